@@ -0,0 +1,22 @@
+/**
+ * 图片衍生图地址
+ * 列表和缩略图展示时使用服务端生成的缩放 WebP 版本，减少移动端流量
+ */
+import { API_CONFIG } from '../config/constants'
+
+export type ImageVariant = 'thumb' | 'small' | 'medium'
+
+const UPLOADS_PREFIX = '/uploads/'
+
+/**
+ * 将 /uploads 下的图片地址转换为指定规格的衍生图地址
+ * data URI 等非 uploads 地址原样返回
+ * @param url 原图地址
+ * @param variant 图片规格
+ */
+export const imageVariantUrl = (url: string | null | undefined, variant: ImageVariant = 'thumb'): string => {
+  if (!url || !url.startsWith(UPLOADS_PREFIX)) {
+    return url || ''
+  }
+  return `${API_CONFIG.BASE_URL}/images/${variant}/${url.slice(UPLOADS_PREFIX.length)}`
+}
@@ -0,0 +1,46 @@
+"""add background_job table
+
+Revision ID: add_background_job
+Revises: add_personnel_name_idx
+Create Date: 2026-10-18
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = 'add_background_job'
+down_revision: Union[str, None] = 'add_personnel_name_idx'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'background_job',
+        sa.Column('id', sa.BigInteger(), autoincrement=True, nullable=False, comment='主键ID'),
+        sa.Column('job_type', sa.String(50), nullable=False, comment='任务类型'),
+        sa.Column('target', sa.String(100), nullable=True, comment='任务对象标识，用于避免同一对象重复提交'),
+        sa.Column('params', sa.Text(), nullable=True, comment='任务参数(JSON)'),
+        sa.Column('status', sa.String(20), nullable=False, server_default='pending', comment='状态: pending/running/succeeded/failed/cancelled'),
+        sa.Column('progress', sa.Integer(), nullable=False, server_default='0', comment='进度百分比'),
+        sa.Column('message', sa.String(500), nullable=True, comment='进度说明'),
+        sa.Column('result', sa.Text(), nullable=True, comment='执行结果(JSON)'),
+        sa.Column('error', sa.Text(), nullable=True, comment='失败原因'),
+        sa.Column('cancel_requested', sa.Boolean(), nullable=False, server_default=sa.false(), comment='是否已请求取消'),
+        sa.Column('created_by', sa.String(100), nullable=True, comment='提交人'),
+        sa.Column('created_at', sa.DateTime(), server_default=sa.func.now(), nullable=False, comment='提交时间'),
+        sa.Column('started_at', sa.DateTime(), nullable=True, comment='开始时间'),
+        sa.Column('finished_at', sa.DateTime(), nullable=True, comment='结束时间'),
+        sa.PrimaryKeyConstraint('id'),
+        comment='后台任务表',
+    )
+    op.create_index('idx_background_job_status', 'background_job', ['status', 'id'], unique=False)
+    op.create_index('idx_background_job_target', 'background_job', ['job_type', 'target'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('idx_background_job_target', table_name='background_job')
+    op.drop_index('idx_background_job_status', table_name='background_job')
+    op.drop_table('background_job')
@@ -0,0 +1,27 @@
+"""add background_job.heartbeat_at
+
+Revision ID: add_background_job_heartbeat
+Revises: add_record_unique_item
+Create Date: 2026-10-18
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = 'add_background_job_heartbeat'
+down_revision: Union[str, None] = 'add_record_unique_item'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        'background_job',
+        sa.Column('heartbeat_at', sa.DateTime(), nullable=True, comment='执行进程最近一次心跳时间'),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column('background_job', 'heartbeat_at')
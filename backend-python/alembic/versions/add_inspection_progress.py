@@ -0,0 +1,177 @@
+"""add inspection_progress table and parsed inspection item columns
+
+Revision ID: add_inspection_progress
+Revises: add_work_plan_outbox
+Create Date: 2026-10-18
+
+"""
+import json
+from collections import defaultdict
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = 'add_inspection_progress'
+down_revision: Union[str, None] = 'add_work_plan_outbox'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+CHUNK_SIZE = 1000
+
+# 迁移时的表结构，不依赖应用模型
+maintenance_plan = sa.table(
+    'maintenance_plan',
+    sa.column('id', sa.BigInteger),
+    sa.column('plan_id', sa.String),
+    sa.column('project_id', sa.String),
+    sa.column('plan_start_date', sa.DateTime),
+    sa.column('plan_end_date', sa.DateTime),
+    sa.column('inspection_items', sa.Text),
+    sa.column('inspection_item_count', sa.Integer),
+    sa.column('inspection_contents', sa.Text),
+)
+periodic_inspection = sa.table(
+    'periodic_inspection',
+    sa.column('inspection_id', sa.String),
+    sa.column('plan_id', sa.String),
+    sa.column('project_id', sa.String),
+    sa.column('plan_start_date', sa.DateTime),
+    sa.column('plan_end_date', sa.DateTime),
+)
+periodic_inspection_record = sa.table(
+    'periodic_inspection_record',
+    sa.column('inspection_id', sa.String),
+    sa.column('inspection_content', sa.Text),
+    sa.column('item_name', sa.String),
+    sa.column('inspected', sa.Boolean),
+)
+inspection_progress = sa.table(
+    'inspection_progress',
+    sa.column('inspection_id', sa.String),
+    sa.column('total_count', sa.Integer),
+    sa.column('filled_count', sa.Integer),
+)
+
+
+def _parse_items(value):
+    """巡查项数量和去重后的巡查内容，无法解析时为 (0, [])"""
+    try:
+        items = json.loads(value) if value else []
+    except (ValueError, TypeError):
+        return 0, []
+    if not isinstance(items, list):
+        return 0, []
+    contents = []
+    for item in items:
+        content = item.get('inspection_content', '') if isinstance(item, dict) else ''
+        if content and content not in contents:
+            contents.append(content)
+    return len(items), contents
+
+
+def _day(value):
+    return value.date() if hasattr(value, 'date') else value
+
+
+def _fill_plan_items(bind) -> dict:
+    """解析所有维保计划的巡查项并写回，返回 {plan_id: (数量, 巡查内容, 项目编号, 开始日期, 结束日期)}"""
+    plans = {}
+    rows = []
+    for plan in bind.execute(sa.select(
+        maintenance_plan.c.id,
+        maintenance_plan.c.plan_id,
+        maintenance_plan.c.project_id,
+        maintenance_plan.c.plan_start_date,
+        maintenance_plan.c.plan_end_date,
+        maintenance_plan.c.inspection_items,
+    )):
+        count, contents = _parse_items(plan.inspection_items)
+        plans[plan.plan_id] = (count, contents, plan.project_id, _day(plan.plan_start_date), _day(plan.plan_end_date))
+        rows.append({
+            'plan_pk': plan.id,
+            'item_count': count,
+            'contents': json.dumps(contents, ensure_ascii=False) if contents else None,
+        })
+    for start in range(0, len(rows), CHUNK_SIZE):
+        bind.execute(
+            maintenance_plan.update()
+            .where(maintenance_plan.c.id == sa.bindparam('plan_pk'))
+            .values(inspection_item_count=sa.bindparam('item_count'), inspection_contents=sa.bindparam('contents')),
+            rows[start:start + CHUNK_SIZE],
+        )
+    return plans
+
+
+def _fill_progress(bind, plans: dict) -> None:
+    """
+    计算所有巡检单的进度
+
+    total_count 为关联维保计划的巡查项数量，未关联时为同项目、日期重叠的维保计划中不同巡查内容的数量；
+    filled_count 为已处理的不同巡查内容(为空时取巡检项名称)的数量
+    """
+    record_key = sa.func.coalesce(
+        sa.func.nullif(periodic_inspection_record.c.inspection_content, ''),
+        periodic_inspection_record.c.item_name,
+        '',
+    )
+    filled = dict(bind.execute(
+        sa.select(
+            periodic_inspection_record.c.inspection_id,
+            sa.func.count(sa.distinct(sa.case((periodic_inspection_record.c.inspected == sa.true(), record_key)))),
+        ).group_by(periodic_inspection_record.c.inspection_id)
+    ).all())
+
+    plans_by_project = defaultdict(list)
+    for _, contents, project_id, plan_start, plan_end in plans.values():
+        if contents and plan_start and plan_end:
+            plans_by_project[project_id].append((plan_start, plan_end, contents))
+
+    rows = []
+    for inspection in bind.execute(sa.select(
+        periodic_inspection.c.inspection_id,
+        periodic_inspection.c.plan_id,
+        periodic_inspection.c.project_id,
+        periodic_inspection.c.plan_start_date,
+        periodic_inspection.c.plan_end_date,
+    )):
+        if inspection.plan_id in plans:
+            total_count = plans[inspection.plan_id][0]
+        else:
+            order_start, order_end = _day(inspection.plan_start_date), _day(inspection.plan_end_date)
+            unique_items = set()
+            if order_start and order_end:
+                for plan_start, plan_end, contents in plans_by_project.get(inspection.project_id, ()):
+                    if order_start <= plan_end and order_end >= plan_start:
+                        unique_items.update(contents)
+            total_count = len(unique_items)
+        rows.append({
+            'inspection_id': inspection.inspection_id,
+            'total_count': total_count,
+            'filled_count': filled.get(inspection.inspection_id, 0),
+        })
+    for start in range(0, len(rows), CHUNK_SIZE):
+        bind.execute(inspection_progress.insert(), rows[start:start + CHUNK_SIZE])
+
+
+def upgrade() -> None:
+    op.add_column('maintenance_plan', sa.Column('inspection_item_count', sa.Integer(), nullable=False, server_default='0', comment='巡查项数量，由inspection_items解析'))
+    op.add_column('maintenance_plan', sa.Column('inspection_contents', sa.Text(), nullable=True, comment='巡查内容去重列表(JSON数组)，由inspection_items解析'))
+    op.create_table(
+        'inspection_progress',
+        sa.Column('inspection_id', sa.String(50), nullable=False, comment='巡检单编号'),
+        sa.Column('total_count', sa.Integer(), nullable=False, server_default='0', comment='巡检事项总数'),
+        sa.Column('filled_count', sa.Integer(), nullable=False, server_default='0', comment='已处理的巡检事项数'),
+        sa.Column('updated_at', sa.DateTime(), server_default=sa.func.now(), nullable=False, comment='更新时间'),
+        sa.ForeignKeyConstraint(['inspection_id'], ['periodic_inspection.inspection_id'], ondelete='CASCADE', onupdate='CASCADE'),
+        sa.PrimaryKeyConstraint('inspection_id'),
+        comment='定期巡检进度表，随巡检记录和维保计划变更在同一事务中更新',
+    )
+    bind = op.get_bind()
+    _fill_progress(bind, _fill_plan_items(bind))
+
+
+def downgrade() -> None:
+    op.drop_table('inspection_progress')
+    op.drop_column('maintenance_plan', 'inspection_contents')
+    op.drop_column('maintenance_plan', 'inspection_item_count')
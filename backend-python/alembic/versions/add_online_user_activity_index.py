@@ -0,0 +1,27 @@
+"""add partial last_activity index for online session sweeper
+
+Revision ID: add_online_user_activity_idx
+Revises: add_work_order_alert_idx
+Create Date: 2026-10-18
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = 'add_online_user_activity_idx'
+down_revision: Union[str, None] = 'add_work_order_alert_idx'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        'idx_online_user_active_last_activity', 'online_users', ['last_activity'],
+        unique=False, postgresql_where=sa.text('is_active = true')
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('idx_online_user_active_last_activity', table_name='online_users')
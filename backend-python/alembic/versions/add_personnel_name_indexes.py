@@ -0,0 +1,33 @@
+"""add (personnel name, id) indexes for chunked rename cascade
+
+Revision ID: add_personnel_name_idx
+Revises: externalize_work_order_blobs
+Create Date: 2026-10-18
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+revision: str = 'add_personnel_name_idx'
+down_revision: Union[str, None] = 'externalize_work_order_blobs'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('idx_project_info_manager', 'project_info', ['project_manager', 'id'], unique=False)
+    op.create_index('idx_work_plan_personnel', 'work_plan', ['maintenance_personnel', 'id'], unique=False)
+    op.create_index('idx_periodic_personnel', 'periodic_inspection', ['maintenance_personnel', 'id'], unique=False)
+    op.create_index('idx_temp_personnel', 'temporary_repair', ['maintenance_personnel', 'id'], unique=False)
+    op.create_index('idx_spot_personnel', 'spot_work', ['maintenance_personnel', 'id'], unique=False)
+    op.create_index('idx_operation_log_operator', 'work_order_operation_log', ['operator_name', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('idx_operation_log_operator', table_name='work_order_operation_log')
+    op.drop_index('idx_spot_personnel', table_name='spot_work')
+    op.drop_index('idx_temp_personnel', table_name='temporary_repair')
+    op.drop_index('idx_periodic_personnel', table_name='periodic_inspection')
+    op.drop_index('idx_work_plan_personnel', table_name='work_plan')
+    op.drop_index('idx_project_info_manager', table_name='project_info')
@@ -0,0 +1,63 @@
+"""add unique constraint on periodic_inspection_record (inspection_id, item_id)
+
+Revision ID: add_record_unique_item
+Revises: add_inspection_progress
+Create Date: 2026-10-18
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = 'add_record_unique_item'
+down_revision: Union[str, None] = 'add_inspection_progress'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+CHUNK_SIZE = 1000
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    duplicated = bind.execute(sa.text(
+        """
+        SELECT DISTINCT inspection_id FROM periodic_inspection_record
+        GROUP BY inspection_id, item_id HAVING COUNT(*) > 1
+        """
+    )).scalars().all()
+    # 同一巡检单同一事项的重复记录只保留最新的一条
+    op.execute(
+        """
+        DELETE FROM periodic_inspection_record
+        WHERE id NOT IN (
+            SELECT MAX(id) FROM periodic_inspection_record GROUP BY inspection_id, item_id
+        )
+        """
+    )
+    op.create_unique_constraint(
+        'uq_record_inspection_item', 'periodic_inspection_record', ['inspection_id', 'item_id']
+    )
+    # 删除重复记录只影响已处理数，巡检事项总数不变
+    for start in range(0, len(duplicated), CHUNK_SIZE):
+        bind.execute(
+            sa.text(
+                """
+                UPDATE inspection_progress SET filled_count = (
+                    SELECT COUNT(DISTINCT CASE WHEN r.inspected = :inspected
+                        THEN COALESCE(NULLIF(r.inspection_content, ''), r.item_name, '') END)
+                    FROM periodic_inspection_record r
+                    WHERE r.inspection_id = inspection_progress.inspection_id
+                )
+                WHERE inspection_id IN :inspection_ids
+                """
+            ).bindparams(
+                sa.bindparam('inspection_ids', expanding=True),
+                sa.bindparam('inspected', type_=sa.Boolean()),
+            ),
+            {'inspection_ids': duplicated[start:start + CHUNK_SIZE], 'inspected': True},
+        )
+
+
+def downgrade() -> None:
+    op.drop_constraint('uq_record_inspection_item', 'periodic_inspection_record', type_='unique')
@@ -0,0 +1,81 @@
+"""add serial_counter table
+
+Revision ID: add_serial_counter
+Revises: add_background_job
+Create Date: 2026-10-18
+
+"""
+import re
+from datetime import datetime
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = 'add_serial_counter'
+down_revision: Union[str, None] = 'add_background_job'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+WORK_ORDER_ID = re.compile(r'^(XJ|WX|YG)-(.+)-(\d{8})(?:-(\d+))?$')
+WEEKLY_REPORT_ID = re.compile(r'^(ZB)-()(\d{8})-(\d+)$')
+MAINTENANCE_LOG_ID = re.compile(r'^(WX)-(.+)-(\d{8})-(\d+)$')
+
+# (表, 编号列, 编号格式, 计数器前缀的附加前缀)
+SEED_SOURCES = [
+    ('periodic_inspection', 'inspection_id', WORK_ORDER_ID, ''),
+    ('temporary_repair', 'repair_id', WORK_ORDER_ID, ''),
+    ('spot_work', 'work_id', WORK_ORDER_ID, ''),
+    ('weekly_report', 'report_id', WEEKLY_REPORT_ID, ''),
+    ('maintenance_log', 'log_id', MAINTENANCE_LOG_ID, 'LOG-'),
+]
+
+
+def _seed_counters(connection) -> list[dict]:
+    """按已有编号的最大序号初始化计数器，避免新编号与历史编号重复"""
+    counters: dict[tuple, int] = {}
+    for table, column, pattern, counter_prefix in SEED_SOURCES:
+        rows = connection.execute(sa.text(f"SELECT {column} FROM {table}"))
+        for (value,) in rows:
+            match = pattern.match(value or '')
+            if not match:
+                continue
+            prefix, scope, day, seq = match.groups()
+            try:
+                day = datetime.strptime(day, '%Y%m%d').date()
+            except ValueError:
+                continue
+            key = (f"{counter_prefix}{prefix}", scope, day)
+            counters[key] = max(counters.get(key, 0), int(seq or 0))
+    return [
+        {'prefix': prefix, 'scope': scope, 'day': day, 'last_value': last_value}
+        for (prefix, scope, day), last_value in counters.items()
+        if last_value > 0 and len(prefix) <= 20 and len(scope) <= 50
+    ]
+
+
+def upgrade() -> None:
+    serial_counter = op.create_table(
+        'serial_counter',
+        sa.Column('prefix', sa.String(20), nullable=False, comment='编号前缀'),
+        sa.Column('scope', sa.String(50), nullable=False, server_default='', comment='编号范围(如项目编号，空字符串表示全局)'),
+        sa.Column('day', sa.Date(), nullable=False, comment='编号日期'),
+        sa.Column('last_value', sa.Integer(), nullable=False, server_default='0', comment='已分配的最大序号'),
+        sa.Column('updated_at', sa.DateTime(), server_default=sa.func.now(), nullable=False, comment='更新时间'),
+        sa.PrimaryKeyConstraint('prefix', 'scope', 'day'),
+        comment='编号计数器表',
+    )
+
+    seeds = _seed_counters(op.get_bind())
+    if seeds:
+        op.bulk_insert(serial_counter, seeds)
+
+    op.execute("DROP SEQUENCE IF EXISTS work_order_seq")
+
+
+def downgrade() -> None:
+    start = op.get_bind().execute(sa.text(
+        "SELECT COALESCE(MAX(last_value), 0) + 1 FROM serial_counter WHERE prefix IN ('XJ', 'WX', 'YG')"
+    )).scalar()
+    op.execute(f"CREATE SEQUENCE IF NOT EXISTS work_order_seq START {int(start)}")
+    op.drop_table('serial_counter')
@@ -0,0 +1,31 @@
+"""add table_change_counter table
+
+Revision ID: add_table_change_counter
+Revises: add_work_plan_outbox_attempts
+Create Date: 2026-10-18
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = 'add_table_change_counter'
+down_revision: Union[str, None] = 'add_work_plan_outbox_attempts'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'table_change_counter',
+        sa.Column('table_name', sa.String(64), nullable=False, comment='表名'),
+        sa.Column('version', sa.BigInteger(), nullable=False, server_default='0', comment='变更计数，表中数据每次提交变更后加一'),
+        sa.Column('updated_at', sa.DateTime(), server_default=sa.func.now(), nullable=False, comment='更新时间'),
+        sa.PrimaryKeyConstraint('table_name'),
+        comment='表变更计数器，用作列表接口的 ETag 校验值',
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('table_change_counter')
@@ -0,0 +1,40 @@
+"""add partial indexes for overdue and expiring-soon alerts
+
+Revision ID: add_work_order_alert_idx
+Revises: add_work_order_daily_rollup
+Create Date: 2026-10-18
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = 'add_work_order_alert_idx'
+down_revision: Union[str, None] = 'add_work_order_daily_rollup'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TABLES = [
+    ('periodic', 'periodic_inspection'),
+    ('temp', 'temporary_repair'),
+    ('spot', 'spot_work'),
+]
+
+
+def upgrade() -> None:
+    for prefix, table in TABLES:
+        op.create_index(
+            f'idx_{prefix}_open_plan_end', table, ['status', 'plan_end_date'],
+            unique=False, postgresql_where=sa.text('is_deleted = false')
+        )
+        op.create_index(
+            f'idx_{prefix}_open_plan_start', table, ['status', 'plan_start_date'],
+            unique=False, postgresql_where=sa.text('is_deleted = false')
+        )
+
+
+def downgrade() -> None:
+    for prefix, table in reversed(TABLES):
+        op.drop_index(f'idx_{prefix}_open_plan_start', table_name=table)
+        op.drop_index(f'idx_{prefix}_open_plan_end', table_name=table)
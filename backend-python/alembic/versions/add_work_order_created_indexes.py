@@ -0,0 +1,27 @@
+"""add created_at indexes for unified work order list
+
+Revision ID: add_work_order_created_idx
+Revises: add_dingtalk_fields
+Create Date: 2026-10-18
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+revision: str = 'add_work_order_created_idx'
+down_revision: Union[str, None] = 'add_dingtalk_fields'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('idx_periodic_created_at', 'periodic_inspection', ['created_at', 'id'], unique=False)
+    op.create_index('idx_temp_created_at', 'temporary_repair', ['created_at', 'id'], unique=False)
+    op.create_index('idx_spot_created_at', 'spot_work', ['created_at', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('idx_spot_created_at', table_name='spot_work')
+    op.drop_index('idx_temp_created_at', table_name='temporary_repair')
+    op.drop_index('idx_periodic_created_at', table_name='periodic_inspection')
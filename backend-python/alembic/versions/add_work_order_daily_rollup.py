@@ -0,0 +1,68 @@
+"""add work_order_daily_rollup table
+
+Revision ID: add_work_order_daily_rollup
+Revises: add_work_order_created_idx
+Create Date: 2026-10-18
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = 'add_work_order_daily_rollup'
+down_revision: Union[str, None] = 'add_work_order_created_idx'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+SOURCES = [
+    ('periodic_inspection', 'inspection'),
+    ('temporary_repair', 'repair'),
+    ('spot_work', 'spotwork'),
+]
+
+
+def upgrade() -> None:
+    op.create_table(
+        'work_order_daily_rollup',
+        sa.Column('stat_date', sa.Date(), nullable=False, comment='统计日期(计划开始日期)'),
+        sa.Column('project_id', sa.String(50), nullable=False, server_default='', comment='项目编号'),
+        sa.Column('maintenance_personnel', sa.String(100), nullable=False, server_default='', comment='运维人员(空字符串表示未指定)'),
+        sa.Column('order_type', sa.String(20), nullable=False, comment='工单类型: inspection/repair/spotwork'),
+        sa.Column('status', sa.String(20), nullable=False, comment='状态'),
+        sa.Column('order_count', sa.Integer(), nullable=False, server_default='0', comment='工单数量'),
+        sa.Column('completed_count', sa.Integer(), nullable=False, server_default='0', comment='有实际完成时间的工单数量'),
+        sa.Column('on_time_count', sa.Integer(), nullable=False, server_default='0', comment='按期完成的工单数量'),
+        sa.Column('updated_at', sa.DateTime(), server_default=sa.func.now(), nullable=False, comment='更新时间'),
+        sa.PrimaryKeyConstraint('stat_date', 'project_id', 'maintenance_personnel', 'order_type', 'status'),
+        comment='工单日汇总表',
+    )
+    op.create_index('idx_rollup_personnel_date', 'work_order_daily_rollup', ['maintenance_personnel', 'stat_date'], unique=False)
+    op.create_index('idx_rollup_project_date', 'work_order_daily_rollup', ['project_id', 'stat_date'], unique=False)
+
+    for table_name, order_type in SOURCES:
+        op.execute(f"""
+            INSERT INTO work_order_daily_rollup
+                (stat_date, project_id, maintenance_personnel, order_type, status,
+                 order_count, completed_count, on_time_count)
+            SELECT DATE(plan_start_date),
+                   COALESCE(project_id, ''),
+                   COALESCE(maintenance_personnel, ''),
+                   '{order_type}',
+                   COALESCE(status, ''),
+                   COUNT(*),
+                   COUNT(actual_completion_date),
+                   COUNT(*) FILTER (
+                       WHERE actual_completion_date IS NOT NULL
+                         AND DATE(actual_completion_date) <= DATE(plan_end_date)
+                   )
+            FROM {table_name}
+            WHERE is_deleted = FALSE AND plan_start_date IS NOT NULL
+            GROUP BY 1, 2, 3, 5
+        """)
+
+
+def downgrade() -> None:
+    op.drop_index('idx_rollup_project_date', table_name='work_order_daily_rollup')
+    op.drop_index('idx_rollup_personnel_date', table_name='work_order_daily_rollup')
+    op.drop_table('work_order_daily_rollup')
@@ -0,0 +1,34 @@
+"""add work_plan_outbox table
+
+Revision ID: add_work_plan_outbox
+Revises: add_serial_counter
+Create Date: 2026-10-18
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = 'add_work_plan_outbox'
+down_revision: Union[str, None] = 'add_serial_counter'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'work_plan_outbox',
+        sa.Column('id', sa.BigInteger(), autoincrement=True, nullable=False, comment='主键ID'),
+        sa.Column('source_type', sa.String(20), nullable=False, comment='来源类型: inspection/repair/spotwork/maintenance_plan'),
+        sa.Column('source_key', sa.String(50), nullable=False, comment='来源单据编号，即工作计划编号'),
+        sa.Column('created_at', sa.DateTime(), server_default=sa.func.now(), nullable=False, comment='记录时间'),
+        sa.PrimaryKeyConstraint('id'),
+        comment='工作计划同步发件箱，工单和维保计划变更后待同步到工作计划的记录',
+    )
+    op.create_index('idx_work_plan_outbox_source', 'work_plan_outbox', ['source_type', 'source_key'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('idx_work_plan_outbox_source', table_name='work_plan_outbox')
+    op.drop_table('work_plan_outbox')
@@ -0,0 +1,38 @@
+"""add work_plan_outbox retry columns
+
+Revision ID: add_work_plan_outbox_attempts
+Revises: add_background_job_heartbeat
+Create Date: 2026-10-18
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = 'add_work_plan_outbox_attempts'
+down_revision: Union[str, None] = 'add_background_job_heartbeat'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        'work_plan_outbox',
+        sa.Column('attempts', sa.Integer(), server_default='0', nullable=False, comment='同步失败次数'),
+    )
+    op.add_column('work_plan_outbox', sa.Column('last_error', sa.Text(), nullable=True, comment='最近一次同步失败原因'))
+    op.add_column(
+        'work_plan_outbox',
+        sa.Column('dead_at', sa.DateTime(), nullable=True, comment='失败次数达到上限、停止重试的时间'),
+    )
+    op.create_index(
+        'idx_work_plan_outbox_pending', 'work_plan_outbox', ['dead_at', 'attempts', 'id'], unique=False
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('idx_work_plan_outbox_pending', table_name='work_plan_outbox')
+    op.drop_column('work_plan_outbox', 'dead_at')
+    op.drop_column('work_plan_outbox', 'last_error')
+    op.drop_column('work_plan_outbox', 'attempts')
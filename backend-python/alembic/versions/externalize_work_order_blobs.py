@@ -0,0 +1,169 @@
+"""move inline base64 signatures and photos into the blob store
+
+Revision ID: externalize_work_order_blobs
+Revises: add_online_user_activity_idx
+Create Date: 2026-10-18
+
+"""
+import base64
+import binascii
+import hashlib
+import json
+import os
+import re
+import tempfile
+from pathlib import Path
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = 'externalize_work_order_blobs'
+down_revision: Union[str, None] = 'add_online_user_activity_idx'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH_SIZE = 200
+
+# 迁移时的 blob 存储格式：uploads/blobs/<摘要前两位>/<SHA-256><扩展名>
+BLOB_DIR = Path(__file__).resolve().parents[2] / "app" / "uploads" / "blobs"
+BLOB_URL_PREFIX = "/uploads/blobs/"
+
+# {表名: {列名: 是否为 JSON 数组}}
+BLOB_TABLE_COLUMNS = {
+    'periodic_inspection': {'signature': False},
+    'temporary_repair': {'signature': False, 'customer_signature': False, 'photos': True},
+    'spot_work': {'signature': False, 'photos': True},
+}
+
+MIME_EXTENSIONS = {
+    'image/png': '.png',
+    'image/jpeg': '.jpg',
+    'image/jpg': '.jpg',
+    'image/gif': '.gif',
+    'image/webp': '.webp',
+}
+
+EXTENSION_MIMES = {
+    '.png': 'image/png',
+    '.jpg': 'image/jpeg',
+    '.gif': 'image/gif',
+    '.webp': 'image/webp',
+}
+
+DATA_URI_PATTERN = re.compile(r'^data:(?P<mime>[\w.+-]+/[\w.+-]+)?(?:;[\w.+-]+=[\w.+-]+)*;base64,', re.IGNORECASE)
+
+RAW_BASE64_MIN_LENGTH = 512
+
+
+def _sniff_extension(data: bytes) -> str | None:
+    if data.startswith(b'\x89PNG\r\n\x1a\n'):
+        return '.png'
+    if data.startswith(b'\xff\xd8\xff'):
+        return '.jpg'
+    if data[:6] in (b'GIF87a', b'GIF89a'):
+        return '.gif'
+    if data[:4] == b'RIFF' and data[8:12] == b'WEBP':
+        return '.webp'
+    return None
+
+
+def _store(data: bytes, extension: str) -> str:
+    """写入内容寻址文件，已存在时直接返回引用"""
+    digest = hashlib.sha256(data).hexdigest()
+    target = BLOB_DIR / digest[:2] / f"{digest}{extension}"
+    if not target.exists():
+        target.parent.mkdir(parents=True, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=target.parent, prefix='.tmp-')
+        with os.fdopen(fd, 'wb') as file:
+            file.write(data)
+        os.replace(temp_path, target)
+    return f"{BLOB_URL_PREFIX}{digest[:2]}/{digest}{extension}"
+
+
+def _externalize(value):
+    """data URI 或裸 base64 图片转存为引用，其他值原样返回"""
+    if not value or not isinstance(value, str) or value.startswith(BLOB_URL_PREFIX):
+        return value
+    match = DATA_URI_PATTERN.match(value)
+    if match:
+        payload = value[match.end():]
+    elif len(value) >= RAW_BASE64_MIN_LENGTH and not value.startswith(('/uploads/', 'http')):
+        payload = value
+    else:
+        return value
+    try:
+        data = base64.b64decode(payload.strip(), validate=not match)
+    except (binascii.Error, ValueError):
+        return value
+    extension = _sniff_extension(data)
+    if extension is None and match and match.group('mime'):
+        extension = MIME_EXTENSIONS.get(match.group('mime').lower())
+    if extension is None:
+        return value
+    return _store(data, extension)
+
+
+def _inline(value):
+    """引用还原为 data URI，文件不存在时原样返回"""
+    if not isinstance(value, str) or not value.startswith(BLOB_URL_PREFIX):
+        return value
+    relative = value[len(BLOB_URL_PREFIX):]
+    path = BLOB_DIR / relative
+    if '..' in relative or relative.startswith('/') or not path.exists():
+        return value
+    mime = EXTENSION_MIMES.get(path.suffix, 'application/octet-stream')
+    return f"data:{mime};base64,{base64.b64encode(path.read_bytes()).decode('ascii')}"
+
+
+def _convert_list(value, reverse: bool):
+    """JSON 数组形式的图片列表逐项转换，不含待转换内容或无法解析时原样返回"""
+    if not value or not isinstance(value, str):
+        return value
+    if reverse and BLOB_URL_PREFIX not in value:
+        return value
+    if not reverse and 'base64' not in value and len(value) < RAW_BASE64_MIN_LENGTH:
+        return value
+    convert = _inline if reverse else _externalize
+    try:
+        items = json.loads(value)
+    except (TypeError, ValueError):
+        return value
+    if not isinstance(items, list):
+        return value
+    return json.dumps([convert(item) for item in items], ensure_ascii=False)
+
+
+def _convert(reverse: bool) -> None:
+    conn = op.get_bind()
+    convert = _inline if reverse else _externalize
+    for table_name, columns in BLOB_TABLE_COLUMNS.items():
+        table = sa.table(table_name, sa.column('id', sa.BigInteger), *(sa.column(name, sa.Text) for name in columns))
+        last_id = 0
+        while True:
+            rows = conn.execute(
+                sa.select(table.c.id, *(table.c[name] for name in columns))
+                .where(table.c.id > last_id)
+                .order_by(table.c.id)
+                .limit(BATCH_SIZE)
+            ).all()
+            if not rows:
+                break
+            last_id = rows[-1].id
+            for row in rows:
+                values = {}
+                for name, is_list in columns.items():
+                    original = getattr(row, name)
+                    converted = _convert_list(original, reverse) if is_list else convert(original)
+                    if converted != original:
+                        values[name] = converted
+                if values:
+                    conn.execute(table.update().where(table.c.id == row.id).values(**values))
+
+
+def upgrade() -> None:
+    _convert(reverse=False)
+
+
+def downgrade() -> None:
+    _convert(reverse=True)
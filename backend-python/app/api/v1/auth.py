@@ -23,6 +23,7 @@ from app.dependencies import get_current_user_required as get_user_info
 from app.models.online_user import OnlineUser
 from app.models.personnel import Personnel
 from app.schemas.common import ApiResponse
+from app.services.online_presence import heartbeat_aggregator
 
 router = APIRouter(prefix="/auth", tags=["Authentication"])
 
@@ -269,7 +270,9 @@ async def logout(
         
         if existing:
             existing.is_active = False
+            existing.last_activity = datetime.utcnow()
             db.commit()
+        heartbeat_aggregator.record_logout(current_user.id)
     
     return ApiResponse(
         code=200,
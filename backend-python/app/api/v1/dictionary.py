@@ -5,6 +5,12 @@ from sqlalchemy.orm import Session
 from app.database import get_db
 from app.schemas.common import ApiResponse
 from app.services.dictionary import DictionaryService
+from app.utils.conditional_get import (
+    REFERENCE_POLICY,
+    ConditionalGet,
+    conditional_get,
+    reference_validator,
+)
 
 router = APIRouter(prefix="/dictionary", tags=["Dictionary Management"])
 
@@ -12,28 +18,36 @@ router = APIRouter(prefix="/dictionary", tags=["Dictionary Management"])
 @router.get("/type/{dict_type}", response_model=ApiResponse)
 def get_dictionary_by_type(
     dict_type: str,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_db),
+    conditional: ConditionalGet = Depends(conditional_get(REFERENCE_POLICY))
 ):
+    not_modified = conditional.evaluate(reference_validator(db, 'dictionary'))
+    if not_modified is not None:
+        return not_modified
+
     service = DictionaryService(db)
-    items = service.get_by_type(dict_type)
     return ApiResponse(
         code=200,
         message="success",
-        data=[item.to_dict() for item in items]
+        data=service.get_dicts_by_type(dict_type)
     )
 
 
 @router.get("/all/list", response_model=ApiResponse)
 def get_all_dictionaries_unpaginated(
     dict_type: str | None = Query(None, description="Dictionary type filter"),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_db),
+    conditional: ConditionalGet = Depends(conditional_get(REFERENCE_POLICY))
 ):
+    not_modified = conditional.evaluate(reference_validator(db, 'dictionary'))
+    if not_modified is not None:
+        return not_modified
+
     service = DictionaryService(db)
-    items = service.get_all_unpaginated(dict_type)
     return ApiResponse(
         code=200,
         message="success",
-        data=[item.to_dict() for item in items]
+        data=service.get_all_dicts(dict_type)
     )
 
 
@@ -42,8 +56,13 @@ def get_dictionaries_list(
     page: int = Query(0, ge=0, description="Page number, starts from 0"),
     size: int = Query(10, ge=1, le=1000, description="Page size"),
     dict_type: str | None = Query(None, description="Dictionary type filter"),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_db),
+    conditional: ConditionalGet = Depends(conditional_get(REFERENCE_POLICY))
 ):
+    not_modified = conditional.evaluate(reference_validator(db, 'dictionary'))
+    if not_modified is not None:
+        return not_modified
+
     service = DictionaryService(db)
     items, total = service.get_all(page=page, size=size, dict_type=dict_type)
     items_dict = [item.to_dict() for item in items]
@@ -5,6 +5,7 @@ from sqlalchemy.orm import Session
 from app.database import get_db
 from app.dependencies import UserInfo, get_current_user_info
 from app.schemas.common import ApiResponse
+from app.services.alert_counter import AlertCounterService
 from app.services.expiring_soon import ExpiringSoonService
 
 router = APIRouter(prefix="/expiring-soon", tags=["Expiring Soon Alert"])
@@ -59,15 +60,12 @@ def get_expiring_count(
 
     用于手机端首页显示临期提醒数量
     """
-    maintenance_personnel = None if user_info.is_manager else user_info.name
-
-    service = ExpiringSoonService(db)
-    count = service.get_expiring_count(maintenance_personnel=maintenance_personnel)
+    counts = AlertCounterService(db).get_counts(user_info.name, user_info.is_manager)
 
     return ApiResponse(
         code=200,
         message="success",
         data={
-            'count': count
+            'count': counts['expiring']
         }
     )
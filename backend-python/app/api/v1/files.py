@@ -0,0 +1,97 @@
+import logging
+import time
+from urllib.parse import quote
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import FileResponse, Response
+
+from app.config import get_settings
+from app.dependencies import UserInfo, get_current_user_required
+from app.schemas.common import ApiResponse
+from app.services.image_derivatives import VARIANTS
+from app.utils.blob_store import resolve_upload_path
+from app.utils.signed_url import sign_image_url, sign_upload_url, verify_upload_signature
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+router = APIRouter(prefix="/files", tags=["Files"])
+uploads_router = APIRouter(prefix="/uploads", tags=["Files"])
+
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+REVALIDATE_CACHE_CONTROL = "public, max-age=86400"
+
+
+def check_upload_access(path: str, expires: int | None, signature: str | None) -> str:
+    """
+    校验上传文件的访问签名，返回对应的 Cache-Control
+
+    带签名参数时校验签名和过期时间，签名地址只允许浏览器私有缓存到过期为止；
+    upload_require_signature 开启时必须带签名。blobs 下的文件按内容寻址永不变化，
+    不带签名时可以长期公开缓存，其他文件缓存一天后重新验证
+
+    Args:
+        path: 相对 uploads 目录的路径
+        expires: 过期时间戳
+        signature: 签名
+
+    Raises:
+        HTTPException: 签名无效、已过期或缺少签名
+    """
+    if expires is not None or signature is not None:
+        if expires is None or not signature or not verify_upload_signature(path, expires, signature):
+            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="文件地址无效或已过期")
+        return f"private, max-age={max(expires - int(time.time()), 0)}"
+    if settings.upload_require_signature:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="文件地址缺少签名")
+    return IMMUTABLE_CACHE_CONTROL if path.startswith("blobs/") else REVALIDATE_CACHE_CONTROL
+
+
+@router.get("/sign", response_model=ApiResponse)
+def sign_upload(
+    url: str = Query(..., description="/uploads/... 文件地址"),
+    variant: str | None = Query(None, description="图片规格，提供时同时返回衍生图的签名地址"),
+    user_info: UserInfo = Depends(get_current_user_required)
+):
+    """
+    生成上传文件的签名地址，有效期由 upload_url_ttl_seconds 配置
+    """
+    if variant is not None and variant not in VARIANTS:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="不支持的图片规格")
+    now = time.time()
+    try:
+        signed = sign_upload_url(url, settings.upload_url_ttl_seconds, now)
+        data = {"url": signed, "expires_in": settings.upload_url_ttl_seconds}
+        if variant is not None:
+            data["image_url"] = sign_image_url(url, variant, settings.upload_url_ttl_seconds, now)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e)) from None
+    return ApiResponse.success(data)
+
+
+@uploads_router.get("/{path:path}")
+def serve_upload(
+    path: str,
+    expires: int | None = Query(None),
+    signature: str | None = Query(None)
+):
+    """
+    访问上传文件
+
+    带签名参数时校验签名和过期时间；upload_require_signature 开启时必须带签名，
+    衍生图接口 /images 经 check_upload_access 执行同样的校验。
+    upload_serve_mode 为 accel 时只返回 X-Accel-Redirect，由 nginx 通过 sendfile 发送文件，
+    不占用 Python worker；为 direct 时由应用直接返回文件，用于没有 nginx 的开发环境
+    """
+    cache_control = check_upload_access(path, expires, signature)
+
+    source = resolve_upload_path(path)
+    if source is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="文件不存在")
+
+    if settings.upload_serve_mode == "accel":
+        return Response(headers={
+            "X-Accel-Redirect": f"{settings.upload_accel_prefix}{quote(path)}",
+            "Cache-Control": cache_control,
+        })
+    return FileResponse(source, headers={"Cache-Control": cache_control})
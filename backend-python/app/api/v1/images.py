@@ -0,0 +1,46 @@
+import logging
+
+from fastapi import APIRouter, HTTPException, Query, Request, status
+from fastapi.responses import FileResponse, Response
+
+from app.api.v1.files import check_upload_access
+from app.services.image_derivatives import VARIANTS, derivative_cache
+from app.utils.blob_store import resolve_upload_path
+
+logger = logging.getLogger(__name__)
+router = APIRouter(prefix="/images", tags=["Image Derivatives"])
+
+
+@router.get("/{variant}/{path:path}")
+async def get_image_derivative(
+    variant: str,
+    path: str,
+    request: Request,
+    expires: int | None = Query(None),
+    signature: str | None = Query(None)
+):
+    """
+    获取 uploads 下图片的缩放 WebP 版本
+
+    path 为相对 uploads 目录的路径，例如 /uploads/blobs/ab/xxx.png 对应 blobs/ab/xxx.png；
+    访问控制和缓存策略与 /uploads 相同，签名地址沿用原图的 expires、signature 参数
+    """
+    if variant not in VARIANTS:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="不支持的图片规格")
+
+    cache_control = check_upload_access(path, expires, signature)
+    source = resolve_upload_path(path)
+    if source is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="图片不存在")
+
+    try:
+        derivative, key = await derivative_cache.get(variant, source, path)
+    except Exception as e:
+        logger.warning(f"生成衍生图失败 ({path}): {str(e)}")
+        return FileResponse(source, headers={"Cache-Control": cache_control})
+
+    etag = f'"{key}"'
+    headers = {"ETag": etag, "Cache-Control": cache_control}
+    if etag in request.headers.get("if-none-match", ""):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return FileResponse(derivative, media_type="image/webp", headers=headers)
@@ -1,5 +1,7 @@
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, Response
 from sqlalchemy.orm import Session
 
 from app.database import get_db
@@ -7,21 +9,54 @@ from app.dependencies import UserInfo, get_manager_user
 from app.schemas.common import ApiResponse, PaginatedResponse
 from app.schemas.inspection_item import InspectionItemCreate, InspectionItemUpdate
 from app.services.inspection_item import InspectionItemService
+from app.utils.conditional_get import (
+    REFERENCE_POLICY,
+    ConditionalGet,
+    conditional_get,
+    etag_matches,
+    reference_validator,
+)
 
 router = APIRouter(prefix="/inspection-item", tags=["巡检事项管理"])
 
+# ApiResponse(code=200, message="获取成功") 按 FastAPI 的方式序列化后以 data 为界拆开，data 直接拼接缓存的 JSON
+TREE_RESPONSE_PREFIX, _, TREE_RESPONSE_SUFFIX = JSONResponse(
+    jsonable_encoder(ApiResponse(code=200, message="获取成功", data=None))
+).body.rpartition(b'null')
+
 @router.get("/tree", response_model=ApiResponse)
 def get_inspection_item_tree(
+    request: Request,
+    root: int | None = Query(None, description="子树根节点ID，为空返回整棵树"),
+    depth: int | None = Query(None, ge=1, description="返回的层数，为空不限制"),
     db: Session = Depends(get_db)
 ):
+    """
+    获取巡检事项树
+    树快照按版本缓存，响应带 ETag，If-None-Match 命中时返回 304
+    """
     service = InspectionItemService(db)
-    tree = service.get_tree()
-    return ApiResponse(code=200, message="获取成功", data=tree)
+    rendered = service.get_tree_json(root, depth)
+    if rendered is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="巡检事项不存在")
+
+    data, digest = rendered
+    etag = f'"{digest}"'
+    headers = REFERENCE_POLICY.headers(etag)
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    body = TREE_RESPONSE_PREFIX + data + TREE_RESPONSE_SUFFIX
+    return Response(content=body, media_type="application/json", headers=headers)
 
 @router.get("/all/list", response_model=ApiResponse)
 def get_all_inspection_items(
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_db),
+    conditional: ConditionalGet = Depends(conditional_get(REFERENCE_POLICY))
 ):
+    not_modified = conditional.evaluate(reference_validator(db, 'inspection_item'))
+    if not_modified is not None:
+        return not_modified
+
     service = InspectionItemService(db)
     items = service.get_all_items()
     return ApiResponse(code=200, message="获取成功", data=[item.to_dict() for item in items])
@@ -31,8 +66,13 @@ def get_inspection_item_list(
     page: int = 0,
     size: int = 10,
     keyword: str | None = None,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_db),
+    conditional: ConditionalGet = Depends(conditional_get(REFERENCE_POLICY))
 ):
+    not_modified = conditional.evaluate(reference_validator(db, 'inspection_item'))
+    if not_modified is not None:
+        return not_modified
+
     service = InspectionItemService(db)
     if keyword:
         items = service.search_items(keyword)
@@ -0,0 +1,41 @@
+"""
+后台任务API
+提供后台任务的进度查询和取消接口
+"""
+from fastapi import APIRouter, Depends
+from sqlalchemy.orm import Session
+
+from app.database import get_db
+from app.dependencies import UserInfo, get_current_user_required, get_manager_user
+from app.schemas.common import ApiResponse
+from app.services.background_jobs import BackgroundJobService
+
+router = APIRouter(prefix="/jobs", tags=["后台任务"])
+
+
+@router.get("/{id}", response_model=ApiResponse)
+def get_job(
+    id: int,
+    db: Session = Depends(get_db),
+    user_info: UserInfo = Depends(get_current_user_required)
+):
+    """
+    查询后台任务状态和进度
+    """
+    job = BackgroundJobService(db).get_by_id(id)
+    return ApiResponse.success(job.to_dict())
+
+
+@router.post("/{id}/cancel", response_model=ApiResponse)
+def cancel_job(
+    id: int,
+    db: Session = Depends(get_db),
+    user_info: UserInfo = Depends(get_manager_user)
+):
+    """
+    取消后台任务
+    未开始的任务立即取消，执行中的任务在当前分段提交后停止
+    需要管理员或部门经理权限
+    """
+    job = BackgroundJobService(db).cancel(id)
+    return ApiResponse.success(job.to_dict(), "已提交取消")
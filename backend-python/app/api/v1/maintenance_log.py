@@ -16,6 +16,7 @@ from app.models.maintenance_log import MaintenanceLog
 from app.models.personnel import Personnel
 from app.models.work_order_operation_log import WorkOrderOperationLog
 from app.schemas.common import ApiResponse
+from app.utils.work_order_id_generator import generate_maintenance_log_id
 
 router = APIRouter(prefix="/maintenance-log", tags=["Maintenance Log Management"])
 
@@ -47,16 +48,7 @@ def generate_log_id(project_id: str, log_type: str, db: Session) -> str:
     格式: 前缀-项目编号-年月日-序号
     示例: WX-TQ2023423-20251123-01
     """
-    prefix = get_log_type_prefix(log_type)
-    today = datetime.now().strftime("%Y%m%d")
-    base_id = f"{prefix}-{project_id}-{today}"
-
-    count = db.query(MaintenanceLog).filter(
-        MaintenanceLog.log_id.like(f"{base_id}%")
-    ).count()
-
-    sequence = str(count + 1).zfill(2)
-    return f"{base_id}-{sequence}"
+    return generate_maintenance_log_id(db, get_log_type_prefix(log_type), project_id)
 
 
 def record_operation_log(
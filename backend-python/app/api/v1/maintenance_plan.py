@@ -5,7 +5,7 @@
 import logging
 from datetime import datetime
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, Depends, File, HTTPException, Query, UploadFile, status
 from sqlalchemy.orm import Session
 
 from app.database import get_db
@@ -16,16 +16,35 @@ from app.dependencies import (
     get_current_user_required,
     get_manager_user,
 )
+from app.exceptions import ValidationException
 from app.schemas.common import ApiResponse, PaginatedResponse
 from app.schemas.maintenance_plan import (
+    MaintenancePlanBatchCreate,
     MaintenancePlanCreate,
     MaintenancePlanUpdate,
 )
 from app.services.maintenance_plan import MaintenancePlanService
+from app.utils.table_import import read_table
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/maintenance-plan", tags=["Maintenance Plan Management"])
 
+MAX_IMPORT_FILE_SIZE = 10 * 1024 * 1024
+
+
+def _import_response(result: dict) -> ApiResponse:
+    """批量导入结果，存在行错误时整批未导入"""
+    if result['errors']:
+        return ApiResponse(
+            code=400,
+            message=f"导入失败：{len(result['errors'])} 行数据有误，未导入任何计划",
+            data=result
+        )
+    return ApiResponse.success(
+        result,
+        f"导入成功：新建 {result['created']} 条，恢复 {result['restored']} 条，生成工单 {result['work_orders']} 条"
+    )
+
 
 @router.get("/all/list", response_model=ApiResponse)
 def get_all_maintenance_plan(
@@ -125,6 +144,7 @@ def get_maintenance_plan_list(
     project_name: str | None = Query(None, description="Project name (fuzzy search)"),
     client_name: str | None = Query(None, description="Client name (fuzzy search)"),
     plan_type: str | None = Query(None, description="Plan type (定期维保/临时维修/零星用工)"),
+    view: str | None = Query(None, pattern="^summary$", description="List view: summary returns list fields only"),
     db: Session = Depends(get_db),
     user_info: UserInfo = Depends(get_current_user_info)
 ):
@@ -138,7 +158,7 @@ def get_maintenance_plan_list(
     items, total = service.get_all(
         page, size, plan_name, project_id, equipment_name,
         plan_status, execution_status, responsible_person,
-        project_name, client_name, plan_type, responsible_person_filter
+        project_name, client_name, plan_type, responsible_person_filter, view
     )
     items_dict = [item.to_dict() for item in items]
     return PaginatedResponse.success(items_dict, total, page, size)
@@ -199,6 +219,48 @@ def create_maintenance_plan(
     return ApiResponse.success(maintenance_plan.to_dict(), "Created successfully")
 
 
+@router.post("/batch", response_model=ApiResponse)
+def batch_create_maintenance_plans(
+    dto: MaintenancePlanBatchCreate,
+    db: Session = Depends(get_db),
+    user_info: UserInfo = Depends(get_manager_user)
+):
+    """
+    批量创建维保计划
+    逐行校验，全部通过后在同一事务内创建计划、巡检工单和工作计划；
+    任一行有误时返回行错误列表，不导入任何数据
+    需要管理员或部门经理权限
+    """
+    service = MaintenancePlanService(db)
+    result = service.bulk_import(dto.plans, user_info.id, user_info.name)
+    return _import_response(result)
+
+
+@router.post("/import", response_model=ApiResponse)
+def import_maintenance_plans(
+    file: UploadFile = File(...),
+    db: Session = Depends(get_db),
+    user_info: UserInfo = Depends(get_manager_user)
+):
+    """
+    从 CSV 或 XLSX 文件导入维保计划
+    首行为表头，可使用字段名或字段中文名（如“计划编号”“计划开始日期”）
+    需要管理员或部门经理权限
+    """
+    content = file.file.read(MAX_IMPORT_FILE_SIZE + 1)
+    if len(content) > MAX_IMPORT_FILE_SIZE:
+        raise ValidationException("文件大小不能超过10MB")
+
+    try:
+        rows = read_table(file.filename, content)
+    except ValueError as e:
+        raise ValidationException(str(e)) from None
+
+    service = MaintenancePlanService(db)
+    result = service.bulk_import(rows, user_info.id, user_info.name, first_row=2)
+    return _import_response(result)
+
+
 @router.put("/{id}", response_model=ApiResponse)
 def update_maintenance_plan(
     id: int,
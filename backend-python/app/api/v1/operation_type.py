@@ -5,6 +5,13 @@ from sqlalchemy.orm import Session
 from app.database import get_db
 from app.models.operation_type import OperationType
 from app.schemas.common import ApiResponse
+from app.services.reference_cache import reference_cache
+from app.utils.conditional_get import (
+    REFERENCE_POLICY,
+    ConditionalGet,
+    conditional_get,
+    reference_validator,
+)
 
 router = APIRouter(prefix="/operation-type", tags=["Operation Type"])
 
@@ -28,17 +35,24 @@ class OperationTypeUpdate(BaseModel):
 @router.get("", response_model=ApiResponse)
 def get_operation_types(
     is_active: int | None = Query(None, description="是否启用: 1启用, 0禁用"),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_db),
+    conditional: ConditionalGet = Depends(conditional_get(REFERENCE_POLICY))
 ):
     """
     获取操作类型列表
     """
-    query = db.query(OperationType)
-    if is_active is not None:
-        query = query.filter(OperationType.is_active == is_active)
-
-    items = query.order_by(OperationType.sort_order.asc(), OperationType.id.asc()).all()
-    return ApiResponse.success([item.to_dict() for item in items])
+    not_modified = conditional.evaluate(reference_validator(db, 'operation_type'))
+    if not_modified is not None:
+        return not_modified
+
+    def load() -> list[dict]:
+        query = db.query(OperationType)
+        if is_active is not None:
+            query = query.filter(OperationType.is_active == is_active)
+        items = query.order_by(OperationType.sort_order.asc(), OperationType.id.asc()).all()
+        return [item.to_dict() for item in items]
+
+    return ApiResponse.success(reference_cache.get_or_load(db, 'operation_type', ('list', is_active), load))
 
 
 @router.get("/{type_code}", response_model=ApiResponse)
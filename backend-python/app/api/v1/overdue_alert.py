@@ -6,6 +6,7 @@ from sqlalchemy.orm import Session
 from app.database import get_db
 from app.dependencies import UserInfo, get_current_user_info
 from app.schemas.common import ApiResponse
+from app.services.alert_counter import AlertCounterService
 from app.services.overdue_alert import OverdueAlertService
 
 logger = logging.getLogger(__name__)
@@ -63,15 +64,34 @@ def get_overdue_count(
 
     用于手机端首页显示超期提醒数量
     """
-    maintenance_personnel = None if user_info.is_manager else user_info.name
+    counts = AlertCounterService(db).get_counts(user_info.name, user_info.is_manager)
 
-    service = OverdueAlertService(db)
-    count = service.get_overdue_count(maintenance_personnel=maintenance_personnel)
+    return ApiResponse(
+        code=200,
+        message="success",
+        data={
+            'count': counts['overdue']
+        }
+    )
+
+
+@router.get("/counts", response_model=ApiResponse)
+def get_alert_counts(
+    db: Session = Depends(get_db),
+    user_info: UserInfo = Depends(get_current_user_info)
+):
+    """
+    获取超期、临期工单数量
+
+    用于手机端首页角标，一次返回两个数量，结果在进程内缓存，工单变更后失效
+    """
+    counts = AlertCounterService(db).get_counts(user_info.name, user_info.is_manager)
 
     return ApiResponse(
         code=200,
         message="success",
         data={
-            'count': count
+            'overdueCount': counts['overdue'],
+            'expiringCount': counts['expiring']
         }
     )
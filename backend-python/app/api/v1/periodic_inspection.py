@@ -60,6 +60,7 @@ def get_periodic_inspection_list(
     client_name: str | None = Query(None, description="Client name (fuzzy search)"),
     inspection_id: str | None = Query(None, description="Inspection ID (fuzzy search)"),
     status: str | None = Query(None, description="Status"),
+    view: str | None = Query(None, pattern="^summary$", description="List view: summary returns list fields only"),
     db: Session = Depends(get_db),
     user_info: UserInfo = Depends(get_current_user_info)
 ):
@@ -73,7 +74,7 @@ def get_periodic_inspection_list(
     logger.info(f"[PC端定期巡检] user={user_info.name}, is_manager={user_info.is_manager}, filter={maintenance_personnel}")
 
     items, total = service.get_all(
-        page, size, project_name, client_name, inspection_id, status, maintenance_personnel
+        page, size, project_name, client_name, inspection_id, status, maintenance_personnel, view
     )
 
     if not items:
@@ -14,6 +14,12 @@ from app.schemas.personnel import (
     PersonnelUpdate,
 )
 from app.services.personnel import PersonnelService
+from app.utils.conditional_get import (
+    REFERENCE_POLICY,
+    ConditionalGet,
+    conditional_get,
+    reference_validator,
+)
 
 router = APIRouter(prefix="/personnel", tags=["Personnel Management"])
 
@@ -62,7 +68,8 @@ def _get_online_status_map(db: Session, user_ids: list[int]) -> dict:
 
 @router.get("/all/list", response_model=ApiResponse)
 def get_all_personnel(
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_db),
+    conditional: ConditionalGet = Depends(conditional_get(REFERENCE_POLICY))
 ):
     """
     获取所有人员列表（不分页）
@@ -72,9 +79,12 @@ def get_all_personnel(
     Returns:
         ApiResponse: 包含所有人员列表的响应对象
     """
+    not_modified = conditional.evaluate(reference_validator(db, 'personnel'))
+    if not_modified is not None:
+        return not_modified
+
     service = PersonnelService(db)
-    items = service.get_all_unpaginated()
-    return ApiResponse.success([item.to_dict() for item in items])
+    return ApiResponse.success(service.get_all_dicts())
 
 
 @router.get("", response_model=PaginatedResponse)
@@ -15,6 +15,12 @@ from app.schemas.project_info import (
     ProjectInfoUpdate,
 )
 from app.services.project_info import ProjectInfoService
+from app.utils.conditional_get import (
+    USER_SCOPED_POLICY,
+    ConditionalGet,
+    conditional_get,
+    reference_validator,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -28,12 +34,19 @@ def get_project_info_list(
     project_name: str | None = Query(None, description="项目名称（模糊查询）"),
     client_name: str | None = Query(None, description="客户名称（模糊查询）"),
     db: Session = Depends(get_db),
-    user_info: UserInfo = Depends(get_current_user_info)
+    user_info: UserInfo = Depends(get_current_user_info),
+    conditional: ConditionalGet = Depends(conditional_get(USER_SCOPED_POLICY))
 ):
     """
     获取项目信息列表，支持分页和条件查询
     普通用户只能看到自己是运维人员的项目
     """
+    not_modified = conditional.evaluate(
+        reference_validator(db, 'project_info'), user_info.name, user_info.is_manager
+    )
+    if not_modified is not None:
+        return not_modified
+
     service = ProjectInfoService(db)
 
     project_ids = None
@@ -50,12 +63,19 @@ def get_project_info_list(
 @router.get("/all/list", response_model=ApiResponse)
 def get_all_project_info(
     db: Session = Depends(get_db),
-    user_info: UserInfo = Depends(get_current_user_info)
+    user_info: UserInfo = Depends(get_current_user_info),
+    conditional: ConditionalGet = Depends(conditional_get(USER_SCOPED_POLICY))
 ):
     """
     获取所有项目信息列表，不分页
     普通用户只能看到自己是运维人员的项目
     """
+    not_modified = conditional.evaluate(
+        reference_validator(db, 'project_info'), user_info.name, user_info.is_manager
+    )
+    if not_modified is not None:
+        return not_modified
+
     service = ProjectInfoService(db)
 
     project_ids = None
@@ -64,8 +84,7 @@ def get_all_project_info(
         if not project_ids:
             return ApiResponse.success([])
 
-    items = service.get_all_unpaginated(project_ids)
-    return ApiResponse.success([item.to_dict() for item in items])
+    return ApiResponse.success(service.get_all_dicts(project_ids))
 
 
 @router.get("/{id}", response_model=ApiResponse)
@@ -113,7 +132,10 @@ def update_project_info(
     """
     service = ProjectInfoService(db)
     project_info = service.update(id, dto, user_info.id, user_info.name)
-    return ApiResponse.success(project_info.to_dict(), "更新成功")
+    data = project_info.to_dict()
+    if service.sync_job:
+        data['sync_job_id'] = service.sync_job.id
+    return ApiResponse.success(data, "更新成功")
 
 
 @router.delete("/{id}", response_model=ApiResponse)
@@ -128,24 +150,14 @@ def delete_project_info(
     需要管理员或部门经理权限
 
     参数:
-    - cascade: 是否级联删除关联数据（工作计划、定期巡检、临时维修、零星用工、维保计划）
+    - cascade: 是否级联删除关联数据（工作计划、定期巡检、临时维修、零星用工、维保计划、备品备件和维修工具领用）
+
+    存在关联数据时级联删除作为后台任务执行，返回任务信息，通过 /jobs/{id} 查询进度
     """
     service = ProjectInfoService(db)
     result = service.delete(id, cascade=cascade, user_id=user_info.id, operator_name=user_info.name)
 
-    if result.get('deleted_related'):
-        deleted_info = []
-        for key, count in result['deleted_related'].items():
-            name_map = {
-                'work_plan': '工作计划',
-                'periodic_inspection': '定期巡检',
-                'temporary_repair': '临时维修',
-                'spot_work': '零星用工',
-                'maintenance_plan': '维保计划'
-            }
-            deleted_info.append(f"{count} 条{name_map.get(key, key)}")
-        message = f"已删除项目【{result['project_name']}】及其关联的 {', '.join(deleted_info)}"
-    else:
-        message = "删除成功"
-
-    return ApiResponse.success(None, message)
+    if result.get('job'):
+        return ApiResponse.success(result['job'], f"已提交删除项目【{result['project_name']}】的后台任务")
+
+    return ApiResponse.success(None, "删除成功")
@@ -1,16 +1,14 @@
 import logging
-import random
-import string
 import uuid
 from datetime import datetime
 
 from fastapi import APIRouter, Depends, HTTPException, Query, status
-from sqlalchemy import or_
-from sqlalchemy.orm import Session
+from sqlalchemy import func, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
 
 logger = logging.getLogger(__name__)
 
-from app.database import get_db
+from app.database import get_async_db
 from app.dependencies import UserInfo, get_current_user_info, get_material_manager_user
 from app.models.personnel import Personnel
 from app.models.project_info import ProjectInfo
@@ -25,36 +23,56 @@ from app.schemas.repair_tools import (
     RepairToolsStockCreate,
     RepairToolsStockUpdate,
 )
+from app.utils.conditional_get import (
+    REFERENCE_POLICY,
+    ConditionalGet,
+    conditional_get,
+    table_validator,
+)
+from app.utils.work_order_id_generator import generate_inbound_no
 
 router = APIRouter(prefix="/repair-tools", tags=["维修工具管理"])
 
+INBOUND_NO_PREFIX = "RT"
+
+
+async def _first(db: AsyncSession, stmt):
+    """查询第一条记录"""
+    result = await db.execute(stmt.limit(1))
+    return result.scalars().first()
+
 
-def generate_inbound_no() -> str:
-    """生成入库单号"""
-    timestamp = datetime.now().strftime('%Y%m%d%H%M%S')
-    random_str = ''.join(random.choices(string.digits, k=4))
-    return f"RT{timestamp}{random_str}"
+async def _all(db: AsyncSession, stmt) -> list:
+    """查询全部记录"""
+    result = await db.execute(stmt)
+    return list(result.scalars().all())
+
+
+async def _count(db: AsyncSession, stmt) -> int:
+    """统计查询结果数量"""
+    result = await db.execute(select(func.count()).select_from(stmt.subquery()))
+    return result.scalar() or 0
 
 
 @router.get("/personnel-projects", summary="获取人员与项目的关联关系")
 async def get_personnel_projects(
     personnel_id: int | None = Query(None, description="人员ID"),
     project_id: str | None = Query(None, description="项目编号"),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     result = []
 
     if personnel_id:
-        person = db.query(Personnel).filter(Personnel.id == personnel_id).first()
+        person = await _first(db, select(Personnel).where(Personnel.id == personnel_id))
         if person:
-            work_plans = db.query(WorkPlan).filter(
+            work_plans = await _all(db, select(WorkPlan).where(
                 WorkPlan.maintenance_personnel == person.name
-            ).all()
+            ))
 
             for plan in work_plans:
-                project = db.query(ProjectInfo).filter(
+                project = await _first(db, select(ProjectInfo).where(
                     ProjectInfo.project_id == plan.project_id
-                ).first()
+                ))
                 if project:
                     result.append({
                         'project_id': project.project_id,
@@ -62,16 +80,16 @@ async def get_personnel_projects(
                     })
 
     elif project_id:
-        work_plans = db.query(WorkPlan).filter(
+        work_plans = await _all(db, select(WorkPlan).where(
             WorkPlan.project_id == project_id
-        ).all()
+        ))
 
         for plan in work_plans:
             if plan.maintenance_personnel:
-                person = db.query(Personnel).filter(
+                person = await _first(db, select(Personnel).where(
                     Personnel.name == plan.maintenance_personnel,
                     Personnel.role == '运维人员'
-                ).first()
+                ))
                 if person and not any(p['id'] == person.id for p in result):
                     result.append({
                         'id': person.id,
@@ -79,15 +97,15 @@ async def get_personnel_projects(
                     })
 
     else:
-        work_plans = db.query(WorkPlan).all()
+        work_plans = await _all(db, select(WorkPlan))
         personnel_projects = {}
 
         for plan in work_plans:
             if plan.maintenance_personnel and plan.project_id:
-                person = db.query(Personnel).filter(
+                person = await _first(db, select(Personnel).where(
                     Personnel.name == plan.maintenance_personnel,
                     Personnel.role == '运维人员'
-                ).first()
+                ))
 
                 if person:
                     if person.id not in personnel_projects:
@@ -97,9 +115,9 @@ async def get_personnel_projects(
                             'projects': []
                         }
 
-                    project = db.query(ProjectInfo).filter(
+                    project = await _first(db, select(ProjectInfo).where(
                         ProjectInfo.project_id == plan.project_id
-                    ).first()
+                    ))
 
                     if project:
                         if not any(p['project_id'] == project.project_id for p in personnel_projects[person.id]['projects']):
@@ -118,12 +136,12 @@ async def search_tools(
     keyword: str | None = Query(None, description="搜索关键词"),
     page: int = Query(0, ge=0, description="页码"),
     size: int = Query(10, ge=1, le=1000, description="每页数量"),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    query = db.query(RepairToolsStock).filter(RepairToolsStock.stock > 0)
+    query = select(RepairToolsStock).where(RepairToolsStock.stock > 0)
 
     if keyword:
-        query = query.filter(
+        query = query.where(
             or_(
                 RepairToolsStock.tool_name.ilike(f"%{keyword}%"),
                 RepairToolsStock.tool_id.ilike(f"%{keyword}%"),
@@ -132,8 +150,8 @@ async def search_tools(
             )
         )
 
-    total = query.count()
-    items = query.order_by(RepairToolsStock.tool_name).offset(page * size).limit(size).all()
+    total = await _count(db, query)
+    items = await _all(db, query.order_by(RepairToolsStock.tool_name).offset(page * size).limit(size))
 
     return ApiResponse(
         code=200,
@@ -153,17 +171,22 @@ async def get_stock_list(
     size: int = Query(10, ge=1, le=1000, description="每页数量"),
     tool_name: str | None = Query(None, description="工具名称"),
     category: str | None = Query(None, description="工具分类"),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db),
+    conditional: ConditionalGet = Depends(conditional_get(REFERENCE_POLICY))
 ):
-    query = db.query(RepairToolsStock)
+    not_modified = conditional.evaluate(await db.run_sync(table_validator, RepairToolsStock))
+    if not_modified is not None:
+        return not_modified
+
+    query = select(RepairToolsStock)
 
     if tool_name:
-        query = query.filter(RepairToolsStock.tool_name.ilike(f"%{tool_name}%"))
+        query = query.where(RepairToolsStock.tool_name.ilike(f"%{tool_name}%"))
     if category:
-        query = query.filter(RepairToolsStock.category == category)
+        query = query.where(RepairToolsStock.category == category)
 
-    total = query.count()
-    items = query.order_by(RepairToolsStock.updated_at.desc()).offset(page * size).limit(size).all()
+    total = await _count(db, query)
+    items = await _all(db, query.order_by(RepairToolsStock.updated_at.desc()).offset(page * size).limit(size))
 
     return ApiResponse(
         code=200,
@@ -180,7 +203,7 @@ async def get_stock_list(
 @router.post("/stock", summary="新增维修工具入库")
 async def create_stock(
     data: RepairToolsStockCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     user_info: UserInfo = Depends(get_material_manager_user)
 ):
     """
@@ -189,7 +212,7 @@ async def create_stock(
     需要管理员、部门经理或材料员权限
     """
     try:
-        inbound_no = generate_inbound_no()
+        inbound_no = await db.run_sync(generate_inbound_no, INBOUND_NO_PREFIX)
 
         inbound = RepairToolsInbound(
             inbound_no=inbound_no,
@@ -216,12 +239,12 @@ async def create_stock(
         )
         db.add(stock)
 
-        db.commit()
-        db.refresh(stock)
+        await db.commit()
+        await db.refresh(stock)
 
         return ApiResponse(code=200, data=stock.to_dict(), message="新增成功")
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         error_id = str(uuid.uuid4())[:8]
         logger.error(f"[{error_id}] 新增维修工具入库失败: {str(e)}")
         raise HTTPException(
@@ -233,9 +256,9 @@ async def create_stock(
 @router.get("/stock/{stock_id}", summary="获取维修工具详情")
 async def get_stock_detail(
     stock_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    stock = db.query(RepairToolsStock).filter(RepairToolsStock.id == stock_id).first()
+    stock = await _first(db, select(RepairToolsStock).where(RepairToolsStock.id == stock_id))
     if not stock:
         raise HTTPException(status_code=404, detail="工具不存在")
 
@@ -246,14 +269,14 @@ async def get_stock_detail(
 async def update_stock(
     stock_id: int,
     data: RepairToolsStockUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     user_info: UserInfo = Depends(get_material_manager_user)
 ):
     """
     更新维修工具信息
     需要管理员、部门经理或材料员权限
     """
-    stock = db.query(RepairToolsStock).filter(RepairToolsStock.id == stock_id).first()
+    stock = await _first(db, select(RepairToolsStock).where(RepairToolsStock.id == stock_id))
     if not stock:
         raise HTTPException(status_code=404, detail="工具不存在")
 
@@ -261,8 +284,8 @@ async def update_stock(
     for key, value in update_data.items():
         setattr(stock, key, value)
 
-    db.commit()
-    db.refresh(stock)
+    await db.commit()
+    await db.refresh(stock)
 
     return ApiResponse(code=200, data=stock.to_dict(), message="更新成功")
 
@@ -271,19 +294,19 @@ async def update_stock(
 async def restock_tool(
     stock_id: int,
     data: RepairToolsRestock,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     user_info: UserInfo = Depends(get_material_manager_user)
 ):
     """
     工具入库（增加库存）
     需要管理员、部门经理或材料员权限
     """
-    stock = db.query(RepairToolsStock).filter(RepairToolsStock.id == stock_id).first()
+    stock = await _first(db, select(RepairToolsStock).where(RepairToolsStock.id == stock_id))
     if not stock:
         raise HTTPException(status_code=404, detail="工具不存在")
 
     try:
-        inbound_no = generate_inbound_no()
+        inbound_no = await db.run_sync(generate_inbound_no, INBOUND_NO_PREFIX)
 
         inbound = RepairToolsInbound(
             inbound_no=inbound_no,
@@ -300,12 +323,12 @@ async def restock_tool(
         db.add(inbound)
 
         stock.stock += data.quantity
-        db.commit()
-        db.refresh(stock)
+        await db.commit()
+        await db.refresh(stock)
 
         return ApiResponse(code=200, data=stock.to_dict(), message="入库成功")
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         error_id = str(uuid.uuid4())[:8]
         logger.error(f"[{error_id}] 维修工具入库失败: {str(e)}")
         raise HTTPException(status_code=500, detail=f"入库失败，错误ID: {error_id}，请联系管理员") from None
@@ -314,7 +337,7 @@ async def restock_tool(
 @router.delete("/stock/{stock_id}", summary="删除维修工具")
 async def delete_stock(
     stock_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     user_info: UserInfo = Depends(get_material_manager_user)
 ):
     """
@@ -322,14 +345,14 @@ async def delete_stock(
     需要管理员、部门经理或材料员权限
     删除前会检查是否有未归还的领用记录
     """
-    stock = db.query(RepairToolsStock).filter(RepairToolsStock.id == stock_id).first()
+    stock = await _first(db, select(RepairToolsStock).where(RepairToolsStock.id == stock_id))
     if not stock:
         raise HTTPException(status_code=404, detail="工具不存在")
 
-    pending_issues = db.query(RepairToolsIssue).filter(
+    pending_issues = await _count(db, select(RepairToolsIssue).where(
         RepairToolsIssue.stock_id == stock_id,
         RepairToolsIssue.status != "已归还"
-    ).count()
+    ))
 
     if pending_issues > 0:
         raise HTTPException(
@@ -337,8 +360,8 @@ async def delete_stock(
             detail=f"该工具有 {pending_issues} 条未归还的领用记录，无法删除"
         )
 
-    db.delete(stock)
-    db.commit()
+    await db.delete(stock)
+    await db.commit()
 
     return ApiResponse(code=200, message="删除成功")
 
@@ -349,17 +372,17 @@ async def get_inbound_list(
     size: int = Query(10, ge=1, le=1000, description="每页数量"),
     tool_name: str | None = Query(None, description="工具名称"),
     user_name: str | None = Query(None, description="入库人"),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    query = db.query(RepairToolsInbound)
+    query = select(RepairToolsInbound)
 
     if tool_name:
-        query = query.filter(RepairToolsInbound.tool_name.ilike(f"%{tool_name}%"))
+        query = query.where(RepairToolsInbound.tool_name.ilike(f"%{tool_name}%"))
     if user_name:
-        query = query.filter(RepairToolsInbound.user_name.ilike(f"%{user_name}%"))
+        query = query.where(RepairToolsInbound.user_name.ilike(f"%{user_name}%"))
 
-    total = query.count()
-    items = query.order_by(RepairToolsInbound.created_at.desc()).offset(page * size).limit(size).all()
+    total = await _count(db, query)
+    items = await _all(db, query.order_by(RepairToolsInbound.created_at.desc()).offset(page * size).limit(size))
 
     return ApiResponse(code=200, data={
         'items': [item.to_dict() for item in items],
@@ -374,27 +397,27 @@ async def get_issue_list(
     tool_name: str | None = Query(None, description="工具名称"),
     user_name: str | None = Query(None, description="运维人员"),
     status: str | None = Query(None, description="状态"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     user_info: UserInfo = Depends(get_current_user_info)
 ):
     current_user_name = user_info.name
     is_manager = user_info.is_manager
 
-    query = db.query(RepairToolsIssue)
+    query = select(RepairToolsIssue)
 
     if tool_name:
-        query = query.filter(RepairToolsIssue.tool_name.ilike(f"%{tool_name}%"))
+        query = query.where(RepairToolsIssue.tool_name.ilike(f"%{tool_name}%"))
 
     if not is_manager and current_user_name:
-        query = query.filter(RepairToolsIssue.user_name == current_user_name)
+        query = query.where(RepairToolsIssue.user_name == current_user_name)
     elif user_name:
-        query = query.filter(RepairToolsIssue.user_name.ilike(f"%{user_name}%"))
+        query = query.where(RepairToolsIssue.user_name.ilike(f"%{user_name}%"))
 
     if status:
-        query = query.filter(RepairToolsIssue.status == status)
+        query = query.where(RepairToolsIssue.status == status)
 
-    total = query.count()
-    items = query.order_by(RepairToolsIssue.issue_time.desc()).offset(page * size).limit(size).all()
+    total = await _count(db, query)
+    items = await _all(db, query.order_by(RepairToolsIssue.issue_time.desc()).offset(page * size).limit(size))
 
     return ApiResponse(
         code=200,
@@ -411,7 +434,7 @@ async def get_issue_list(
 @router.post("/issue", summary="新增工具领用")
 async def create_issue(
     data: RepairToolsIssueCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     user_info: UserInfo = Depends(get_current_user_info)
 ):
     """
@@ -434,15 +457,15 @@ async def create_issue(
 
     if data.tool_id:
         if data.tool_id.isdigit():
-            stock = db.query(RepairToolsStock).filter(RepairToolsStock.id == int(data.tool_id)).first()
+            stock = await _first(db, select(RepairToolsStock).where(RepairToolsStock.id == int(data.tool_id)))
         else:
-            stock = db.query(RepairToolsStock).filter(RepairToolsStock.tool_id == data.tool_id).first()
+            stock = await _first(db, select(RepairToolsStock).where(RepairToolsStock.tool_id == data.tool_id))
 
     if not stock and tool_name:
-        stock = db.query(RepairToolsStock).filter(
+        stock = await _first(db, select(RepairToolsStock).where(
             RepairToolsStock.tool_name == tool_name,
             RepairToolsStock.specification == (specification or '')
-        ).first()
+        ))
 
     if not stock:
         raise HTTPException(status_code=400, detail="该工具不存在于库存中，请先入库")
@@ -467,13 +490,13 @@ async def create_issue(
 
     user_name = data.user_name
     if data.user_id and not user_name:
-        user = db.query(Personnel).filter(Personnel.id == data.user_id).first()
+        user = await _first(db, select(Personnel).where(Personnel.id == data.user_id))
         if user:
             user_name = user.name
 
     project_name = data.project_name
     if data.project_id and not project_name:
-        project = db.query(ProjectInfo).filter(ProjectInfo.project_id == data.project_id).first()
+        project = await _first(db, select(ProjectInfo).where(ProjectInfo.project_id == data.project_id))
         if project:
             project_name = project.project_name
 
@@ -496,8 +519,8 @@ async def create_issue(
         stock_id=stock.id
     )
     db.add(issue)
-    db.commit()
-    db.refresh(issue)
+    await db.commit()
+    await db.refresh(issue)
 
     return ApiResponse(code=200, data=issue.to_dict(), message="领用成功")
 
@@ -506,7 +529,7 @@ async def create_issue(
 async def return_tool(
     issue_id: int,
     data: RepairToolsReturn,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     user_info: UserInfo = Depends(get_current_user_info)
 ):
     """
@@ -523,7 +546,7 @@ async def return_tool(
             detail="未登录或登录已过期"
         )
 
-    issue = db.query(RepairToolsIssue).filter(RepairToolsIssue.id == issue_id).first()
+    issue = await _first(db, select(RepairToolsIssue).where(RepairToolsIssue.id == issue_id))
     if not issue:
         raise HTTPException(status_code=404, detail="领用记录不存在")
 
@@ -540,7 +563,7 @@ async def return_tool(
         issue.status = "已归还"
 
     if issue.stock_id:
-        stock = db.query(RepairToolsStock).filter(RepairToolsStock.id == issue.stock_id).first()
+        stock = await _first(db, select(RepairToolsStock).where(RepairToolsStock.id == issue.stock_id))
         if stock:
             stock.stock += data.return_quantity
         else:
@@ -551,7 +574,7 @@ async def return_tool(
                 unit='个'
             )
             db.add(new_stock)
-            db.flush()
+            await db.flush()
             issue.stock_id = new_stock.id
     else:
         new_stock = RepairToolsStock(
@@ -561,11 +584,11 @@ async def return_tool(
             unit='个'
         )
         db.add(new_stock)
-        db.flush()
+        await db.flush()
         issue.stock_id = new_stock.id
 
-    db.commit()
-    db.refresh(issue)
+    await db.commit()
+    await db.refresh(issue)
 
     return ApiResponse(code=200, data=issue.to_dict(), message="归还成功")
 
@@ -573,9 +596,9 @@ async def return_tool(
 @router.get("/issue/{issue_id}", summary="获取领用记录详情")
 async def get_issue_detail(
     issue_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    issue = db.query(RepairToolsIssue).filter(RepairToolsIssue.id == issue_id).first()
+    issue = await _first(db, select(RepairToolsIssue).where(RepairToolsIssue.id == issue_id))
     if not issue:
         raise HTTPException(status_code=404, detail="领用记录不存在")
 
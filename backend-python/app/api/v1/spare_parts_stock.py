@@ -1,8 +1,5 @@
 import logging
-import random
-import string
 import uuid
-from datetime import datetime
 
 from fastapi import APIRouter, Depends, Query, status
 from pydantic import BaseModel, Field
@@ -14,18 +11,20 @@ from app.exceptions import BusinessException, ValidationException
 from app.models.spare_parts_inbound import SparePartsInbound
 from app.models.spare_parts_stock import SparePartsStock
 from app.schemas.common import ApiResponse
+from app.utils.conditional_get import (
+    REFERENCE_POLICY,
+    ConditionalGet,
+    conditional_get,
+    table_validator,
+)
+from app.utils.work_order_id_generator import generate_inbound_no
 
 logger = logging.getLogger(__name__)
 
 
 router = APIRouter(prefix="/spare-parts-stock", tags=["Spare Parts Stock Management"])
 
-
-def generate_inbound_no() -> str:
-    """生成入库单号"""
-    timestamp = datetime.now().strftime('%Y%m%d%H%M%S')
-    random_str = ''.join(random.choices(string.digits, k=4))
-    return f"IN{timestamp}{random_str}"
+INBOUND_NO_PREFIX = "IN"
 
 
 class SparePartsInboundCreate(BaseModel):
@@ -65,7 +64,7 @@ def create_inbound(
         raise ValidationException("入库人不能为空")
 
     try:
-        inbound_no = generate_inbound_no()
+        inbound_no = generate_inbound_no(db, INBOUND_NO_PREFIX)
 
         inbound = SparePartsInbound(
             inbound_no=inbound_no,
@@ -153,9 +152,14 @@ def get_inbound_records(
 @router.get("/stock", response_model=ApiResponse)
 def get_stock(
     product_name: str | None = Query(None, description="产品名称"),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_db),
+    conditional: ConditionalGet = Depends(conditional_get(REFERENCE_POLICY))
 ):
     """查询库存"""
+    not_modified = conditional.evaluate(table_validator(db, SparePartsStock))
+    if not_modified is not None:
+        return not_modified
+
     query = db.query(SparePartsStock)
 
     if product_name:
@@ -88,6 +88,7 @@ def get_spot_works_list(
     project_name: str | None = Query(None, description="Project name (fuzzy search)"),
     work_id: str | None = Query(None, description="Work ID (fuzzy search)"),
     status: str | None = Query(None, description="Status"),
+    view: str | None = Query(None, pattern="^summary$", description="List view: summary returns list fields only"),
     db: Session = Depends(get_db),
     user_info: UserInfo = Depends(get_current_user_info)
 ):
@@ -102,7 +103,7 @@ def get_spot_works_list(
 
     items_dict, total = service.get_all_with_workers(
         page=page, size=size, project_name=project_name, work_id=work_id,
-        status=status, maintenance_personnel=maintenance_personnel
+        status=status, maintenance_personnel=maintenance_personnel, projection=view
     )
 
     return ApiResponse(
@@ -1,17 +1,25 @@
-from datetime import datetime
+from datetime import date, datetime, timedelta
 import logging
 
 from fastapi import APIRouter, Depends, Query
+from sqlalchemy import Integer, String, and_, func, literal, select, union_all
 from sqlalchemy.orm import Session
 
 from app.config import OverdueAlertConfig
 from app.database import get_db
-from app.dependencies import UserInfo, get_current_user_info
+from app.dependencies import UserInfo, get_admin_user, get_current_user_info
 from app.models.periodic_inspection import PeriodicInspection
 from app.models.project_info import ProjectInfo
 from app.models.spot_work import SpotWork
 from app.models.temporary_repair import TemporaryRepair
+from app.models.work_order_daily_rollup import WorkOrderDailyRollup
 from app.schemas.common import ApiResponse
+from app.services.work_order_rollup import (
+    ORDER_TYPE_INSPECTION,
+    ORDER_TYPE_REPAIR,
+    ORDER_TYPE_SPOTWORK,
+    WorkOrderRollupService,
+)
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/statistics", tags=["Statistics"])
@@ -49,126 +57,60 @@ def get_statistics_overview(
     获取统计数据概览 - 从三种工单表获取数据
     年份过滤统一使用 plan_start_date
     本年完成使用 actual_completion_date 判断
+    每张表一次聚合查询（COUNT(*) FILTER），不再加载工单行到内存
     """
 
     user_name, is_manager = _get_user_info(user_info)
 
     today = datetime.now().date()
     current_year = today.year
-    year_start = datetime(year, 1, 1).date()
     year_end = datetime(year, 12, 31).date()
     near_due_days = 7
     valid_statuses = OverdueAlertConfig.VALID_STATUSES
     completed_statuses = OverdueAlertConfig.COMPLETED_STATUSES
 
-    near_due_count = 0
-    overdue_count = 0
-    year_completed_count = 0
-    regular_inspection_count = 0
-    temporary_repair_count = 0
-    spot_work_count = 0
-
-    inspection_query = db.query(PeriodicInspection)
-    inspection_query = _apply_soft_delete_filter(inspection_query, PeriodicInspection)
-    inspection_query = _apply_user_filter(inspection_query, PeriodicInspection, user_name, is_manager)
-
-    for inspection in inspection_query.all():
-        plan_start = inspection.plan_start_date
-        plan_end = inspection.plan_end_date
-        actual_completion = inspection.actual_completion_date
-        if isinstance(plan_start, datetime):
-            plan_start = plan_start.date()
-        if isinstance(plan_end, datetime):
-            plan_end = plan_end.date()
-        if isinstance(actual_completion, datetime):
-            actual_completion = actual_completion.date()
-
-        if plan_start:
-            if plan_start >= year_start and plan_start <= year_end:
-                if inspection.status in valid_statuses:
-                    regular_inspection_count += 1
-
-            if inspection.status in valid_statuses:
-                days_from_today = (plan_start - today).days
-                if 0 <= days_from_today <= near_due_days:
-                    near_due_count += 1
-
-        if plan_end:
-            check_date = today if year == current_year else year_end
-            if plan_end < check_date and inspection.status in valid_statuses:
-                overdue_count += 1
-
-        if inspection.status in completed_statuses and actual_completion:
-            if actual_completion >= year_start and actual_completion <= year_end:
-                year_completed_count += 1
-
-    repair_query = db.query(TemporaryRepair)
-    repair_query = _apply_soft_delete_filter(repair_query, TemporaryRepair)
-    repair_query = _apply_user_filter(repair_query, TemporaryRepair, user_name, is_manager)
-
-    for repair in repair_query.all():
-        plan_start = repair.plan_start_date
-        plan_end = repair.plan_end_date
-        actual_completion = repair.actual_completion_date
-        if isinstance(plan_start, datetime):
-            plan_start = plan_start.date()
-        if isinstance(plan_end, datetime):
-            plan_end = plan_end.date()
-        if isinstance(actual_completion, datetime):
-            actual_completion = actual_completion.date()
-
-        if plan_start:
-            if plan_start >= year_start and plan_start <= year_end:
-                if repair.status in valid_statuses:
-                    temporary_repair_count += 1
-
-            if repair.status in valid_statuses:
-                days_from_today = (plan_start - today).days
-                if 0 <= days_from_today <= near_due_days:
-                    near_due_count += 1
-
-        if plan_end:
-            check_date = today if year == current_year else year_end
-            if plan_end < check_date and repair.status in valid_statuses:
-                overdue_count += 1
-
-        if repair.status in completed_statuses and actual_completion:
-            if actual_completion >= year_start and actual_completion <= year_end:
-                year_completed_count += 1
-
-    work_query = db.query(SpotWork)
-    work_query = _apply_soft_delete_filter(work_query, SpotWork)
-    work_query = _apply_user_filter(work_query, SpotWork, user_name, is_manager)
-
-    for work in work_query.all():
-        plan_start = work.plan_start_date
-        plan_end = work.plan_end_date
-        actual_completion = work.actual_completion_date
-        if isinstance(plan_start, datetime):
-            plan_start = plan_start.date()
-        if isinstance(plan_end, datetime):
-            plan_end = plan_end.date()
-        if isinstance(actual_completion, datetime):
-            actual_completion = actual_completion.date()
-
-        if plan_start:
-            if plan_start >= year_start and plan_start <= year_end:
-                if work.status in valid_statuses:
-                    spot_work_count += 1
-
-            if work.status in valid_statuses:
-                days_from_today = (plan_start - today).days
-                if 0 <= days_from_today <= near_due_days:
-                    near_due_count += 1
-
-        if plan_end:
-            check_date = today if year == current_year else year_end
-            if plan_end < check_date and work.status in valid_statuses:
-                overdue_count += 1
-
-        if work.status in completed_statuses and actual_completion:
-            if actual_completion >= year_start and actual_completion <= year_end:
-                year_completed_count += 1
+    year_start_dt = datetime(year, 1, 1)
+    next_year_start_dt = datetime(year + 1, 1, 1)
+    check_date = today if year == current_year else year_end
+    check_dt = datetime.combine(check_date, datetime.min.time())
+    today_dt = datetime.combine(today, datetime.min.time())
+    near_due_end_dt = today_dt + timedelta(days=near_due_days + 1)
+
+    def aggregate(model):
+        """单表聚合：一次查询返回年度工单数、临期数、超期数、本年完成数"""
+        is_valid = model.status.in_(valid_statuses)
+        query = db.query(
+            func.count().filter(and_(
+                is_valid,
+                model.plan_start_date >= year_start_dt,
+                model.plan_start_date < next_year_start_dt,
+            )),
+            func.count().filter(and_(
+                is_valid,
+                model.plan_start_date >= today_dt,
+                model.plan_start_date < near_due_end_dt,
+            )),
+            func.count().filter(and_(
+                is_valid,
+                model.plan_end_date < check_dt,
+            )),
+            func.count().filter(and_(
+                model.status.in_(completed_statuses),
+                model.actual_completion_date >= year_start_dt,
+                model.actual_completion_date < next_year_start_dt,
+            )),
+        )
+        query = _apply_soft_delete_filter(query, model)
+        query = _apply_user_filter(query, model, user_name, is_manager)
+        return tuple(count or 0 for count in query.one())
+
+    regular_inspection_count, inspection_near_due, inspection_overdue, inspection_completed = aggregate(PeriodicInspection)
+    temporary_repair_count, repair_near_due, repair_overdue, repair_completed = aggregate(TemporaryRepair)
+    spot_work_count, work_near_due, work_overdue, work_completed = aggregate(SpotWork)
+
+    near_due_count = inspection_near_due + repair_near_due + work_near_due
+    overdue_count = inspection_overdue + repair_overdue + work_overdue
+    year_completed_count = inspection_completed + repair_completed + work_completed
 
     total_work_orders = regular_inspection_count + temporary_repair_count + spot_work_count
 
@@ -184,6 +126,69 @@ def get_statistics_overview(
     })
 
 
+def _rollup_query(db: Session, columns: list, year: int, user_name: str | None, is_manager: bool,
+                  order_type: str | None = None, statuses: list[str] | None = None):
+    """
+    构建汇总表查询：按计划开始日期所在年度过滤，并应用用户数据过滤
+    """
+    query = db.query(*columns).filter(
+        WorkOrderDailyRollup.stat_date >= date(year, 1, 1),
+        WorkOrderDailyRollup.stat_date <= date(year, 12, 31),
+    )
+    if order_type:
+        query = query.filter(WorkOrderDailyRollup.order_type == order_type)
+    if statuses:
+        query = query.filter(WorkOrderDailyRollup.status.in_(statuses))
+    return _apply_user_filter(query, WorkOrderDailyRollup, user_name, is_manager)
+
+
+def _top_projects_from_rollup(db: Session, year: int, limit: int, user_name: str | None, is_manager: bool,
+                              order_type: str | None = None) -> list[dict]:
+    """按项目统计已完成工单数量，取前 limit 个"""
+    value = func.sum(WorkOrderDailyRollup.order_count)
+    query = _rollup_query(
+        db, [WorkOrderDailyRollup.project_id, value], year, user_name, is_manager,
+        order_type=order_type, statuses=OverdueAlertConfig.COMPLETED_STATUSES,
+    ).filter(WorkOrderDailyRollup.project_id != '')
+    rows = query.group_by(WorkOrderDailyRollup.project_id).order_by(
+        value.desc(), WorkOrderDailyRollup.project_id
+    ).limit(limit).all()
+
+    project_ids = [project_id for project_id, _ in rows]
+    project_dict = {}
+    if project_ids:
+        project_dict = dict(
+            db.query(ProjectInfo.project_id, ProjectInfo.project_name)
+            .filter(ProjectInfo.project_id.in_(project_ids)).all()
+        )
+
+    return [
+        {'name': project_dict.get(project_id, project_id), 'value': int(count)}
+        for project_id, count in rows
+    ]
+
+
+def _employee_counts_from_rollup(db: Session, year: int, user_name: str | None, is_manager: bool,
+                                 order_type: str | None = None, completed_only: bool = False) -> dict:
+    """按运维人员统计工单数量，未指定运维人员的工单不计入"""
+    count = func.sum(WorkOrderDailyRollup.order_count)
+    statuses = OverdueAlertConfig.COMPLETED_STATUSES if completed_only else None
+    query = _rollup_query(
+        db, [WorkOrderDailyRollup.maintenance_personnel, count], year, user_name, is_manager,
+        order_type=order_type, statuses=statuses,
+    ).filter(WorkOrderDailyRollup.maintenance_personnel.notin_(['', '未知']))
+    rows = query.group_by(WorkOrderDailyRollup.maintenance_personnel).order_by(
+        count.desc(), WorkOrderDailyRollup.maintenance_personnel
+    ).all()
+
+    result = [{'name': name, 'count': int(value)} for name, value in rows]
+    return {
+        'year': year,
+        'employees': result,
+        'total': len(result)
+    }
+
+
 @router.get("/completion-rate", response_model=ApiResponse)
 def get_completion_rate(
     year: int = Query(..., description="年度"),
@@ -191,82 +196,21 @@ def get_completion_rate(
     user_info: UserInfo = Depends(get_current_user_info)
 ):
     """
-    获取准时完成率 - 从三种工单表获取数据
+    获取准时完成率 - 读取工单日汇总表
     使用 actual_completion_date 判断实际完成时间
     使用 plan_start_date 过滤年份
     """
 
     user_name, is_manager = _get_user_info(user_info)
 
-    year_start = datetime(year, 1, 1).date()
-    year_end = datetime(year, 12, 31).date()
-    completed_statuses = OverdueAlertConfig.COMPLETED_STATUSES
-
-    on_time_count = 0
-    total_count = 0
-
-    inspection_query = db.query(PeriodicInspection).filter(PeriodicInspection.status.in_(completed_statuses))
-    inspection_query = _apply_soft_delete_filter(inspection_query, PeriodicInspection)
-    inspection_query = _apply_user_filter(inspection_query, PeriodicInspection, user_name, is_manager)
-
-    for inspection in inspection_query.all():
-        plan_start = inspection.plan_start_date
-        plan_end = inspection.plan_end_date
-        actual_completion = inspection.actual_completion_date
-        if isinstance(plan_start, datetime):
-            plan_start = plan_start.date()
-        if isinstance(plan_end, datetime):
-            plan_end = plan_end.date()
-        if isinstance(actual_completion, datetime):
-            actual_completion = actual_completion.date()
-
-        if plan_start and actual_completion:
-            if plan_start >= year_start and plan_start <= year_end:
-                total_count += 1
-                if actual_completion <= plan_end:
-                    on_time_count += 1
-
-    repair_query = db.query(TemporaryRepair).filter(TemporaryRepair.status.in_(completed_statuses))
-    repair_query = _apply_soft_delete_filter(repair_query, TemporaryRepair)
-    repair_query = _apply_user_filter(repair_query, TemporaryRepair, user_name, is_manager)
-
-    for repair in repair_query.all():
-        plan_start = repair.plan_start_date
-        plan_end = repair.plan_end_date
-        actual_completion = repair.actual_completion_date
-        if isinstance(plan_start, datetime):
-            plan_start = plan_start.date()
-        if isinstance(plan_end, datetime):
-            plan_end = plan_end.date()
-        if isinstance(actual_completion, datetime):
-            actual_completion = actual_completion.date()
-
-        if plan_start and actual_completion:
-            if plan_start >= year_start and plan_start <= year_end:
-                total_count += 1
-                if actual_completion <= plan_end:
-                    on_time_count += 1
-
-    work_query = db.query(SpotWork).filter(SpotWork.status.in_(completed_statuses))
-    work_query = _apply_soft_delete_filter(work_query, SpotWork)
-    work_query = _apply_user_filter(work_query, SpotWork, user_name, is_manager)
-
-    for work in work_query.all():
-        plan_start = work.plan_start_date
-        plan_end = work.plan_end_date
-        actual_completion = work.actual_completion_date
-        if isinstance(plan_start, datetime):
-            plan_start = plan_start.date()
-        if isinstance(plan_end, datetime):
-            plan_end = plan_end.date()
-        if isinstance(actual_completion, datetime):
-            actual_completion = actual_completion.date()
-
-        if plan_start and actual_completion:
-            if plan_start >= year_start and plan_start <= year_end:
-                total_count += 1
-                if actual_completion <= plan_end:
-                    on_time_count += 1
+    total_count, on_time_count = _rollup_query(
+        db,
+        [func.sum(WorkOrderDailyRollup.completed_count), func.sum(WorkOrderDailyRollup.on_time_count)],
+        year, user_name, is_manager,
+        statuses=OverdueAlertConfig.COMPLETED_STATUSES,
+    ).one()
+    total_count = int(total_count or 0)
+    on_time_count = int(on_time_count or 0)
 
     delayed_count = total_count - on_time_count
     on_time_rate = on_time_count / total_count if total_count > 0 else 0
@@ -288,74 +232,13 @@ def get_top_projects(
     user_info: UserInfo = Depends(get_current_user_info)
 ):
     """
-    获取年度前五项目（工单数量）- 从三种工单表获取数据
+    获取年度前五项目（工单数量）- 读取工单日汇总表
     使用 plan_start_date 过滤年份
     """
 
     user_name, is_manager = _get_user_info(user_info)
 
-    year_start = datetime(year, 1, 1).date()
-    year_end = datetime(year, 12, 31).date()
-    completed_statuses = OverdueAlertConfig.COMPLETED_STATUSES
-
-    project_stats = {}
-
-    inspection_query = db.query(PeriodicInspection).filter(PeriodicInspection.status.in_(completed_statuses))
-    inspection_query = _apply_soft_delete_filter(inspection_query, PeriodicInspection)
-    inspection_query = _apply_user_filter(inspection_query, PeriodicInspection, user_name, is_manager)
-
-    for inspection in inspection_query.all():
-        plan_start = inspection.plan_start_date
-        if isinstance(plan_start, datetime):
-            plan_start = plan_start.date()
-        if plan_start and plan_start >= year_start and plan_start <= year_end:
-            if inspection.project_id:
-                if inspection.project_id not in project_stats:
-                    project_stats[inspection.project_id] = 0
-                project_stats[inspection.project_id] += 1
-
-    repair_query = db.query(TemporaryRepair).filter(TemporaryRepair.status.in_(completed_statuses))
-    repair_query = _apply_soft_delete_filter(repair_query, TemporaryRepair)
-    repair_query = _apply_user_filter(repair_query, TemporaryRepair, user_name, is_manager)
-
-    for repair in repair_query.all():
-        plan_start = repair.plan_start_date
-        if isinstance(plan_start, datetime):
-            plan_start = plan_start.date()
-        if plan_start and plan_start >= year_start and plan_start <= year_end:
-            if repair.project_id:
-                if repair.project_id not in project_stats:
-                    project_stats[repair.project_id] = 0
-                project_stats[repair.project_id] += 1
-
-    work_query = db.query(SpotWork).filter(SpotWork.status.in_(completed_statuses))
-    work_query = _apply_soft_delete_filter(work_query, SpotWork)
-    work_query = _apply_user_filter(work_query, SpotWork, user_name, is_manager)
-
-    for work in work_query.all():
-        plan_start = work.plan_start_date
-        if isinstance(plan_start, datetime):
-            plan_start = plan_start.date()
-        if plan_start and plan_start >= year_start and plan_start <= year_end:
-            if work.project_id:
-                if work.project_id not in project_stats:
-                    project_stats[work.project_id] = 0
-                project_stats[work.project_id] += 1
-
-    projects = db.query(ProjectInfo).all()
-    project_dict = {p.project_id: p.project_name for p in projects}
-
-    sorted_projects = sorted(project_stats.items(), key=lambda x: x[1], reverse=True)[:limit]
-
-    result = []
-    for project_id, value in sorted_projects:
-        project_name = project_dict.get(project_id, project_id)
-        result.append({
-            'name': project_name,
-            'value': value
-        })
-
-    return ApiResponse.success(result)
+    return ApiResponse.success(_top_projects_from_rollup(db, year, limit, user_name, is_manager))
 
 
 @router.get("/top-repairs", response_model=ApiResponse)
@@ -372,40 +255,9 @@ def get_top_repairs(
 
     user_name, is_manager = _get_user_info(user_info)
 
-    year_start = datetime(year, 1, 1).date()
-    year_end = datetime(year, 12, 31).date()
-    completed_statuses = OverdueAlertConfig.COMPLETED_STATUSES
-
-    project_stats = {}
-
-    repair_query = db.query(TemporaryRepair).filter(TemporaryRepair.status.in_(completed_statuses))
-    repair_query = _apply_soft_delete_filter(repair_query, TemporaryRepair)
-    repair_query = _apply_user_filter(repair_query, TemporaryRepair, user_name, is_manager)
-
-    for repair in repair_query.all():
-        plan_start = repair.plan_start_date
-        if isinstance(plan_start, datetime):
-            plan_start = plan_start.date()
-        if plan_start and plan_start >= year_start and plan_start <= year_end:
-            if repair.project_id:
-                if repair.project_id not in project_stats:
-                    project_stats[repair.project_id] = 0
-                project_stats[repair.project_id] += 1
-
-    projects = db.query(ProjectInfo).all()
-    project_dict = {p.project_id: p.project_name for p in projects}
-
-    sorted_projects = sorted(project_stats.items(), key=lambda x: x[1], reverse=True)[:limit]
-
-    result = []
-    for project_id, value in sorted_projects:
-        project_name = project_dict.get(project_id, project_id)
-        result.append({
-            'name': project_name,
-            'value': value
-        })
-
-    return ApiResponse.success(result)
+    return ApiResponse.success(
+        _top_projects_from_rollup(db, year, limit, user_name, is_manager, order_type=ORDER_TYPE_REPAIR)
+    )
 
 
 @router.get("/employee-stats", response_model=ApiResponse)
@@ -421,68 +273,7 @@ def get_employee_stats(
 
     user_name, is_manager = _get_user_info(user_info)
 
-    year_start = datetime(year, 1, 1).date()
-    year_end = datetime(year, 12, 31).date()
-
-    employee_stats = {}
-
-    inspection_query = db.query(PeriodicInspection)
-    inspection_query = _apply_soft_delete_filter(inspection_query, PeriodicInspection)
-    inspection_query = _apply_user_filter(inspection_query, PeriodicInspection, user_name, is_manager)
-
-    for inspection in inspection_query.all():
-        plan_start = inspection.plan_start_date
-        if isinstance(plan_start, datetime):
-            plan_start = plan_start.date()
-        if plan_start and plan_start >= year_start and plan_start <= year_end:
-            personnel = inspection.maintenance_personnel or '未知'
-            if personnel not in employee_stats:
-                employee_stats[personnel] = 0
-            employee_stats[personnel] += 1
-
-    repair_query = db.query(TemporaryRepair)
-    repair_query = _apply_soft_delete_filter(repair_query, TemporaryRepair)
-    repair_query = _apply_user_filter(repair_query, TemporaryRepair, user_name, is_manager)
-
-    for repair in repair_query.all():
-        plan_start = repair.plan_start_date
-        if isinstance(plan_start, datetime):
-            plan_start = plan_start.date()
-        if plan_start and plan_start >= year_start and plan_start <= year_end:
-            personnel = repair.maintenance_personnel or '未知'
-            if personnel not in employee_stats:
-                employee_stats[personnel] = 0
-            employee_stats[personnel] += 1
-
-    work_query = db.query(SpotWork)
-    work_query = _apply_soft_delete_filter(work_query, SpotWork)
-    work_query = _apply_user_filter(work_query, SpotWork, user_name, is_manager)
-
-    for work in work_query.all():
-        plan_start = work.plan_start_date
-        if isinstance(plan_start, datetime):
-            plan_start = plan_start.date()
-        if plan_start and plan_start >= year_start and plan_start <= year_end:
-            personnel = work.maintenance_personnel or '未知'
-            if personnel not in employee_stats:
-                employee_stats[personnel] = 0
-            employee_stats[personnel] += 1
-
-    sorted_employees = sorted(employee_stats.items(), key=lambda x: x[1], reverse=True)
-
-    result = []
-    for name, count in sorted_employees:
-        if name != '未知':
-            result.append({
-                'name': name,
-                'count': count
-            })
-
-    return ApiResponse.success({
-        'year': year,
-        'employees': result,
-        'total': len(result)
-    })
+    return ApiResponse.success(_employee_counts_from_rollup(db, year, user_name, is_manager))
 
 
 @router.get("/repair-stats", response_model=ApiResponse)
@@ -498,41 +289,9 @@ def get_repair_stats(
 
     user_name, is_manager = _get_user_info(user_info)
 
-    year_start = datetime(year, 1, 1).date()
-    year_end = datetime(year, 12, 31).date()
-    completed_statuses = OverdueAlertConfig.COMPLETED_STATUSES
-
-    repair_stats = {}
-
-    repair_query = db.query(TemporaryRepair).filter(TemporaryRepair.status.in_(completed_statuses))
-    repair_query = _apply_soft_delete_filter(repair_query, TemporaryRepair)
-    repair_query = _apply_user_filter(repair_query, TemporaryRepair, user_name, is_manager)
-
-    for repair in repair_query.all():
-        plan_start = repair.plan_start_date
-        if isinstance(plan_start, datetime):
-            plan_start = plan_start.date()
-        if plan_start and plan_start >= year_start and plan_start <= year_end:
-            personnel = repair.maintenance_personnel or '未知'
-            if personnel not in repair_stats:
-                repair_stats[personnel] = 0
-            repair_stats[personnel] += 1
-
-    sorted_employees = sorted(repair_stats.items(), key=lambda x: x[1], reverse=True)
-
-    result = []
-    for name, count in sorted_employees:
-        if name != '未知':
-            result.append({
-                'name': name,
-                'count': count
-            })
-
-    return ApiResponse.success({
-        'year': year,
-        'employees': result,
-        'total': len(result)
-    })
+    return ApiResponse.success(_employee_counts_from_rollup(
+        db, year, user_name, is_manager, order_type=ORDER_TYPE_REPAIR, completed_only=True
+    ))
 
 
 @router.get("/spotwork-stats", response_model=ApiResponse)
@@ -548,41 +307,9 @@ def get_spotwork_stats(
 
     user_name, is_manager = _get_user_info(user_info)
 
-    year_start = datetime(year, 1, 1).date()
-    year_end = datetime(year, 12, 31).date()
-    completed_statuses = OverdueAlertConfig.COMPLETED_STATUSES
-
-    spotwork_stats = {}
-
-    work_query = db.query(SpotWork).filter(SpotWork.status.in_(completed_statuses))
-    work_query = _apply_soft_delete_filter(work_query, SpotWork)
-    work_query = _apply_user_filter(work_query, SpotWork, user_name, is_manager)
-
-    for work in work_query.all():
-        plan_start = work.plan_start_date
-        if isinstance(plan_start, datetime):
-            plan_start = plan_start.date()
-        if plan_start and plan_start >= year_start and plan_start <= year_end:
-            personnel = work.maintenance_personnel or '未知'
-            if personnel not in spotwork_stats:
-                spotwork_stats[personnel] = 0
-            spotwork_stats[personnel] += 1
-
-    sorted_employees = sorted(spotwork_stats.items(), key=lambda x: x[1], reverse=True)
-
-    result = []
-    for name, count in sorted_employees:
-        if name != '未知':
-            result.append({
-                'name': name,
-                'count': count
-            })
-
-    return ApiResponse.success({
-        'year': year,
-        'employees': result,
-        'total': len(result)
-    })
+    return ApiResponse.success(_employee_counts_from_rollup(
+        db, year, user_name, is_manager, order_type=ORDER_TYPE_SPOTWORK, completed_only=True
+    ))
 
 
 @router.get("/inspection-stats", response_model=ApiResponse)
@@ -598,41 +325,84 @@ def get_inspection_stats(
 
     user_name, is_manager = _get_user_info(user_info)
 
-    year_start = datetime(year, 1, 1).date()
-    year_end = datetime(year, 12, 31).date()
-    completed_statuses = OverdueAlertConfig.COMPLETED_STATUSES
+    return ApiResponse.success(_employee_counts_from_rollup(
+        db, year, user_name, is_manager, order_type=ORDER_TYPE_INSPECTION, completed_only=True
+    ))
 
-    inspection_stats = {}
 
-    inspection_query = db.query(PeriodicInspection).filter(PeriodicInspection.status.in_(completed_statuses))
-    inspection_query = _apply_soft_delete_filter(inspection_query, PeriodicInspection)
-    inspection_query = _apply_user_filter(inspection_query, PeriodicInspection, user_name, is_manager)
+@router.post("/rollup/rebuild", response_model=ApiResponse)
+def rebuild_rollup(
+    db: Session = Depends(get_db),
+    admin_user: UserInfo = Depends(get_admin_user)
+):
+    """
+    从三种工单表全量重建工单日汇总表，修复批量更新等造成的统计偏差
+    需要超级管理员权限
+    """
+    logger.info(f"工单日汇总表重建由管理员 {admin_user.name} 执行")
+    row_count = WorkOrderRollupService(db).rebuild()
+    return ApiResponse.success({'rowCount': row_count}, message="汇总表重建完成")
 
-    for inspection in inspection_query.all():
-        plan_start = inspection.plan_start_date
-        if isinstance(plan_start, datetime):
-            plan_start = plan_start.date()
-        if plan_start and plan_start >= year_start and plan_start <= year_end:
-            personnel = inspection.maintenance_personnel or '未知'
-            if personnel not in inspection_stats:
-                inspection_stats[personnel] = 0
-            inspection_stats[personnel] += 1
 
-    sorted_employees = sorted(inspection_stats.items(), key=lambda x: x[1], reverse=True)
+DETAIL_ORDER_TYPES = {
+    PeriodicInspection: ('定期巡检单', 1, 'inspection_id'),
+    TemporaryRepair: ('临时维修单', 2, 'repair_id'),
+    SpotWork: ('零星用工单', 3, 'work_id'),
+}
 
-    result = []
-    for name, count in sorted_employees:
-        if name != '未知':
-            result.append({
-                'name': name,
-                'count': count
-            })
 
-    return ApiResponse.success({
-        'year': year,
-        'employees': result,
-        'total': len(result)
-    })
+def _query_detail_page(db: Session, models: list, predicate, user_name: str | None, is_manager: bool,
+                       page: int, page_size: int) -> tuple[int, list[dict]]:
+    """
+    统计明细分页查询
+
+    每种工单一个分支，谓词、软删除和用户过滤在各分支内执行，
+    项目名称通过关联 project_info 获取；UNION ALL 后在数据库中计数和分页
+
+    Returns:
+        (总数, 当前页明细)
+    """
+    branches = []
+    for model in models:
+        order_type_str, type_rank, number_field = DETAIL_ORDER_TYPES[model]
+        stmt = select(
+            model.id.label('id'),
+            literal(order_type_str, String).label('order_type'),
+            literal(type_rank, Integer).label('type_rank'),
+            getattr(model, number_field).label('order_number'),
+            func.coalesce(ProjectInfo.project_name, model.project_id, '').label('project_name'),
+            model.maintenance_personnel.label('maintenance_personnel'),
+            model.plan_start_date.label('plan_start_date'),
+            model.plan_end_date.label('plan_end_date'),
+            model.status.label('status'),
+            model.remarks.label('remarks'),
+        ).outerjoin(
+            ProjectInfo, ProjectInfo.project_id == model.project_id
+        ).where(predicate(model), model.is_deleted == False)
+        if not is_manager and user_name:
+            stmt = stmt.where(model.maintenance_personnel == user_name)
+        branches.append(stmt)
+
+    details = (branches[0] if len(branches) == 1 else union_all(*branches)).subquery('details')
+    total = db.execute(select(func.count()).select_from(details)).scalar() or 0
+    rows = db.execute(
+        select(details)
+        .order_by(details.c.type_rank, details.c.id)
+        .offset((page - 1) * page_size)
+        .limit(page_size)
+    ).mappings().all()
+
+    return total, [{
+        'id': row['id'],
+        'orderType': row['order_type'],
+        'orderNumber': row['order_number'] or '',
+        'projectName': row['project_name'],
+        'maintenancePersonnel': row['maintenance_personnel'] or '',
+        'planStartDate': row['plan_start_date'].strftime('%Y-%m-%d') if row['plan_start_date'] else '',
+        'planEndDate': row['plan_end_date'].strftime('%Y-%m-%d') if row['plan_end_date'] else '',
+        'status': row['status'] or '',
+        'content': row['remarks'] or '',
+    } for row in rows]
 
 
 @router.get("/detail", response_model=ApiResponse)
@@ -654,299 +424,119 @@ def get_statistics_detail(
                onTime-准时完成, delayed-延期完成, employee-运维人员工单详情, project-项目工单详情
     年份过滤统一使用 plan_start_date
     本年完成使用 actual_completion_date 判断
+    各明细条件均转换为 SQL 谓词，计数和分页在数据库中完成
     """
 
     user_name, is_manager = _get_user_info(user_info)
 
     today = datetime.now().date()
     current_year = today.year
-    year_start = datetime(year, 1, 1).date()
     year_end = datetime(year, 12, 31).date()
     near_due_days = 7
     valid_statuses = OverdueAlertConfig.VALID_STATUSES
     completed_statuses = OverdueAlertConfig.COMPLETED_STATUSES
 
-    results = []
-    total = 0
-
-    projects = db.query(ProjectInfo).all()
-    project_dict = {p.project_id: p.project_name for p in projects}
-
-    def format_work_order(item, order_type_str: str) -> dict:
-        """格式化工单数据"""
-        plan_start = item.plan_start_date
-        plan_end = item.plan_end_date
-        if isinstance(plan_start, datetime):
-            plan_start = plan_start.date()
-        if isinstance(plan_end, datetime):
-            plan_end = plan_end.date()
-
-        order_number = ''
-        if hasattr(item, 'inspection_id'):
-            order_number = item.inspection_id or ''
-        elif hasattr(item, 'repair_id'):
-            order_number = item.repair_id or ''
-        elif hasattr(item, 'work_id'):
-            order_number = item.work_id or ''
-
-        content = item.remarks or ''
-
-        return {
-            'id': item.id,
-            'orderType': order_type_str,
-            'orderNumber': order_number,
-            'projectName': project_dict.get(item.project_id, item.project_id or ''),
-            'maintenancePersonnel': item.maintenance_personnel or '',
-            'planStartDate': plan_start.strftime('%Y-%m-%d') if plan_start else '',
-            'planEndDate': plan_end.strftime('%Y-%m-%d') if plan_end else '',
-            'status': item.status or '',
-            'content': content
-        }
-
-    def filter_and_paginate(query, model, order_type_str: str, filter_func) -> tuple:
-        """过滤并分页"""
-        query = _apply_soft_delete_filter(query, model)
-        query = _apply_user_filter(query, model, user_name, is_manager)
-        items = []
-        for item in query.all():
-            if filter_func(item):
-                items.append(format_work_order(item, order_type_str))
-        return items
+    year_start_dt = datetime(year, 1, 1)
+    next_year_start_dt = datetime(year + 1, 1, 1)
+    today_dt = datetime.combine(today, datetime.min.time())
+    check_date = today if year == current_year else year_end
+    check_dt = datetime.combine(check_date, datetime.min.time())
+
+    def in_year(model):
+        return and_(model.plan_start_date >= year_start_dt, model.plan_start_date < next_year_start_dt)
+
+    def completed_in_year(model):
+        return and_(
+            model.status.in_(completed_statuses),
+            in_year(model),
+            model.actual_completion_date.isnot(None),
+        )
+
+    all_models = [PeriodicInspection, TemporaryRepair, SpotWork]
+    models_by_order_type = {
+        'inspection': PeriodicInspection,
+        'repair': TemporaryRepair,
+        'spotwork': SpotWork,
+    }
+    predicate = None
+    models = all_models
 
     if data_type == 'nearDue':
-        is_current_year = (year == current_year)
-        if is_current_year:
-            def check_near_due(item):
-                plan_start = item.plan_start_date
-                if isinstance(plan_start, datetime):
-                    plan_start = plan_start.date()
-                if plan_start and item.status in valid_statuses:
-                    days_from_today = (plan_start - today).days
-                    return 0 <= days_from_today <= near_due_days
-                return False
-
-            results.extend(filter_and_paginate(
-                db.query(PeriodicInspection), PeriodicInspection, '定期巡检单', check_near_due
-            ))
-            results.extend(filter_and_paginate(
-                db.query(TemporaryRepair), TemporaryRepair, '临时维修单', check_near_due
-            ))
-            results.extend(filter_and_paginate(
-                db.query(SpotWork), SpotWork, '零星用工单', check_near_due
-            ))
+        if year == current_year:
+            def predicate(model):
+                return and_(
+                    model.status.in_(valid_statuses),
+                    model.plan_start_date >= today_dt,
+                    model.plan_start_date < today_dt + timedelta(days=near_due_days + 1),
+                )
 
     elif data_type == 'overdue':
-        def check_overdue(item):
-            plan_end = item.plan_end_date
-            if isinstance(plan_end, datetime):
-                plan_end = plan_end.date()
-            check_date = today if year == current_year else year_end
-            return bool(plan_end and plan_end < check_date and item.status in valid_statuses)
-
-        results.extend(filter_and_paginate(
-            db.query(PeriodicInspection), PeriodicInspection, '定期巡检单', check_overdue
-        ))
-        results.extend(filter_and_paginate(
-            db.query(TemporaryRepair), TemporaryRepair, '临时维修单', check_overdue
-        ))
-        results.extend(filter_and_paginate(
-            db.query(SpotWork), SpotWork, '零星用工单', check_overdue
-        ))
+        def predicate(model):
+            return and_(model.plan_end_date < check_dt, model.status.in_(valid_statuses))
 
     elif data_type == 'yearCompleted':
-        def check_year_completed(item):
-            actual_completion = item.actual_completion_date
-            if isinstance(actual_completion, datetime):
-                actual_completion = actual_completion.date()
-            if item.status in completed_statuses and actual_completion:
-                return year_start <= actual_completion <= year_end
-            return False
-
-        results.extend(filter_and_paginate(
-            db.query(PeriodicInspection), PeriodicInspection, '定期巡检单', check_year_completed
-        ))
-        results.extend(filter_and_paginate(
-            db.query(TemporaryRepair), TemporaryRepair, '临时维修单', check_year_completed
-        ))
-        results.extend(filter_and_paginate(
-            db.query(SpotWork), SpotWork, '零星用工单', check_year_completed
-        ))
-
-    elif data_type == 'regularInspection':
-        def check_inspection(item):
-            plan_start = item.plan_start_date
-            if isinstance(plan_start, datetime):
-                plan_start = plan_start.date()
-            if plan_start:
-                if year_start <= plan_start <= year_end:
-                    return item.status in valid_statuses
-            return False
-
-        results = filter_and_paginate(
-            db.query(PeriodicInspection), PeriodicInspection, '定期巡检单', check_inspection
-        )
-
-    elif data_type == 'temporaryRepair':
-        def check_repair(item):
-            plan_start = item.plan_start_date
-            if isinstance(plan_start, datetime):
-                plan_start = plan_start.date()
-            if plan_start:
-                if year_start <= plan_start <= year_end:
-                    return item.status in valid_statuses
-            return False
-
-        results = filter_and_paginate(
-            db.query(TemporaryRepair), TemporaryRepair, '临时维修单', check_repair
-        )
-
-    elif data_type == 'spotWork':
-        def check_spotwork(item):
-            plan_start = item.plan_start_date
-            if isinstance(plan_start, datetime):
-                plan_start = plan_start.date()
-            if plan_start:
-                if year_start <= plan_start <= year_end:
-                    return item.status in valid_statuses
-            return False
-
-        results = filter_and_paginate(
-            db.query(SpotWork), SpotWork, '零星用工单', check_spotwork
-        )
+        def predicate(model):
+            return and_(
+                model.status.in_(completed_statuses),
+                model.actual_completion_date >= year_start_dt,
+                model.actual_completion_date < next_year_start_dt,
+            )
+
+    elif data_type in ('regularInspection', 'temporaryRepair', 'spotWork'):
+        models = [{
+            'regularInspection': PeriodicInspection,
+            'temporaryRepair': TemporaryRepair,
+            'spotWork': SpotWork,
+        }[data_type]]
+
+        def predicate(model):
+            return and_(in_year(model), model.status.in_(valid_statuses))
 
     elif data_type == 'onTime':
-        def check_on_time(item):
-            plan_start = item.plan_start_date
-            plan_end = item.plan_end_date
-            actual_completion = item.actual_completion_date
-            if isinstance(plan_start, datetime):
-                plan_start = plan_start.date()
-            if isinstance(plan_end, datetime):
-                plan_end = plan_end.date()
-            if isinstance(actual_completion, datetime):
-                actual_completion = actual_completion.date()
-            if item.status in completed_statuses and plan_start and actual_completion:
-                if year_start <= plan_start <= year_end:
-                    return actual_completion <= plan_end
-            return False
-
-        results.extend(filter_and_paginate(
-            db.query(PeriodicInspection), PeriodicInspection, '定期巡检单', check_on_time
-        ))
-        results.extend(filter_and_paginate(
-            db.query(TemporaryRepair), TemporaryRepair, '临时维修单', check_on_time
-        ))
-        results.extend(filter_and_paginate(
-            db.query(SpotWork), SpotWork, '零星用工单', check_on_time
-        ))
+        def predicate(model):
+            return and_(
+                completed_in_year(model),
+                func.date(model.actual_completion_date) <= func.date(model.plan_end_date),
+            )
 
     elif data_type == 'delayed':
-        def check_delayed(item):
-            plan_start = item.plan_start_date
-            plan_end = item.plan_end_date
-            actual_completion = item.actual_completion_date
-            if isinstance(plan_start, datetime):
-                plan_start = plan_start.date()
-            if isinstance(plan_end, datetime):
-                plan_end = plan_end.date()
-            if isinstance(actual_completion, datetime):
-                actual_completion = actual_completion.date()
-            if item.status in completed_statuses and plan_start and actual_completion:
-                if year_start <= plan_start <= year_end:
-                    return actual_completion > plan_end
-            return False
-
-        results.extend(filter_and_paginate(
-            db.query(PeriodicInspection), PeriodicInspection, '定期巡检单', check_delayed
-        ))
-        results.extend(filter_and_paginate(
-            db.query(TemporaryRepair), TemporaryRepair, '临时维修单', check_delayed
-        ))
-        results.extend(filter_and_paginate(
-            db.query(SpotWork), SpotWork, '零星用工单', check_delayed
-        ))
+        def predicate(model):
+            return and_(
+                completed_in_year(model),
+                func.date(model.actual_completion_date) > func.date(model.plan_end_date),
+            )
 
     elif data_type == 'employee' and employee_name:
-        def check_employee(item, require_completed=False):
-            plan_start = item.plan_start_date
-            if isinstance(plan_start, datetime):
-                plan_start = plan_start.date()
-            if plan_start and year_start <= plan_start <= year_end:
-                if item.maintenance_personnel == employee_name:
-                    if require_completed:
-                        return item.status in completed_statuses
-                    return True
-            return False
-
-        if order_type == 'inspection':
-            results.extend(filter_and_paginate(
-                db.query(PeriodicInspection), PeriodicInspection, '定期巡检单', lambda item: check_employee(item, True)
-            ))
-        elif order_type == 'repair':
-            results.extend(filter_and_paginate(
-                db.query(TemporaryRepair), TemporaryRepair, '临时维修单', lambda item: check_employee(item, True)
-            ))
-        elif order_type == 'spotwork':
-            results.extend(filter_and_paginate(
-                db.query(SpotWork), SpotWork, '零星用工单', lambda item: check_employee(item, True)
-            ))
-        else:
-            results.extend(filter_and_paginate(
-                db.query(PeriodicInspection), PeriodicInspection, '定期巡检单', lambda item: check_employee(item, False)
-            ))
-            results.extend(filter_and_paginate(
-                db.query(TemporaryRepair), TemporaryRepair, '临时维修单', lambda item: check_employee(item, False)
-            ))
-            results.extend(filter_and_paginate(
-                db.query(SpotWork), SpotWork, '零星用工单', lambda item: check_employee(item, False)
-            ))
+        if order_type in models_by_order_type:
+            models = [models_by_order_type[order_type]]
+
+        def predicate(model):
+            condition = and_(in_year(model), model.maintenance_personnel == employee_name)
+            if order_type in models_by_order_type:
+                condition = and_(condition, model.status.in_(completed_statuses))
+            return condition
 
     elif data_type == 'project' and project_name:
-        project_id = None
-        for pid, pname in project_dict.items():
-            if pname == project_name:
-                project_id = pid
-                break
+        project_id = db.query(ProjectInfo.project_id).filter(
+            ProjectInfo.project_name == project_name
+        ).limit(1).scalar()
 
         if project_id:
-            def check_project(item, require_completed=False):
-                plan_start = item.plan_start_date
-                if isinstance(plan_start, datetime):
-                    plan_start = plan_start.date()
-                if plan_start and year_start <= plan_start <= year_end:
-                    if item.project_id == project_id:
-                        if require_completed:
-                            return item.status in completed_statuses
-                        return True
-                return False
-
-            if order_type == 'inspection':
-                results.extend(filter_and_paginate(
-                    db.query(PeriodicInspection), PeriodicInspection, '定期巡检单', lambda item: check_project(item, True)
-                ))
-            elif order_type == 'repair':
-                results.extend(filter_and_paginate(
-                    db.query(TemporaryRepair), TemporaryRepair, '临时维修单', lambda item: check_project(item, True)
-                ))
-            elif order_type == 'spotwork':
-                results.extend(filter_and_paginate(
-                    db.query(SpotWork), SpotWork, '零星用工单', lambda item: check_project(item, True)
-                ))
-            else:
-                results.extend(filter_and_paginate(
-                    db.query(PeriodicInspection), PeriodicInspection, '定期巡检单', lambda item: check_project(item, False)
-                ))
-                results.extend(filter_and_paginate(
-                    db.query(TemporaryRepair), TemporaryRepair, '临时维修单', lambda item: check_project(item, False)
-                ))
-                results.extend(filter_and_paginate(
-                    db.query(SpotWork), SpotWork, '零星用工单', lambda item: check_project(item, False)
-                ))
-
-    total = len(results)
-    start_idx = (page - 1) * page_size
-    end_idx = start_idx + page_size
-    paginated_results = results[start_idx:end_idx]
+            if order_type in models_by_order_type:
+                models = [models_by_order_type[order_type]]
+
+            def predicate(model):
+                condition = and_(in_year(model), model.project_id == project_id)
+                if order_type in models_by_order_type:
+                    condition = and_(condition, model.status.in_(completed_statuses))
+                return condition
+
+    if predicate is None:
+        total, paginated_results = 0, []
+    else:
+        total, paginated_results = _query_detail_page(
+            db, models, predicate, user_name, is_manager, page, page_size
+        )
 
     return ApiResponse.success({
         'total': total,
@@ -56,6 +56,7 @@ def get_temporary_repairs_list(
     project_name: str | None = Query(None, description="Project name (fuzzy search)"),
     repair_id: str | None = Query(None, description="Repair ID (fuzzy search)"),
     status: str | None = Query(None, description="Status"),
+    view: str | None = Query(None, pattern="^summary$", description="List view: summary returns list fields only"),
     db: Session = Depends(get_db),
     user_info: UserInfo = Depends(get_current_user_info)
 ):
@@ -70,7 +71,7 @@ def get_temporary_repairs_list(
 
     items, total = service.get_all(
         page=page, size=size, project_name=project_name, repair_id=repair_id,
-        status=status, maintenance_personnel=maintenance_personnel
+        status=status, maintenance_personnel=maintenance_personnel, projection=view
     )
     items_dict = [item.to_dict() for item in items]
     return ApiResponse(
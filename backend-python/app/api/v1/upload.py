@@ -1,102 +1,92 @@
-import os
-import uuid
-from datetime import datetime
-
 from fastapi import APIRouter, File, HTTPException, UploadFile, status
+from starlette.concurrency import run_in_threadpool
 
-from app.config import get_settings
 from app.schemas.common import ApiResponse
+from app.utils.blob_store import (
+    MIME_EXTENSIONS,
+    BlobTooLargeError,
+    BlobWriter,
+    sniff_extension,
+    store_base64,
+)
+from app.utils.signed_url import present_upload_url
 
 router = APIRouter(prefix="/upload", tags=["File Upload"])
-settings = get_settings()
 
-UPLOAD_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "uploads")
+MAX_UPLOAD_SIZE = 10 * 1024 * 1024
+UPLOAD_CHUNK_SIZE = 256 * 1024
+
 
-os.makedirs(UPLOAD_DIR, exist_ok=True)
+def _uploaded(url: str) -> ApiResponse:
+    return ApiResponse(
+        code=200,
+        message="上传成功",
+        data={"url": present_upload_url(url), "filename": url.rsplit("/", 1)[-1]}
+    )
 
 
 @router.post("", response_model=ApiResponse)
 async def upload_file(file: UploadFile = File(...)):
+    """
+    上传图片
+    分块写入临时文件并计算 SHA-256，文件读写在线程池中执行，不阻塞事件循环；
+    相同内容的图片只保存一份
+    """
     if not file:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="请选择要上传的文件"
         )
 
-    allowed_types = ["image/jpeg", "image/png", "image/gif", "image/webp"]
-    if file.content_type not in allowed_types:
+    if file.content_type not in MIME_EXTENSIONS:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="只支持上传图片文件（JPEG、PNG、GIF、WebP）"
         )
 
-    max_size = 10 * 1024 * 1024
-    content = await file.read()
-    if len(content) > max_size:
+    writer = await run_in_threadpool(BlobWriter, MAX_UPLOAD_SIZE)
+    try:
+        while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+            await run_in_threadpool(writer.write, chunk)
+    except BlobTooLargeError:
+        await run_in_threadpool(writer.abort)
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="文件大小不能超过10MB"
-        )
-
-    today = datetime.now().strftime("%Y%m%d")
-    upload_path = os.path.join(UPLOAD_DIR, today)
-    os.makedirs(upload_path, exist_ok=True)
-
-    file_ext = os.path.splitext(file.filename or "image.jpg")[1]
-    if not file_ext:
-        file_ext = ".jpg"
-
-    new_filename = f"{uuid.uuid4().hex}{file_ext}"
-    file_path = os.path.join(upload_path, new_filename)
-
-    with open(file_path, "wb") as f:
-        f.write(content)
-
-    file_url = f"/uploads/{today}/{new_filename}"
+        ) from None
+    except BaseException:
+        await run_in_threadpool(writer.abort)
+        raise
 
-    return ApiResponse(
-        code=200,
-        message="上传成功",
-        data={"url": file_url, "filename": new_filename}
-    )
+    extension = sniff_extension(writer.head) or MIME_EXTENSIONS[file.content_type]
+    url = await run_in_threadpool(writer.commit, extension)
+    return _uploaded(url)
 
 
 @router.post("/base64", response_model=ApiResponse)
 async def upload_base64(data: dict):
-    import base64
-
+    """
+    上传 base64 图片
+    在线程池中分块解码写入，相同内容的图片只保存一份
+    """
     base64_str = data.get("data")
-    if not base64_str:
+    if not base64_str or not isinstance(base64_str, str):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="请提供base64编码的图片数据"
         )
 
-    if base64_str.startswith("data:image"):
-        base64_str = base64_str.split(",")[1]
-
     try:
-        image_data = base64.b64decode(base64_str)
-    except Exception:
+        url = await run_in_threadpool(store_base64, base64_str, MAX_UPLOAD_SIZE)
+    except BlobTooLargeError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="文件大小不能超过10MB"
+        ) from None
+    except ValueError:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="无效的base64图片数据"
         ) from None
 
-    today = datetime.now().strftime("%Y%m%d")
-    upload_path = os.path.join(UPLOAD_DIR, today)
-    os.makedirs(upload_path, exist_ok=True)
-
-    new_filename = f"{uuid.uuid4().hex}.png"
-    file_path = os.path.join(upload_path, new_filename)
-
-    with open(file_path, "wb") as f:
-        f.write(image_data)
-
-    file_url = f"/uploads/{today}/{new_filename}"
-
-    return ApiResponse(
-        code=200,
-        message="上传成功",
-        data={"url": file_url, "filename": new_filename}
-    )
+    return _uploaded(url)
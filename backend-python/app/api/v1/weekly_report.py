@@ -3,7 +3,6 @@
 提供维保周报的HTTP接口
 """
 import logging
-from datetime import datetime
 
 from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.orm import Session
@@ -16,7 +15,6 @@ from app.dependencies import (
     get_current_user_required,
     get_manager_user,
 )
-from app.models.weekly_report import WeeklyReport
 from app.models.work_order_operation_log import WorkOrderOperationLog
 from app.schemas.common import ApiResponse
 from app.schemas.weekly_report import (
@@ -26,6 +24,8 @@ from app.schemas.weekly_report import (
     WeeklyReportUpdate,
 )
 from app.services.weekly_report import WeeklyReportService
+from app.utils.date_utils import parse_datetime
+from app.utils.work_order_id_generator import preview_weekly_report_id
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/weekly-report", tags=["Weekly Report Management"])
@@ -37,19 +37,14 @@ def generate_report_id(
     db: Session = Depends(get_db)
 ):
     """
-    生成周报编号
+    预览周报编号
     格式: ZB-年月日-序号
     示例: ZB-20260220-01
-    """
-    today = datetime.now().strftime("%Y%m%d")
-    base_id = f"ZB-{today}"
-
-    count = db.query(WeeklyReport).filter(
-        WeeklyReport.report_id.like(f"{base_id}%")
-    ).count()
 
-    sequence = str(count + 1).zfill(2)
-    report_id = f"{base_id}-{sequence}"
+    只查询不预留，实际编号在保存周报时分配
+    """
+    day = parse_datetime(report_date)
+    report_id = preview_weekly_report_id(db, day.date() if day else None)
 
     return ApiResponse(
         code=200,
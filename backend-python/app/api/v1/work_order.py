@@ -8,15 +8,48 @@ from sqlalchemy.orm import Session
 
 from app.database import get_db
 from app.dependencies import UserInfo, get_current_user_info
+from app.exceptions import ValidationException
 from app.models.periodic_inspection import PeriodicInspection
 from app.models.spot_work import SpotWork
 from app.models.temporary_repair import TemporaryRepair
+from app.repositories.work_order import WorkOrderRepository
 from app.schemas.common import ApiResponse, PaginatedResponse
+from app.utils.conditional_get import (
+    USER_SCOPED_POLICY,
+    ConditionalGet,
+    conditional_get,
+    table_validator,
+)
+from app.utils.signed_url import present_upload_url
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/work-order", tags=["Work Order Management"])
 
 
+def _format_work_order(row: dict) -> dict:
+    """将统一工单视图的一行转换为接口返回格式"""
+    item = {
+        'id': row['id'],
+        'order_id': row['order_id'],
+        'order_type': row['order_type'],
+        'order_type_code': row['order_type_code'],
+        'project_id': row['project_id'],
+        'project_name': row['project_name'],
+        'client_name': row['client_name'],
+        'plan_start_date': row['plan_start_date'].isoformat() if row['plan_start_date'] else None,
+        'plan_end_date': row['plan_end_date'].isoformat() if row['plan_end_date'] else None,
+        'maintenance_personnel': row['maintenance_personnel'],
+        'status': row['status'],
+        'remarks': row['remarks'],
+        'created_at': row['created_at'].isoformat() if row['created_at'] else None,
+        'updated_at': row['updated_at'].isoformat() if row['updated_at'] else None,
+    }
+    if row['order_type_code'] == 'inspection':
+        item['execution_result'] = row['execution_result']
+        item['signature'] = present_upload_url(row['signature'])
+    return item
+
+
 @router.get("", response_model=PaginatedResponse)
 def get_work_order_list(
     request: Request,
@@ -27,122 +60,45 @@ def get_work_order_list(
     order_type: str | None = Query(None, description="工单类型: inspection/repair/spotwork"),
     status: str | None = Query(None, description="状态"),
     maintenance_personnel: str | None = Query(None, description="运维人员(模糊搜索)"),
+    cursor: str | None = Query(None, description="键集分页游标(上一页返回的nextCursor)，传入时忽略page"),
     db: Session = Depends(get_db),
-    user_info: UserInfo = Depends(get_current_user_info)
+    user_info: UserInfo = Depends(get_current_user_info),
+    conditional: ConditionalGet = Depends(conditional_get(USER_SCOPED_POLICY))
 ):
     """
     获取工单列表，合并三种工单类型的数据
+    三表 UNION ALL 后在数据库中排序、计数和分页；三表均未变化时返回 304
     """
     user_name = user_info.name
     is_manager = user_info.is_manager
 
-    logger.info(f"📋 [工单列表] user_name={user_name}, is_manager={is_manager}")
-
-    all_orders = []
-
-    if not order_type or order_type == 'inspection':
-        query = db.query(PeriodicInspection)
-        if project_name:
-            query = query.filter(PeriodicInspection.project_name.ilike(f'%{project_name}%'))
-        if order_id:
-            query = query.filter(PeriodicInspection.inspection_id.ilike(f'%{order_id}%'))
-        if status:
-            query = query.filter(PeriodicInspection.status == status)
-        if maintenance_personnel:
-            query = query.filter(PeriodicInspection.maintenance_personnel.ilike(f'%{maintenance_personnel}%'))
-        if not is_manager and user_name:
-            query = query.filter(PeriodicInspection.maintenance_personnel == user_name)
-
-        for item in query.all():
-            all_orders.append({
-                'id': item.id,
-                'order_id': item.inspection_id,
-                'order_type': '定期巡检单',
-                'order_type_code': 'inspection',
-                'project_id': item.project_id,
-                'project_name': item.project_name,
-                'client_name': item.client_name,
-                'plan_start_date': item.plan_start_date.isoformat() if item.plan_start_date else None,
-                'plan_end_date': item.plan_end_date.isoformat() if item.plan_end_date else None,
-                'maintenance_personnel': item.maintenance_personnel,
-                'status': item.status,
-                'remarks': item.remarks,
-                'execution_result': item.execution_result,
-                'signature': item.signature,
-                'created_at': item.created_at.isoformat() if item.created_at else None,
-                'updated_at': item.updated_at.isoformat() if item.updated_at else None,
-            })
-
-    if not order_type or order_type == 'repair':
-        query = db.query(TemporaryRepair)
-        if project_name:
-            query = query.filter(TemporaryRepair.project_name.ilike(f'%{project_name}%'))
-        if order_id:
-            query = query.filter(TemporaryRepair.repair_id.ilike(f'%{order_id}%'))
-        if status:
-            query = query.filter(TemporaryRepair.status == status)
-        if maintenance_personnel:
-            query = query.filter(TemporaryRepair.maintenance_personnel.ilike(f'%{maintenance_personnel}%'))
-        if not is_manager and user_name:
-            query = query.filter(TemporaryRepair.maintenance_personnel == user_name)
-
-        for item in query.all():
-            all_orders.append({
-                'id': item.id,
-                'order_id': item.repair_id,
-                'order_type': '临时维修单',
-                'order_type_code': 'repair',
-                'project_id': item.project_id,
-                'project_name': item.project_name,
-                'client_name': item.client_name,
-                'plan_start_date': item.plan_start_date.isoformat() if item.plan_start_date else None,
-                'plan_end_date': item.plan_end_date.isoformat() if item.plan_end_date else None,
-                'maintenance_personnel': item.maintenance_personnel,
-                'status': item.status,
-                'remarks': item.remarks,
-                'created_at': item.created_at.isoformat() if item.created_at else None,
-                'updated_at': item.updated_at.isoformat() if item.updated_at else None,
-            })
-
-    if not order_type or order_type == 'spotwork':
-        query = db.query(SpotWork)
-        if project_name:
-            query = query.filter(SpotWork.project_name.ilike(f'%{project_name}%'))
-        if order_id:
-            query = query.filter(SpotWork.work_id.ilike(f'%{order_id}%'))
-        if status:
-            query = query.filter(SpotWork.status == status)
-        if maintenance_personnel:
-            query = query.filter(SpotWork.maintenance_personnel.ilike(f'%{maintenance_personnel}%'))
-        if not is_manager and user_name:
-            query = query.filter(SpotWork.maintenance_personnel == user_name)
-
-        for item in query.all():
-            all_orders.append({
-                'id': item.id,
-                'order_id': item.work_id,
-                'order_type': '零星用工单',
-                'order_type_code': 'spotwork',
-                'project_id': item.project_id,
-                'project_name': item.project_name,
-                'client_name': item.client_name,
-                'plan_start_date': item.plan_start_date.isoformat() if item.plan_start_date else None,
-                'plan_end_date': item.plan_end_date.isoformat() if item.plan_end_date else None,
-                'maintenance_personnel': item.maintenance_personnel,
-                'status': item.status,
-                'remarks': item.remarks,
-                'created_at': item.created_at.isoformat() if item.created_at else None,
-                'updated_at': item.updated_at.isoformat() if item.updated_at else None,
-            })
+    not_modified = conditional.evaluate(
+        table_validator(db, PeriodicInspection, TemporaryRepair, SpotWork), user_name, is_manager
+    )
+    if not_modified is not None:
+        return not_modified
 
-    all_orders.sort(key=lambda x: x.get('created_at') or '', reverse=True)
-
-    total = len(all_orders)
-    start = page * size
-    end = start + size
-    paged_orders = all_orders[start:end]
+    logger.info(f"📋 [工单列表] user_name={user_name}, is_manager={is_manager}")
 
-    return PaginatedResponse.success(paged_orders, total, page, size)
+    repository = WorkOrderRepository(db)
+    try:
+        rows, total, next_cursor = repository.find_page(
+            page=page,
+            size=size,
+            cursor=cursor,
+            project_name=project_name,
+            order_id=order_id,
+            order_type=order_type,
+            status=status,
+            maintenance_personnel=maintenance_personnel,
+            user_name=user_name if not is_manager else None,
+        )
+    except ValueError as e:
+        raise ValidationException(str(e)) from e
+
+    response = PaginatedResponse.success([_format_work_order(row) for row in rows], total, page, size)
+    response.data['nextCursor'] = next_cursor
+    return response
 
 
 @router.get("/all/list", response_model=ApiResponse)
@@ -175,7 +131,7 @@ def get_all_work_orders(
             'status': item.status,
             'remarks': item.remarks,
             'execution_result': item.execution_result,
-            'signature': item.signature,
+            'signature': present_upload_url(item.signature),
         })
 
     for item in db.query(TemporaryRepair).all():
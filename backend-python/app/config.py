@@ -35,6 +35,32 @@ class Settings(BaseSettings):
     page_size: int = 10
     max_page_size: int = 1000
 
+    online_heartbeat_flush_seconds: int = 10
+    online_session_timeout_minutes: int = 30
+    online_sweep_interval_seconds: int = 60
+
+    rate_limit_backend: str = "memory"
+    rate_limit_sqlite_path: str = "/tmp/sstcp_rate_limit.db"
+
+    image_cache_dir: str = "/tmp/sstcp_image_cache"
+    image_cache_max_mb: int = 1024
+    image_derivative_workers: int = 2
+
+    upload_serve_mode: str = "direct"
+    upload_accel_prefix: str = "/protected-uploads/"
+    upload_require_signature: bool = False
+    upload_url_ttl_seconds: int = 3600
+
+    job_workers: int = 2
+    job_poll_seconds: int = 5
+    job_chunk_size: int = 1000
+
+    outbox_batch_size: int = 500
+    outbox_poll_seconds: int = 5
+    outbox_max_attempts: int = 5
+
+    reference_cache_ttl_seconds: int = 300
+
     @field_validator('cors_origins', mode='after')
     @classmethod
     def parse_cors_origins(cls, v):
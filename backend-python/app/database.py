@@ -1,6 +1,8 @@
 import logging
 
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 
@@ -33,6 +35,50 @@ except Exception as e:
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+ASYNC_DRIVERS = {
+    'postgresql': 'postgresql+asyncpg',
+    'sqlite': 'sqlite+aiosqlite',
+}
+
+
+def get_async_database_url(database_url: str) -> str:
+    """
+    将同步数据库URL转换为异步驱动URL
+
+    postgresql / postgresql+psycopg2 -> postgresql+asyncpg，sqlite -> sqlite+aiosqlite
+    """
+    url = make_url(database_url)
+    backend = url.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"不支持的异步数据库类型: {backend}")
+    return url.set(drivername=ASYNC_DRIVERS[backend]).render_as_string(hide_password=False)
+
+
+async_database_url = get_async_database_url(settings.database_url)
+
+if async_database_url.startswith('postgresql'):
+    async_engine = create_async_engine(
+        async_database_url,
+        echo=settings.debug,
+        pool_pre_ping=True,
+        pool_recycle=1800,
+        pool_size=15,
+        max_overflow=30,
+        pool_timeout=60,
+        connect_args={
+            "timeout": 10
+        }
+    )
+else:
+    async_engine = create_async_engine(async_database_url, echo=settings.debug)
+
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine,
+    class_=AsyncSession,
+    autoflush=False,
+    expire_on_commit=False
+)
+
 Base = declarative_base()
 
 def get_db():
@@ -57,3 +103,18 @@ def get_db():
             db.close()
         except Exception as e:
             logger.error(f"关闭session失败: {str(e)}")
+
+
+async def get_async_db():
+    """
+    获取异步数据库会话
+
+    供 async def 路由使用，查询不会阻塞事件循环；事务约定与 get_db 相同
+    """
+    async with AsyncSessionLocal() as db:
+        try:
+            yield db
+        except Exception as e:
+            logger.error(f"事务异常，执行回滚: {str(e)}")
+            await db.rollback()
+            raise
@@ -1,3 +1,4 @@
+import asyncio
 import os
 import time
 import uuid
@@ -7,7 +8,6 @@ from fastapi import Depends, FastAPI, Request
 from fastapi.exceptions import RequestValidationError
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
-from fastapi.staticfiles import StaticFiles
 from prometheus_fastapi_instrumentator import Instrumentator
 from sqlalchemy import text
 from starlette.exceptions import HTTPException as StarletteHTTPException
@@ -18,7 +18,10 @@ from app.api.v1 import (
     dictionary,
     dingtalk_auth,
     expiring_soon,
+    files,
+    images,
     inspection_item,
+    jobs,
     maintenance_log,
     maintenance_plan,
     migration,
@@ -43,10 +46,15 @@ from app.api.v1 import (
     work_plan,
 )
 from app.config import get_settings
-from app.database import Base, engine
+from app.database import Base, SessionLocal, engine
 from app.dependencies import UserInfo, get_admin_user
 from app.exceptions import BusinessException
-from app.middleware.rate_limit import RateLimitMiddleware
+from app.middleware.rate_limit import RateLimitMiddleware, create_rate_limit_backend
+from app.services.background_jobs import job_runner
+from app.services.image_derivatives import derivative_cache
+from app.services.online_presence import heartbeat_aggregator, run_heartbeat_flush_loop
+from app.services.reference_cache import reference_cache_listener
+from app.services.work_plan_outbox import work_plan_outbox_applier
 from app.utils.logging_config import get_logger, setup_logging
 
 setup_logging(level="DEBUG" if get_settings().debug else "INFO")
@@ -66,7 +74,7 @@ Instrumentator().instrument(app).expose(app)
 
 @app.on_event("startup")
 async def startup_event():
-    """应用启动时创建数据库表和序列"""
+    """应用启动时创建数据库表"""
     logger.info("正在创建数据库表...")
     try:
         Base.metadata.create_all(bind=engine, checkfirst=True)
@@ -77,14 +85,49 @@ async def startup_event():
         else:
             logger.info("数据库表或索引已存在，跳过创建")
 
-    logger.info("正在创建工单编号序列...")
     try:
-        with engine.connect() as conn:
-            conn.execute(text("CREATE SEQUENCE IF NOT EXISTS work_order_seq START 1"))
-            conn.commit()
-        logger.info("工单编号序列创建成功")
+        with SessionLocal() as db:
+            heartbeat_aggregator.load(db)
+        logger.info(f"已加载在线用户 {heartbeat_aggregator.count()} 人")
+    except Exception as e:
+        logger.error(f"加载在线用户失败: {str(e)}")
+    app.state.heartbeat_flush_task = asyncio.create_task(
+        run_heartbeat_flush_loop(
+            settings.online_heartbeat_flush_seconds,
+            settings.online_session_timeout_minutes,
+            settings.online_sweep_interval_seconds,
+        )
+    )
+
+    try:
+        derivative_cache.load()
+        logger.info(f"已加载衍生图缓存 {derivative_cache.total_bytes() // 1024 // 1024} MB")
     except Exception as e:
-        logger.warning(f"创建工单编号序列失败（可能已存在）: {str(e)}")
+        logger.error(f"加载衍生图缓存失败: {str(e)}")
+
+    job_runner.start()
+    work_plan_outbox_applier.start()
+    reference_cache_listener.start()
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """应用关闭时停止心跳写入任务、写入剩余心跳，关闭衍生图进程池、后台任务调度、工作计划同步线程和参考数据缓存监听线程"""
+    task = getattr(app.state, "heartbeat_flush_task", None)
+    if task:
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+    try:
+        with SessionLocal() as db:
+            flushed = heartbeat_aggregator.flush(db, reload=False)
+        logger.info(f"关闭前写入心跳 {flushed} 条")
+    except Exception as e:
+        logger.error(f"关闭前写入心跳失败: {str(e)}")
+    derivative_cache.shutdown()
+    job_runner.shutdown()
+    work_plan_outbox_applier.shutdown()
+    reference_cache_listener.shutdown()
+
 
 app.add_middleware(
     CORSMiddleware,
@@ -98,6 +141,7 @@ app.add_middleware(
     RateLimitMiddleware,
     requests_per_minute=120,
     requests_per_hour=2000,
+    backend=create_rate_limit_backend(settings.rate_limit_backend, settings.rate_limit_sqlite_path),
 )
 
 @app.middleware("http")
@@ -152,6 +196,9 @@ app.include_router(work_plan.router, prefix=settings.api_prefix)
 app.include_router(customer.router, prefix=settings.api_prefix)
 app.include_router(repair_tools.router, prefix=settings.api_prefix)
 app.include_router(upload.router, prefix=settings.api_prefix)
+app.include_router(files.router, prefix=settings.api_prefix)
+app.include_router(jobs.router, prefix=settings.api_prefix)
+app.include_router(images.router, prefix=settings.api_prefix)
 app.include_router(work_order.router, prefix=settings.api_prefix)
 app.include_router(maintenance_log.router, prefix=settings.api_prefix)
 app.include_router(weekly_report.router, prefix=settings.api_prefix)
@@ -164,7 +211,7 @@ app.include_router(online_user.router, prefix=settings.api_prefix)
 
 UPLOAD_DIR = os.path.join(os.path.dirname(__file__), "uploads")
 os.makedirs(UPLOAD_DIR, exist_ok=True)
-app.mount("/uploads", StaticFiles(directory=UPLOAD_DIR), name="uploads")
+app.include_router(files.uploads_router)
 
 
 @app.get("/")
@@ -1,14 +1,259 @@
+"""
+请求限流中间件
+按客户端 IP 对分钟、小时两个窗口做滑动窗口计数限流
+
+滑动窗口计数：每个窗口只保存当前窗口和上一窗口的请求数，
+估算值 = 上一窗口数 × 上一窗口在滑动区间内的占比 + 当前窗口数，
+每个客户端内存固定，单次请求 O(1)
+
+计数存储通过 RateLimitBackend 插拔：
+- MemoryRateLimitBackend：进程内，按客户端哈希分片加锁
+- SQLiteRateLimitBackend：本机 SQLite 文件，多个 uvicorn worker 共享同一限额
+其他共享存储（如 Redis）实现 RateLimitBackend.hit 即可接入
+"""
 import logging
+import sqlite3
 import threading
 import time
-from collections import defaultdict
+from typing import Protocol
 
 from fastapi import Request, status
+from starlette.concurrency import run_in_threadpool
 from starlette.middleware.base import BaseHTTPMiddleware
 from starlette.responses import JSONResponse
 
 logger = logging.getLogger(__name__)
 
+MINUTE_WINDOW = 60
+HOUR_WINDOW = 3600
+
+
+def sliding_window_estimate(
+    window_seconds: int,
+    window_index: int,
+    current: int,
+    previous: int,
+    now: float
+) -> tuple[int, int, int, float]:
+    """
+    将计数滚动到 now 所在窗口并估算滑动窗口内的请求数
+
+    Args:
+        window_seconds: 窗口长度
+        window_index: 已保存计数所在的窗口序号
+        current: 已保存的当前窗口请求数
+        previous: 已保存的上一窗口请求数
+        now: 当前时间戳
+
+    Returns:
+        (窗口序号, 当前窗口请求数, 上一窗口请求数, 估算请求数)
+    """
+    index = int(now // window_seconds)
+    if index == window_index + 1:
+        previous, current = current, 0
+    elif index != window_index:
+        previous, current = 0, 0
+    elapsed_ratio = (now - index * window_seconds) / window_seconds
+    return index, current, previous, previous * (1 - elapsed_ratio) + current
+
+
+class RateLimitBackend(Protocol):
+    """限流计数存储"""
+
+    # hit 是否可能阻塞（文件锁、网络 I/O），为 True 时中间件在线程池中调用，不阻塞事件循环
+    blocking: bool
+
+    def hit(self, client_id: str, now: float, limits: tuple[tuple[int, int], ...]) -> int | None:
+        """
+        检查并记录一次请求
+
+        Args:
+            client_id: 客户端标识
+            now: 当前时间戳
+            limits: ((窗口秒数, 限额), ...)
+
+        Returns:
+            超限窗口在 limits 中的下标；未超限时记录本次请求并返回 None
+        """
+        ...
+
+
+class _ClientCounters:
+    """单个客户端各窗口的计数，按 limits 顺序存放"""
+
+    __slots__ = ('window_indexes', 'currents', 'previouses', 'last_seen')
+
+    def __init__(self, window_count: int):
+        self.window_indexes = [0] * window_count
+        self.currents = [0] * window_count
+        self.previouses = [0] * window_count
+        self.last_seen = 0.0
+
+
+class _Shard:
+    __slots__ = ('lock', 'clients', 'last_cleanup')
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.clients: dict[str, _ClientCounters] = {}
+        self.last_cleanup = 0.0
+
+
+class MemoryRateLimitBackend:
+    """
+    进程内限流计数
+    客户端按哈希分布到多个分片，每个分片一把锁，分片内定期清理长时间不活跃的客户端
+    """
+
+    blocking = False
+
+    def __init__(self, shard_count: int = 32, idle_seconds: int = 2 * HOUR_WINDOW, cleanup_interval: int = 300):
+        self._shards = [_Shard() for _ in range(shard_count)]
+        self._idle_seconds = idle_seconds
+        self._cleanup_interval = cleanup_interval
+
+    def _cleanup(self, shard: _Shard, now: float) -> None:
+        """清理分片内不活跃的客户端，调用方持有分片锁"""
+        if now - shard.last_cleanup < self._cleanup_interval:
+            return
+        shard.last_cleanup = now
+        idle_before = now - self._idle_seconds
+        inactive = [client_id for client_id, counters in shard.clients.items() if counters.last_seen < idle_before]
+        for client_id in inactive:
+            del shard.clients[client_id]
+        if inactive:
+            logger.debug(f"Cleaned up {len(inactive)} inactive clients from rate limiter")
+
+    def client_count(self) -> int:
+        """当前跟踪的客户端数量"""
+        return sum(len(shard.clients) for shard in self._shards)
+
+    def hit(self, client_id: str, now: float, limits: tuple[tuple[int, int], ...]) -> int | None:
+        shard = self._shards[hash(client_id) % len(self._shards)]
+        with shard.lock:
+            self._cleanup(shard, now)
+            counters = shard.clients.get(client_id)
+            if counters is None:
+                counters = shard.clients[client_id] = _ClientCounters(len(limits))
+            counters.last_seen = now
+
+            for position, (window_seconds, limit) in enumerate(limits):
+                index, current, previous, estimate = sliding_window_estimate(
+                    window_seconds,
+                    counters.window_indexes[position],
+                    counters.currents[position],
+                    counters.previouses[position],
+                    now,
+                )
+                counters.window_indexes[position] = index
+                counters.currents[position] = current
+                counters.previouses[position] = previous
+                if estimate >= limit:
+                    return position
+
+            for position in range(len(limits)):
+                counters.currents[position] += 1
+            return None
+
+
+class SQLiteRateLimitBackend:
+    """
+    基于本机 SQLite 文件的共享限流计数
+    同一台机器上的多个 worker 指向同一文件即可共享限额；每次请求一个 IMMEDIATE 事务，
+    写锁竞争时最多等待 busy timeout，由中间件在线程池中调用
+    """
+
+    blocking = True
+
+    def __init__(self, path: str, cleanup_interval: int = 300):
+        self._path = path
+        self._local = threading.local()
+        self._cleanup_interval = cleanup_interval
+        self._last_cleanup = 0.0
+        connection = self._connection()
+        connection.execute(
+            "CREATE TABLE IF NOT EXISTS rate_limit_counters ("
+            "client_id TEXT NOT NULL, window_seconds INTEGER NOT NULL, "
+            "window_index INTEGER NOT NULL, current INTEGER NOT NULL, previous INTEGER NOT NULL, "
+            "PRIMARY KEY (client_id, window_seconds))"
+        )
+
+    def _connection(self) -> sqlite3.Connection:
+        """每个线程一个连接"""
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(self._path, timeout=5, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+        return connection
+
+    def _cleanup(self, connection: sqlite3.Connection, now: float) -> None:
+        """删除两个窗口以前的计数"""
+        if now - self._last_cleanup < self._cleanup_interval:
+            return
+        self._last_cleanup = now
+        connection.execute(
+            "DELETE FROM rate_limit_counters WHERE window_index < CAST(? / window_seconds AS INTEGER) - 1",
+            (now,),
+        )
+
+    def hit(self, client_id: str, now: float, limits: tuple[tuple[int, int], ...]) -> int | None:
+        connection = self._connection()
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            stored = {
+                row[0]: row[1:]
+                for row in connection.execute(
+                    "SELECT window_seconds, window_index, current, previous "
+                    "FROM rate_limit_counters WHERE client_id = ?",
+                    (client_id,),
+                )
+            }
+
+            updates = []
+            for position, (window_seconds, limit) in enumerate(limits):
+                window_index, current, previous = stored.get(window_seconds, (0, 0, 0))
+                index, current, previous, estimate = sliding_window_estimate(
+                    window_seconds, window_index, current, previous, now
+                )
+                if estimate >= limit:
+                    connection.execute("COMMIT")
+                    return position
+                updates.append((client_id, window_seconds, index, current + 1, previous))
+
+            connection.executemany(
+                "INSERT OR REPLACE INTO rate_limit_counters "
+                "(client_id, window_seconds, window_index, current, previous) VALUES (?, ?, ?, ?, ?)",
+                updates,
+            )
+            self._cleanup(connection, now)
+            connection.execute("COMMIT")
+            return None
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+
+
+def create_rate_limit_backend(backend: str, sqlite_path: str | None = None) -> RateLimitBackend:
+    """
+    按配置创建限流计数存储
+
+    Args:
+        backend: memory 或 sqlite
+        sqlite_path: sqlite 存储的文件路径
+
+    Returns:
+        限流计数存储
+    """
+    if backend == 'memory':
+        return MemoryRateLimitBackend()
+    if backend == 'sqlite':
+        if not sqlite_path:
+            raise ValueError("sqlite 限流存储需要配置文件路径")
+        return SQLiteRateLimitBackend(sqlite_path)
+    raise ValueError(f"不支持的限流存储: {backend}")
+
 
 class RateLimitMiddleware(BaseHTTPMiddleware):
     def __init__(
@@ -16,45 +261,13 @@ class RateLimitMiddleware(BaseHTTPMiddleware):
         app,
         requests_per_minute: int = 60,
         requests_per_hour: int = 1000,
+        backend: RateLimitBackend | None = None,
     ):
         super().__init__(app)
         self.requests_per_minute = requests_per_minute
         self.requests_per_hour = requests_per_hour
-        self.request_counts: dict[str, dict[str, list[float]]] = defaultdict(
-            lambda: {"minute": [], "hour": []}
-        )
-        self._lock = threading.Lock()
-        self._last_cleanup = time.time()
-        self._cleanup_interval = 300
-
-    def _cleanup_old_requests(self, client_id: str, current_time: float):
-        minute_ago = current_time - 60
-        hour_ago = current_time - 3600
-
-        self.request_counts[client_id]["minute"] = [
-            t for t in self.request_counts[client_id]["minute"] if t > minute_ago
-        ]
-        self.request_counts[client_id]["hour"] = [
-            t for t in self.request_counts[client_id]["hour"] if t > hour_ago
-        ]
-
-    def _cleanup_inactive_clients(self, current_time: float):
-        if current_time - self._last_cleanup < self._cleanup_interval:
-            return
-
-        self._last_cleanup = current_time
-        hour_ago = current_time - 3600
-        inactive_clients = []
-
-        for client_id, counts in self.request_counts.items():
-            if not counts["hour"] or max(counts["hour"]) < hour_ago:
-                inactive_clients.append(client_id)
-
-        for client_id in inactive_clients:
-            del self.request_counts[client_id]
-
-        if inactive_clients:
-            logger.debug(f"Cleaned up {len(inactive_clients)} inactive clients from rate limiter")
+        self.limits = ((MINUTE_WINDOW, requests_per_minute), (HOUR_WINDOW, requests_per_hour))
+        self.backend = backend or MemoryRateLimitBackend()
 
     def _get_client_id(self, request: Request) -> str:
         forwarded = request.headers.get("X-Forwarded-For")
@@ -70,38 +283,31 @@ class RateLimitMiddleware(BaseHTTPMiddleware):
             return await call_next(request)
 
         client_id = self._get_client_id(request)
-        current_time = time.time()
-
-        with self._lock:
-            self._cleanup_inactive_clients(current_time)
-            self._cleanup_old_requests(client_id, current_time)
-
-            minute_count = len(self.request_counts[client_id]["minute"])
-            hour_count = len(self.request_counts[client_id]["hour"])
-
-            if minute_count >= self.requests_per_minute:
-                logger.warning(f"Rate limit exceeded for {client_id}: {minute_count} requests/minute")
-                return JSONResponse(
-                    status_code=status.HTTP_429_TOO_MANY_REQUESTS,
-                    content={
-                        "code": 429,
-                        "message": "请求过于频繁，请稍后再试",
-                        "data": None
-                    }
-                )
+        if self.backend.blocking:
+            exceeded = await run_in_threadpool(self.backend.hit, client_id, time.time(), self.limits)
+        else:
+            exceeded = self.backend.hit(client_id, time.time(), self.limits)
 
-            if hour_count >= self.requests_per_hour:
-                logger.warning(f"Hourly rate limit exceeded for {client_id}: {hour_count} requests/hour")
-                return JSONResponse(
-                    status_code=status.HTTP_429_TOO_MANY_REQUESTS,
-                    content={
-                        "code": 429,
-                        "message": "小时请求次数已达上限，请稍后再试",
-                        "data": None
-                    }
-                )
+        if exceeded == 0:
+            logger.warning(f"Rate limit exceeded for {client_id}: {self.requests_per_minute} requests/minute")
+            return JSONResponse(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                content={
+                    "code": 429,
+                    "message": "请求过于频繁，请稍后再试",
+                    "data": None
+                }
+            )
 
-            self.request_counts[client_id]["minute"].append(current_time)
-            self.request_counts[client_id]["hour"].append(current_time)
+        if exceeded == 1:
+            logger.warning(f"Hourly rate limit exceeded for {client_id}: {self.requests_per_hour} requests/hour")
+            return JSONResponse(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                content={
+                    "code": 429,
+                    "message": "小时请求次数已达上限，请稍后再试",
+                    "data": None
+                }
+            )
 
         return await call_next(request)
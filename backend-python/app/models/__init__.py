@@ -1,7 +1,9 @@
 from app.database import Base
+from app.models.background_job import BackgroundJob
 from app.models.customer import Customer
 from app.models.dictionary import Dictionary
 from app.models.inspection_item import InspectionItem
+from app.models.inspection_progress import InspectionProgress
 from app.models.maintenance_log import MaintenanceLog
 from app.models.maintenance_plan import MaintenancePlan
 from app.models.online_user import OnlineUser
@@ -12,15 +14,19 @@ from app.models.personnel import Personnel
 from app.models.project_info import ProjectInfo
 from app.models.repair_tools import RepairToolsIssue, RepairToolsStock
 from app.models.repair_tools_inbound import RepairToolsInbound
+from app.models.serial_counter import SerialCounter
 from app.models.spare_parts_inbound import SparePartsInbound
 from app.models.spare_parts_stock import SparePartsStock
 from app.models.spare_parts_usage import SparePartsUsage
 from app.models.spot_work import SpotWork
 from app.models.spot_work_worker import SpotWorkWorker
+from app.models.table_change_counter import TableChangeCounter
 from app.models.temporary_repair import TemporaryRepair
 from app.models.weekly_report import WeeklyReport
+from app.models.work_order_daily_rollup import WorkOrderDailyRollup
 from app.models.work_order_operation_log import WorkOrderOperationLog
 from app.models.work_plan import WorkPlan
+from app.models.work_plan_outbox import WorkPlanOutbox
 
 __all__ = [
     'Base',
@@ -34,6 +40,7 @@ __all__ = [
     'OnlineUser',
     'Personnel',
     'InspectionItem',
+    'InspectionProgress',
     'SparePartsStock',
     'SparePartsInbound',
     'SparePartsUsage',
@@ -47,4 +54,9 @@ __all__ = [
     'WorkOrderOperationLog',
     'OperationType',
     'Dictionary',
+    'WorkOrderDailyRollup',
+    'BackgroundJob',
+    'SerialCounter',
+    'WorkPlanOutbox',
+    'TableChangeCounter',
 ]
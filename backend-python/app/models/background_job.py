@@ -0,0 +1,50 @@
+import json
+
+from sqlalchemy import BigInteger, Boolean, Column, DateTime, Index, Integer, String, Text
+from sqlalchemy.sql import func
+
+from app.database import Base
+
+
+class BackgroundJob(Base):
+    __tablename__ = "background_job"
+
+    id = Column(BigInteger, primary_key=True, autoincrement=True, comment="主键ID")
+    job_type = Column(String(50), nullable=False, comment="任务类型")
+    target = Column(String(100), comment="任务对象标识，用于避免同一对象重复提交")
+    params = Column(Text, comment="任务参数(JSON)")
+    status = Column(String(20), nullable=False, default='pending', comment="状态: pending/running/succeeded/failed/cancelled")
+    progress = Column(Integer, nullable=False, default=0, comment="进度百分比")
+    message = Column(String(500), comment="进度说明")
+    result = Column(Text, comment="执行结果(JSON)")
+    error = Column(Text, comment="失败原因")
+    cancel_requested = Column(Boolean, nullable=False, default=False, comment="是否已请求取消")
+    created_by = Column(String(100), comment="提交人")
+    created_at = Column(DateTime, server_default=func.now(), nullable=False, comment="提交时间")
+    started_at = Column(DateTime, comment="开始时间")
+    heartbeat_at = Column(DateTime, comment="执行进程最近一次心跳时间")
+    finished_at = Column(DateTime, comment="结束时间")
+
+    __table_args__ = (
+        Index('idx_background_job_status', 'status', 'id'),
+        Index('idx_background_job_target', 'job_type', 'target'),
+        {'comment': '后台任务表'}
+    )
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'job_type': self.job_type,
+            'target': self.target,
+            'status': self.status,
+            'progress': self.progress,
+            'message': self.message,
+            'result': json.loads(self.result) if self.result else None,
+            'error': self.error,
+            'cancel_requested': self.cancel_requested,
+            'created_by': self.created_by,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'heartbeat_at': self.heartbeat_at.isoformat() if self.heartbeat_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None,
+        }
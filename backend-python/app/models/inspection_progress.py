@@ -0,0 +1,17 @@
+from sqlalchemy import Column, DateTime, ForeignKey, Integer, String
+from sqlalchemy.sql import func
+
+from app.database import Base
+
+
+class InspectionProgress(Base):
+    __tablename__ = "inspection_progress"
+
+    inspection_id = Column(String(50), ForeignKey('periodic_inspection.inspection_id', ondelete='CASCADE', onupdate='CASCADE'), primary_key=True, comment="巡检单编号")
+    total_count = Column(Integer, nullable=False, default=0, comment="巡检事项总数")
+    filled_count = Column(Integer, nullable=False, default=0, comment="已处理的巡检事项数")
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now(), nullable=False, comment="更新时间")
+
+    __table_args__ = (
+        {'comment': '定期巡检进度表，随巡检记录和维保计划变更在同一事务中更新'},
+    )
@@ -3,10 +3,10 @@ from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 
 from app.database import Base
-from app.models.mixins import SoftDeleteMixin
+from app.models.mixins import ProjectionMixin, SoftDeleteMixin
 
 
-class MaintenancePlan(Base, SoftDeleteMixin):
+class MaintenancePlan(Base, SoftDeleteMixin, ProjectionMixin):
     __tablename__ = "maintenance_plan"
 
     id = Column(BigInteger, primary_key=True, autoincrement=True, comment="主键ID")
@@ -36,6 +36,8 @@ class MaintenancePlan(Base, SoftDeleteMixin):
     total_count = Column(Integer, default=5, comment="检查项总数量")
     remarks = Column(Text, comment="备注")
     inspection_items = Column(Text, comment="巡查项数据(JSON格式)")
+    inspection_item_count = Column(Integer, nullable=False, default=0, comment="巡查项数量，由inspection_items解析")
+    inspection_contents = Column(Text, comment="巡查内容去重列表(JSON数组)，由inspection_items解析")
     created_at = Column(DateTime, server_default=func.now(), nullable=False, comment="创建时间")
     updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now(), nullable=False, comment="更新时间")
 
@@ -70,7 +72,7 @@ class MaintenancePlan(Base, SoftDeleteMixin):
             address = self.project.address or ''
             client_contact_position = self.project.client_contact_position or ''
 
-        return {
+        data = {
             'id': self.id,
             'plan_id': self.plan_id,
             'plan_name': self.plan_name,
@@ -93,16 +95,19 @@ class MaintenancePlan(Base, SoftDeleteMixin):
             'maintenance_personnel': self.maintenance_personnel,
             'responsible_department': self.responsible_department,
             'contact_info': self.contact_info,
-            'maintenance_content': self.maintenance_content,
-            'maintenance_requirements': self.maintenance_requirements,
-            'maintenance_standard': self.maintenance_standard,
             'plan_status': self.plan_status,
             'status': self.status,
             'completion_rate': self.completion_rate,
             'filled_count': self.filled_count or 0,
             'total_count': self.total_count or 5,
-            'remarks': self.remarks,
-            'inspection_items': self.inspection_items,
             'created_at': self.created_at.isoformat() if self.created_at else None,
             'updated_at': self.updated_at.isoformat() if self.updated_at else None,
         }
+        data.update(self.loaded_fields({
+            'maintenance_content': lambda: self.maintenance_content,
+            'maintenance_requirements': lambda: self.maintenance_requirements,
+            'maintenance_standard': lambda: self.maintenance_standard,
+            'remarks': lambda: self.remarks,
+            'inspection_items': lambda: self.inspection_items,
+        }))
+        return data
@@ -1,11 +1,13 @@
 """
-软删除Mixin
-提供软删除功能的基类
+模型Mixin
+提供软删除、按列投影输出等通用功能的基类
 """
 
+from collections.abc import Callable
 from datetime import datetime
+from typing import Any
 
-from sqlalchemy import BigInteger, Boolean, Column, DateTime
+from sqlalchemy import BigInteger, Boolean, Column, DateTime, inspect
 
 
 class SoftDeleteMixin:
@@ -52,3 +54,26 @@ class SoftDeleteMixin:
             过滤后的查询对象
         """
         return query.filter(cls.is_deleted == False)
+
+
+class ProjectionMixin:
+    """
+    列投影Mixin
+
+    按投影查询（load_only）得到的实体只加载了部分列，
+    to_dict 中可能未加载的大字段通过 loaded_fields 输出，未加载的字段不出现在结果中
+    """
+
+    def loaded_fields(self, fields: dict[str, Callable[[], Any]]) -> dict[str, Any]:
+        """
+        计算已加载列对应的字段
+
+        Args:
+            fields: {列名: 取值函数}，输出键与列名相同
+
+        Returns:
+            已加载列的字段字典
+        """
+        state = inspect(self)
+        unloaded = state.unloaded if state.key is not None else ()
+        return {name: value() for name, value in fields.items() if name not in unloaded}
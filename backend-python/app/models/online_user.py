@@ -1,4 +1,4 @@
-from sqlalchemy import BigInteger, Boolean, Column, DateTime, Index, String
+from sqlalchemy import BigInteger, Boolean, Column, DateTime, Index, String, text
 
 from app.database import Base
 
@@ -20,6 +20,10 @@ class OnlineUser(Base):
     __table_args__ = (
         Index('idx_online_user_user_id', 'user_id'),
         Index('idx_online_user_is_active', 'is_active'),
+        Index(
+            'idx_online_user_active_last_activity', 'last_activity',
+            postgresql_where=text('is_active = true'), sqlite_where=text('is_active = 1')
+        ),
         {'comment': '在线用户表'}
     )
 
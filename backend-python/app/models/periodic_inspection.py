@@ -1,12 +1,13 @@
 from sqlalchemy import BigInteger, Column, DateTime, ForeignKey, Index, Integer, String, Text
 from sqlalchemy.orm import relationship
-from sqlalchemy.sql import func
+from sqlalchemy.sql import func, text
 
 from app.database import Base
-from app.models.mixins import SoftDeleteMixin
+from app.models.mixins import ProjectionMixin, SoftDeleteMixin
+from app.utils.signed_url import present_upload_url
 
 
-class PeriodicInspection(Base, SoftDeleteMixin):
+class PeriodicInspection(Base, SoftDeleteMixin, ProjectionMixin):
     __tablename__ = "periodic_inspection"
 
     id = Column(BigInteger, primary_key=True, autoincrement=True, comment="主键ID")
@@ -23,7 +24,7 @@ class PeriodicInspection(Base, SoftDeleteMixin):
     total_count = Column(Integer, default=5, comment="检查项总数量")
     execution_result = Column(Text, comment="发现问题")
     remarks = Column(String(500), comment="处理结果")
-    signature = Column(Text, comment="用户签名(base64)")
+    signature = Column(Text, comment="用户签名图片引用")
     actual_completion_date = Column(DateTime, comment="实际完成时间")
     created_at = Column(DateTime, server_default=func.now(), nullable=False, comment="创建时间")
     updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now(), nullable=False, comment="更新时间")
@@ -36,8 +37,12 @@ class PeriodicInspection(Base, SoftDeleteMixin):
         Index('idx_periodic_project_id', 'project_id'),
         Index('idx_periodic_project_name', 'project_name'),
         Index('idx_periodic_client_name', 'client_name'),
+        Index('idx_periodic_personnel', 'maintenance_personnel', 'id'),
         Index('idx_periodic_status', 'status'),
         Index('idx_periodic_plan_start_date', 'plan_start_date'),
+        Index('idx_periodic_created_at', 'created_at', 'id'),
+        Index('idx_periodic_open_plan_end', 'status', 'plan_end_date', postgresql_where=text('is_deleted = false')),
+        Index('idx_periodic_open_plan_start', 'status', 'plan_start_date', postgresql_where=text('is_deleted = false')),
         {'comment': '定期巡检单表'}
     )
 
@@ -56,7 +61,7 @@ class PeriodicInspection(Base, SoftDeleteMixin):
             address = self.project.address or ''
             client_contact_position = self.project.client_contact_position or ''
 
-        return {
+        data = {
             'id': self.id,
             'inspection_id': self.inspection_id,
             'plan_id': self.plan_id,
@@ -73,10 +78,13 @@ class PeriodicInspection(Base, SoftDeleteMixin):
             'status': self.status,
             'filled_count': self.filled_count or 0,
             'total_count': self.total_count or 5,
-            'execution_result': self.execution_result,
             'remarks': self.remarks,
-            'signature': self.signature,
             'actual_completion_date': self.actual_completion_date.isoformat() if self.actual_completion_date else None,
             'created_at': self.created_at.isoformat() if self.created_at else None,
             'updated_at': self.updated_at.isoformat() if self.updated_at else None,
         }
+        data.update(self.loaded_fields({
+            'execution_result': lambda: self.execution_result,
+            'signature': lambda: present_upload_url(self.signature),
+        }))
+        return data
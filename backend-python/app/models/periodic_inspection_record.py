@@ -1,7 +1,18 @@
-from sqlalchemy import BigInteger, Boolean, Column, DateTime, ForeignKey, Index, String, Text
+from sqlalchemy import (
+    BigInteger,
+    Boolean,
+    Column,
+    DateTime,
+    ForeignKey,
+    Index,
+    String,
+    Text,
+    UniqueConstraint,
+)
 from sqlalchemy.sql import func
 
 from app.database import Base
+from app.utils.signed_url import present_upload_urls
 
 
 class PeriodicInspectionRecord(Base):
@@ -26,6 +37,7 @@ class PeriodicInspectionRecord(Base):
     __table_args__ = (
         Index('idx_record_inspection_id', 'inspection_id'),
         Index('idx_record_item_id', 'item_id'),
+        UniqueConstraint('inspection_id', 'item_id', name='uq_record_inspection_item'),
         {'comment': '定期巡检记录表'}
     )
 
@@ -50,7 +62,7 @@ class PeriodicInspectionRecord(Base):
             'equipment_name': self.equipment_name,
             'equipment_location': self.equipment_location,
             'inspected': self.inspected or False,
-            'photos': photos,
+            'photos': present_upload_urls(photos),
             'photos_uploaded': len(photos) > 0,
             'inspection_result': self.inspection_result or '',
             'created_at': self.created_at.isoformat() if self.created_at else None,
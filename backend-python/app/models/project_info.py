@@ -37,6 +37,7 @@ class ProjectInfo(Base):
         Index('idx_project_info_id', 'project_id'),
         Index('idx_project_info_client_name', 'client_name'),
         Index('idx_project_info_project_name', 'project_name'),
+        Index('idx_project_info_manager', 'project_manager', 'id'),
         {'comment': '项目信息表'}
     )
 
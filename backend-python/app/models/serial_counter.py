@@ -0,0 +1,18 @@
+from sqlalchemy import Column, Date, DateTime, Integer, String
+from sqlalchemy.sql import func
+
+from app.database import Base
+
+
+class SerialCounter(Base):
+    __tablename__ = "serial_counter"
+
+    prefix = Column(String(20), primary_key=True, comment="编号前缀")
+    scope = Column(String(50), primary_key=True, default='', comment="编号范围(如项目编号，空字符串表示全局)")
+    day = Column(Date, primary_key=True, comment="编号日期")
+    last_value = Column(Integer, nullable=False, default=0, comment="已分配的最大序号")
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now(), nullable=False, comment="更新时间")
+
+    __table_args__ = (
+        {'comment': '编号计数器表'},
+    )
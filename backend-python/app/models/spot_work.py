@@ -1,12 +1,15 @@
+import json
+
 from sqlalchemy import BigInteger, Column, DateTime, ForeignKey, Index, String, Text
 from sqlalchemy.orm import relationship
-from sqlalchemy.sql import func
+from sqlalchemy.sql import func, text
 
 from app.database import Base
-from app.models.mixins import SoftDeleteMixin
+from app.models.mixins import ProjectionMixin, SoftDeleteMixin
+from app.utils.signed_url import present_upload_url, present_upload_urls
 
 
-class SpotWork(Base, SoftDeleteMixin):
+class SpotWork(Base, SoftDeleteMixin, ProjectionMixin):
     __tablename__ = "spot_work"
 
     id = Column(BigInteger, primary_key=True, autoincrement=True, comment="主键ID")
@@ -37,15 +40,18 @@ class SpotWork(Base, SoftDeleteMixin):
         Index('idx_spot_project_id', 'project_id'),
         Index('idx_spot_project_name', 'project_name'),
         Index('idx_spot_client_name', 'client_name'),
+        Index('idx_spot_personnel', 'maintenance_personnel', 'id'),
         Index('idx_spot_status', 'status'),
         Index('idx_spot_plan_start_date', 'plan_start_date'),
+        Index('idx_spot_created_at', 'created_at', 'id'),
+        Index('idx_spot_open_plan_end', 'status', 'plan_end_date', postgresql_where=text('is_deleted = false')),
+        Index('idx_spot_open_plan_start', 'status', 'plan_start_date', postgresql_where=text('is_deleted = false')),
         Index('idx_spot_status_created', 'status', 'created_at'),
         Index('idx_spot_status_updated', 'status', 'updated_at'),
         {'comment': '零星用工单表'}
     )
 
     def to_dict(self):
-        import json
         project_name = self.project_name
         client_name = self.client_name
         address = ''
@@ -63,14 +69,7 @@ class SpotWork(Base, SoftDeleteMixin):
         if not client_contact_info and self.project:
             client_contact_info = self.project.client_contact_info or ''
 
-        photos = []
-        if self.photos:
-            try:
-                photos = json.loads(self.photos)
-            except (json.JSONDecodeError, TypeError):
-                photos = []
-
-        return {
+        data = {
             'id': self.id,
             'work_id': self.work_id,
             'plan_id': self.plan_id,
@@ -84,12 +83,24 @@ class SpotWork(Base, SoftDeleteMixin):
             'address': address,
             'client_contact_position': client_contact_position,
             'maintenance_personnel': self.maintenance_personnel,
-            'work_content': self.work_content,
-            'photos': photos,
-            'signature': self.signature,
             'status': self.status,
             'remarks': self.remarks,
             'actual_completion_date': self.actual_completion_date.isoformat() if self.actual_completion_date else None,
             'created_at': self.created_at.isoformat() if self.created_at else None,
             'updated_at': self.updated_at.isoformat() if self.updated_at else None,
         }
+        data.update(self.loaded_fields({
+            'work_content': lambda: self.work_content,
+            'photos': lambda: present_upload_urls(self._photo_list()),
+            'signature': lambda: present_upload_url(self.signature),
+        }))
+        return data
+
+    def _photo_list(self) -> list:
+        """解析现场图片JSON数组"""
+        if not self.photos:
+            return []
+        try:
+            return json.loads(self.photos)
+        except (json.JSONDecodeError, TypeError):
+            return []
@@ -0,0 +1,16 @@
+from sqlalchemy import BigInteger, Column, DateTime, String
+from sqlalchemy.sql import func
+
+from app.database import Base
+
+
+class TableChangeCounter(Base):
+    __tablename__ = "table_change_counter"
+
+    table_name = Column(String(64), primary_key=True, comment="表名")
+    version = Column(BigInteger, nullable=False, default=0, comment="变更计数，表中数据每次提交变更后加一")
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now(), nullable=False, comment="更新时间")
+
+    __table_args__ = (
+        {'comment': '表变更计数器，用作列表接口的 ETag 校验值'},
+    )
@@ -1,12 +1,15 @@
+import json
+
 from sqlalchemy import BigInteger, Column, DateTime, ForeignKey, Index, String, Text
 from sqlalchemy.orm import relationship
-from sqlalchemy.sql import func
+from sqlalchemy.sql import func, text
 
 from app.database import Base
-from app.models.mixins import SoftDeleteMixin
+from app.models.mixins import ProjectionMixin, SoftDeleteMixin
+from app.utils.signed_url import present_upload_url, present_upload_urls
 
 
-class TemporaryRepair(Base, SoftDeleteMixin):
+class TemporaryRepair(Base, SoftDeleteMixin, ProjectionMixin):
     __tablename__ = "temporary_repair"
 
     id = Column(BigInteger, primary_key=True, autoincrement=True, comment="主键ID")
@@ -25,8 +28,8 @@ class TemporaryRepair(Base, SoftDeleteMixin):
     fault_description = Column(Text, comment="故障描述")
     solution = Column(Text, comment="解决方案")
     photos = Column(Text, comment="现场图片JSON数组")
-    signature = Column(Text, comment="用户签字Base64")
-    customer_signature = Column(Text, comment="客户签字Base64")
+    signature = Column(Text, comment="用户签字图片引用")
+    customer_signature = Column(Text, comment="客户签字图片引用")
     execution_date = Column(DateTime, comment="执行日期")
     actual_completion_date = Column(DateTime, comment="实际完成时间")
     created_at = Column(DateTime, server_default=func.now(), nullable=False, comment="创建时间")
@@ -40,8 +43,12 @@ class TemporaryRepair(Base, SoftDeleteMixin):
         Index('idx_temp_project_id', 'project_id'),
         Index('idx_temp_project_name', 'project_name'),
         Index('idx_temp_client_name', 'client_name'),
+        Index('idx_temp_personnel', 'maintenance_personnel', 'id'),
         Index('idx_temp_status', 'status'),
         Index('idx_temp_plan_start_date', 'plan_start_date'),
+        Index('idx_temp_created_at', 'created_at', 'id'),
+        Index('idx_temp_open_plan_end', 'status', 'plan_end_date', postgresql_where=text('is_deleted = false')),
+        Index('idx_temp_open_plan_start', 'status', 'plan_start_date', postgresql_where=text('is_deleted = false')),
         {'comment': '临时维修单表'}
     )
 
@@ -60,15 +67,7 @@ class TemporaryRepair(Base, SoftDeleteMixin):
             address = self.project.address or ''
             client_contact_position = self.project.client_contact_position or ''
 
-        import json
-        photos = []
-        if self.photos:
-            try:
-                photos = json.loads(self.photos)
-            except (json.JSONDecodeError, TypeError):
-                photos = []
-
-        return {
+        data = {
             'id': self.id,
             'repair_id': self.repair_id,
             'plan_id': self.plan_id,
@@ -84,13 +83,25 @@ class TemporaryRepair(Base, SoftDeleteMixin):
             'maintenance_personnel': self.maintenance_personnel,
             'status': self.status,
             'remarks': self.remarks,
-            'fault_description': self.fault_description or '',
-            'solution': self.solution or '',
-            'photos': photos,
-            'signature': self.signature or '',
-            'customer_signature': self.customer_signature or '',
             'execution_date': self.execution_date.isoformat() if self.execution_date else None,
             'actual_completion_date': self.actual_completion_date.isoformat() if self.actual_completion_date else None,
             'created_at': self.created_at.isoformat() if self.created_at else None,
             'updated_at': self.updated_at.isoformat() if self.updated_at else None,
         }
+        data.update(self.loaded_fields({
+            'fault_description': lambda: self.fault_description or '',
+            'solution': lambda: self.solution or '',
+            'photos': lambda: present_upload_urls(self._photo_list()),
+            'signature': lambda: present_upload_url(self.signature or ''),
+            'customer_signature': lambda: present_upload_url(self.customer_signature or ''),
+        }))
+        return data
+
+    def _photo_list(self) -> list:
+        """解析现场图片JSON数组"""
+        if not self.photos:
+            return []
+        try:
+            return json.loads(self.photos)
+        except (json.JSONDecodeError, TypeError):
+            return []
@@ -0,0 +1,36 @@
+from sqlalchemy import Column, Date, DateTime, Index, Integer, String
+from sqlalchemy.sql import func
+
+from app.database import Base
+
+
+class WorkOrderDailyRollup(Base):
+    __tablename__ = "work_order_daily_rollup"
+
+    stat_date = Column(Date, primary_key=True, comment="统计日期(计划开始日期)")
+    project_id = Column(String(50), primary_key=True, default='', comment="项目编号")
+    maintenance_personnel = Column(String(100), primary_key=True, default='', comment="运维人员(空字符串表示未指定)")
+    order_type = Column(String(20), primary_key=True, comment="工单类型: inspection/repair/spotwork")
+    status = Column(String(20), primary_key=True, comment="状态")
+    order_count = Column(Integer, nullable=False, default=0, comment="工单数量")
+    completed_count = Column(Integer, nullable=False, default=0, comment="有实际完成时间的工单数量")
+    on_time_count = Column(Integer, nullable=False, default=0, comment="按期完成的工单数量")
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now(), nullable=False, comment="更新时间")
+
+    __table_args__ = (
+        Index('idx_rollup_personnel_date', 'maintenance_personnel', 'stat_date'),
+        Index('idx_rollup_project_date', 'project_id', 'stat_date'),
+        {'comment': '工单日汇总表'}
+    )
+
+    def to_dict(self):
+        return {
+            'stat_date': self.stat_date.isoformat() if self.stat_date else None,
+            'project_id': self.project_id,
+            'maintenance_personnel': self.maintenance_personnel,
+            'order_type': self.order_type,
+            'status': self.status,
+            'order_count': self.order_count,
+            'completed_count': self.completed_count,
+            'on_time_count': self.on_time_count,
+        }
@@ -23,6 +23,7 @@ class WorkOrderOperationLog(Base):
         Index('idx_operation_log_type_id', 'work_order_type', 'work_order_id'),
         Index('idx_operation_log_work_order_no', 'work_order_no'),
         Index('idx_operation_log_created_at', 'created_at'),
+        Index('idx_operation_log_operator', 'operator_name', 'id'),
         {'comment': '工单操作日志表'}
     )
 
@@ -34,6 +34,7 @@ class WorkPlan(Base, SoftDeleteMixin):
         Index('idx_work_plan_project_id', 'project_id'),
         Index('idx_work_plan_project_name', 'project_name'),
         Index('idx_work_plan_client_name', 'client_name'),
+        Index('idx_work_plan_personnel', 'maintenance_personnel', 'id'),
         Index('idx_work_plan_status', 'status'),
         Index('idx_work_plan_start_date', 'plan_start_date'),
         {'comment': '工作计划表（统一管理定期巡检、临时维修、零星用工）'}
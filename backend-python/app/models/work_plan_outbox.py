@@ -0,0 +1,22 @@
+from sqlalchemy import BigInteger, Column, DateTime, Index, Integer, String, Text
+from sqlalchemy.sql import func
+
+from app.database import Base
+
+
+class WorkPlanOutbox(Base):
+    __tablename__ = "work_plan_outbox"
+
+    id = Column(BigInteger, primary_key=True, autoincrement=True, comment="主键ID")
+    source_type = Column(String(20), nullable=False, comment="来源类型: inspection/repair/spotwork/maintenance_plan")
+    source_key = Column(String(50), nullable=False, comment="来源单据编号，即工作计划编号")
+    attempts = Column(Integer, nullable=False, default=0, server_default='0', comment="同步失败次数")
+    last_error = Column(Text, comment="最近一次同步失败原因")
+    dead_at = Column(DateTime, comment="失败次数达到上限、停止重试的时间")
+    created_at = Column(DateTime, server_default=func.now(), nullable=False, comment="记录时间")
+
+    __table_args__ = (
+        Index('idx_work_plan_outbox_source', 'source_type', 'source_key'),
+        Index('idx_work_plan_outbox_pending', 'dead_at', 'attempts', 'id'),
+        {'comment': '工作计划同步发件箱，工单和维保计划变更后待同步到工作计划的记录'}
+    )
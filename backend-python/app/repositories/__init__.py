@@ -15,6 +15,7 @@ from app.repositories.spare_parts_usage import SparePartsUsageRepository
 from app.repositories.spot_work import SpotWorkRepository
 from app.repositories.temporary_repair import TemporaryRepairRepository
 from app.repositories.weekly_report import WeeklyReportRepository
+from app.repositories.work_order import WorkOrderRepository
 from app.repositories.work_order_operation_log import WorkOrderOperationLogRepository
 from app.repositories.work_plan import WorkPlanRepository
 
@@ -34,4 +35,5 @@ __all__ = [
     'SparePartsUsageRepository',
     'WeeklyReportRepository',
     'WorkPlanRepository',
+    'WorkOrderRepository',
 ]
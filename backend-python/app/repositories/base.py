@@ -5,7 +5,7 @@ Repository 基类
 import logging
 from typing import Any, Generic, TypeVar
 
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, load_only
 
 logger = logging.getLogger(__name__)
 
@@ -21,8 +21,13 @@ class BaseRepository(Generic[T]):
     class PeriodicInspectionRepository(BaseRepository[PeriodicInspection]):
         def __init__(self, db: Session):
             super().__init__(db, PeriodicInspection)
+
+    列投影：子类在 PROJECTIONS 中按用途声明需要加载的列，
+    查询时通过 projection_options(名称) 只加载这些列；不传投影时加载完整实体
     """
 
+    PROJECTIONS: dict[str, tuple[str, ...]] = {}
+
     def __init__(self, db: Session, model_class: type[T]):
         """
         初始化 Repository
@@ -44,6 +49,28 @@ class BaseRepository(Generic[T]):
         """获取模型类"""
         return self._model_class
 
+    def projection_options(self, projection: str | None) -> list:
+        """
+        获取列投影对应的查询选项
+
+        未加载的列访问时直接抛错，避免逐行补查
+
+        Args:
+            projection: PROJECTIONS 中的投影名称，None 表示加载完整实体
+
+        Returns:
+            SQLAlchemy 查询选项列表
+
+        Raises:
+            ValueError: 投影名称未定义
+        """
+        if projection is None:
+            return []
+        if projection not in self.PROJECTIONS:
+            raise ValueError(f"{self.model_class.__name__} 没有投影 {projection}")
+        columns = [getattr(self.model_class, name) for name in self.PROJECTIONS[projection]]
+        return [load_only(*columns, raiseload=True)]
+
     def find_by_id(self, id: int, options: list | None = None) -> T | None:
         """
         根据 ID 查询实体
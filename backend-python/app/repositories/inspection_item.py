@@ -1,4 +1,6 @@
 import logging
+from collections import defaultdict
+from collections.abc import Iterable
 from typing import Any
 
 from sqlalchemy import or_
@@ -10,6 +12,59 @@ from app.schemas.inspection_item import InspectionItemCreate, InspectionItemUpda
 logger = logging.getLogger(__name__)
 
 
+def build_tree_index(items: Iterable[InspectionItem]) -> tuple[dict[int, dict[str, Any]], dict[int | None, list[int]]]:
+    """
+    一次遍历建立节点字典和 父节点→子节点 索引
+
+    Returns:
+        (节点ID→节点字典, 父节点ID→子节点ID列表)，子节点保持 items 中的顺序
+    """
+    nodes: dict[int, dict[str, Any]] = {}
+    children: dict[int | None, list[int]] = defaultdict(list)
+    for item in items:
+        nodes[item.id] = item.to_dict()
+        children[item.parent_id].append(item.id)
+    return nodes, children
+
+
+def build_tree(
+    nodes: dict[int, dict[str, Any]],
+    children: dict[int | None, list[int]],
+    root: int | None = None,
+    depth: int | None = None
+) -> list[dict[str, Any]]:
+    """
+    根据索引构建树，每个节点只访问一次
+
+    Args:
+        nodes: 节点字典
+        children: 子节点索引
+        root: 子树根节点ID，为空时从顶层节点开始
+        depth: 返回的层数，为空不限制；最后一层节点的 children 为空列表
+
+    Returns:
+        树形结构，root 不存在时返回空列表
+    """
+    if root is not None and root not in nodes:
+        return []
+    visited: set[int] = set()
+
+    def expand(node_ids: Iterable[int], level: int) -> list[dict[str, Any]]:
+        tree = []
+        for node_id in node_ids:
+            if node_id in visited:
+                continue
+            visited.add(node_id)
+            expanded = depth is None or level < depth
+            tree.append({
+                **nodes[node_id],
+                'children': expand(children.get(node_id, ()), level + 1) if expanded else [],
+            })
+        return tree
+
+    return expand([root] if root is not None else children.get(None, ()), 1)
+
+
 class InspectionItemRepository:
     def __init__(self, db: Session):
         self.db = db
@@ -53,27 +108,13 @@ class InspectionItemRepository:
             logger.error(f"查询根节点失败: {str(e)}")
             raise
 
-    def get_tree(self) -> list[dict[str, Any]]:
+    def get_tree(self, root: int | None = None, depth: int | None = None) -> list[dict[str, Any]]:
         try:
-            all_items = self.get_all()
-            return self._build_tree(all_items)
+            return build_tree(*build_tree_index(self.get_all()), root=root, depth=depth)
         except Exception as e:
             logger.error(f"构建树形结构失败: {str(e)}")
             raise
 
-    def _build_tree(self, items: list[InspectionItem], parent_id: int | None = None) -> list[dict[str, Any]]:
-        tree = []
-        for item in items:
-            if item.parent_id == parent_id:
-                node = item.to_dict()
-                children = self._build_tree(items, item.id)
-                if children:
-                    node['children'] = children
-                else:
-                    node['children'] = []
-                tree.append(node)
-        return tree
-
     def search(self, keyword: str | None = None) -> list[InspectionItem]:
         try:
             query = self.db.query(InspectionItem)
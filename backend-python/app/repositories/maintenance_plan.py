@@ -5,17 +5,24 @@ from sqlalchemy import and_
 from sqlalchemy.orm import Session, joinedload
 
 from app.models.maintenance_plan import MaintenancePlan
+from app.repositories.base import BaseRepository
 
 logger = logging.getLogger(__name__)
 
 
-class MaintenancePlanRepository:
-    def __init__(self, db: Session):
-        self._db = db
+class MaintenancePlanRepository(BaseRepository[MaintenancePlan]):
+    PROJECTIONS = {
+        'summary': (
+            'id', 'plan_id', 'plan_name', 'project_id', 'project_name', 'plan_type',
+            'equipment_id', 'equipment_name', 'equipment_model', 'equipment_location',
+            'plan_start_date', 'plan_end_date', 'execution_date', 'next_maintenance_date',
+            'maintenance_personnel', 'responsible_department', 'contact_info', 'plan_status', 'status',
+            'completion_rate', 'filled_count', 'total_count', 'created_at', 'updated_at',
+        ),
+    }
 
-    @property
-    def db(self):
-        return self._db
+    def __init__(self, db: Session):
+        super().__init__(db, MaintenancePlan)
 
     def find_by_id(self, id: int) -> MaintenancePlan | None:
         try:
@@ -72,10 +79,14 @@ class MaintenancePlanRepository:
         project_name: str | None = None,
         client_name: str | None = None,
         plan_type: str | None = None,
-        maintenance_personnel_filter: str | None = None
+        maintenance_personnel_filter: str | None = None,
+        projection: str | None = None
     ) -> tuple[list[MaintenancePlan], int]:
         try:
-            query = self.db.query(MaintenancePlan).filter(
+            query = self.db.query(MaintenancePlan).options(
+                joinedload(MaintenancePlan.project),
+                *self.projection_options(projection)
+            ).filter(
                 MaintenancePlan.is_deleted == False
             )
 
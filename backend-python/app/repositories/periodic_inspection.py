@@ -18,6 +18,14 @@ class PeriodicInspectionRepository(BaseRepository[PeriodicInspection]):
     继承BaseRepository，复用通用CRUD方法
     """
 
+    PROJECTIONS = {
+        'summary': (
+            'id', 'inspection_id', 'plan_id', 'project_id', 'project_name',
+            'plan_start_date', 'plan_end_date', 'client_name', 'maintenance_personnel', 'status',
+            'filled_count', 'total_count', 'remarks', 'actual_completion_date', 'created_at', 'updated_at',
+        ),
+    }
+
     def __init__(self, db: Session):
         super().__init__(db, PeriodicInspection)
 
@@ -88,7 +96,8 @@ class PeriodicInspectionRepository(BaseRepository[PeriodicInspection]):
         client_name: str | None = None,
         inspection_id: str | None = None,
         status: str | None = None,
-        maintenance_personnel: str | None = None
+        maintenance_personnel: str | None = None,
+        projection: str | None = None
     ) -> tuple[list[PeriodicInspection], int]:
         """
         分页查询定期巡检列表
@@ -101,13 +110,15 @@ class PeriodicInspectionRepository(BaseRepository[PeriodicInspection]):
             inspection_id: 巡检单编号（模糊查询）
             status: 状态
             maintenance_personnel: 运维人员
+            projection: 列投影名称，None 表示加载完整实体
 
         Returns:
             (巡检单列表, 总数)
         """
         try:
             query = self.db.query(PeriodicInspection).options(
-                joinedload(PeriodicInspection.project)
+                joinedload(PeriodicInspection.project),
+                *self.projection_options(projection)
             ).filter(PeriodicInspection.is_deleted == False)
 
             if project_name:
@@ -4,13 +4,27 @@
 """
 import logging
 
+from sqlalchemy import func
 from sqlalchemy.orm import Session
 
 from app.models.periodic_inspection_record import PeriodicInspectionRecord
 from app.repositories.base import BaseRepository
+from app.utils.db_upsert import dialect_insert
 
 logger = logging.getLogger(__name__)
 
+# 更新已有记录时，传入 None 的字段保留原值
+KEEP_IF_NONE_FIELDS = (
+    'item_name',
+    'inspection_item',
+    'inspection_content',
+    'check_content',
+    'brief_description',
+    'equipment_name',
+    'equipment_location',
+    'inspection_result',
+)
+
 
 class PeriodicInspectionRecordRepository(BaseRepository[PeriodicInspectionRecord]):
     """
@@ -84,6 +98,44 @@ class PeriodicInspectionRecordRepository(BaseRepository[PeriodicInspectionRecord
             logger.error(f"删除巡检记录失败 (inspection_id={inspection_id}): {str(e)}")
             raise
 
+    def bulk_upsert(self, inspection_id: str, rows: list[dict]) -> list[PeriodicInspectionRecord]:
+        """
+        批量创建或更新同一巡检单的记录，不提交事务
+
+        按 (inspection_id, item_id) 执行 INSERT ... ON CONFLICT DO UPDATE ... RETURNING，
+        多行 VALUES 一次往返写入并返回保存后的记录；同一事项出现多次时以最后一次为准
+
+        Args:
+            inspection_id: 巡检单编号
+            rows: 记录字段字典列表，需包含 item_id
+
+        Returns:
+            保存后的记录，按事项首次出现的顺序排列
+        """
+        deduped: dict[str, dict] = {}
+        for row in rows:
+            deduped[row['item_id']] = {**row, 'inspection_id': inspection_id}
+        if not deduped:
+            return []
+
+        table = PeriodicInspectionRecord.__table__
+        stmt = dialect_insert(self.db, PeriodicInspectionRecord)
+        set_ = {field: func.coalesce(stmt.excluded[field], table.c[field]) for field in KEEP_IF_NONE_FIELDS}
+        set_.update(inspected=stmt.excluded.inspected, photos=stmt.excluded.photos, updated_at=func.now())
+        stmt = stmt.on_conflict_do_update(
+            index_elements=['inspection_id', 'item_id'],
+            set_=set_,
+        ).returning(PeriodicInspectionRecord, sort_by_parameter_order=True)
+        try:
+            return list(self.db.scalars(
+                stmt,
+                list(deduped.values()),
+                execution_options={'populate_existing': True},
+            ))
+        except Exception as e:
+            logger.error(f"批量保存巡检记录失败 (inspection_id={inspection_id}): {str(e)}")
+            raise
+
     def upsert(
         self,
         inspection_id: str,
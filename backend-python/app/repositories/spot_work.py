@@ -22,6 +22,14 @@ class SpotWorkRepository(BaseRepository[SpotWork]):
     继承BaseRepository，复用通用CRUD方法
     """
 
+    PROJECTIONS = {
+        'summary': (
+            'id', 'work_id', 'plan_id', 'project_id', 'project_name',
+            'plan_start_date', 'plan_end_date', 'client_name', 'client_contact', 'client_contact_info',
+            'maintenance_personnel', 'status', 'remarks', 'actual_completion_date', 'created_at', 'updated_at',
+        ),
+    }
+
     def __init__(self, db: Session):
         super().__init__(db, SpotWork)
 
@@ -33,7 +41,8 @@ class SpotWorkRepository(BaseRepository[SpotWork]):
         work_id: str | None = None,
         status: str | None = None,
         maintenance_personnel: str | None = None,
-        client_name: str | None = None
+        client_name: str | None = None,
+        projection: str | None = None
     ) -> tuple[list[SpotWork], int]:
         """
         分页查询零星用工列表
@@ -46,12 +55,16 @@ class SpotWorkRepository(BaseRepository[SpotWork]):
             status: 状态
             maintenance_personnel: 运维人员
             client_name: 客户名称（模糊查询）
+            projection: 列投影名称，None 表示加载完整实体
 
         Returns:
             (工单列表, 总数)
         """
         try:
-            query = self.db.query(SpotWork).options(joinedload(SpotWork.project)).filter(
+            query = self.db.query(SpotWork).options(
+                joinedload(SpotWork.project),
+                *self.projection_options(projection)
+            ).filter(
                 SpotWork.is_deleted == False
             )
 
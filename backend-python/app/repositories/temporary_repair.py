@@ -18,6 +18,15 @@ class TemporaryRepairRepository(BaseRepository[TemporaryRepair]):
     继承BaseRepository，复用通用CRUD方法
     """
 
+    PROJECTIONS = {
+        'summary': (
+            'id', 'repair_id', 'plan_id', 'project_id', 'project_name',
+            'plan_start_date', 'plan_end_date', 'client_name', 'client_contact', 'client_contact_info',
+            'maintenance_personnel', 'status', 'remarks', 'execution_date', 'actual_completion_date',
+            'created_at', 'updated_at',
+        ),
+    }
+
     def __init__(self, db: Session):
         super().__init__(db, TemporaryRepair)
 
@@ -29,7 +38,8 @@ class TemporaryRepairRepository(BaseRepository[TemporaryRepair]):
         repair_id: str | None = None,
         status: str | None = None,
         maintenance_personnel: str | None = None,
-        client_name: str | None = None
+        client_name: str | None = None,
+        projection: str | None = None
     ) -> tuple[list[TemporaryRepair], int]:
         """
         分页查询临时维修列表
@@ -42,13 +52,15 @@ class TemporaryRepairRepository(BaseRepository[TemporaryRepair]):
             status: 状态
             maintenance_personnel: 运维人员
             client_name: 客户名称（模糊查询）
+            projection: 列投影名称，None 表示加载完整实体
 
         Returns:
             (维修单列表, 总数)
         """
         try:
             query = self.db.query(TemporaryRepair).options(
-                joinedload(TemporaryRepair.project)
+                joinedload(TemporaryRepair.project),
+                *self.projection_options(projection)
             ).filter(TemporaryRepair.is_deleted == False)
 
             if project_name:
@@ -0,0 +1,382 @@
+"""
+统一工单Repository
+将定期巡检、临时维修、零星用工三张表通过 UNION ALL 归一为同一组列，
+过滤、排序、计数和分页全部在数据库中完成
+"""
+import base64
+import logging
+from datetime import date, datetime, timedelta
+from typing import Any
+
+from sqlalchemy import (
+    Date,
+    Integer,
+    String,
+    Text,
+    and_,
+    cast,
+    func,
+    literal,
+    null,
+    or_,
+    select,
+    union_all,
+)
+from sqlalchemy.orm import Session
+
+from app.models.periodic_inspection import PeriodicInspection
+from app.models.spot_work import SpotWork
+from app.models.temporary_repair import TemporaryRepair
+from app.utils.sql_functions import days_between
+
+logger = logging.getLogger(__name__)
+
+WORK_ORDER_SOURCES = [
+    ('inspection', '定期巡检单', 1, PeriodicInspection, 'inspection_id'),
+    ('repair', '临时维修单', 2, TemporaryRepair, 'repair_id'),
+    ('spotwork', '零星用工单', 3, SpotWork, 'work_id'),
+]
+
+ALERT_OVERDUE = 'overdue'
+ALERT_EXPIRING = 'expiring'
+
+ALERT_ORDER_TYPES = [
+    ('定期巡检', PeriodicInspection, 'inspection_id'),
+    ('临时维修', TemporaryRepair, 'repair_id'),
+    ('零星用工', SpotWork, 'work_id'),
+]
+
+
+def encode_cursor(created_at: datetime, type_rank: int, id: int) -> str:
+    """
+    生成键集分页游标
+
+    Args:
+        created_at: 最后一条记录的创建时间
+        type_rank: 最后一条记录的工单类型序号
+        id: 最后一条记录的ID
+
+    Returns:
+        URL安全的游标字符串
+    """
+    raw = f"{created_at.isoformat()}|{type_rank}|{id}"
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii')
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, int, int]:
+    """
+    解析键集分页游标
+
+    Args:
+        cursor: encode_cursor 生成的游标
+
+    Returns:
+        (created_at, type_rank, id)
+
+    Raises:
+        ValueError: 游标格式无效
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode('ascii')).decode('utf-8')
+        created_at, type_rank, id = raw.split('|')
+        return datetime.fromisoformat(created_at), int(type_rank), int(id)
+    except Exception as e:
+        raise ValueError(f"无效的分页游标: {cursor}") from e
+
+
+class WorkOrderRepository:
+    """
+    统一工单Repository
+    三种工单的只读视图，不对应单一模型，因此不继承BaseRepository
+    """
+
+    def __init__(self, db: Session):
+        self._db = db
+
+    @property
+    def db(self) -> Session:
+        """获取数据库会话"""
+        return self._db
+
+    def _build_union(
+        self,
+        project_name: str | None = None,
+        order_id: str | None = None,
+        order_type: str | None = None,
+        status: str | None = None,
+        maintenance_personnel: str | None = None,
+        user_name: str | None = None
+    ):
+        """
+        构建三表 UNION ALL 子查询
+
+        过滤条件下推到每个分支，以便各表使用自身索引
+
+        Returns:
+            归一化列的子查询
+        """
+        branches = []
+        for type_code, type_name, type_rank, model, number_field in WORK_ORDER_SOURCES:
+            if order_type and order_type != type_code:
+                continue
+
+            number_column = getattr(model, number_field)
+            is_inspection = model is PeriodicInspection
+            stmt = select(
+                model.id.label('id'),
+                number_column.label('order_id'),
+                literal(type_name, String).label('order_type'),
+                literal(type_code, String).label('order_type_code'),
+                literal(type_rank, Integer).label('type_rank'),
+                model.project_id.label('project_id'),
+                model.project_name.label('project_name'),
+                model.client_name.label('client_name'),
+                model.plan_start_date.label('plan_start_date'),
+                model.plan_end_date.label('plan_end_date'),
+                model.maintenance_personnel.label('maintenance_personnel'),
+                model.status.label('status'),
+                model.remarks.label('remarks'),
+                (model.execution_result if is_inspection else cast(null(), Text)).label('execution_result'),
+                (model.signature if is_inspection else cast(null(), Text)).label('signature'),
+                model.created_at.label('created_at'),
+                model.updated_at.label('updated_at'),
+            )
+
+            if project_name:
+                stmt = stmt.where(model.project_name.ilike(f'%{project_name}%'))
+            if order_id:
+                stmt = stmt.where(number_column.ilike(f'%{order_id}%'))
+            if status:
+                stmt = stmt.where(model.status == status)
+            if maintenance_personnel:
+                stmt = stmt.where(model.maintenance_personnel.ilike(f'%{maintenance_personnel}%'))
+            if user_name:
+                stmt = stmt.where(model.maintenance_personnel == user_name)
+
+            branches.append(stmt)
+
+        if not branches:
+            return None
+        if len(branches) == 1:
+            return branches[0].subquery('work_orders')
+        return union_all(*branches).subquery('work_orders')
+
+    def find_page(
+        self,
+        page: int = 0,
+        size: int = 10,
+        cursor: str | None = None,
+        with_total: bool = True,
+        **filters: Any
+    ) -> tuple[list[dict], int | None, str | None]:
+        """
+        分页查询统一工单列表，按创建时间倒序
+
+        传入 cursor 时使用 (created_at, type_rank, id) 键集分页，忽略 page；
+        否则使用 OFFSET 分页
+
+        Args:
+            page: 页码（从0开始）
+            size: 每页数量
+            cursor: 上一页返回的游标
+            with_total: 是否统计总数
+            **filters: 透传给 _build_union 的过滤条件
+
+        Returns:
+            (工单列表, 总数, 下一页游标)
+        """
+        try:
+            work_orders = self._build_union(**filters)
+            if work_orders is None:
+                return [], 0, None
+
+            total = None
+            if with_total:
+                total = self.db.execute(
+                    select(func.count()).select_from(work_orders)
+                ).scalar() or 0
+
+            query = select(work_orders)
+            if cursor:
+                created_at, type_rank, last_id = decode_cursor(cursor)
+                query = query.where(or_(
+                    work_orders.c.created_at < created_at,
+                    and_(work_orders.c.created_at == created_at, work_orders.c.type_rank < type_rank),
+                    and_(
+                        work_orders.c.created_at == created_at,
+                        work_orders.c.type_rank == type_rank,
+                        work_orders.c.id < last_id,
+                    ),
+                ))
+            else:
+                query = query.offset(page * size)
+
+            query = query.order_by(
+                work_orders.c.created_at.desc(),
+                work_orders.c.type_rank.desc(),
+                work_orders.c.id.desc(),
+            ).limit(size)
+
+            rows = self.db.execute(query).mappings().all()
+
+            next_cursor = None
+            if len(rows) == size:
+                last = rows[-1]
+                next_cursor = encode_cursor(last['created_at'], last['type_rank'], last['id'])
+
+            return [dict(row) for row in rows], total, next_cursor
+        except ValueError:
+            raise
+        except Exception as e:
+            logger.error(f"查询统一工单列表失败: {str(e)}")
+            raise
+
+    def find_alert_page(
+        self,
+        alert_type: str,
+        today: date,
+        statuses: list[str],
+        page: int = 0,
+        size: int = 10,
+        project_name: str | None = None,
+        client_name: str | None = None,
+        work_order_type: str | None = None,
+        maintenance_personnel: str | None = None,
+        expiring_days: int = 7
+    ) -> tuple[list[dict], int]:
+        """
+        超期/临期工单分页查询
+
+        三表 UNION ALL，天数在 SQL 中计算，COUNT(*) OVER () 随分页结果一并返回总数；
+        排序直接使用计划日期列，与按天数排序等价且可以利用 (status, plan_*_date) 索引
+
+        Args:
+            alert_type: ALERT_OVERDUE（按计划结束日期）或 ALERT_EXPIRING（按计划开始日期）
+            today: 当前日期
+            statuses: 需要提醒的工单状态
+            page: 页码（从0开始）
+            size: 每页数量
+            project_name: 项目名称（模糊查询）
+            client_name: 客户名称（模糊查询）
+            work_order_type: 工单类型（定期巡检/临时维修/零星用工）
+            maintenance_personnel: 运维人员
+            expiring_days: 临期天数
+
+        Returns:
+            (工单行列表, 总数)，行中 days 为超期天数或剩余天数
+        """
+        today_dt = datetime.combine(today, datetime.min.time())
+        today_value = literal(today, Date)
+
+        try:
+            branches = []
+            for type_name, model, number_field in ALERT_ORDER_TYPES:
+                if work_order_type is not None and work_order_type != type_name:
+                    continue
+
+                if alert_type == ALERT_OVERDUE:
+                    sort_date = model.plan_end_date
+                    days = days_between(today_value, model.plan_end_date)
+                    condition = model.plan_end_date < today_dt
+                else:
+                    sort_date = model.plan_start_date
+                    days = days_between(model.plan_start_date, today_value)
+                    condition = and_(
+                        model.plan_start_date >= today_dt,
+                        model.plan_start_date <= today_dt + timedelta(days=expiring_days),
+                    )
+
+                stmt = select(
+                    model.id.label('id'),
+                    getattr(model, number_field).label('work_order_no'),
+                    literal(type_name, String).label('work_order_type'),
+                    model.project_id.label('project_id'),
+                    model.project_name.label('project_name'),
+                    model.client_name.label('client_name'),
+                    model.plan_start_date.label('plan_start_date'),
+                    model.plan_end_date.label('plan_end_date'),
+                    model.status.label('status'),
+                    model.maintenance_personnel.label('executor'),
+                    sort_date.label('sort_date'),
+                    days.label('days'),
+                ).where(
+                    condition,
+                    model.status.in_(statuses),
+                    model.is_deleted == False,
+                )
+
+                if project_name:
+                    stmt = stmt.where(model.project_name.like(f"%{project_name}%"))
+                if client_name:
+                    stmt = stmt.where(model.client_name.like(f"%{client_name}%"))
+                if maintenance_personnel:
+                    stmt = stmt.where(model.maintenance_personnel == maintenance_personnel)
+
+                branches.append(stmt)
+
+            if not branches:
+                return [], 0
+
+            alerts = (branches[0] if len(branches) == 1 else union_all(*branches)).subquery('alerts')
+            query = select(alerts, func.count().over().label('total_count')).order_by(
+                alerts.c.sort_date, alerts.c.work_order_type, alerts.c.id
+            ).offset(page * size).limit(size)
+
+            rows = [dict(row) for row in self.db.execute(query).mappings().all()]
+            if rows:
+                total = rows[0]['total_count']
+            elif page > 0:
+                total = self.db.execute(select(func.count()).select_from(alerts)).scalar() or 0
+            else:
+                total = 0
+            return rows, total
+        except Exception as e:
+            logger.error(f"查询{'超期' if alert_type == ALERT_OVERDUE else '临期'}工单失败: {str(e)}")
+            raise
+
+    def count_alerts(
+        self,
+        today: date,
+        statuses: list[str],
+        maintenance_personnel: str | None = None,
+        expiring_days: int = 7
+    ) -> dict[str, int]:
+        """
+        统计超期、临期工单数量
+
+        每张表一次扫描同时计算两个数量，不加载任何工单行
+
+        Args:
+            today: 当前日期
+            statuses: 需要提醒的工单状态
+            maintenance_personnel: 运维人员
+            expiring_days: 临期天数
+
+        Returns:
+            {'overdue': 超期数量, 'expiring': 临期数量}
+        """
+        today_dt = datetime.combine(today, datetime.min.time())
+        expiring_end_dt = today_dt + timedelta(days=expiring_days)
+
+        branches = []
+        for _, model, _ in ALERT_ORDER_TYPES:
+            stmt = select(
+                func.count().filter(model.plan_end_date < today_dt).label('overdue'),
+                func.count().filter(and_(
+                    model.plan_start_date >= today_dt,
+                    model.plan_start_date <= expiring_end_dt,
+                )).label('expiring'),
+            ).where(
+                model.status.in_(statuses),
+                model.is_deleted == False,
+            )
+            if maintenance_personnel:
+                stmt = stmt.where(model.maintenance_personnel == maintenance_personnel)
+            branches.append(stmt)
+
+        counts = union_all(*branches).subquery('alert_counts')
+        row = self.db.execute(select(
+            func.coalesce(func.sum(counts.c.overdue), 0).label('overdue'),
+            func.coalesce(func.sum(counts.c.expiring), 0).label('expiring'),
+        )).one()
+        return {'overdue': int(row.overdue), 'expiring': int(row.expiring)}
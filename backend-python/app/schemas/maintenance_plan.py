@@ -93,6 +93,10 @@ class MaintenancePlanCreate(BaseModel):
     inspection_items: str | None = Field(None, description="巡查项数据(JSON格式)")
 
 
+class MaintenancePlanBatchCreate(BaseModel):
+    plans: list[dict] = Field(..., description="维保计划列表，逐行校验，字段同创建接口")
+
+
 class MaintenancePlanUpdate(BaseModel):
     plan_id: str = Field(..., max_length=50, description="计划编号")
     plan_name: str = Field(..., max_length=200, description="计划名称")
@@ -2,10 +2,13 @@
 服务层统一导出
 提供所有服务的统一入口
 """
+from app.services import work_order_blobs  # noqa: F401  注册签字/照片转存事件
+from app.services.alert_counter import AlertCounterService
 from app.services.customer import CustomerService
 from app.services.dictionary import DictionaryService
 from app.services.expiring_soon import ExpiringSoonService
 from app.services.inspection_item import InspectionItemService
+from app.services.inspection_progress import InspectionProgressService
 from app.services.maintenance_plan import MaintenancePlanService
 from app.services.overdue_alert import OverdueAlertService
 from app.services.periodic_inspection import PeriodicInspectionService
@@ -18,9 +21,12 @@ from app.services.sync_service import SyncService
 from app.services.temporary_repair import TemporaryRepairService
 from app.services.weekly_report import WeeklyReportService
 from app.services.work_order_operation_log import WorkOrderOperationLogService
+from app.services.work_order_rollup import WorkOrderRollupService
 from app.services.work_plan import WorkPlanService
+from app.services.work_plan_outbox import WorkPlanOutboxService
 
 __all__ = [
+    'AlertCounterService',
     'SpotWorkService',
     'PeriodicInspectionService',
     'TemporaryRepairService',
@@ -30,6 +36,7 @@ __all__ = [
     'DictionaryService',
     'ExpiringSoonService',
     'InspectionItemService',
+    'InspectionProgressService',
     'MaintenancePlanService',
     'OverdueAlertService',
     'PersonnelService',
@@ -38,4 +45,6 @@ __all__ = [
     'SyncService',
     'WeeklyReportService',
     'WorkPlanService',
+    'WorkOrderRollupService',
+    'WorkPlanOutboxService',
 ]
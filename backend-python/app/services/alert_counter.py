@@ -0,0 +1,162 @@
+"""
+超期/临期工单数量服务
+H5 首页角标轮询只需要数量，结果缓存在进程内，按 (用户, 是否管理员, 日期) 区分
+
+失效：监听 Session 事件，三种工单的状态、计划日期、运维人员或删除标记发生变化
+并提交后清空缓存；绕过 flush 的批量 UPDATE/DELETE 同样会触发失效。
+缓存只在当前进程有效，多进程部署时其他进程依靠 TTL 兜底
+"""
+import logging
+import threading
+import time
+from datetime import date
+
+from prometheus_client import Counter
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+
+from app.config import OverdueAlertConfig
+from app.models.periodic_inspection import PeriodicInspection
+from app.models.spot_work import SpotWork
+from app.models.temporary_repair import TemporaryRepair
+from app.repositories.work_order import WorkOrderRepository
+
+logger = logging.getLogger(__name__)
+
+ALERT_COUNT_TTL_SECONDS = 60
+
+ALERT_SOURCES = (PeriodicInspection, TemporaryRepair, SpotWork)
+
+ALERT_FIELDS = (
+    'status',
+    'plan_start_date',
+    'plan_end_date',
+    'maintenance_personnel',
+    'is_deleted',
+)
+
+_SESSION_FLAG = 'alert_counts_dirty'
+
+ALERT_COUNT_CACHE_REQUESTS = Counter(
+    'alert_count_cache_total',
+    '超期/临期工单数量缓存访问次数',
+    ['result'],
+)
+
+
+class AlertCountCache:
+    """
+    进程内数量缓存
+    """
+
+    def __init__(self, ttl_seconds: int = ALERT_COUNT_TTL_SECONDS):
+        self._ttl_seconds = ttl_seconds
+        self._entries: dict[tuple, tuple[float, dict]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: tuple) -> dict | None:
+        """读取未过期的缓存"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            return value
+
+    def set(self, key: tuple, value: dict) -> None:
+        """写入缓存"""
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self._ttl_seconds, value)
+
+    def clear(self) -> None:
+        """清空缓存"""
+        with self._lock:
+            self._entries.clear()
+
+
+alert_count_cache = AlertCountCache()
+
+
+def _affects_alerts(obj) -> bool:
+    """本次 flush 是否修改了影响提醒数量的字段"""
+    state = inspect(obj)
+    return any(state.attrs[field].history.has_changes() for field in ALERT_FIELDS)
+
+
+@event.listens_for(Session, 'after_flush')
+def _mark_alert_counts_dirty(session: Session, flush_context) -> None:
+    """flush 中有工单变更时标记会话，等提交后再失效缓存"""
+    if session.info.get(_SESSION_FLAG):
+        return
+    for obj in session.new | session.deleted:
+        if isinstance(obj, ALERT_SOURCES):
+            session.info[_SESSION_FLAG] = True
+            return
+    for obj in session.dirty:
+        if isinstance(obj, ALERT_SOURCES) and _affects_alerts(obj):
+            session.info[_SESSION_FLAG] = True
+            return
+
+
+@event.listens_for(Session, 'do_orm_execute')
+def _mark_alert_counts_dirty_on_bulk(orm_execute_state) -> None:
+    """批量 UPDATE/DELETE 工单时标记会话"""
+    if not (orm_execute_state.is_update or orm_execute_state.is_delete):
+        return
+    mapper = orm_execute_state.bind_mapper
+    if mapper is not None and mapper.class_ in ALERT_SOURCES:
+        orm_execute_state.session.info[_SESSION_FLAG] = True
+
+
+@event.listens_for(Session, 'after_commit')
+def _invalidate_alert_counts(session: Session) -> None:
+    """提交后失效缓存"""
+    if session.info.pop(_SESSION_FLAG, False):
+        alert_count_cache.clear()
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_alert_counts_flag(session: Session) -> None:
+    """回滚后丢弃标记"""
+    session.info.pop(_SESSION_FLAG, None)
+
+
+class AlertCounterService:
+    """
+    超期/临期工单数量服务
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+        self.repository = WorkOrderRepository(db)
+
+    def get_counts(self, user_name: str | None, is_manager: bool) -> dict[str, int]:
+        """
+        获取超期、临期工单数量
+
+        Args:
+            user_name: 当前用户姓名
+            is_manager: 是否管理员（管理员统计全部工单）
+
+        Returns:
+            {'overdue': 超期数量, 'expiring': 临期数量}
+        """
+        today = date.today()
+        key = (None if is_manager else user_name, is_manager, today)
+
+        counts = alert_count_cache.get(key)
+        if counts is not None:
+            ALERT_COUNT_CACHE_REQUESTS.labels(result='hit').inc()
+            return counts
+
+        ALERT_COUNT_CACHE_REQUESTS.labels(result='miss').inc()
+        counts = self.repository.count_alerts(
+            today=today,
+            statuses=OverdueAlertConfig.VALID_STATUSES,
+            maintenance_personnel=None if is_manager else user_name,
+        )
+        alert_count_cache.set(key, counts)
+        return counts
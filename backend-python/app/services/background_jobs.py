@@ -0,0 +1,447 @@
+"""
+后台任务服务
+耗时的级联操作写入 background_job 表，由进程内线程池执行，接口立即返回任务 ID，
+前端通过 /jobs/{id} 查询进度
+
+- 领取：UPDATE ... WHERE status = 'pending'，多个 uvicorn worker 同时领取时只有一个成功
+- 执行：PostgreSQL 下执行期间在独立连接上持有 advisory lock，进程退出后锁自动释放，
+  其他 worker 据此把状态停留在 running 但锁已释放的任务重新放回队列；
+  其他数据库由执行进程定期刷新 heartbeat_at，心跳超时的 running 任务视为中断
+- 进度：任务处理函数分段提交，每段调用 JobContext.progress() 更新进度并检查取消请求
+- 取消：未开始的任务直接取消；执行中的任务在下一段提交后停止，已提交的部分不回滚
+"""
+import json
+import logging
+import threading
+import time
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+from sqlalchemy import func, select, update
+from sqlalchemy.orm import Session
+
+from app.config import get_settings
+from app.database import SessionLocal
+from app.exceptions import NotFoundException, ValidationException
+from app.models.background_job import BackgroundJob
+
+logger = logging.getLogger(__name__)
+
+STATUS_PENDING = 'pending'
+STATUS_RUNNING = 'running'
+STATUS_SUCCEEDED = 'succeeded'
+STATUS_FAILED = 'failed'
+STATUS_CANCELLED = 'cancelled'
+
+FINISHED_STATUSES = (STATUS_SUCCEEDED, STATUS_FAILED, STATUS_CANCELLED)
+
+# advisory lock 键的高 32 位，避免与其他用途的 advisory lock 冲突
+JOB_LOCK_NAMESPACE = 0x4A4F42
+
+JOB_RECOVER_SECONDS = 60
+
+# 执行进程刷新心跳的间隔，超过 JOB_STALE_SECONDS 没有心跳的 running 任务视为中断
+JOB_HEARTBEAT_SECONDS = 30
+JOB_STALE_SECONDS = 3 * JOB_HEARTBEAT_SECONDS
+
+JOB_HANDLERS: dict[str, Callable[['JobContext'], dict | None]] = {}
+
+
+def register_job(job_type: str):
+    """
+    注册任务处理函数
+
+    处理函数接收 JobContext，返回值序列化为 JSON 后保存为任务结果
+    """
+    def decorator(handler):
+        JOB_HANDLERS[job_type] = handler
+        return handler
+    return decorator
+
+
+class JobCancelledError(Exception):
+    """任务已被请求取消"""
+
+
+class JobContext:
+    """
+    任务执行上下文
+    """
+
+    def __init__(self, db: Session, job_id: int, params: dict):
+        self.db = db
+        self.job_id = job_id
+        self.params = params
+
+    def progress(self, done: int, total: int, message: str | None = None) -> None:
+        """
+        更新进度并提交当前事务，随后检查取消请求
+
+        Args:
+            done: 已处理数量
+            total: 总数量
+            message: 进度说明
+
+        Raises:
+            JobCancelledError: 任务已被请求取消
+        """
+        values = {'progress': min(99, done * 100 // total) if total else 0, 'heartbeat_at': datetime.now()}
+        if message:
+            values['message'] = message[:500]
+        self.db.execute(update(BackgroundJob).where(BackgroundJob.id == self.job_id).values(**values))
+        self.db.commit()
+        self.check_cancelled()
+
+    def check_cancelled(self) -> None:
+        """已请求取消时抛出 JobCancelledError"""
+        cancel_requested = self.db.execute(
+            select(BackgroundJob.cancel_requested).where(BackgroundJob.id == self.job_id)
+        ).scalar()
+        if cancel_requested:
+            raise JobCancelledError()
+
+
+class JobRunner:
+    """
+    进程内任务执行器
+    """
+
+    def __init__(self, session_factory, workers: int, poll_seconds: int):
+        """
+        Args:
+            session_factory: 数据库会话工厂
+            workers: 并发执行的任务数
+            poll_seconds: 轮询待执行任务的间隔
+        """
+        self._session_factory = session_factory
+        self.workers = workers
+        self.poll_seconds = poll_seconds
+        self._executor: ThreadPoolExecutor | None = None
+        self._thread: threading.Thread | None = None
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self._active: set[int] = set()
+
+    def start(self) -> None:
+        """恢复中断的任务并启动调度线程"""
+        if self._thread is not None:
+            return
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='job')
+        self._stop.clear()
+        try:
+            requeued = self.recover()
+            if requeued:
+                logger.info(f"重新排队中断的后台任务 {requeued} 个")
+        except Exception as e:
+            logger.error(f"恢复后台任务失败: {str(e)}")
+        self._thread = threading.Thread(target=self._loop, name='job-dispatcher', daemon=True)
+        self._thread.start()
+
+    def shutdown(self) -> None:
+        """停止调度，不再领取新任务；执行中的任务由下次启动时恢复"""
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def wake(self) -> None:
+        """通知调度线程有新任务"""
+        self._wake.set()
+
+    def _loop(self) -> None:
+        last_recover = last_heartbeat = time.monotonic()
+        while not self._stop.is_set():
+            try:
+                self.dispatch()
+                if time.monotonic() - last_heartbeat >= JOB_HEARTBEAT_SECONDS:
+                    last_heartbeat = time.monotonic()
+                    self.heartbeat()
+                if time.monotonic() - last_recover >= JOB_RECOVER_SECONDS:
+                    last_recover = time.monotonic()
+                    self.recover()
+            except Exception as e:
+                logger.error(f"调度后台任务失败: {str(e)}")
+            self._wake.wait(self.poll_seconds)
+            self._wake.clear()
+
+    def dispatch(self) -> list[int]:
+        """
+        把待执行任务提交到线程池
+
+        Returns:
+            提交的任务 ID
+        """
+        with self._lock:
+            free = self.workers - len(self._active)
+            active = set(self._active)
+        if free <= 0 or self._executor is None:
+            return []
+
+        with self._session_factory() as db:
+            stmt = select(BackgroundJob.id).where(BackgroundJob.status == STATUS_PENDING)
+            if active:
+                stmt = stmt.where(BackgroundJob.id.notin_(active))
+            job_ids = db.execute(stmt.order_by(BackgroundJob.id).limit(free)).scalars().all()
+
+        for job_id in job_ids:
+            with self._lock:
+                self._active.add(job_id)
+            future = self._executor.submit(self.run, job_id)
+            future.add_done_callback(lambda _, job_id=job_id: self._discard(job_id))
+        return list(job_ids)
+
+    def _discard(self, job_id: int) -> None:
+        with self._lock:
+            self._active.discard(job_id)
+        self._wake.set()
+
+    def _lock_key(self, job_id: int) -> int:
+        return (JOB_LOCK_NAMESPACE << 32) | (job_id & 0xFFFFFFFF)
+
+    def _acquire_lock(self, engine, job_id: int):
+        """
+        在独立连接上获取任务的 advisory lock，非 PostgreSQL 时不加锁
+
+        Returns:
+            (连接, 是否获取成功)，非 PostgreSQL 时连接为 None
+        """
+        if engine.dialect.name != 'postgresql':
+            return None, True
+        connection = engine.connect()
+        try:
+            acquired = connection.execute(select(func.pg_try_advisory_lock(self._lock_key(job_id)))).scalar()
+            connection.commit()
+        except Exception:
+            connection.close()
+            raise
+        if not acquired:
+            connection.close()
+        return connection, bool(acquired)
+
+    def _release_lock(self, connection, job_id: int) -> None:
+        if connection is None:
+            return
+        try:
+            connection.execute(select(func.pg_advisory_unlock(self._lock_key(job_id))))
+            connection.commit()
+        finally:
+            connection.close()
+
+    def heartbeat(self) -> int:
+        """
+        刷新本进程执行中任务的心跳时间
+
+        Returns:
+            刷新的任务数
+        """
+        with self._lock:
+            active = list(self._active)
+        if not active:
+            return 0
+        with self._session_factory() as db:
+            result = db.execute(
+                update(BackgroundJob)
+                .where(BackgroundJob.id.in_(active), BackgroundJob.status == STATUS_RUNNING)
+                .values(heartbeat_at=datetime.now())
+            )
+            db.commit()
+        return result.rowcount
+
+    def recover(self) -> int:
+        """
+        把执行进程已退出的任务放回队列
+
+        PostgreSQL 下能获取到 advisory lock 的 running 任务即为中断的任务；
+        其他数据库以心跳判断，只恢复超过 JOB_STALE_SECONDS 没有心跳的任务，
+        其他 worker 正在执行的任务不受影响
+
+        Returns:
+            重新排队的任务数
+        """
+        with self._session_factory() as db:
+            engine = db.get_bind()
+            with self._lock:
+                active = set(self._active)
+            stmt = select(BackgroundJob.id).where(BackgroundJob.status == STATUS_RUNNING)
+            if engine.dialect.name != 'postgresql':
+                stale_before = datetime.now() - timedelta(seconds=JOB_STALE_SECONDS)
+                stmt = stmt.where(func.coalesce(BackgroundJob.heartbeat_at, BackgroundJob.started_at) < stale_before)
+            job_ids = [job_id for job_id in db.execute(stmt).scalars().all() if job_id not in active]
+
+            requeued = 0
+            for job_id in job_ids:
+                connection, acquired = self._acquire_lock(engine, job_id)
+                if not acquired:
+                    continue
+                try:
+                    result = db.execute(
+                        update(BackgroundJob)
+                        .where(BackgroundJob.id == job_id, BackgroundJob.status == STATUS_RUNNING)
+                        .values(status=STATUS_PENDING, message='执行中断，等待重新执行')
+                    )
+                    db.commit()
+                    requeued += result.rowcount
+                finally:
+                    self._release_lock(connection, job_id)
+        if requeued:
+            self._wake.set()
+        return requeued
+
+    def run(self, job_id: int) -> bool:
+        """
+        领取并执行一个任务
+
+        处理函数应当可以重复执行：中断后重新排队的任务会从头再执行一次
+
+        Returns:
+            是否由本次调用执行
+        """
+        with self._session_factory() as db:
+            connection, acquired = self._acquire_lock(db.get_bind(), job_id)
+            if not acquired:
+                return False
+            try:
+                claimed = db.execute(
+                    update(BackgroundJob)
+                    .where(BackgroundJob.id == job_id, BackgroundJob.status == STATUS_PENDING)
+                    .values(status=STATUS_RUNNING, started_at=datetime.now(), heartbeat_at=datetime.now(), progress=0)
+                ).rowcount == 1
+                db.commit()
+                if claimed:
+                    self._execute(db, job_id)
+                return claimed
+            finally:
+                self._release_lock(connection, job_id)
+
+    def _execute(self, db: Session, job_id: int) -> None:
+        job = db.get(BackgroundJob, job_id)
+        handler = JOB_HANDLERS.get(job.job_type)
+        context = JobContext(db, job_id, json.loads(job.params) if job.params else {})
+        started = time.monotonic()
+        values = {}
+        try:
+            if handler is None:
+                raise ValueError(f"未知的任务类型: {job.job_type}")
+            result = handler(context)
+        except JobCancelledError:
+            db.rollback()
+            values.update(status=STATUS_CANCELLED, message='已取消，已处理的部分不回滚')
+        except Exception as e:
+            db.rollback()
+            logger.error(f"后台任务失败 #{job_id} {job.job_type}: {str(e)}", exc_info=True)
+            values.update(status=STATUS_FAILED, error=str(e))
+        else:
+            values.update(
+                status=STATUS_SUCCEEDED,
+                progress=100,
+                message='已完成',
+                result=json.dumps(result, ensure_ascii=False, default=str) if result is not None else None,
+            )
+        values['finished_at'] = datetime.now()
+        db.execute(update(BackgroundJob).where(BackgroundJob.id == job_id).values(**values))
+        db.commit()
+        logger.info(f"后台任务结束 #{job_id} {job.job_type}: {values['status']}, 耗时 {time.monotonic() - started:.1f}s")
+
+
+_settings = get_settings()
+
+job_runner = JobRunner(SessionLocal, _settings.job_workers, _settings.job_poll_seconds)
+
+
+class BackgroundJobService:
+    """
+    后台任务服务
+    提供任务的提交、查询和取消
+    """
+
+    def __init__(self, db: Session):
+        self._db = db
+
+    def enqueue(
+        self,
+        job_type: str,
+        params: dict | None = None,
+        target: str | None = None,
+        created_by: str | None = None
+    ) -> BackgroundJob:
+        """
+        提交任务
+
+        同一类型、同一对象已有未开始的任务时直接返回该任务
+
+        Args:
+            job_type: 任务类型，需已通过 register_job 注册
+            params: 任务参数
+            target: 任务对象标识
+            created_by: 提交人
+
+        Returns:
+            任务对象
+        """
+        if job_type not in JOB_HANDLERS:
+            raise ValueError(f"未知的任务类型: {job_type}")
+
+        if target is not None:
+            existing = self._db.query(BackgroundJob).filter(
+                BackgroundJob.job_type == job_type,
+                BackgroundJob.target == target,
+                BackgroundJob.status == STATUS_PENDING
+            ).first()
+            if existing:
+                return existing
+
+        job = BackgroundJob(
+            job_type=job_type,
+            target=target,
+            params=json.dumps(params or {}, ensure_ascii=False, default=str),
+            status=STATUS_PENDING,
+            progress=0,
+            cancel_requested=False,
+            created_by=created_by
+        )
+        self._db.add(job)
+        self._db.commit()
+        self._db.refresh(job)
+        job_runner.wake()
+        logger.info(f"提交后台任务 #{job.id} {job_type} target={target}")
+        return job
+
+    def get_by_id(self, id: int) -> BackgroundJob:
+        """
+        获取任务
+
+        Raises:
+            NotFoundException: 任务不存在
+        """
+        job = self._db.get(BackgroundJob, id, populate_existing=True)
+        if not job:
+            raise NotFoundException("任务不存在")
+        return job
+
+    def cancel(self, id: int) -> BackgroundJob:
+        """
+        取消任务
+
+        Raises:
+            NotFoundException: 任务不存在
+            ValidationException: 任务已结束
+        """
+        job = self.get_by_id(id)
+        if job.status in FINISHED_STATUSES:
+            raise ValidationException("任务已结束，无法取消")
+
+        self._db.execute(
+            update(BackgroundJob)
+            .where(BackgroundJob.id == id, BackgroundJob.status == STATUS_PENDING)
+            .values(status=STATUS_CANCELLED, message='已取消', finished_at=datetime.now())
+        )
+        self._db.execute(update(BackgroundJob).where(BackgroundJob.id == id).values(cancel_requested=True))
+        self._db.commit()
+        self._db.refresh(job)
+        return job
@@ -4,11 +4,13 @@ from sqlalchemy.orm import Session
 from app.exceptions import NotFoundException
 from app.models.dictionary import Dictionary
 from app.repositories.dictionary import DictionaryRepository
+from app.services.reference_cache import reference_cache
 
 
 class DictionaryService:
     def __init__(self, db: Session):
         self.repository = DictionaryRepository(db)
+        self.db = db
 
     def get_all(
         self,
@@ -21,6 +23,12 @@ class DictionaryService:
     def get_by_type(self, dict_type: str) -> list[Dictionary]:
         return self.repository.find_by_type(dict_type)
 
+    def get_dicts_by_type(self, dict_type: str) -> list[dict]:
+        return reference_cache.get_or_load(
+            self.db, 'dictionary', ('type', dict_type),
+            lambda: [item.to_dict() for item in self.repository.find_by_type(dict_type)],
+        )
+
     def get_by_type_and_key(self, dict_type: str, dict_key: str) -> Dictionary:
         dictionary = self.repository.find_by_type_and_key(dict_type, dict_key)
         if not dictionary:
@@ -63,3 +71,9 @@ class DictionaryService:
 
     def get_all_unpaginated(self, dict_type: str | None = None) -> list[Dictionary]:
         return self.repository.find_all_unpaginated(dict_type)
+
+    def get_all_dicts(self, dict_type: str | None = None) -> list[dict]:
+        return reference_cache.get_or_load(
+            self.db, 'dictionary', ('all', dict_type),
+            lambda: [item.to_dict() for item in self.repository.find_all_unpaginated(dict_type)],
+        )
@@ -0,0 +1,195 @@
+"""
+图片衍生图缓存
+按预设尺寸把 uploads 下的照片、签字、身份证图片缩放为 WebP，供列表和缩略图展示
+
+- 生成：在进程池中执行 Pillow 缩放，不占用事件循环和 API 线程；同一衍生图并发请求只生成一次
+- 缓存：磁盘目录按总大小做 LRU 淘汰，启动时按访问时间恢复顺序
+- 缓存键：变体 + 源文件相对路径 + 修改时间 + 大小的 SHA-256，同时作为强 ETag
+"""
+import asyncio
+import hashlib
+import logging
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from app.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+VARIANTS = {
+    'thumb': (240, 240),
+    'small': (480, 480),
+    'medium': (1080, 1080),
+}
+
+WEBP_QUALITY = 80
+
+
+def render_derivative(source: str, target: str, max_width: int, max_height: int, quality: int) -> int:
+    """
+    生成 WebP 衍生图，在子进程中执行
+
+    先写同目录临时文件再原子重命名，多个进程同时生成同一衍生图也不会读到半个文件
+
+    Returns:
+        衍生图字节数
+    """
+    from PIL import Image, ImageOps
+
+    with Image.open(source) as original:
+        image = ImageOps.exif_transpose(original)
+        image.thumbnail((max_width, max_height))
+        if image.mode not in ('RGB', 'RGBA'):
+            image = image.convert('RGBA' if image.has_transparency_data else 'RGB')
+        temp_path = f"{target}.{os.getpid()}.tmp"
+        image.save(temp_path, 'WEBP', quality=quality, method=4)
+    os.replace(temp_path, target)
+    return os.path.getsize(target)
+
+
+class DerivativeCache:
+    """
+    衍生图磁盘缓存
+    """
+
+    def __init__(self, cache_dir: str, max_bytes: int, workers: int):
+        """
+        Args:
+            cache_dir: 缓存目录
+            max_bytes: 缓存总大小上限
+            workers: 生成衍生图的进程数
+        """
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+        self.workers = workers
+        self._entries: OrderedDict[str, int] = OrderedDict()
+        self._total = 0
+        self._lock = threading.Lock()
+        self._pending: dict[str, asyncio.Future] = {}
+        self._executor: ProcessPoolExecutor | None = None
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / key[:2] / f"{key}.webp"
+
+    def cache_key(self, variant: str, source: Path, relative: str) -> str:
+        """衍生图缓存键，源文件被替换后键随之变化"""
+        stat = source.stat()
+        return hashlib.sha256(
+            f"{variant}:{relative}:{stat.st_mtime_ns}:{stat.st_size}".encode()
+        ).hexdigest()
+
+    def total_bytes(self) -> int:
+        """缓存总大小"""
+        with self._lock:
+            return self._total
+
+    def load(self) -> None:
+        """启动时扫描缓存目录，按访问时间恢复 LRU 顺序并淘汰超出部分"""
+        files = []
+        for path in self.cache_dir.glob('*/*.webp'):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            files.append((stat.st_atime, path.stem, stat.st_size))
+        files.sort()
+        with self._lock:
+            self._entries = OrderedDict((key, size) for _, key, size in files)
+            self._total = sum(size for _, _, size in files)
+        self._evict()
+
+    def _touch(self, key: str, size: int) -> None:
+        """记录一次访问，调用方持有锁"""
+        previous = self._entries.pop(key, None)
+        if previous is not None:
+            self._total -= previous
+        self._entries[key] = size
+        self._total += size
+
+    def _evict(self) -> None:
+        """淘汰最久未访问的衍生图直到总大小不超过上限"""
+        removed = []
+        with self._lock:
+            while self._total > self.max_bytes and len(self._entries) > 1:
+                key, size = self._entries.popitem(last=False)
+                self._total -= size
+                removed.append(key)
+        for key in removed:
+            try:
+                self._path(key).unlink()
+            except FileNotFoundError:
+                pass
+        if removed:
+            logger.debug(f"淘汰衍生图 {len(removed)} 个")
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.workers)
+        return self._executor
+
+    async def _render(self, key: str, variant: str, source: Path) -> int:
+        """在进程池中生成衍生图"""
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        width, height = VARIANTS[variant]
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._get_executor(), render_derivative, str(source), str(path), width, height, WEBP_QUALITY
+        )
+
+    async def get(self, variant: str, source: Path, relative: str) -> tuple[Path, str]:
+        """
+        获取衍生图，不存在时生成
+
+        Args:
+            variant: VARIANTS 中的变体名
+            source: 源文件
+            relative: 源文件相对 uploads 目录的路径
+
+        Returns:
+            (衍生图路径, 缓存键)
+        """
+        key = self.cache_key(variant, source, relative)
+        path = self._path(key)
+
+        with self._lock:
+            cached = key in self._entries
+        if cached or path.exists():
+            try:
+                size = path.stat().st_size
+            except FileNotFoundError:
+                size = None
+            if size is not None:
+                with self._lock:
+                    self._touch(key, size)
+                return path, key
+
+        pending = self._pending.get(key)
+        if pending is None:
+            pending = asyncio.ensure_future(self._render(key, variant, source))
+            self._pending[key] = pending
+            pending.add_done_callback(lambda _: self._pending.pop(key, None))
+        size = await asyncio.shield(pending)
+
+        with self._lock:
+            self._touch(key, size)
+        self._evict()
+        return path, key
+
+    def shutdown(self) -> None:
+        """关闭进程池"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+_settings = get_settings()
+
+derivative_cache = DerivativeCache(
+    _settings.image_cache_dir,
+    _settings.image_cache_max_mb * 1024 * 1024,
+    _settings.image_derivative_workers,
+)
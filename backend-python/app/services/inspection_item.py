@@ -4,11 +4,13 @@ from sqlalchemy.orm import Session
 
 from app.repositories.inspection_item import InspectionItemRepository
 from app.schemas.inspection_item import InspectionItem, InspectionItemCreate, InspectionItemUpdate
+from app.services.inspection_item_tree import inspection_item_tree_cache
 
 
 class InspectionItemService:
     def __init__(self, db: Session):
         self.repository = InspectionItemRepository(db)
+        self.db = db
 
     def get_all_items(self) -> list[InspectionItem]:
         return self.repository.get_all()
@@ -16,8 +18,17 @@ class InspectionItemService:
     def get_item_by_id(self, item_id: int) -> InspectionItem | None:
         return self.repository.get_by_id(item_id)
 
-    def get_tree(self) -> list[dict[str, Any]]:
-        return self.repository.get_tree()
+    def get_tree(self, root: int | None = None, depth: int | None = None) -> list[dict[str, Any]]:
+        return inspection_item_tree_cache.load(self.db).tree(root, depth)
+
+    def get_tree_json(self, root: int | None = None, depth: int | None = None) -> tuple[bytes, str] | None:
+        """
+        获取整树或子树序列化后的 JSON 和 ETag，root 不存在时返回 None
+        """
+        snapshot = inspection_item_tree_cache.load(self.db)
+        if root is not None and root not in snapshot.nodes:
+            return None
+        return snapshot.render(root, depth)
 
     def search_items(self, keyword: str | None = None) -> list[InspectionItem]:
         return self.repository.search(keyword)
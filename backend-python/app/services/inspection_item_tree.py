@@ -0,0 +1,124 @@
+"""
+巡检事项树快照缓存
+维保计划编辑器打开时加载整棵事项树，事项目录上千条时每次从数据库重建代价较高
+
+- 快照：一次查询建立节点字典和 父节点→子节点 索引，按版本号缓存在进程内；
+  整树和子树的序列化结果缓存在快照上，重复请求直接返回 JSON
+- 失效：订阅参考数据缓存的 inspection_item 命名空间，巡检事项新增、修改、删除提交后
+  本进程和其他 worker 都会递增版本号，旧快照作废；TTL 兜底不经过 ORM 的修改
+- ETag：取序列化结果的 SHA-256，与进程和版本号无关，多进程部署时也不会误判未修改
+"""
+import hashlib
+import json
+import threading
+import time
+from typing import Any
+
+from sqlalchemy.orm import Session
+
+from app.repositories.inspection_item import InspectionItemRepository, build_tree, build_tree_index
+from app.services.reference_cache import has_pending_changes, reference_cache
+
+TREE_SNAPSHOT_TTL_SECONDS = 300
+
+RENDERED_CACHE_SIZE = 256
+
+NAMESPACE = 'inspection_item'
+
+
+class TreeSnapshot:
+    """
+    某一版本的事项树快照
+    """
+
+    def __init__(self, version: int, nodes: dict[int, dict[str, Any]], children: dict[int | None, list[int]]):
+        self.version = version
+        self.nodes = nodes
+        self.children = children
+        self._rendered: dict[tuple, tuple[bytes, str]] = {}
+        self._lock = threading.Lock()
+
+    def tree(self, root: int | None = None, depth: int | None = None) -> list[dict[str, Any]]:
+        """构建整树或子树"""
+        return build_tree(self.nodes, self.children, root=root, depth=depth)
+
+    def render(self, root: int | None = None, depth: int | None = None) -> tuple[bytes, str]:
+        """
+        获取整树或子树的 JSON 及其 ETag
+
+        Returns:
+            (JSON 字节串, 内容摘要)
+        """
+        key = (root, depth)
+        with self._lock:
+            rendered = self._rendered.get(key)
+        if rendered is not None:
+            return rendered
+
+        body = json.dumps(self.tree(root, depth), ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        rendered = (body, hashlib.sha256(body).hexdigest())
+        with self._lock:
+            if len(self._rendered) < RENDERED_CACHE_SIZE:
+                self._rendered[key] = rendered
+        return rendered
+
+
+class InspectionItemTreeCache:
+    """
+    进程内事项树缓存，只保存最新版本的快照
+    """
+
+    def __init__(self, ttl_seconds: int = TREE_SNAPSHOT_TTL_SECONDS):
+        self._ttl_seconds = ttl_seconds
+        self._version = 0
+        self._snapshot: TreeSnapshot | None = None
+        self._expires_at = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def version(self) -> int:
+        """当前版本号"""
+        return self._version
+
+    def get(self) -> TreeSnapshot | None:
+        """读取当前版本未过期的快照"""
+        with self._lock:
+            if self._snapshot is None or self._expires_at < time.monotonic():
+                return None
+            return self._snapshot
+
+    def put(self, snapshot: TreeSnapshot) -> None:
+        """写入快照，构建期间版本号已变化的快照直接丢弃"""
+        with self._lock:
+            if snapshot.version == self._version:
+                self._snapshot = snapshot
+                self._expires_at = time.monotonic() + self._ttl_seconds
+
+    def invalidate(self) -> None:
+        """递增版本号并丢弃快照"""
+        with self._lock:
+            self._version += 1
+            self._snapshot = None
+
+    def load(self, db: Session) -> TreeSnapshot:
+        """
+        获取当前快照，不存在时从数据库构建
+
+        会话中有未提交的事项变更时按会话中的数据构建，结果只用于本次请求，不写入缓存
+        """
+        pending = has_pending_changes(db, NAMESPACE)
+        snapshot = None if pending else self.get()
+        if snapshot is not None:
+            return snapshot
+
+        version = self.version
+        nodes, children = build_tree_index(InspectionItemRepository(db).get_all())
+        snapshot = TreeSnapshot(version, nodes, children)
+        if not pending:
+            self.put(snapshot)
+        return snapshot
+
+
+inspection_item_tree_cache = InspectionItemTreeCache()
+
+reference_cache.subscribe(NAMESPACE, inspection_item_tree_cache.invalidate)
@@ -0,0 +1,405 @@
+"""
+定期巡检进度服务
+维护 inspection_progress 表，巡检单列表直接读取每单的总数和已处理数
+
+- 维保计划：设置 inspection_items 时解析出巡查项数量和去重后的巡查内容，
+  分别保存在 inspection_item_count、inspection_contents，计算进度时不再解析巡查项 JSON
+- 增量维护：监听 Session 的 after_flush 事件，巡检记录、巡检单和维保计划的变更
+  在同一事务中重算受影响巡检单的进度；批量 UPDATE/DELETE 巡检记录时在语句执行后重算
+- 全量重建：rebuild() 重算所有巡检单，用于修复绕过 ORM 造成的偏差
+
+进度口径：
+- total_count: 巡检单关联维保计划的巡查项数量；未关联时为同项目、日期重叠的维保计划中不同巡查内容的数量
+- filled_count: 巡检记录中已处理的不同巡查内容(为空时取巡检项名称)的数量
+"""
+import json
+import logging
+from collections import defaultdict
+from collections.abc import Iterable
+from datetime import datetime
+
+from sqlalchemy import (
+    and_,
+    bindparam,
+    case,
+    delete,
+    distinct,
+    event,
+    func,
+    inspect,
+    or_,
+    select,
+    update,
+)
+from sqlalchemy.orm import Session
+
+from app.models.inspection_progress import InspectionProgress
+from app.models.maintenance_plan import MaintenancePlan
+from app.models.periodic_inspection import PeriodicInspection
+from app.models.periodic_inspection_record import PeriodicInspectionRecord
+from app.utils.db_upsert import dialect_insert
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 1000
+
+RECORD_FIELDS = ('inspection_id', 'inspection_content', 'item_name', 'inspected')
+INSPECTION_FIELDS = ('inspection_id', 'plan_id', 'project_id', 'plan_start_date', 'plan_end_date')
+PLAN_FIELDS = ('plan_id', 'project_id', 'plan_start_date', 'plan_end_date', 'inspection_items')
+
+
+def parse_inspection_items(value: str | None) -> tuple[int, list[str]]:
+    """
+    解析维保计划的巡查项 JSON
+
+    Returns:
+        (巡查项数量, 去重后的巡查内容列表)，无法解析时为 (0, [])
+    """
+    if not value:
+        return 0, []
+    try:
+        items = json.loads(value)
+    except (json.JSONDecodeError, TypeError):
+        return 0, []
+    if not isinstance(items, list):
+        return 0, []
+
+    contents = []
+    seen = set()
+    for item in items:
+        content = item.get('inspection_content', '') if isinstance(item, dict) else ''
+        if content and content not in seen:
+            seen.add(content)
+            contents.append(content)
+    return len(items), contents
+
+
+@event.listens_for(MaintenancePlan.inspection_items, 'set')
+def _parse_plan_inspection_items(target: MaintenancePlan, value, oldvalue, initiator) -> None:
+    """设置巡查项时同步解析结果"""
+    count, contents = parse_inspection_items(value)
+    target.inspection_item_count = count
+    target.inspection_contents = json.dumps(contents, ensure_ascii=False) if contents else None
+
+
+def _day(value: datetime | None):
+    return value.date() if isinstance(value, datetime) else value
+
+
+def plans_total_count(plans: Iterable, plan_start_date: datetime | None, plan_end_date: datetime | None, contents_of=None) -> int:
+    """
+    日期与巡检单重叠的维保计划中不同巡查内容的数量，按天比较
+
+    Args:
+        plans: 维保计划或含 plan_start_date/plan_end_date/inspection_contents 的行
+        plan_start_date: 巡检单计划开始日期
+        plan_end_date: 巡检单计划结束日期
+        contents_of: 取计划巡查内容集合的函数，默认解析 inspection_contents
+    """
+    order_start, order_end = _day(plan_start_date), _day(plan_end_date)
+    if not order_start or not order_end:
+        return 0
+    contents_of = contents_of or (lambda plan: json.loads(plan.inspection_contents) if plan.inspection_contents else ())
+
+    unique_items = set()
+    for plan in plans:
+        plan_start, plan_end = _day(plan.plan_start_date), _day(plan.plan_end_date)
+        if plan_start and plan_end and order_start <= plan_end and order_end >= plan_start:
+            unique_items.update(contents_of(plan))
+    return len(unique_items)
+
+
+def compute_progress(bind, inspection_ids: Iterable[str]) -> dict[str, tuple[int, int]]:
+    """
+    计算巡检单进度
+
+    Args:
+        bind: Session 或 Connection
+        inspection_ids: 巡检单编号
+
+    Returns:
+        {巡检单编号: (total_count, filled_count)}，不存在的巡检单不返回
+    """
+    inspection_ids = list(dict.fromkeys(inspection_ids))
+    inspections = []
+    filled = {}
+    for start in range(0, len(inspection_ids), CHUNK_SIZE):
+        chunk = inspection_ids[start:start + CHUNK_SIZE]
+        inspections.extend(bind.execute(
+            select(
+                PeriodicInspection.inspection_id,
+                PeriodicInspection.plan_id,
+                PeriodicInspection.project_id,
+                PeriodicInspection.plan_start_date,
+                PeriodicInspection.plan_end_date,
+            ).where(PeriodicInspection.inspection_id.in_(chunk))
+        ).all())
+        record_key = func.coalesce(
+            func.nullif(PeriodicInspectionRecord.inspection_content, ''),
+            PeriodicInspectionRecord.item_name,
+            '',
+        )
+        filled.update(bind.execute(
+            select(
+                PeriodicInspectionRecord.inspection_id,
+                func.count(distinct(case((PeriodicInspectionRecord.inspected == True, record_key)))),
+            ).where(
+                PeriodicInspectionRecord.inspection_id.in_(chunk)
+            ).group_by(PeriodicInspectionRecord.inspection_id)
+        ).all())
+
+    plan_ids = list({row.plan_id for row in inspections if row.plan_id})
+    item_counts = {}
+    for start in range(0, len(plan_ids), CHUNK_SIZE):
+        item_counts.update(bind.execute(
+            select(MaintenancePlan.plan_id, MaintenancePlan.inspection_item_count)
+            .where(MaintenancePlan.plan_id.in_(plan_ids[start:start + CHUNK_SIZE]))
+        ).all())
+
+    project_ids = list({row.project_id for row in inspections if row.plan_id not in item_counts and row.project_id})
+    plans_by_project = defaultdict(list)
+    for start in range(0, len(project_ids), CHUNK_SIZE):
+        for plan in bind.execute(
+            select(
+                MaintenancePlan.project_id,
+                MaintenancePlan.plan_start_date,
+                MaintenancePlan.plan_end_date,
+                MaintenancePlan.inspection_contents,
+            ).where(
+                MaintenancePlan.project_id.in_(project_ids[start:start + CHUNK_SIZE]),
+                MaintenancePlan.inspection_contents.isnot(None),
+            )
+        ):
+            plans_by_project[plan.project_id].append(plan)
+
+    # 同一计划在多个巡检单间只解析一次
+    parsed_contents = {}
+
+    def contents_of(plan):
+        if plan.inspection_contents not in parsed_contents:
+            parsed_contents[plan.inspection_contents] = json.loads(plan.inspection_contents)
+        return parsed_contents[plan.inspection_contents]
+
+    result = {}
+    for row in inspections:
+        if row.plan_id in item_counts:
+            total_count = item_counts[row.plan_id] or 0
+        else:
+            total_count = plans_total_count(
+                plans_by_project.get(row.project_id, ()), row.plan_start_date, row.plan_end_date, contents_of
+            )
+        result[row.inspection_id] = (total_count, filled.get(row.inspection_id, 0))
+    return result
+
+
+def refresh_progress(bind, inspection_ids: Iterable[str]) -> int:
+    """
+    重算巡检单进度并写入 inspection_progress，不提交事务
+
+    Args:
+        bind: Session 或 Connection
+        inspection_ids: 巡检单编号
+
+    Returns:
+        写入的行数
+    """
+    inspection_ids = set(inspection_ids)
+    if not inspection_ids:
+        return 0
+    progress = compute_progress(bind, inspection_ids)
+
+    table = InspectionProgress.__table__
+    missing = list(inspection_ids - progress.keys())
+    for start in range(0, len(missing), CHUNK_SIZE):
+        bind.execute(delete(table).where(table.c.inspection_id.in_(missing[start:start + CHUNK_SIZE])))
+    if progress:
+        stmt = dialect_insert(bind, table)
+        bind.execute(
+            stmt.on_conflict_do_update(
+                index_elements=['inspection_id'],
+                set_={
+                    'total_count': stmt.excluded.total_count,
+                    'filled_count': stmt.excluded.filled_count,
+                    'updated_at': func.now(),
+                },
+            ),
+            [
+                {'inspection_id': inspection_id, 'total_count': total_count, 'filled_count': filled_count}
+                for inspection_id, (total_count, filled_count) in progress.items()
+            ],
+        )
+    return len(progress)
+
+
+def _changed(obj, fields: tuple[str, ...]) -> bool:
+    state = inspect(obj)
+    return any(state.attrs[field].history.has_changes() for field in fields)
+
+
+def _values(obj, field: str) -> set:
+    """字段当前值和本次 flush 之前的值"""
+    history = inspect(obj).attrs[field].history
+    return {value for value in (*history.deleted, *history.unchanged, *history.added) if value}
+
+
+def collect_affected(session: Session) -> tuple[set[str], set[str], set[str]]:
+    """
+    收集本次 flush 中进度受影响的巡检单
+
+    Returns:
+        (巡检单编号, 维保计划编号, 项目编号)，后两者关联的巡检单需要一并重算
+    """
+    inspection_ids, plan_ids, project_ids = set(), set(), set()
+    for obj in session.new | session.dirty | session.deleted:
+        if isinstance(obj, PeriodicInspectionRecord):
+            if obj in session.dirty and not _changed(obj, RECORD_FIELDS):
+                continue
+            inspection_ids |= _values(obj, 'inspection_id')
+        elif isinstance(obj, PeriodicInspection):
+            if obj in session.dirty and not _changed(obj, INSPECTION_FIELDS):
+                continue
+            inspection_ids |= _values(obj, 'inspection_id')
+        elif isinstance(obj, MaintenancePlan):
+            if obj in session.dirty and not _changed(obj, PLAN_FIELDS):
+                continue
+            plan_ids |= _values(obj, 'plan_id')
+            project_ids |= _values(obj, 'project_id')
+    return inspection_ids, plan_ids, project_ids
+
+
+def _plan_inspection_ids(bind, plan_ids: set[str], project_ids: set[str]) -> set[str]:
+    """
+    维保计划变更影响的巡检单：关联该计划的，以及同项目未关联计划的
+
+    关联的计划不存在时巡检单按同项目的计划计算进度，同样视为未关联；
+    关联其他计划的巡检单总数只取自己计划的巡查项数量，不受影响
+    """
+    unlinked = or_(
+        PeriodicInspection.plan_id.is_(None),
+        ~select(MaintenancePlan.id).where(MaintenancePlan.plan_id == PeriodicInspection.plan_id).exists(),
+    )
+    inspection_ids = set()
+    for keys, criteria in (
+        (list(plan_ids), lambda chunk: PeriodicInspection.plan_id.in_(chunk)),
+        (list(project_ids), lambda chunk: and_(PeriodicInspection.project_id.in_(chunk), unlinked)),
+    ):
+        for start in range(0, len(keys), CHUNK_SIZE):
+            inspection_ids.update(bind.execute(
+                select(PeriodicInspection.inspection_id).where(criteria(keys[start:start + CHUNK_SIZE]))
+            ).scalars())
+    return inspection_ids
+
+
+@event.listens_for(Session, 'after_flush')
+def _maintain_progress_after_flush(session: Session, flush_context) -> None:
+    """flush 后在同一事务中重算受影响巡检单的进度"""
+    inspection_ids, plan_ids, project_ids = collect_affected(session)
+    if not (inspection_ids or plan_ids or project_ids):
+        return
+    connection = session.connection()
+    if plan_ids or project_ids:
+        inspection_ids |= _plan_inspection_ids(connection, plan_ids, project_ids)
+    refresh_progress(connection, inspection_ids)
+
+
+@event.listens_for(Session, 'do_orm_execute')
+def _maintain_progress_on_bulk(orm_execute_state):
+    """批量 UPDATE/DELETE 巡检记录时，先查出涉及的巡检单，语句执行后重算"""
+    if not (orm_execute_state.is_update or orm_execute_state.is_delete):
+        return None
+    mapper = orm_execute_state.bind_mapper
+    if mapper is None or mapper.class_ is not PeriodicInspectionRecord:
+        return None
+
+    session = orm_execute_state.session
+    whereclause = orm_execute_state.statement.whereclause
+    stmt = select(distinct(PeriodicInspectionRecord.inspection_id))
+    if whereclause is not None:
+        stmt = stmt.where(whereclause)
+    inspection_ids = set(session.connection().execute(stmt).scalars())
+
+    result = orm_execute_state.invoke_statement()
+    refresh_progress(session.connection(), inspection_ids)
+    return result
+
+
+def rebuild_progress(bind) -> int:
+    """
+    重新解析所有维保计划的巡查项，清空并重算所有巡检单进度，不提交事务
+
+    Args:
+        bind: Session 或 Connection
+
+    Returns:
+        写入的进度行数
+    """
+    rows = []
+    for plan in bind.execute(select(MaintenancePlan.id, MaintenancePlan.inspection_items)):
+        count, contents = parse_inspection_items(plan.inspection_items)
+        rows.append({
+            'plan_pk': plan.id,
+            'item_count': count,
+            'contents': json.dumps(contents, ensure_ascii=False) if contents else None,
+        })
+    table = MaintenancePlan.__table__
+    for start in range(0, len(rows), CHUNK_SIZE):
+        bind.execute(
+            update(table)
+            .where(table.c.id == bindparam('plan_pk'))
+            .values(inspection_item_count=bindparam('item_count'), inspection_contents=bindparam('contents')),
+            rows[start:start + CHUNK_SIZE],
+        )
+
+    bind.execute(delete(InspectionProgress.__table__))
+    inspection_ids = bind.execute(select(PeriodicInspection.inspection_id)).scalars().all()
+    return refresh_progress(bind, inspection_ids)
+
+
+class InspectionProgressService:
+    """
+    定期巡检进度服务
+    提供列表读取和全量重建
+    """
+
+    def __init__(self, db: Session):
+        self._db = db
+
+    def get_counts(self, inspection_ids: Iterable[str]) -> dict[str, dict]:
+        """
+        读取巡检单进度，进度表中缺失的巡检单当场计算
+
+        Returns:
+            {巡检单编号: {'total_count': int, 'filled_count': int}}
+        """
+        inspection_ids = list(dict.fromkeys(inspection_ids))
+        result = {}
+        for start in range(0, len(inspection_ids), CHUNK_SIZE):
+            chunk = inspection_ids[start:start + CHUNK_SIZE]
+            for row in self._db.execute(
+                select(InspectionProgress.inspection_id, InspectionProgress.total_count, InspectionProgress.filled_count)
+                .where(InspectionProgress.inspection_id.in_(chunk))
+            ):
+                result[row.inspection_id] = {'total_count': row.total_count, 'filled_count': row.filled_count}
+
+        missing = [inspection_id for inspection_id in inspection_ids if inspection_id not in result]
+        if missing:
+            logger.warning(f"巡检进度缺失 {len(missing)} 条，当场计算")
+            for inspection_id, (total_count, filled_count) in compute_progress(self._db, missing).items():
+                result[inspection_id] = {'total_count': total_count, 'filled_count': filled_count}
+        return result
+
+    def rebuild(self) -> int:
+        """
+        重新解析所有维保计划的巡查项并重算所有巡检单进度
+
+        Returns:
+            写入的进度行数
+        """
+        try:
+            count = rebuild_progress(self._db)
+            self._db.commit()
+        except Exception:
+            self._db.rollback()
+            raise
+        logger.info(f"巡检进度重建完成: {count} 条")
+        return count
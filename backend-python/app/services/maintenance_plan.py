@@ -3,22 +3,76 @@
 提供维保计划业务逻辑处理
 """
 import logging
-from datetime import datetime
+from collections import Counter
+from datetime import datetime, timedelta
 
+from pydantic import ValidationError
 from sqlalchemy.orm import Session
 
-from app.exceptions import DuplicateException, NotFoundException
+from app.exceptions import DuplicateException, NotFoundException, ValidationException
 from app.models.maintenance_plan import MaintenancePlan
 from app.models.periodic_inspection import PeriodicInspection
 from app.models.spot_work import SpotWork
 from app.models.temporary_repair import TemporaryRepair
 from app.repositories.maintenance_plan import MaintenancePlanRepository
 from app.schemas.maintenance_plan import MaintenancePlanCreate, MaintenancePlanUpdate
-from app.services.sync_service import SyncService
 from app.utils.date_utils import parse_datetime
+from app.utils.work_order_id_generator import (
+    format_work_order_id,
+    generate_inspection_id,
+    reserve_serial_ranges,
+)
 
 logger = logging.getLogger(__name__)
 
+IMPORT_MAX_ROWS = 5000
+
+IMPORT_DATE_FIELDS = ('plan_start_date', 'plan_end_date', 'execution_date', 'next_maintenance_date')
+
+EXCEL_EPOCH = datetime(1899, 12, 30)
+
+# 表头可以使用字段名，也可以使用字段说明（如“计划编号”）
+IMPORT_COLUMN_ALIASES = {
+    **{field.description: name for name, field in MaintenancePlanCreate.model_fields.items() if field.description},
+    **{name: name for name in MaintenancePlanCreate.model_fields},
+}
+
+
+def normalize_import_row(row: dict) -> dict:
+    """
+    整理导入数据行：表头转换为字段名，去掉空值，Excel 日期序列号转换为日期
+
+    Args:
+        row: 原始数据行
+
+    Returns:
+        字段名到值的字典，空行返回空字典
+    """
+    values = {}
+    for key, value in row.items():
+        name = IMPORT_COLUMN_ALIASES.get(str(key).strip())
+        if name is None:
+            continue
+        if isinstance(value, str):
+            value = value.strip()
+        if value is None or value == '':
+            continue
+        if name in IMPORT_DATE_FIELDS and isinstance(value, str) and value.replace('.', '', 1).isdigit():
+            value = EXCEL_EPOCH + timedelta(days=float(value))
+        values[name] = value
+    return values
+
+
+def _validation_messages(error: ValidationError) -> list[str]:
+    """校验错误转换为带字段说明的提示"""
+    messages = []
+    for item in error.errors():
+        name = item['loc'][0] if item['loc'] else ''
+        field = MaintenancePlanCreate.model_fields.get(name)
+        label = field.description if field and field.description else name
+        messages.append(f"{label}: {item['msg']}")
+    return messages
+
 
 class MaintenancePlanService:
     """
@@ -28,7 +82,6 @@ class MaintenancePlanService:
 
     def __init__(self, db: Session):
         self.repository = MaintenancePlanRepository(db)
-        self.sync_service = SyncService(db)
         self._db = db
 
     def _parse_date(self, date_value: str | datetime | None) -> datetime | None:
@@ -88,7 +141,8 @@ class MaintenancePlanService:
         project_name: str | None = None,
         client_name: str | None = None,
         plan_type: str | None = None,
-        maintenance_personnel_filter: str | None = None
+        maintenance_personnel_filter: str | None = None,
+        projection: str | None = None
     ) -> tuple[list[MaintenancePlan], int]:
         """
         分页获取维保计划列表
@@ -106,6 +160,7 @@ class MaintenancePlanService:
             client_name: 客户名称
             plan_type: 计划类型
             maintenance_personnel_filter: 权限过滤
+            projection: 列投影名称，None 表示加载完整实体
 
         Returns:
             (维保计划列表, 总数)
@@ -113,7 +168,7 @@ class MaintenancePlanService:
         return self.repository.find_all(
             page, size, plan_name, project_id, equipment_name,
             plan_status, status, maintenance_personnel,
-            project_name, client_name, plan_type, maintenance_personnel_filter
+            project_name, client_name, plan_type, maintenance_personnel_filter, projection
         )
 
     def get_by_id(self, id: int) -> MaintenancePlan:
@@ -261,9 +316,6 @@ class MaintenancePlanService:
 
             self._create_work_order_for_plan(result)
 
-            self.sync_service.sync_maintenance_plan_to_work_plan(result)
-            logger.info(f"✅ [Service] 同步到WorkPlan成功: plan_id={result.plan_id}")
-
             if operator_name and result.id:
                 self._create_operation_log(
                     work_order_type='maintenance_plan',
@@ -321,9 +373,6 @@ class MaintenancePlanService:
 
         self._create_work_order_for_plan(result)
 
-        self.sync_service.sync_maintenance_plan_to_work_plan(result)
-        logger.info(f"✅ [Service] 同步到WorkPlan成功: plan_id={result.plan_id}")
-
         if operator_name and result.id:
             self._create_operation_log(
                 work_order_type='maintenance_plan',
@@ -351,23 +400,11 @@ class MaintenancePlanService:
 
             client_name = project.client_name if project else plan.responsible_department
 
-            inspection_id = f"XJ-{plan.project_id}-{plan.plan_start_date.strftime('%Y%m%d') if plan.plan_start_date else datetime.now().strftime('%Y%m%d')}"
-
-            existing = self._db.query(PeriodicInspection).filter(
-                PeriodicInspection.inspection_id == inspection_id
-            ).first()
-
-            if existing:
-                max_retries = 100
-                for seq in range(1, max_retries + 1):
-                    inspection_id = f"XJ-{plan.project_id}-{plan.plan_start_date.strftime('%Y%m%d') if plan.plan_start_date else datetime.now().strftime('%Y%m%d')}-{seq:02d}"
-                    if not self._db.query(PeriodicInspection).filter(
-                        PeriodicInspection.inspection_id == inspection_id
-                    ).first():
-                        break
-                else:
-                    logger.error(f"无法生成唯一工单编号，已达到最大重试次数: {max_retries}")
-                    raise Exception("无法生成唯一工单编号，请检查数据是否存在重复")
+            inspection_id = generate_inspection_id(
+                self._db,
+                plan.project_id,
+                plan.plan_start_date.date() if plan.plan_start_date else None
+            )
 
             work_order = PeriodicInspection(
                 inspection_id=inspection_id,
@@ -391,6 +428,211 @@ class MaintenancePlanService:
             logger.error(f"❌ [Service] 创建工单失败: {str(e)}")
             self._db.rollback()
 
+    def _plan_values(self, dto: MaintenancePlanCreate, project_name: str | None) -> dict:
+        """创建数据对应的维保计划字段值"""
+        return {
+            'plan_id': dto.plan_id,
+            'plan_name': dto.plan_name,
+            'project_id': dto.project_id,
+            'project_name': project_name,
+            'plan_type': dto.plan_type,
+            'equipment_id': dto.equipment_id,
+            'equipment_name': dto.equipment_name,
+            'equipment_model': dto.equipment_model,
+            'equipment_location': dto.equipment_location,
+            'plan_start_date': self._parse_date(dto.plan_start_date),
+            'plan_end_date': self._parse_date(dto.plan_end_date),
+            'execution_date': self._parse_date(dto.execution_date),
+            'next_maintenance_date': self._parse_date(dto.next_maintenance_date),
+            'maintenance_personnel': dto.maintenance_personnel,
+            'responsible_department': dto.responsible_department,
+            'contact_info': dto.contact_info,
+            'maintenance_content': dto.maintenance_content,
+            'maintenance_requirements': dto.maintenance_requirements,
+            'maintenance_standard': dto.maintenance_standard,
+            'plan_status': dto.plan_status,
+            'status': dto.status,
+            'completion_rate': dto.completion_rate,
+            'filled_count': dto.filled_count or 0,
+            'total_count': dto.total_count or 5,
+            'remarks': dto.remarks,
+            'inspection_items': dto.inspection_items,
+        }
+
+    def _validate_import_rows(self, rows: list[dict], first_row: int) -> tuple[list, list[dict]]:
+        """
+        逐行校验导入数据
+
+        Returns:
+            ([(行号, 创建数据)], [行错误])
+        """
+        valid = []
+        errors = []
+        seen_plan_ids = set()
+        for row_no, row in enumerate(rows, start=first_row):
+            values = normalize_import_row(row)
+            if not values:
+                continue
+            try:
+                dto = MaintenancePlanCreate.model_validate(values)
+            except ValidationError as e:
+                errors.append({
+                    'row': row_no,
+                    'plan_id': values.get('plan_id'),
+                    'message': '; '.join(_validation_messages(e)),
+                })
+                continue
+
+            start = self._parse_date(dto.plan_start_date)
+            end = self._parse_date(dto.plan_end_date)
+            message = None
+            if start is None or end is None:
+                message = '计划开始日期或结束日期格式无效'
+            elif end < start:
+                message = '计划结束日期不能早于开始日期'
+            elif dto.plan_id in seen_plan_ids:
+                message = '计划编号在导入数据中重复'
+            if message:
+                errors.append({'row': row_no, 'plan_id': dto.plan_id, 'message': message})
+                continue
+
+            seen_plan_ids.add(dto.plan_id)
+            valid.append((row_no, dto))
+        return valid, errors
+
+    def bulk_import(
+        self,
+        rows: list[dict],
+        operator_id: int | None = None,
+        operator_name: str | None = None,
+        first_row: int = 1
+    ) -> dict:
+        """
+        批量导入维保计划
+
+        项目和已有计划各用一次查询解析，计划、巡检工单和操作日志在同一事务内
+        一次 flush 批量插入，工作计划由发件箱异步同步；任一行校验失败时不写入任何数据
+
+        Args:
+            rows: 维保计划数据行，键可以是字段名或表头中文名
+            operator_id: 操作者ID
+            operator_name: 操作者名称
+            first_row: 第一行数据的行号，用于错误提示
+
+        Returns:
+            {'created': 新建数量, 'restored': 恢复已删除计划数量, 'work_orders': 生成工单数量, 'errors': 行错误列表}
+
+        Raises:
+            ValidationException: 数据为空或超过导入上限
+        """
+        from app.models.project_info import ProjectInfo
+        from app.models.work_order_operation_log import WorkOrderOperationLog
+
+        if len(rows) > IMPORT_MAX_ROWS:
+            raise ValidationException(f"单次最多导入 {IMPORT_MAX_ROWS} 条维保计划")
+
+        valid, errors = self._validate_import_rows(rows, first_row)
+        if not valid and not errors:
+            raise ValidationException("导入数据为空")
+
+        project_ids = {dto.project_id for _, dto in valid}
+        projects = {
+            project.project_id: project
+            for project in self._db.query(
+                ProjectInfo.project_id, ProjectInfo.project_name, ProjectInfo.client_name
+            ).filter(ProjectInfo.project_id.in_(project_ids))
+        } if project_ids else {}
+
+        plan_ids = [dto.plan_id for _, dto in valid]
+        existing_plans = {
+            plan.plan_id: plan
+            for plan in self._db.query(MaintenancePlan).filter(MaintenancePlan.plan_id.in_(plan_ids))
+        } if plan_ids else {}
+
+        for row_no, dto in valid:
+            if dto.project_id not in projects:
+                errors.append({'row': row_no, 'plan_id': dto.plan_id, 'message': f'项目不存在: {dto.project_id}'})
+            elif dto.plan_id in existing_plans and not existing_plans[dto.plan_id].is_deleted:
+                errors.append({'row': row_no, 'plan_id': dto.plan_id, 'message': '计划编号已存在'})
+
+        if errors:
+            errors.sort(key=lambda error: error['row'])
+            logger.info(f"📥 [Service] 批量导入维保计划校验失败: {len(errors)} 行")
+            return {'created': 0, 'restored': 0, 'work_orders': 0, 'errors': errors}
+
+        plans = []
+        restored = 0
+        for _, dto in valid:
+            values = self._plan_values(dto, projects[dto.project_id].project_name)
+            plan = existing_plans.get(dto.plan_id)
+            if plan is None:
+                plan = MaintenancePlan(**values)
+            else:
+                for key, value in values.items():
+                    setattr(plan, key, value)
+                plan.is_deleted = False
+                plan.deleted_at = None
+                plan.deleted_by = None
+                restored += 1
+            plans.append(plan)
+
+        inspection_counts = Counter(('XJ', plan.project_id, plan.plan_start_date.date()) for plan in plans)
+
+        try:
+            # 所有项目、日期的工单编号一条语句预留
+            inspection_serials = {
+                key: iter(serials)
+                for key, serials in reserve_serial_ranges(self._db, inspection_counts).items()
+            }
+            self._db.add_all(plans)
+            for plan in plans:
+                project = projects[plan.project_id]
+                self._db.add(PeriodicInspection(
+                    inspection_id=format_work_order_id(
+                        'XJ', plan.project_id, plan.plan_start_date.date(),
+                        next(inspection_serials[('XJ', plan.project_id, plan.plan_start_date.date())])
+                    ),
+                    plan_id=plan.plan_id,
+                    project_id=plan.project_id,
+                    project_name=plan.project_name or project.project_name or '',
+                    plan_start_date=plan.plan_start_date,
+                    plan_end_date=plan.plan_end_date,
+                    client_name=project.client_name or plan.responsible_department,
+                    maintenance_personnel=plan.maintenance_personnel,
+                    status='执行中',
+                    remarks=plan.remarks
+                ))
+
+            self._db.flush()
+
+            if operator_name:
+                self._db.add_all([
+                    WorkOrderOperationLog(
+                        work_order_type='maintenance_plan',
+                        work_order_id=plan.id,
+                        work_order_no=plan.plan_id,
+                        operator_name=operator_name,
+                        operator_id=operator_id,
+                        operation_type='create',
+                        operation_type_code='create',
+                        operation_type_name='创建',
+                        operation_remark='批量导入维保计划'
+                    )
+                    for plan in plans
+                ])
+            self._db.commit()
+        except Exception:
+            self._db.rollback()
+            raise
+
+        logger.info(f"✅ [Service] 批量导入维保计划成功: {len(plans)} 条, 其中恢复 {restored} 条")
+        return {
+            'created': len(plans) - restored,
+            'restored': restored,
+            'work_orders': len(plans),
+            'errors': [],
+        }
+
     def update(
         self,
         id: int,
@@ -456,9 +698,6 @@ class MaintenancePlanService:
 
         result = self.repository.update(existing_plan)
 
-        self.sync_service.sync_maintenance_plan_to_work_plan(result)
-        logger.info(f"✅ [Service] 同步更新WorkPlan成功: plan_id={result.plan_id}")
-
         if operator_name and result.id:
             self._create_operation_log(
                 work_order_type='maintenance_plan',
@@ -526,7 +765,6 @@ class MaintenancePlanService:
                 work.soft_delete(user_id)
                 deleted_stats['spot_works'] += 1
 
-            self.sync_service.sync_maintenance_plan_to_work_plan(maintenance_plan, is_delete=True, user_id=user_id)
             deleted_stats['work_plan'] = True
 
             self.repository.soft_delete(maintenance_plan, user_id)
@@ -568,7 +806,6 @@ class MaintenancePlanService:
         maintenance_plan = self.repository.update_status(id, status)
         if not maintenance_plan:
             raise NotFoundException("维保计划不存在")
-        self.sync_service.sync_maintenance_plan_to_work_plan(maintenance_plan)
         return maintenance_plan
 
     def update_execution_status(
@@ -593,7 +830,6 @@ class MaintenancePlanService:
         maintenance_plan = self.repository.update_status(id, status)
         if not maintenance_plan:
             raise NotFoundException("维保计划不存在")
-        self.sync_service.sync_maintenance_plan_to_work_plan(maintenance_plan)
 
         if operator_name and maintenance_plan.id:
             self._create_operation_log(
@@ -629,7 +865,6 @@ class MaintenancePlanService:
         maintenance_plan = self.repository.update_completion_rate(id, rate)
         if not maintenance_plan:
             raise NotFoundException("维保计划不存在")
-        self.sync_service.sync_maintenance_plan_to_work_plan(maintenance_plan)
         return maintenance_plan
 
     def get_all_unpaginated(self) -> list[MaintenancePlan]:
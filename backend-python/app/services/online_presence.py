@@ -0,0 +1,404 @@
+"""
+在线用户心跳聚合
+心跳只更新进程内的在线用户表，后台任务每隔 N 秒把变化批量写入 online_users，
+在线人数、在线列表和在线统计直接读取内存
+
+- 写入：PostgreSQL 使用一条 UPDATE ... FROM (VALUES ...)，其他数据库使用 executemany；
+  没有在线记录的用户补插新行，心跳之后已登出的用户除外（登出时 last_activity 记为登出时间）
+- 同步：每次写入后从数据库重新加载在线记录，合并其他 worker 的心跳和登录/登出
+- 重启：启动时从数据库加载，关闭时写入剩余心跳；异常退出最多丢失一个周期的活动时间
+- 过期：后台任务定期把超过超时时间没有活动的在线记录批量置为离线
+"""
+import asyncio
+import logging
+import threading
+import time
+from dataclasses import dataclass, replace
+from datetime import datetime, timedelta
+
+from sqlalchemy import (
+    BigInteger,
+    DateTime,
+    String,
+    bindparam,
+    column,
+    func,
+    select,
+    update,
+    values,
+)
+from sqlalchemy.orm import Session
+
+from app.database import AsyncSessionLocal
+from app.models.online_user import OnlineUser
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class OnlinePresence:
+    """内存中的在线用户记录，字段与 OnlineUser 一致"""
+    user_id: int
+    user_name: str
+    login_time: datetime
+    last_activity: datetime
+    ip_address: str | None = None
+    device_type: str = 'h5'
+    department: str | None = None
+    role: str | None = None
+    id: int | None = None
+
+    @classmethod
+    def from_model(cls, online_user: OnlineUser) -> 'OnlinePresence':
+        """从数据库记录创建"""
+        return cls(
+            user_id=online_user.user_id,
+            user_name=online_user.user_name,
+            login_time=online_user.login_time,
+            last_activity=online_user.last_activity,
+            ip_address=online_user.ip_address,
+            device_type=online_user.device_type,
+            department=online_user.department,
+            role=online_user.role,
+            id=online_user.id,
+        )
+
+    def to_dict(self) -> dict:
+        return {
+            'id': self.id,
+            'user_id': self.user_id,
+            'user_name': self.user_name,
+            'department': self.department,
+            'role': self.role,
+            'login_time': self.login_time.isoformat() if self.login_time else None,
+            'last_activity': self.last_activity.isoformat() if self.last_activity else None,
+            'ip_address': self.ip_address,
+            'device_type': self.device_type,
+            'is_active': True,
+        }
+
+
+def build_values_update(pending: list[OnlinePresence]):
+    """
+    构建 PostgreSQL 批量更新语句
+
+    UPDATE online_users SET ... FROM (VALUES ...) AS heartbeats WHERE user_id 匹配且在线
+    """
+    table = OnlineUser.__table__
+    heartbeats = values(
+        column('user_id', BigInteger),
+        column('last_activity', DateTime),
+        column('ip_address', String),
+        column('device_type', String),
+        name='heartbeats',
+    ).data([
+        (entry.user_id, entry.last_activity, entry.ip_address, entry.device_type)
+        for entry in pending
+    ])
+    return (
+        update(table)
+        .where(table.c.user_id == heartbeats.c.user_id, table.c.is_active == True)
+        .values(
+            last_activity=heartbeats.c.last_activity,
+            ip_address=heartbeats.c.ip_address,
+            device_type=heartbeats.c.device_type,
+        )
+    )
+
+
+def count_today_logins(db: Session, today_start: datetime) -> int:
+    """
+    统计今日登录数，包括已离线的记录；在线人数由内存中的在线记录统计
+
+    Args:
+        db: 数据库会话
+        today_start: 今日零点
+
+    Returns:
+        今日登录数
+    """
+    return db.execute(
+        select(func.count()).select_from(OnlineUser).where(OnlineUser.login_time >= today_start)
+    ).scalar_one()
+
+
+class HeartbeatAggregator:
+    """
+    心跳聚合器
+    """
+
+    def __init__(self):
+        self._entries: dict[int, OnlinePresence] = {}
+        self._dirty: set[int] = set()
+        self._today_logins = 0
+        self._today = datetime.utcnow().date()
+        self._lock = threading.Lock()
+
+    def _roll_day(self, now: datetime) -> None:
+        """跨天后重置今日登录数，调用方持有锁"""
+        if now.date() != self._today:
+            self._today = now.date()
+            self._today_logins = 0
+
+    def record_heartbeat(
+        self,
+        user_id: int,
+        user_name: str,
+        ip_address: str,
+        device_type: str,
+        now: datetime | None = None
+    ) -> None:
+        """
+        记录一次心跳，不访问数据库
+
+        Args:
+            user_id: 用户ID
+            user_name: 用户姓名
+            ip_address: IP地址
+            device_type: 设备类型
+            now: 心跳时间
+        """
+        now = now or datetime.utcnow()
+        with self._lock:
+            self._roll_day(now)
+            entry = self._entries.get(user_id)
+            if entry is None:
+                self._entries[user_id] = OnlinePresence(
+                    user_id=user_id,
+                    user_name=user_name,
+                    login_time=now,
+                    last_activity=now,
+                    ip_address=ip_address,
+                    device_type=device_type,
+                )
+                self._today_logins += 1
+            else:
+                entry.last_activity = now
+                entry.ip_address = ip_address
+                entry.device_type = device_type
+            self._dirty.add(user_id)
+
+    def record_login(self, online_user: OnlineUser, new_session: bool) -> None:
+        """
+        登录已写入数据库后同步到内存
+
+        Args:
+            online_user: 登录后的在线记录
+            new_session: 是否新建了在线记录
+        """
+        with self._lock:
+            self._roll_day(online_user.login_time)
+            self._entries[online_user.user_id] = OnlinePresence.from_model(online_user)
+            self._dirty.discard(online_user.user_id)
+            if new_session:
+                self._today_logins += 1
+
+    def record_logout(self, user_id: int) -> None:
+        """登出已写入数据库后从内存移除，未写入的心跳一并丢弃"""
+        with self._lock:
+            self._entries.pop(user_id, None)
+            self._dirty.discard(user_id)
+
+    def count(self) -> int:
+        """在线用户数量"""
+        with self._lock:
+            return len(self._entries)
+
+    def users(self) -> list[dict]:
+        """在线用户列表，按登录时间倒序"""
+        with self._lock:
+            entries = list(self._entries.values())
+        entries.sort(key=lambda entry: entry.login_time, reverse=True)
+        return [entry.to_dict() for entry in entries]
+
+    def statistics(self) -> dict:
+        """在线用户统计"""
+        with self._lock:
+            self._roll_day(datetime.utcnow())
+            entries = list(self._entries.values())
+            today_logins = self._today_logins
+        return {
+            "total_online": len(entries),
+            "h5_count": sum(1 for entry in entries if entry.device_type == "h5"),
+            "pc_count": sum(1 for entry in entries if entry.device_type == "pc"),
+            "today_logins": today_logins,
+        }
+
+    def _write(self, db: Session, pending: list[OnlinePresence]) -> None:
+        """批量写入心跳，没有在线记录的用户补插新行"""
+        table = OnlineUser.__table__
+        if db.get_bind().dialect.name == 'postgresql':
+            db.execute(build_values_update(pending))
+        else:
+            rows = [
+                {
+                    'b_user_id': entry.user_id,
+                    'b_last_activity': entry.last_activity,
+                    'b_ip_address': entry.ip_address,
+                    'b_device_type': entry.device_type,
+                }
+                for entry in pending
+            ]
+            db.execute(
+                update(table)
+                .where(table.c.user_id == bindparam('b_user_id'), table.c.is_active == True)
+                .values(
+                    last_activity=bindparam('b_last_activity'),
+                    ip_address=bindparam('b_ip_address'),
+                    device_type=bindparam('b_device_type'),
+                ),
+                rows,
+            )
+
+        user_ids = [entry.user_id for entry in pending]
+        sessions = {
+            row.user_id: row
+            for row in db.execute(
+                select(
+                    table.c.user_id,
+                    func.count().filter(table.c.is_active == True).label('active_count'),
+                    func.max(table.c.last_activity).filter(table.c.is_active == False).label('logged_out_at'),
+                )
+                .where(table.c.user_id.in_(user_ids))
+                .group_by(table.c.user_id)
+            )
+        }
+
+        def is_missing(entry: OnlinePresence) -> bool:
+            session = sessions.get(entry.user_id)
+            if session is None:
+                return True
+            if session.active_count:
+                return False
+            # 登出时刷新 last_activity，心跳取出后才登出的会话不再补插
+            return session.logged_out_at is None or session.logged_out_at < entry.last_activity
+
+        missing = [entry for entry in pending if is_missing(entry)]
+        if missing:
+            db.execute(table.insert(), [
+                {
+                    'user_id': entry.user_id,
+                    'user_name': entry.user_name,
+                    'login_time': entry.login_time,
+                    'last_activity': entry.last_activity,
+                    'ip_address': entry.ip_address,
+                    'device_type': entry.device_type,
+                    'is_active': True,
+                }
+                for entry in missing
+            ])
+
+    def _reload(self, db: Session) -> None:
+        """从数据库重新加载在线记录，保留尚未写入的心跳"""
+        active = db.query(OnlineUser).filter(OnlineUser.is_active == True).all()
+        today_start = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+        today_logins = count_today_logins(db, today_start)
+
+        with self._lock:
+            entries = {row.user_id: OnlinePresence.from_model(row) for row in active}
+            for user_id in self._dirty:
+                entries[user_id] = self._entries[user_id]
+            self._entries = entries
+            self._today = today_start.date()
+            self._today_logins = today_logins + sum(
+                1 for user_id in self._dirty if entries[user_id].id is None
+            )
+
+    def flush(self, db: Session, reload: bool = True) -> int:
+        """
+        写入积累的心跳
+
+        Args:
+            db: 数据库会话
+            reload: 写入后是否从数据库重新加载在线记录
+
+        Returns:
+            写入的心跳数量
+        """
+        with self._lock:
+            pending = [replace(self._entries[user_id]) for user_id in self._dirty]
+            self._dirty.clear()
+
+        try:
+            if pending:
+                self._write(db, pending)
+                db.commit()
+        except BaseException:
+            db.rollback()
+            with self._lock:
+                for entry in pending:
+                    if entry.user_id in self._entries:
+                        self._dirty.add(entry.user_id)
+            raise
+
+        if reload:
+            self._reload(db)
+        return len(pending)
+
+    def load(self, db: Session) -> None:
+        """启动时从数据库加载在线记录"""
+        self._reload(db)
+
+    def sweep(self, db: Session, timeout_minutes: int) -> int:
+        """
+        将超时未活动的在线记录置为离线
+
+        先写入积累的心跳，避免刚活动过的用户被误判；
+        UPDATE 条件与部分索引 (last_activity) WHERE is_active 一致
+
+        Args:
+            db: 数据库会话
+            timeout_minutes: 超时分钟数
+
+        Returns:
+            置为离线的记录数
+        """
+        self.flush(db, reload=False)
+        cutoff = datetime.utcnow() - timedelta(minutes=timeout_minutes)
+        try:
+            result = db.execute(
+                update(OnlineUser.__table__)
+                .where(OnlineUser.is_active == True, OnlineUser.last_activity < cutoff)
+                .values(is_active=False)
+            )
+            db.commit()
+        except BaseException:
+            db.rollback()
+            raise
+
+        self._reload(db)
+        return result.rowcount or 0
+
+
+heartbeat_aggregator = HeartbeatAggregator()
+
+
+async def run_heartbeat_flush_loop(
+    interval_seconds: int,
+    session_timeout_minutes: int,
+    sweep_interval_seconds: int
+) -> None:
+    """
+    后台定时写入心跳并清理超时会话
+
+    Args:
+        interval_seconds: 写入间隔秒数
+        session_timeout_minutes: 会话超时分钟数
+        sweep_interval_seconds: 清理间隔秒数
+    """
+    last_sweep = time.monotonic()
+    while True:
+        await asyncio.sleep(interval_seconds)
+        try:
+            async with AsyncSessionLocal() as db:
+                if time.monotonic() - last_sweep >= sweep_interval_seconds:
+                    last_sweep = time.monotonic()
+                    swept = await db.run_sync(heartbeat_aggregator.sweep, session_timeout_minutes)
+                    if swept:
+                        logger.info(f"清理超时在线会话 {swept} 个")
+                else:
+                    flushed = await db.run_sync(heartbeat_aggregator.flush)
+                    if flushed:
+                        logger.debug(f"写入心跳 {flushed} 条")
+        except Exception as e:
+            logger.error(f"写入心跳失败: {str(e)}")
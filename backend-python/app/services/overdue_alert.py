@@ -1,12 +1,10 @@
 import logging
-from datetime import date, datetime
+from datetime import date
 
 from sqlalchemy.orm import Session
 
 from app.config import OverdueAlertConfig
-from app.models.periodic_inspection import PeriodicInspection
-from app.models.spot_work import SpotWork
-from app.models.temporary_repair import TemporaryRepair
+from app.repositories.work_order import ALERT_OVERDUE, WorkOrderRepository
 
 logger = logging.getLogger(__name__)
 
@@ -19,6 +17,7 @@ class OverdueAlertService:
 
     def __init__(self, db: Session):
         self.db = db
+        self.repository = WorkOrderRepository(db)
 
     def get_overdue_items(
         self,
@@ -32,6 +31,8 @@ class OverdueAlertService:
         """
         获取超期工单列表
 
+        三种工单在数据库中合并、按超期天数倒序排序并分页，只取当前页
+
         Args:
             project_name: 项目名称筛选
             client_name: 客户名称筛选
@@ -43,219 +44,36 @@ class OverdueAlertService:
         Returns:
             tuple: (超期工单列表, 总数)
         """
-        today = date.today()
-        overdue_items = []
-
-        valid_statuses = OverdueAlertConfig.VALID_STATUSES
-
-        if work_order_type is None or work_order_type == '定期巡检':
-            items = self._get_overdue_periodic_inspections(
-                today=today,
-                valid_statuses=valid_statuses,
-                project_name=project_name,
-                client_name=client_name,
-                maintenance_personnel=maintenance_personnel
-            )
-            overdue_items.extend(items)
-
-        if work_order_type is None or work_order_type == '临时维修':
-            items = self._get_overdue_temporary_repairs(
-                today=today,
-                valid_statuses=valid_statuses,
-                project_name=project_name,
-                client_name=client_name,
-                maintenance_personnel=maintenance_personnel
-            )
-            overdue_items.extend(items)
-
-        if work_order_type is None or work_order_type == '零星用工':
-            items = self._get_overdue_spot_works(
-                today=today,
-                valid_statuses=valid_statuses,
+        try:
+            rows, total = self.repository.find_alert_page(
+                alert_type=ALERT_OVERDUE,
+                today=date.today(),
+                statuses=OverdueAlertConfig.VALID_STATUSES,
+                page=page,
+                size=size,
                 project_name=project_name,
                 client_name=client_name,
+                work_order_type=work_order_type,
                 maintenance_personnel=maintenance_personnel
             )
-            overdue_items.extend(items)
-
-        overdue_items.sort(key=lambda x: x['overdueDays'], reverse=True)
-
-        total = len(overdue_items)
-        start = page * size
-        end = start + size
-        paginated_items = overdue_items[start:end]
-
-        return paginated_items, total
-
-    def _get_plan_end_date(self, record) -> date:
-        """
-        获取计划结束日期，统一转换为date类型
-        """
-        plan_end_date = record.plan_end_date
-        if plan_end_date is None:
-            return None
-        if isinstance(plan_end_date, datetime):
-            return plan_end_date.date()
-        return plan_end_date
-
-    def _get_overdue_periodic_inspections(
-        self,
-        today: date,
-        valid_statuses: list[str],
-        project_name: str | None = None,
-        client_name: str | None = None,
-        maintenance_personnel: str | None = None
-    ) -> list[dict]:
-        """
-        获取超期的定期巡检工单
-        """
-        try:
-            query = self.db.query(PeriodicInspection).filter(
-                PeriodicInspection.plan_end_date < datetime.combine(today, datetime.min.time()),
-                PeriodicInspection.status.in_(valid_statuses),
-                PeriodicInspection.is_deleted == False
-            )
-
-            if project_name:
-                query = query.filter(PeriodicInspection.project_name.like(f"%{project_name}%"))
-
-            if client_name:
-                query = query.filter(PeriodicInspection.client_name.like(f"%{client_name}%"))
-
-            if maintenance_personnel:
-                query = query.filter(PeriodicInspection.maintenance_personnel == maintenance_personnel)
-
-            inspections = query.all()
-
-            items = []
-            for inspection in inspections:
-                plan_end = self._get_plan_end_date(inspection)
-                if plan_end is None:
-                    continue
-                overdue_days = (today - plan_end).days
-                items.append({
-                    'id': str(inspection.id),
-                    'workOrderNo': inspection.inspection_id,
-                    'project_id': inspection.project_id,
-                    'projectName': inspection.project_name,
-                    'customerName': inspection.client_name,
-                    'workOrderType': '定期巡检',
-                    'planEndDate': plan_end.isoformat() if plan_end else None,
-                    'workOrderStatus': inspection.status,
-                    'overdueDays': overdue_days,
-                    'executor': inspection.maintenance_personnel
-                })
-
-            return items
-        except Exception as e:
-            logger.error(f"查询超期定期巡检失败: {str(e)}")
-            return []
-
-    def _get_overdue_temporary_repairs(
-        self,
-        today: date,
-        valid_statuses: list[str],
-        project_name: str | None = None,
-        client_name: str | None = None,
-        maintenance_personnel: str | None = None
-    ) -> list[dict]:
-        """
-        获取超期的临时维修工单
-        """
-        try:
-            query = self.db.query(TemporaryRepair).filter(
-                TemporaryRepair.plan_end_date < datetime.combine(today, datetime.min.time()),
-                TemporaryRepair.status.in_(valid_statuses),
-                TemporaryRepair.is_deleted == False
-            )
-
-            if project_name:
-                query = query.filter(TemporaryRepair.project_name.like(f"%{project_name}%"))
-
-            if client_name:
-                query = query.filter(TemporaryRepair.client_name.like(f"%{client_name}%"))
-
-            if maintenance_personnel:
-                query = query.filter(TemporaryRepair.maintenance_personnel == maintenance_personnel)
-
-            repairs = query.all()
-
-            items = []
-            for repair in repairs:
-                plan_end = self._get_plan_end_date(repair)
-                if plan_end is None:
-                    continue
-                overdue_days = (today - plan_end).days
-                items.append({
-                    'id': str(repair.id),
-                    'workOrderNo': repair.repair_id,
-                    'project_id': repair.project_id,
-                    'projectName': repair.project_name,
-                    'customerName': repair.client_name,
-                    'workOrderType': '临时维修',
-                    'planEndDate': plan_end.isoformat() if plan_end else None,
-                    'workOrderStatus': repair.status,
-                    'overdueDays': overdue_days,
-                    'executor': repair.maintenance_personnel
-                })
-
-            return items
-        except Exception as e:
-            logger.error(f"查询超期临时维修失败: {str(e)}")
-            return []
-
-    def _get_overdue_spot_works(
-        self,
-        today: date,
-        valid_statuses: list[str],
-        project_name: str | None = None,
-        client_name: str | None = None,
-        maintenance_personnel: str | None = None
-    ) -> list[dict]:
-        """
-        获取超期的零星用工工单
-        """
-        try:
-            query = self.db.query(SpotWork).filter(
-                SpotWork.plan_end_date < datetime.combine(today, datetime.min.time()),
-                SpotWork.status.in_(valid_statuses),
-                SpotWork.is_deleted == False
-            )
-
-            if project_name:
-                query = query.filter(SpotWork.project_name.like(f"%{project_name}%"))
-
-            if client_name:
-                query = query.filter(SpotWork.client_name.like(f"%{client_name}%"))
-
-            if maintenance_personnel:
-                query = query.filter(SpotWork.maintenance_personnel == maintenance_personnel)
-
-            works = query.all()
-
-            items = []
-            for work in works:
-                plan_end = self._get_plan_end_date(work)
-                if plan_end is None:
-                    continue
-                overdue_days = (today - plan_end).days
-                items.append({
-                    'id': str(work.id),
-                    'workOrderNo': work.work_id,
-                    'project_id': work.project_id,
-                    'projectName': work.project_name,
-                    'customerName': work.client_name,
-                    'workOrderType': '零星用工',
-                    'planEndDate': plan_end.isoformat() if plan_end else None,
-                    'workOrderStatus': work.status,
-                    'overdueDays': overdue_days,
-                    'executor': work.maintenance_personnel
-                })
-
-            return items
         except Exception as e:
-            logger.error(f"查询超期零星用工失败: {str(e)}")
-            return []
+            logger.error(f"查询超期工单失败: {str(e)}")
+            return [], 0
+
+        items = [{
+            'id': str(row['id']),
+            'workOrderNo': row['work_order_no'],
+            'project_id': row['project_id'],
+            'projectName': row['project_name'],
+            'customerName': row['client_name'],
+            'workOrderType': row['work_order_type'],
+            'planEndDate': row['plan_end_date'].date().isoformat(),
+            'workOrderStatus': row['status'],
+            'overdueDays': row['days'],
+            'executor': row['executor']
+        } for row in rows]
+
+        return items, total
 
     def get_overdue_count(self, maintenance_personnel: str | None = None) -> int:
         """
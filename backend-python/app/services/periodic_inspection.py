@@ -2,7 +2,6 @@
 定期巡检服务
 提供定期巡检业务逻辑处理
 """
-import json
 import logging
 from datetime import datetime
 
@@ -19,7 +18,7 @@ from app.schemas.periodic_inspection import (
     PeriodicInspectionPartialUpdate,
     PeriodicInspectionUpdate,
 )
-from app.services.sync_service import PLAN_TYPE_INSPECTION, SyncService
+from app.services.inspection_progress import InspectionProgressService, plans_total_count
 from app.utils.date_utils import parse_datetime
 from app.utils.dictionary_helper import get_default_periodic_inspection_status
 from app.utils.work_order_id_generator import generate_inspection_id
@@ -36,7 +35,6 @@ class PeriodicInspectionService:
     def __init__(self, db: Session):
         self.repository = PeriodicInspectionRepository(db)
         self.personnel_repository = PersonnelRepository(db)
-        self.sync_service = SyncService(db)
         self._db = db
 
     def _parse_date(self, date_value: str | datetime | None) -> datetime | None:
@@ -104,7 +102,8 @@ class PeriodicInspectionService:
         client_name: str | None = None,
         inspection_id: str | None = None,
         status: str | None = None,
-        maintenance_personnel: str | None = None
+        maintenance_personnel: str | None = None,
+        projection: str | None = None
     ) -> tuple[list[PeriodicInspection], int]:
         """
         分页获取定期巡检列表
@@ -117,12 +116,13 @@ class PeriodicInspectionService:
             inspection_id: 巡检单编号
             status: 状态
             maintenance_personnel: 运维人员
+            projection: 列投影名称，None 表示加载完整实体
 
         Returns:
             (巡检单列表, 总数)
         """
         return self.repository.find_all(
-            page, size, project_name, client_name, inspection_id, status, maintenance_personnel
+            page, size, project_name, client_name, inspection_id, status, maintenance_personnel, projection
         )
 
     def get_by_id(self, id: int) -> PeriodicInspection:
@@ -209,7 +209,6 @@ class PeriodicInspectionService:
         )
 
         result = self.repository.create(inspection)
-        self.sync_service.sync_order_to_work_plan(PLAN_TYPE_INSPECTION, result)
 
         if operator_name and result.id:
             self._create_operation_log(
@@ -272,7 +271,6 @@ class PeriodicInspectionService:
             existing_inspection.signature = dto.signature
 
         result = self.repository.update(existing_inspection)
-        self.sync_service.sync_order_to_work_plan(PLAN_TYPE_INSPECTION, result)
 
         if operator_name and result.id:
             self._create_operation_log(
@@ -300,7 +298,6 @@ class PeriodicInspectionService:
             NotFoundException: 巡检单不存在
         """
         inspection = self.get_by_id(id)
-        self.sync_service.sync_order_to_work_plan(PLAN_TYPE_INSPECTION, inspection, is_delete=True, user_id=user_id)
 
         if operator_name and inspection.id:
             self._create_operation_log(
@@ -360,7 +357,6 @@ class PeriodicInspectionService:
                 existing_inspection.actual_completion_date = datetime.now()
 
         result = self.repository.update(existing_inspection)
-        self.sync_service.sync_order_to_work_plan(PLAN_TYPE_INSPECTION, result)
         self._db.commit()
         return result
 
@@ -408,8 +404,8 @@ class PeriodicInspectionService:
 
     def get_inspection_counts_batch(self, inspections: list[PeriodicInspection]) -> dict:
         """
-        批量计算多个巡检单的已填写数量和总数量
-        避免N+1查询问题
+        批量读取多个巡检单的已填写数量和总数量
+        进度由 inspection_progress 表维护，列表每行只读两个整数
 
         total_count: 工单关联的维保计划中配置的巡检事项总数
         filled_count: 已处理的巡检记录数量
@@ -422,126 +418,7 @@ class PeriodicInspectionService:
         """
         if not inspections:
             return {}
-
-        inspection_ids = [ins.inspection_id for ins in inspections]
-
-        all_records = self._db.query(PeriodicInspectionRecord).filter(
-            PeriodicInspectionRecord.inspection_id.in_(inspection_ids)
-        ).all()
-
-        records_by_inspection = {}
-        for record in all_records:
-            if record.inspection_id not in records_by_inspection:
-                records_by_inspection[record.inspection_id] = []
-            records_by_inspection[record.inspection_id].append(record)
-
-        plan_ids = list({ins.plan_id for ins in inspections if ins.plan_id})
-        plans_by_id = {}
-        if plan_ids:
-            plans = self._db.query(MaintenancePlan).filter(
-                MaintenancePlan.plan_id.in_(plan_ids)
-            ).all()
-            for plan in plans:
-                plans_by_id[plan.plan_id] = plan
-
-        project_ids = list({ins.project_id for ins in inspections if ins.project_id})
-        plans_by_project = {}
-        if project_ids:
-            project_plans = self._db.query(MaintenancePlan).filter(
-                MaintenancePlan.project_id.in_(project_ids)
-            ).all()
-            for plan in project_plans:
-                if plan.project_id not in plans_by_project:
-                    plans_by_project[plan.project_id] = []
-                plans_by_project[plan.project_id].append(plan)
-
-        result = {}
-        for ins in inspections:
-            records = records_by_inspection.get(ins.inspection_id, [])
-
-            total_count = 0
-            if ins.plan_id and ins.plan_id in plans_by_id:
-                plan = plans_by_id[ins.plan_id]
-                total_count = self._get_plan_items_count(plan)
-            else:
-                project_plans = plans_by_project.get(ins.project_id, [])
-                total_count = self._get_total_count_from_plans_cached(
-                    project_plans, ins.plan_start_date, ins.plan_end_date
-                )
-
-            filled_count = 0
-            if records:
-                unique_items = {}
-                for record in records:
-                    key = record.inspection_content or record.item_name
-                    if key not in unique_items:
-                        unique_items[key] = {'inspected': False}
-                    if record.inspected:
-                        unique_items[key]['inspected'] = True
-                filled_count = sum(1 for item in unique_items.values() if item['inspected'])
-
-            result[ins.inspection_id] = {
-                'total_count': total_count,
-                'filled_count': filled_count
-            }
-
-        return result
-
-    def _get_plan_items_count(self, plan: MaintenancePlan) -> int:
-        """
-        从维保计划中获取巡检事项总数
-
-        Args:
-            plan: 维保计划对象
-
-        Returns:
-            巡检事项总数
-        """
-        if not plan or not plan.inspection_items:
-            return 0
-
-        try:
-            items = json.loads(plan.inspection_items)
-            if isinstance(items, list):
-                return len(items)
-        except (json.JSONDecodeError, TypeError):
-            pass
-
-        return 0
-
-    def _get_total_count_from_plans_cached(self, plans: list, plan_start_date: datetime, plan_end_date: datetime) -> int:
-        """
-        从缓存的维保计划列表中获取3级节点总数
-        """
-        if not plan_start_date or not plan_end_date:
-            return 0
-
-        try:
-            order_start = plan_start_date.replace(hour=0, minute=0, second=0, microsecond=0)
-            order_end = plan_end_date.replace(hour=0, minute=0, second=0, microsecond=0)
-
-            unique_items = set()
-            for plan in plans:
-                if not plan.plan_start_date or not plan.plan_end_date:
-                    continue
-                plan_start = plan.plan_start_date.replace(hour=0, minute=0, second=0, microsecond=0)
-                plan_end = plan.plan_end_date.replace(hour=0, minute=0, second=0, microsecond=0)
-
-                if order_start <= plan_end and order_end >= plan_start:
-                    if plan.inspection_items:
-                        try:
-                            items = json.loads(plan.inspection_items)
-                            for item in items:
-                                inspection_content = item.get('inspection_content', '')
-                                if inspection_content:
-                                    unique_items.add(inspection_content)
-                        except (json.JSONDecodeError, TypeError):
-                            pass
-
-            return len(unique_items)
-        except Exception as e:
-            logger.error(f"Error getting total count from plans: {e}")
-            return 0
+        return InspectionProgressService(self._db).get_counts(ins.inspection_id for ins in inspections)
 
     def _get_total_count_from_plans(self, project_id: str, plan_start_date: datetime, plan_end_date: datetime) -> int:
         """
@@ -550,33 +427,12 @@ class PeriodicInspectionService:
         if not project_id or not plan_start_date or not plan_end_date:
             return 0
 
-        try:
-            plans = self._db.query(MaintenancePlan).filter(
-                MaintenancePlan.project_id == project_id
-            ).all()
-
-            order_start = plan_start_date.replace(hour=0, minute=0, second=0, microsecond=0)
-            order_end = plan_end_date.replace(hour=0, minute=0, second=0, microsecond=0)
-
-            unique_items = set()
-            for plan in plans:
-                if not plan.plan_start_date or not plan.plan_end_date:
-                    continue
-                plan_start = plan.plan_start_date.replace(hour=0, minute=0, second=0, microsecond=0)
-                plan_end = plan.plan_end_date.replace(hour=0, minute=0, second=0, microsecond=0)
-
-                if order_start <= plan_end and order_end >= plan_start:
-                    if plan.inspection_items:
-                        try:
-                            items = json.loads(plan.inspection_items)
-                            for item in items:
-                                inspection_content = item.get('inspection_content', '')
-                                if inspection_content:
-                                    unique_items.add(inspection_content)
-                        except (json.JSONDecodeError, TypeError):
-                            pass
-
-            return len(unique_items)
-        except Exception as e:
-            logger.error(f"Error getting total count from plans: {e}")
-            return 0
+        plans = self._db.query(
+            MaintenancePlan.plan_start_date,
+            MaintenancePlan.plan_end_date,
+            MaintenancePlan.inspection_contents,
+        ).filter(
+            MaintenancePlan.project_id == project_id,
+            MaintenancePlan.inspection_contents.isnot(None)
+        ).all()
+        return plans_total_count(plans, plan_start_date, plan_end_date)
@@ -13,6 +13,13 @@ from app.schemas.periodic_inspection_record import (
     PeriodicInspectionRecordCreate,
     PeriodicInspectionRecordUpdate,
 )
+from app.services.inspection_progress import refresh_progress
+from app.utils.signed_url import strip_upload_signature
+
+
+def _photos_json(photos: list | None) -> str:
+    """图片列表序列化为 JSON，客户端回传的签名地址只保存引用"""
+    return json.dumps([strip_upload_signature(photo) for photo in photos or []])
 
 
 class PeriodicInspectionRecordService:
@@ -81,7 +88,7 @@ class PeriodicInspectionRecordService:
         if dto.inspected is not None:
             record.inspected = dto.inspected
         if dto.photos is not None:
-            record.photos = json.dumps(dto.photos)
+            record.photos = _photos_json(dto.photos)
         if dto.inspection_result is not None:
             record.inspection_result = dto.inspection_result
 
@@ -110,7 +117,7 @@ class PeriodicInspectionRecordService:
             equipment_name=dto.equipment_name,
             equipment_location=dto.equipment_location,
             inspected=dto.inspected or False,
-            photos=json.dumps(dto.photos) if dto.photos else '[]',
+            photos=_photos_json(dto.photos),
             inspection_result=dto.inspection_result
         )
 
@@ -118,18 +125,38 @@ class PeriodicInspectionRecordService:
         """
         批量保存巡检记录
 
+        单条 INSERT ... ON CONFLICT DO UPDATE ... RETURNING 写入全部记录，
+        并在同一事务内重算巡检单进度
+
         Args:
             dto: 批量保存数据传输对象
 
         Returns:
             保存的记录列表
         """
-        results = []
-        for record_dto in dto.records:
-            record_dto.inspection_id = dto.inspection_id
-            result = self.upsert(record_dto)
-            results.append(result)
-        self._db.commit()
+        rows = [
+            {
+                'item_id': record_dto.item_id,
+                'item_name': record_dto.item_name,
+                'inspection_item': record_dto.inspection_item,
+                'inspection_content': record_dto.inspection_content,
+                'check_content': record_dto.check_content,
+                'brief_description': record_dto.brief_description,
+                'equipment_name': record_dto.equipment_name,
+                'equipment_location': record_dto.equipment_location,
+                'inspected': record_dto.inspected or False,
+                'photos': _photos_json(record_dto.photos),
+                'inspection_result': record_dto.inspection_result,
+            }
+            for record_dto in dto.records
+        ]
+        try:
+            results = self.repository.bulk_upsert(dto.inspection_id, rows)
+            refresh_progress(self._db, [dto.inspection_id])
+            self._db.commit()
+        except Exception:
+            self._db.rollback()
+            raise
         return results
 
     def delete(self, record_id: int) -> None:
@@ -1,17 +1,52 @@
 
+import logging
+
+from sqlalchemy import update
 from sqlalchemy.orm import Session
 
 from app.exceptions import NotFoundException
+from app.models.maintenance_log import MaintenanceLog
 from app.models.maintenance_plan import MaintenancePlan
 from app.models.online_user import OnlineUser
 from app.models.periodic_inspection import PeriodicInspection
 from app.models.personnel import Personnel
 from app.models.project_info import ProjectInfo
+from app.models.repair_tools import RepairToolsIssue
+from app.models.repair_tools_inbound import RepairToolsInbound
+from app.models.spare_parts_inbound import SparePartsInbound
+from app.models.spare_parts_usage import SparePartsUsage
 from app.models.spot_work import SpotWork
 from app.models.temporary_repair import TemporaryRepair
+from app.models.weekly_report import WeeklyReport
+from app.models.work_order_operation_log import WorkOrderOperationLog
 from app.models.work_plan import WorkPlan
 from app.repositories.personnel import PersonnelRepository
 from app.schemas.personnel import PersonnelCreate, PersonnelUpdate
+from app.services.reference_cache import reference_cache
+from app.services.work_order_rollup import ROLLUP_SOURCES, WorkOrderRollupService
+from app.utils.db_batches import iter_id_ranges
+
+logger = logging.getLogger(__name__)
+
+# 按人员姓名关联的字段，人员改名时同步更新
+PERSONNEL_NAME_COLUMNS = (
+    (ProjectInfo, 'project_manager'),
+    (MaintenancePlan, 'maintenance_personnel'),
+    (WorkPlan, 'maintenance_personnel'),
+    (PeriodicInspection, 'maintenance_personnel'),
+    (TemporaryRepair, 'maintenance_personnel'),
+    (SpotWork, 'maintenance_personnel'),
+    (SparePartsUsage, 'user_name'),
+    (SparePartsInbound, 'user_name'),
+    (RepairToolsIssue, 'user_name'),
+    (RepairToolsInbound, 'user_name'),
+    (WorkOrderOperationLog, 'operator_name'),
+    (MaintenanceLog, 'created_by'),
+    (WeeklyReport, 'created_by'),
+    (WeeklyReport, 'approved_by'),
+)
+
+RENAME_CHUNK_SIZE = 1000
 
 
 # TODO: 后续考虑加入人员权限校验
@@ -113,60 +148,45 @@ class PersonnelService:
 
         return result
 
-    def _sync_personnel_name_to_all_tables(self, old_name: str, new_name: str) -> None:
+    def _sync_personnel_name_to_all_tables(self, old_name: str, new_name: str) -> dict[str, int]:
         """
         同步更新所有关联表中的人员姓名
+        逐表执行批量 UPDATE，按主键分段提交，单个事务只锁定一段记录；
+        工单表同一事务内同步移动日汇总
         @param old_name: 原姓名
         @param new_name: 新姓名
+        @return: {表名.字段: 更新条数}
         """
         db = self.repository.db
-        updated_count = 0
-
-        project_infos = db.query(ProjectInfo).filter(
-            ProjectInfo.project_manager == old_name
-        ).all()
-        for project in project_infos:
-            project.project_manager = new_name
-            updated_count += 1
-
-        maintenance_plans = db.query(MaintenancePlan).filter(
-            MaintenancePlan.maintenance_personnel == old_name
-        ).all()
-        for plan in maintenance_plans:
-            plan.maintenance_personnel = new_name
-            updated_count += 1
-
-        work_plans = db.query(WorkPlan).filter(
-            WorkPlan.maintenance_personnel == old_name
-        ).all()
-        for plan in work_plans:
-            plan.maintenance_personnel = new_name
-            updated_count += 1
-
-        periodic_inspections = db.query(PeriodicInspection).filter(
-            PeriodicInspection.maintenance_personnel == old_name
-        ).all()
-        for inspection in periodic_inspections:
-            inspection.maintenance_personnel = new_name
-            updated_count += 1
-
-        temporary_repairs = db.query(TemporaryRepair).filter(
-            TemporaryRepair.maintenance_personnel == old_name
-        ).all()
-        for repair in temporary_repairs:
-            repair.maintenance_personnel = new_name
-            updated_count += 1
-
-        spot_works = db.query(SpotWork).filter(
-            SpotWork.maintenance_personnel == old_name
-        ).all()
-        for work in spot_works:
-            work.maintenance_personnel = new_name
-            updated_count += 1
-
-        if updated_count > 0:
-            db.commit()
-            print(f"[PersonnelService] 同步更新人员姓名: '{old_name}' -> '{new_name}', 共更新 {updated_count} 条记录")
+        rollup = WorkOrderRollupService(db)
+        counts = {}
+
+        for model, field in PERSONNEL_NAME_COLUMNS:
+            column = getattr(model, field)
+            updated = 0
+            for min_id, max_id, _ in iter_id_ranges(db, model, column == old_name, chunk_size=RENAME_CHUNK_SIZE):
+                try:
+                    if model in ROLLUP_SOURCES:
+                        rollup.move_personnel(model, old_name, new_name, min_id, max_id)
+                    result = db.execute(
+                        update(model)
+                        .where(column == old_name, model.id.between(min_id, max_id))
+                        .values({field: new_name})
+                        .execution_options(synchronize_session=False)
+                    )
+                    db.commit()
+                except Exception:
+                    db.rollback()
+                    logger.error(
+                        f"同步人员姓名失败: {model.__tablename__} '{old_name}' -> '{new_name}'，"
+                        f"已完成 {counts}"
+                    )
+                    raise
+                updated += result.rowcount
+            counts[f"{model.__tablename__}.{field}"] = updated
+
+        logger.info(f"同步更新人员姓名: '{old_name}' -> '{new_name}', {counts}")
+        return counts
 
     def _sync_online_user_info(self, user_id: int, name: str, department: str, role: str) -> None:
         """
@@ -224,6 +244,16 @@ class PersonnelService:
         """
         return self.repository.find_all_unpaginated()
 
+    def get_all_dicts(self) -> list[dict]:
+        """
+        获取所有人员的字典列表（不分页），结果缓存在参考数据缓存中
+        @return: 人员字典列表
+        """
+        return reference_cache.get_or_load(
+            self.repository.db, 'personnel', 'all',
+            lambda: [item.to_dict() for item in self.repository.find_all_unpaginated()],
+        )
+
     def validate_personnel_exists(self, name: str) -> bool:
         """
         验证人员姓名是否存在于personnel表中
@@ -234,8 +264,10 @@ class PersonnelService:
 
     def get_all_names(self) -> list[str]:
         """
-        获取所有人员姓名列表
+        获取所有人员姓名列表，结果缓存在参考数据缓存中
         @return: 人员姓名列表
         """
-        personnel_list = self.repository.find_all_unpaginated()
-        return [p.name for p in personnel_list]
+        return reference_cache.get_or_load(
+            self.repository.db, 'personnel', 'names',
+            lambda: [p.name for p in self.repository.find_all_unpaginated()],
+        )
@@ -4,14 +4,49 @@
 """
 import logging
 
+from sqlalchemy import delete, or_, update
 from sqlalchemy.orm import Session
 
+from app.config import get_settings
 from app.exceptions import DuplicateException, NotFoundException, ValidationException
+from app.models.maintenance_plan import MaintenancePlan
+from app.models.periodic_inspection import PeriodicInspection
 from app.models.project_info import ProjectInfo
+from app.models.repair_tools import RepairToolsIssue
+from app.models.spare_parts_usage import SparePartsUsage
+from app.models.spot_work import SpotWork
+from app.models.temporary_repair import TemporaryRepair
+from app.models.work_plan import WorkPlan
 from app.repositories.project_info import ProjectInfoRepository
 from app.schemas.project_info import ProjectInfoCreate, ProjectInfoUpdate
+from app.services.background_jobs import BackgroundJobService, JobContext, register_job
+from app.services.reference_cache import reference_cache
+from app.services.work_order_rollup import ROLLUP_SOURCES, WorkOrderRollupService
+from app.services.work_plan_outbox import record_bulk_changes
+from app.utils.db_batches import iter_id_ranges
 
 logger = logging.getLogger(__name__)
+settings = get_settings()
+
+JOB_PROJECT_CASCADE_DELETE = 'project_cascade_delete'
+JOB_PROJECT_SYNC_NAMES = 'project_sync_names'
+
+# 按 project_id 关联的表，级联删除顺序
+PROJECT_RELATED_MODELS = (
+    (WorkPlan, '工作计划'),
+    (PeriodicInspection, '定期巡检'),
+    (TemporaryRepair, '临时维修'),
+    (SpotWork, '零星用工'),
+    (MaintenancePlan, '维保计划'),
+    (SparePartsUsage, '备品备件领用'),
+    (RepairToolsIssue, '维修工具领用'),
+)
+
+# 冗余保存项目名称、客户名称的表
+PROJECT_NAME_MODELS = (
+    WorkPlan, PeriodicInspection, TemporaryRepair, SpotWork, SparePartsUsage, RepairToolsIssue, MaintenancePlan,
+)
+CLIENT_NAME_MODELS = (WorkPlan, PeriodicInspection, TemporaryRepair, SpotWork)
 
 
 class ProjectInfoService:
@@ -23,6 +58,7 @@ class ProjectInfoService:
     def __init__(self, db: Session):
         self.repository = ProjectInfoRepository(db)
         self._db = db
+        self.sync_job = None
 
     def _sync_customer_data(self, client_name: str, client_contact: str | None, client_contact_info: str | None, address: str | None, client_contact_position: str | None):
         """
@@ -288,11 +324,11 @@ class ProjectInfoService:
         )
 
         if project_name_changed or client_name_changed:
-            self._sync_related_tables(
-                existing_project.project_id,
-                existing_project.id,
-                dto.project_name if project_name_changed else None,
-                dto.client_name if client_name_changed else None
+            self.sync_job = BackgroundJobService(self._db).enqueue(
+                JOB_PROJECT_SYNC_NAMES,
+                {'project_id': existing_project.project_id},
+                target=existing_project.project_id,
+                created_by=operator_name
             )
 
         if project_manager_changed and dto.project_manager:
@@ -320,94 +356,62 @@ class ProjectInfoService:
 
         return result
 
-    def _sync_related_tables(
-        self,
-        project_id: str,
-        project_pk: int,
-        new_project_name: str | None = None,
-        new_client_name: str | None = None
-    ):
+    def sync_related_names(self, context: JobContext) -> dict:
         """
-        同步更新关联表数据
+        同步关联表中冗余的项目名称、客户名称，作为后台任务执行
+
+        以执行时项目的当前名称为准，只更新名称不一致的记录，按主键分段提交，可以重复执行
+
+        Args:
+            context: 任务上下文，params 包含 project_id
+
+        Returns:
+            {表名.字段: 更新条数}
         """
-        from app.models.maintenance_plan import MaintenancePlan
-        from app.models.periodic_inspection import PeriodicInspection
-        from app.models.repair_tools import RepairToolsIssue
-        from app.models.spare_parts_usage import SparePartsUsage
-        from app.models.spot_work import SpotWork
-        from app.models.temporary_repair import TemporaryRepair
-        from app.models.work_plan import WorkPlan
-
-        sync_count = 0
-
-        if new_project_name:
-            work_plan_updated = self._db.query(WorkPlan).filter(
-                WorkPlan.project_id == project_id
-            ).update({"project_name": new_project_name}, synchronize_session=False)
-            sync_count += work_plan_updated
-
-            periodic_updated = self._db.query(PeriodicInspection).filter(
-                PeriodicInspection.project_id == project_id
-            ).update({"project_name": new_project_name}, synchronize_session=False)
-            sync_count += periodic_updated
-
-            repair_updated = self._db.query(TemporaryRepair).filter(
-                TemporaryRepair.project_id == project_id
-            ).update({"project_name": new_project_name}, synchronize_session=False)
-            sync_count += repair_updated
-
-            spot_work_updated = self._db.query(SpotWork).filter(
-                SpotWork.project_id == project_id
-            ).update({"project_name": new_project_name}, synchronize_session=False)
-            sync_count += spot_work_updated
-
-            spare_parts_updated = self._db.query(SparePartsUsage).filter(
-                SparePartsUsage.project_id == project_id
-            ).update({"project_name": new_project_name}, synchronize_session=False)
-            sync_count += spare_parts_updated
-
-            tools_issue_updated = self._db.query(RepairToolsIssue).filter(
-                RepairToolsIssue.project_id == project_id
-            ).update({"project_name": new_project_name}, synchronize_session=False)
-            sync_count += tools_issue_updated
-
-            maintenance_plan_updated = self._db.query(MaintenancePlan).filter(
-                MaintenancePlan.project_id == project_id
-            ).update({"project_name": new_project_name}, synchronize_session=False)
-            sync_count += maintenance_plan_updated
-
-        if new_client_name:
-            work_plan_updated = self._db.query(WorkPlan).filter(
-                WorkPlan.project_id == project_id
-            ).update({"client_name": new_client_name}, synchronize_session=False)
-            sync_count += work_plan_updated
-
-            periodic_updated = self._db.query(PeriodicInspection).filter(
-                PeriodicInspection.project_id == project_id
-            ).update({"client_name": new_client_name}, synchronize_session=False)
-            sync_count += periodic_updated
-
-            repair_updated = self._db.query(TemporaryRepair).filter(
-                TemporaryRepair.project_id == project_id
-            ).update({"client_name": new_client_name}, synchronize_session=False)
-            sync_count += repair_updated
-
-            spot_work_updated = self._db.query(SpotWork).filter(
-                SpotWork.project_id == project_id
-            ).update({"client_name": new_client_name}, synchronize_session=False)
-            sync_count += spot_work_updated
-
-        if sync_count > 0:
-            self._db.commit()
-            logger.info(f"✅ [Service] 同步更新关联表数据: project_id={project_id}, 更新记录数={sync_count}")
+        project_id = context.params['project_id']
+        project = self._db.query(ProjectInfo).filter(ProjectInfo.project_id == project_id).first()
+        if not project:
+            return {}
+
+        targets = [(model, 'project_name', project.project_name) for model in PROJECT_NAME_MODELS]
+        if project.client_name:
+            targets += [(model, 'client_name', project.client_name) for model in CLIENT_NAME_MODELS]
+
+        def stale(model, field, value):
+            column = getattr(model, field)
+            return (model.project_id == project_id, or_(column.is_(None), column != value))
+
+        total = sum(
+            self._db.query(model).filter(*stale(model, field, value)).count()
+            for model, field, value in targets
+        )
+        done = 0
+        updated = {}
+        for model, field, value in targets:
+            key = f"{model.__tablename__}.{field}"
+            updated[key] = 0
+            for min_id, max_id, size in iter_id_ranges(
+                self._db, model, *stale(model, field, value), chunk_size=settings.job_chunk_size
+            ):
+                result = self._db.execute(
+                    update(model)
+                    .where(*stale(model, field, value), model.id.between(min_id, max_id))
+                    .values({field: value})
+                    .execution_options(synchronize_session=False)
+                )
+                updated[key] += result.rowcount
+                done += size
+                context.progress(done, total, f"正在同步 {model.__tablename__}")
+
+        logger.info(f"✅ [Service] 同步更新关联表数据: project_id={project_id}, {updated}")
+        return updated
 
     def _sync_maintenance_plan_responsible_person(self, project_id: str, new_responsible_person: str):
         """
-        同步更新维保计划的负责人
+        同步更新维保计划的负责人，同一事务中写入工作计划发件箱
         """
-        from app.models.maintenance_plan import MaintenancePlan
-
         try:
+            record_bulk_changes(self._db, MaintenancePlan, MaintenancePlan.project_id == project_id)
             updated_count = self._db.query(MaintenancePlan).filter(
                 MaintenancePlan.project_id == project_id
             ).update({"maintenance_personnel": new_responsible_person}, synchronize_session=False)
@@ -422,34 +426,31 @@ class ProjectInfoService:
     def _sync_work_orders_maintenance_personnel(self, project_id: str, old_personnel: str, new_personnel: str):
         """
         同步更新工单的运维人员
+        按主键分段批量 UPDATE，每段更新前在同一事务中移动日汇总并写入工作计划发件箱
         """
-        from app.models.periodic_inspection import PeriodicInspection
-        from app.models.spot_work import SpotWork
-        from app.models.temporary_repair import TemporaryRepair
-
+        rollup = WorkOrderRollupService(self._db)
         total_updated = 0
 
         try:
-            periodic_updated = self._db.query(PeriodicInspection).filter(
-                PeriodicInspection.project_id == project_id,
-                PeriodicInspection.maintenance_personnel == old_personnel
-            ).update({"maintenance_personnel": new_personnel}, synchronize_session=False)
-            total_updated += periodic_updated
-            logger.info(f"📝 [Service] 更新定期巡检工单运维人员: {periodic_updated} 条")
-
-            repair_updated = self._db.query(TemporaryRepair).filter(
-                TemporaryRepair.project_id == project_id,
-                TemporaryRepair.maintenance_personnel == old_personnel
-            ).update({"maintenance_personnel": new_personnel}, synchronize_session=False)
-            total_updated += repair_updated
-            logger.info(f"📝 [Service] 更新临时维修工单运维人员: {repair_updated} 条")
-
-            spot_work_updated = self._db.query(SpotWork).filter(
-                SpotWork.project_id == project_id,
-                SpotWork.maintenance_personnel == old_personnel
-            ).update({"maintenance_personnel": new_personnel}, synchronize_session=False)
-            total_updated += spot_work_updated
-            logger.info(f"📝 [Service] 更新零星用工工单运维人员: {spot_work_updated} 条")
+            for model, label in ((PeriodicInspection, '定期巡检'), (TemporaryRepair, '临时维修'), (SpotWork, '零星用工')):
+                criteria = (model.project_id == project_id, model.maintenance_personnel == old_personnel)
+                updated = 0
+                for min_id, max_id, _ in iter_id_ranges(
+                    self._db, model, *criteria, chunk_size=settings.job_chunk_size
+                ):
+                    rollup.move_personnel(
+                        model, old_personnel, new_personnel, min_id, max_id, model.project_id == project_id
+                    )
+                    record_bulk_changes(self._db, model, *criteria, model.id.between(min_id, max_id))
+                    result = self._db.execute(
+                        update(model)
+                        .where(*criteria, model.id.between(min_id, max_id))
+                        .values(maintenance_personnel=new_personnel)
+                        .execution_options(synchronize_session=False)
+                    )
+                    updated += result.rowcount
+                total_updated += updated
+                logger.info(f"📝 [Service] 更新{label}工单运维人员: {updated} 条")
 
             if total_updated > 0:
                 self._db.commit()
@@ -465,6 +466,8 @@ class ProjectInfoService:
         """
         删除项目信息
 
+        没有关联数据时直接删除；级联删除提交为后台任务，返回任务信息
+
         Args:
             id: 项目信息ID
             cascade: 是否级联删除
@@ -472,84 +475,45 @@ class ProjectInfoService:
             operator_name: 操作者名称
 
         Returns:
-            删除结果
+            删除结果，级联删除时包含 job
 
         Raises:
             NotFoundException: 项目信息不存在
             ValidationException: 存在关联数据且未指定级联删除
         """
         project_info = self.get_by_id(id)
-
-        from app.models.maintenance_plan import MaintenancePlan
-        from app.models.periodic_inspection import PeriodicInspection
-        from app.models.repair_tools import RepairToolsIssue
-        from app.models.spare_parts_usage import SparePartsUsage
-        from app.models.spot_work import SpotWork
-        from app.models.temporary_repair import TemporaryRepair
-        from app.models.work_plan import WorkPlan
-
         project_id = project_info.project_id
 
-        work_plan_count = self._db.query(WorkPlan).filter(WorkPlan.project_id == project_id).count()
-        periodic_count = self._db.query(PeriodicInspection).filter(PeriodicInspection.project_id == project_id).count()
-        repair_count = self._db.query(TemporaryRepair).filter(TemporaryRepair.project_id == project_id).count()
-        spot_count = self._db.query(SpotWork).filter(SpotWork.project_id == project_id).count()
-        maintenance_count = self._db.query(MaintenancePlan).filter(MaintenancePlan.project_id == project_id).count()
-        spare_parts_count = self._db.query(SparePartsUsage).filter(SparePartsUsage.project_id == project_id).count()
-        tools_issue_count = self._db.query(RepairToolsIssue).filter(RepairToolsIssue.project_id == project_id).count()
-
-        total_related = work_plan_count + periodic_count + repair_count + spot_count + maintenance_count + spare_parts_count + tools_issue_count
+        related_counts = [
+            (label, self._db.query(model).filter(model.project_id == project_id).count())
+            for model, label in PROJECT_RELATED_MODELS
+        ]
+        total_related = sum(count for _, count in related_counts)
 
         if total_related > 0 and not cascade:
-            details = []
-            if work_plan_count > 0:
-                details.append(f"{work_plan_count} 条工作计划")
-            if periodic_count > 0:
-                details.append(f"{periodic_count} 条定期巡检")
-            if repair_count > 0:
-                details.append(f"{repair_count} 条临时维修")
-            if spot_count > 0:
-                details.append(f"{spot_count} 条零星用工")
-            if maintenance_count > 0:
-                details.append(f"{maintenance_count} 条维保计划")
-            if spare_parts_count > 0:
-                details.append(f"{spare_parts_count} 条备品备件领用")
-            if tools_issue_count > 0:
-                details.append(f"{tools_issue_count} 条维修工具领用")
-
+            details = [f"{count} 条{label}" for label, count in related_counts if count > 0]
             raise ValidationException(f"该项目下有 {', '.join(details)}，请确认是否级联删除")
 
-        deleted_counts = {}
-
-        if cascade:
-            if work_plan_count > 0:
-                self._db.query(WorkPlan).filter(WorkPlan.project_id == project_id).delete(synchronize_session=False)
-                deleted_counts['work_plan'] = work_plan_count
-
-            if periodic_count > 0:
-                self._db.query(PeriodicInspection).filter(PeriodicInspection.project_id == project_id).delete(synchronize_session=False)
-                deleted_counts['periodic_inspection'] = periodic_count
-
-            if repair_count > 0:
-                self._db.query(TemporaryRepair).filter(TemporaryRepair.project_id == project_id).delete(synchronize_session=False)
-                deleted_counts['temporary_repair'] = repair_count
-
-            if spot_count > 0:
-                self._db.query(SpotWork).filter(SpotWork.project_id == project_id).delete(synchronize_session=False)
-                deleted_counts['spot_work'] = spot_count
-
-            if maintenance_count > 0:
-                self._db.query(MaintenancePlan).filter(MaintenancePlan.project_id == project_id).delete(synchronize_session=False)
-                deleted_counts['maintenance_plan'] = maintenance_count
-
-            if spare_parts_count > 0:
-                self._db.query(SparePartsUsage).filter(SparePartsUsage.project_id == project_id).delete(synchronize_session=False)
-                deleted_counts['spare_parts_usage'] = spare_parts_count
+        if total_related > 0:
+            job = BackgroundJobService(self._db).enqueue(
+                JOB_PROJECT_CASCADE_DELETE,
+                {'project_pk': project_info.id, 'user_id': user_id, 'operator_name': operator_name},
+                target=project_id,
+                created_by=operator_name
+            )
+            return {
+                'project_name': project_info.project_name,
+                'job': job.to_dict()
+            }
 
-            if tools_issue_count > 0:
-                self._db.query(RepairToolsIssue).filter(RepairToolsIssue.project_id == project_id).delete(synchronize_session=False)
-                deleted_counts['repair_tools_issue'] = tools_issue_count
+        self._delete_project(project_info, user_id, operator_name)
+        return {
+            'project_name': project_info.project_name,
+            'deleted_related': {}
+        }
 
+    def _delete_project(self, project_info: ProjectInfo, user_id: int | None, operator_name: str | None) -> None:
+        """记录操作日志并删除项目"""
         if operator_name and project_info.id:
             self._create_operation_log(
                 work_order_type='project_info',
@@ -565,8 +529,52 @@ class ProjectInfoService:
         self.repository.delete(project_info)
         self._db.commit()
 
+    def cascade_delete(self, context: JobContext) -> dict:
+        """
+        级联删除项目及其关联数据，作为后台任务执行
+
+        关联表按主键分段删除并提交，工单表同一事务内扣除日汇总；全部删除后再删除项目本身
+
+        Args:
+            context: 任务上下文，params 包含 project_pk、user_id、operator_name
+
+        Returns:
+            {'project_name': 项目名称, 'deleted_related': {表名: 删除条数}}
+        """
+        project_info = self._db.get(ProjectInfo, context.params['project_pk'])
+        if not project_info:
+            return {'project_name': None, 'deleted_related': {}}
+        project_id = project_info.project_id
+        project_name = project_info.project_name
+
+        rollup = WorkOrderRollupService(self._db)
+        total = sum(
+            self._db.query(model).filter(model.project_id == project_id).count()
+            for model, _ in PROJECT_RELATED_MODELS
+        )
+        done = 0
+        deleted_counts = {}
+        for model, label in PROJECT_RELATED_MODELS:
+            criteria = model.project_id == project_id
+            for min_id, max_id, size in iter_id_ranges(
+                self._db, model, criteria, chunk_size=settings.job_chunk_size
+            ):
+                if model in ROLLUP_SOURCES:
+                    rollup.remove(model, min_id, max_id, criteria)
+                result = self._db.execute(
+                    delete(model)
+                    .where(criteria, model.id.between(min_id, max_id))
+                    .execution_options(synchronize_session=False)
+                )
+                if result.rowcount:
+                    deleted_counts[model.__tablename__] = deleted_counts.get(model.__tablename__, 0) + result.rowcount
+                done += size
+                context.progress(done, total, f"正在删除{label}")
+
+        self._delete_project(project_info, context.params.get('user_id'), context.params.get('operator_name'))
+        logger.info(f"✅ [Service] 级联删除项目: project_id={project_id}, {deleted_counts}")
         return {
-            'project_name': project_info.project_name,
+            'project_name': project_name,
             'deleted_related': deleted_counts
         }
 
@@ -582,6 +590,22 @@ class ProjectInfoService:
         """
         return self.repository.find_all_unpaginated(project_ids)
 
+    def get_all_dicts(self, project_ids: list[str] | None = None) -> list[dict]:
+        """
+        获取所有项目信息的字典列表（不分页），按权限范围缓存在参考数据缓存中
+
+        Args:
+            project_ids: 项目ID列表（权限过滤）
+
+        Returns:
+            项目信息字典列表
+        """
+        scope = tuple(sorted(project_ids)) if project_ids is not None else None
+        return reference_cache.get_or_load(
+            self._db, 'project_info', ('all', scope),
+            lambda: [item.to_dict() for item in self.repository.find_all_unpaginated(project_ids)],
+        )
+
     def get_user_project_ids(self, user_name: str) -> list[str]:
         """
         获取用户关联的项目ID列表（通过项目运维人员字段关联）
@@ -597,3 +621,15 @@ class ProjectInfoService:
         ).all()
         project_ids = [p[0] for p in projects if p[0]]
         return project_ids if project_ids else []
+
+
+@register_job(JOB_PROJECT_CASCADE_DELETE)
+def _run_project_cascade_delete(context: JobContext) -> dict:
+    """项目级联删除任务"""
+    return ProjectInfoService(context.db).cascade_delete(context)
+
+
+@register_job(JOB_PROJECT_SYNC_NAMES)
+def _run_project_sync_names(context: JobContext) -> dict:
+    """项目名称、客户名称同步任务"""
+    return ProjectInfoService(context.db).sync_related_names(context)
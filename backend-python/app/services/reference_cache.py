@@ -0,0 +1,288 @@
+"""
+参考数据缓存
+字典、操作类型、人员、项目和巡检事项几乎不变，却在每次请求时重新查询，结果按命名空间缓存在进程内
+
+- 版本：每个命名空间一个版本号，失效时递增；加载期间版本号变化的结果不写入缓存
+- 本进程失效：监听 Session 事件，参考数据新增、修改、删除并提交后失效对应命名空间；
+  绕过 flush 的批量 INSERT/UPDATE/DELETE 同样会触发失效
+- 跨进程失效：PostgreSQL 下 flush 时在同一事务内执行 pg_notify，提交后才会送达，回滚则丢弃；
+  每个 worker 的监听线程 LISTEN 同一频道，收到通知后失效本进程缓存。
+  监听连接断开重连时清空全部缓存，避免漏掉断开期间的通知；TTL 兜底不经过 ORM 的修改
+"""
+import logging
+import select
+import threading
+import time
+from collections import defaultdict
+from collections.abc import Callable, Hashable
+from typing import Any
+
+from prometheus_client import Counter
+from sqlalchemy import event, text
+from sqlalchemy.orm import Session
+
+from app.config import get_settings
+from app.database import engine
+from app.models.dictionary import Dictionary
+from app.models.inspection_item import InspectionItem
+from app.models.operation_type import OperationType
+from app.models.personnel import Personnel
+from app.models.project_info import ProjectInfo
+
+logger = logging.getLogger(__name__)
+
+REFERENCE_NAMESPACES = {
+    Dictionary: 'dictionary',
+    OperationType: 'operation_type',
+    Personnel: 'personnel',
+    ProjectInfo: 'project_info',
+    InspectionItem: 'inspection_item',
+}
+
+NOTIFY_CHANNEL = 'reference_cache'
+
+LISTEN_POLL_SECONDS = 5
+
+LISTEN_RETRY_SECONDS = 5
+
+_SESSION_KEY = 'reference_cache_dirty'
+
+REFERENCE_CACHE_REQUESTS = Counter(
+    'reference_cache_total',
+    '参考数据缓存访问次数',
+    ['namespace', 'result'],
+)
+
+REFERENCE_CACHE_INVALIDATIONS = Counter(
+    'reference_cache_invalidations_total',
+    '参考数据缓存失效次数',
+    ['namespace', 'source'],
+)
+
+
+class ReferenceCache:
+    """
+    进程内参考数据缓存，缓存的值由所有请求共享，调用方不要修改
+    """
+
+    def __init__(self, ttl_seconds: int):
+        self._ttl_seconds = ttl_seconds
+        self._versions: dict[str, int] = defaultdict(int)
+        self._counters: dict[str, int] = {}
+        self._entries: dict[str, dict[Hashable, tuple[float, Any]]] = defaultdict(dict)
+        self._subscribers: dict[str, list[Callable[[], None]]] = defaultdict(list)
+        self._lock = threading.Lock()
+
+    def version(self, namespace: str) -> int:
+        """命名空间当前版本号"""
+        with self._lock:
+            return self._versions[namespace]
+
+    def get_or_load(self, db: Session, namespace: str, key: Hashable, loader: Callable[[], Any]) -> Any:
+        """
+        读取缓存，未命中时调用 loader 加载并写入
+
+        会话中有该命名空间未提交的变更时直接调用 loader，结果不写入缓存
+
+        Args:
+            db: 数据库会话
+            namespace: 命名空间
+            key: 命名空间内的缓存键
+            loader: 加载函数
+
+        Returns:
+            缓存或加载的值
+        """
+        if has_pending_changes(db, namespace):
+            return loader()
+
+        with self._lock:
+            entry = self._entries[namespace].get(key)
+            version = self._versions[namespace]
+        if entry is not None and entry[0] >= time.monotonic():
+            REFERENCE_CACHE_REQUESTS.labels(namespace=namespace, result='hit').inc()
+            return entry[1]
+
+        REFERENCE_CACHE_REQUESTS.labels(namespace=namespace, result='miss').inc()
+        value = loader()
+        with self._lock:
+            if self._versions[namespace] == version:
+                self._entries[namespace][key] = (time.monotonic() + self._ttl_seconds, value)
+        return value
+
+    def sync_counter(self, namespace: str, counter: int) -> None:
+        """
+        对齐表变更计数，计数与上次看到的不同时失效命名空间
+
+        条件请求以表变更计数(见 table_versions)作为校验值，所有进程一致；
+        跨进程通知异步送达，先于通知读到新计数时在此失效，不会把旧内容配上新的 ETag。
+        本进程第一次看到计数时同样失效，此前加载的内容无法确认对应哪个计数
+
+        Args:
+            namespace: 命名空间
+            counter: 数据库中的表变更计数
+        """
+        with self._lock:
+            changed = self._counters.get(namespace) != counter
+            self._counters[namespace] = counter
+        if changed:
+            self.invalidate(namespace, source='counter')
+
+    def subscribe(self, namespace: str, callback: Callable[[], None]) -> None:
+        """注册失效回调，供自行维护缓存的模块跟随失效"""
+        self._subscribers[namespace].append(callback)
+
+    def invalidate(self, namespace: str, source: str = 'local') -> None:
+        """
+        失效命名空间：递增版本号，丢弃缓存并通知订阅者
+
+        Args:
+            namespace: 命名空间
+            source: local 本进程提交，remote 其他进程通知，counter 表变更计数变化
+        """
+        with self._lock:
+            self._versions[namespace] += 1
+            self._entries.pop(namespace, None)
+            callbacks = list(self._subscribers.get(namespace, ()))
+        REFERENCE_CACHE_INVALIDATIONS.labels(namespace=namespace, source=source).inc()
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception as e:
+                logger.error(f"参考数据失效回调失败 ({namespace}): {str(e)}")
+
+    def clear(self, source: str = 'local') -> None:
+        """失效全部命名空间"""
+        for namespace in set(REFERENCE_NAMESPACES.values()) | set(self._versions):
+            self.invalidate(namespace, source)
+
+
+def has_pending_changes(db: Session, namespace: str) -> bool:
+    """会话中是否有该命名空间已 flush 未提交的变更"""
+    return namespace in db.info.get(_SESSION_KEY, ())
+
+
+def _mark_dirty(session: Session, namespaces: set[str]) -> None:
+    """标记会话，PostgreSQL 下在同一事务内发送通知"""
+    dirty = session.info.setdefault(_SESSION_KEY, set())
+    new = namespaces - dirty
+    if not new:
+        return
+    dirty |= new
+    connection = session.connection()
+    if connection.dialect.name == 'postgresql':
+        for namespace in sorted(new):
+            connection.execute(
+                text("SELECT pg_notify(:channel, :namespace)"),
+                {'channel': NOTIFY_CHANNEL, 'namespace': namespace},
+            )
+
+
+@event.listens_for(Session, 'after_flush')
+def _mark_reference_dirty(session: Session, flush_context) -> None:
+    """flush 中有参考数据变更时标记会话，等提交后再失效缓存"""
+    namespaces = {
+        REFERENCE_NAMESPACES[type(obj)]
+        for obj in session.new | session.dirty | session.deleted
+        if type(obj) in REFERENCE_NAMESPACES
+    }
+    if namespaces:
+        _mark_dirty(session, namespaces)
+
+
+@event.listens_for(Session, 'do_orm_execute')
+def _mark_reference_dirty_on_bulk(orm_execute_state) -> None:
+    """批量 INSERT/UPDATE/DELETE 参考数据时标记会话"""
+    if not (orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete):
+        return
+    mapper = orm_execute_state.bind_mapper
+    if mapper is not None and mapper.class_ in REFERENCE_NAMESPACES:
+        _mark_dirty(orm_execute_state.session, {REFERENCE_NAMESPACES[mapper.class_]})
+
+
+@event.listens_for(Session, 'after_commit')
+def _invalidate_reference(session: Session) -> None:
+    """提交后失效本进程缓存，其他进程由通知失效"""
+    for namespace in session.info.pop(_SESSION_KEY, ()):
+        reference_cache.invalidate(namespace)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_reference_flag(session: Session) -> None:
+    """回滚后丢弃标记，事务内的通知随回滚丢弃"""
+    session.info.pop(_SESSION_KEY, None)
+
+
+class ReferenceCacheListener:
+    """
+    跨进程失效监听线程
+    使用独立于连接池的数据库连接 LISTEN 通知频道，仅 PostgreSQL 下启动
+    """
+
+    def __init__(self, cache: ReferenceCache, bind, channel: str = NOTIFY_CHANNEL):
+        """
+        Args:
+            cache: 参考数据缓存
+            bind: 数据库 Engine
+            channel: 通知频道
+        """
+        self._cache = cache
+        self._engine = bind
+        self.channel = channel
+        self._thread: threading.Thread | None = None
+        self._stop = threading.Event()
+
+    def start(self) -> None:
+        """启动监听线程"""
+        if self._thread is not None or self._engine.dialect.name != 'postgresql':
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name='reference-cache-listener', daemon=True)
+        self._thread.start()
+
+    def shutdown(self) -> None:
+        """停止监听线程"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=LISTEN_POLL_SECONDS + 1)
+            self._thread = None
+
+    def _loop(self) -> None:
+        while not self._stop.is_set():
+            try:
+                self._listen()
+            except Exception as e:
+                logger.error(f"参考数据缓存监听失败: {str(e)}")
+            self._stop.wait(LISTEN_RETRY_SECONDS)
+
+    def _connect(self):
+        """按 Engine 的连接参数新建 DBAPI 连接，不占用连接池"""
+        dialect = self._engine.dialect
+        cargs, cparams = dialect.create_connect_args(self._engine.url)
+        connection = dialect.connect(*cargs, **cparams)
+        connection.autocommit = True
+        return connection
+
+    def _listen(self) -> None:
+        connection = self._connect()
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute(f"LISTEN {self.channel}")
+            # 连接建立前的通知已无法收到
+            self._cache.clear(source='remote')
+            while not self._stop.is_set():
+                if select.select([connection], [], [], LISTEN_POLL_SECONDS) == ([], [], []):
+                    continue
+                connection.poll()
+                while connection.notifies:
+                    notify = connection.notifies.pop(0)
+                    self._cache.invalidate(notify.payload, source='remote')
+        finally:
+            connection.close()
+
+
+_settings = get_settings()
+
+reference_cache = ReferenceCache(_settings.reference_cache_ttl_seconds)
+
+reference_cache_listener = ReferenceCacheListener(reference_cache, engine)
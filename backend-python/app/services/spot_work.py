@@ -15,7 +15,6 @@ from app.models.spot_work import SpotWork
 from app.models.spot_work_worker import SpotWorkWorker
 from app.repositories.spot_work import SpotWorkRepository
 from app.schemas.spot_work import SpotWorkCreate, SpotWorkUpdate
-from app.services.sync_service import PLAN_TYPE_SPOTWORK, SyncService
 from app.utils.date_utils import parse_datetime
 from app.utils.dictionary_helper import get_default_spot_work_status
 from app.utils.work_order_id_generator import generate_spot_work_id
@@ -31,7 +30,6 @@ class SpotWorkService:
 
     def __init__(self, db: Session):
         self.repository = SpotWorkRepository(db)
-        self.sync_service = SyncService(db)
         self._db = db
 
     def _parse_date(self, date_value: str | datetime | None) -> datetime | None:
@@ -103,7 +101,7 @@ class SpotWorkService:
 
     def generate_work_id(self, project_id: str) -> str:
         """
-        生成工单编号（使用数据库序列保证并发安全）
+        生成工单编号（从 serial_counter 计数器表分配，保证并发安全）
 
         Args:
             project_id: 项目编号
@@ -157,7 +155,6 @@ class SpotWorkService:
         )
 
         result = self.repository.create(work)
-        self.sync_service.sync_order_to_work_plan(PLAN_TYPE_SPOTWORK, result)
 
         if operator_name and result.id:
             self._create_operation_log(
@@ -210,7 +207,6 @@ class SpotWorkService:
         existing_work.remarks = dto.remarks
 
         result = self.repository.update(existing_work)
-        self.sync_service.sync_order_to_work_plan(PLAN_TYPE_SPOTWORK, result)
         self._db.commit()
         return result
 
@@ -265,7 +261,6 @@ class SpotWorkService:
             existing_work.remarks = dto.remarks
 
         result = self.repository.update(existing_work)
-        self.sync_service.sync_order_to_work_plan(PLAN_TYPE_SPOTWORK, result)
         self._db.commit()
         return result
 
@@ -282,7 +277,6 @@ class SpotWorkService:
             NotFoundException: 工单不存在
         """
         work = self.get_by_id(id)
-        self.sync_service.sync_order_to_work_plan(PLAN_TYPE_SPOTWORK, work, is_delete=True, user_id=user_id)
 
         if operator_name and work.id:
             self._create_operation_log(
@@ -313,7 +307,8 @@ class SpotWorkService:
         project_name: str | None = None,
         work_id: str | None = None,
         status: str | None = None,
-        maintenance_personnel: str | None = None
+        maintenance_personnel: str | None = None,
+        projection: str | None = None
     ) -> tuple[list[dict[str, Any]], int]:
         """
         分页获取零星用工列表（包含工人信息）
@@ -325,12 +320,13 @@ class SpotWorkService:
             work_id: 工单编号
             status: 状态
             maintenance_personnel: 运维人员
+            projection: 列投影名称，None 表示加载完整实体
 
         Returns:
             (工单字典列表, 总数)
         """
         items, total = self.repository.find_all(
-            page, size, project_name, work_id, status, maintenance_personnel
+            page, size, project_name, work_id, status, maintenance_personnel, projection=projection
         )
 
         if not items:
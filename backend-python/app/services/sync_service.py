@@ -1,7 +1,7 @@
 """
 工单与工作计划同步服务
-实现三种工单表(PeriodicInspection, TemporaryRepair, SpotWork)与WorkPlan表之间的双向同步
-同时实现MaintenancePlan与WorkPlan之间的双向同步
+实现WorkPlan到三种工单表(PeriodicInspection, TemporaryRepair, SpotWork)和MaintenancePlan的同步
+工单和MaintenancePlan到WorkPlan的同步由发件箱异步完成，见 work_plan_outbox
 """
 import logging
 from datetime import datetime
@@ -17,7 +17,6 @@ from app.repositories.maintenance_plan import MaintenancePlanRepository
 from app.repositories.periodic_inspection import PeriodicInspectionRepository
 from app.repositories.spot_work import SpotWorkRepository
 from app.repositories.temporary_repair import TemporaryRepairRepository
-from app.repositories.work_plan import WorkPlanRepository
 from app.utils.date_utils import parse_datetime
 
 logger = logging.getLogger(__name__)
@@ -30,13 +29,11 @@ PLAN_TYPE_SPOTWORK = '零星用工'
 class SyncService:
     """
     工单与工作计划同步服务
-    负责维护三种工单表与WorkPlan表之间的数据一致性
-    同时维护MaintenancePlan与WorkPlan之间的数据一致性
+    WorkPlan变更时同步到三种工单表和MaintenancePlan
     """
 
     def __init__(self, db: Session):
         self.db = db
-        self.work_plan_repo = WorkPlanRepository(db)
         self.maintenance_plan_repo = MaintenancePlanRepository(db)
         self.inspection_repo = PeriodicInspectionRepository(db)
         self.repair_repo = TemporaryRepairRepository(db)
@@ -46,76 +43,6 @@ class SyncService:
         """解析日期值"""
         return parse_datetime(date_value)
 
-    def _get_plan_id_by_type(self, order_type: str, order) -> str:
-        """根据工单类型获取工单编号"""
-        if order_type == PLAN_TYPE_INSPECTION:
-            return order.inspection_id
-        elif order_type == PLAN_TYPE_REPAIR:
-            return order.repair_id
-        elif order_type == PLAN_TYPE_SPOTWORK:
-            return order.work_id
-        return ''
-
-    def sync_order_to_work_plan(self, order_type: str, order, is_delete: bool = False, user_id: int = None) -> WorkPlan | None:
-        """
-        将工单数据同步到WorkPlan表
-
-        Args:
-            order_type: 工单类型 (定期巡检/临时维修/零星用工)
-            order: 工单对象 (PeriodicInspection/TemporaryRepair/SpotWork)
-            is_delete: 是否为删除操作
-            user_id: 执行删除的用户ID
-
-        Returns:
-            同步后的WorkPlan对象，删除操作返回None
-        """
-        plan_id = self._get_plan_id_by_type(order_type, order)
-
-        if is_delete:
-            existing_plan = self.work_plan_repo.find_by_plan_id(plan_id)
-            if existing_plan:
-                self.work_plan_repo.soft_delete(existing_plan, user_id)
-                logger.info(f"同步软删除WorkPlan: plan_id={plan_id}, type={order_type}")
-            return None
-
-        existing_plan = self.work_plan_repo.find_by_plan_id(plan_id)
-
-        if existing_plan:
-            existing_plan.plan_type = order_type
-            existing_plan.project_id = order.project_id
-            existing_plan.project_name = order.project_name
-            existing_plan.plan_start_date = order.plan_start_date
-            existing_plan.plan_end_date = order.plan_end_date
-            existing_plan.client_name = order.client_name
-            existing_plan.maintenance_personnel = order.maintenance_personnel
-            existing_plan.status = order.status
-            existing_plan.filled_count = getattr(order, 'filled_count', 0) or 0
-            existing_plan.total_count = getattr(order, 'total_count', 5) or 5
-            existing_plan.remarks = order.remarks
-
-            result = self.work_plan_repo.update(existing_plan)
-            logger.info(f"同步更新WorkPlan: plan_id={plan_id}, type={order_type}")
-            return result
-        else:
-            new_plan = WorkPlan(
-                plan_id=plan_id,
-                plan_type=order_type,
-                project_id=order.project_id,
-                project_name=order.project_name,
-                plan_start_date=order.plan_start_date,
-                plan_end_date=order.plan_end_date,
-                client_name=order.client_name,
-                maintenance_personnel=order.maintenance_personnel,
-                status=order.status,
-                filled_count=getattr(order, 'filled_count', 0) or 0,
-                total_count=getattr(order, 'total_count', 5) or 5,
-                remarks=order.remarks
-            )
-
-            result = self.work_plan_repo.create(new_plan)
-            logger.info(f"同步创建WorkPlan: plan_id={plan_id}, type={order_type}")
-            return result
-
     def sync_work_plan_to_order(self, work_plan: WorkPlan, is_delete: bool = False, user_id: int = None):
         """
         将WorkPlan数据同步到对应的工单表
@@ -272,86 +199,6 @@ class SyncService:
             logger.info(f"同步创建SpotWork: work_id={work_plan.plan_id}")
             return result
 
-    def sync_maintenance_plan_to_work_plan(self, maintenance_plan: MaintenancePlan, is_delete: bool = False, user_id: int = None) -> WorkPlan | None:
-        """
-        将MaintenancePlan数据同步到WorkPlan表
-
-        Args:
-            maintenance_plan: MaintenancePlan对象
-            is_delete: 是否为删除操作
-            user_id: 执行删除的用户ID
-
-        Returns:
-            同步后的WorkPlan对象，删除操作返回None
-        """
-        plan_id = maintenance_plan.plan_id
-
-        if is_delete:
-            existing_plan = self.work_plan_repo.find_by_plan_id(plan_id)
-            if existing_plan:
-                self.work_plan_repo.soft_delete(existing_plan, user_id)
-                logger.info(f"同步软删除WorkPlan (from MaintenancePlan): plan_id={plan_id}")
-            return None
-
-        existing_plan = self.work_plan_repo.find_by_plan_id(plan_id)
-
-        project_name = maintenance_plan.project_name
-        client_name = ''
-
-        if maintenance_plan.project:
-            if not project_name:
-                project_name = maintenance_plan.project.project_name
-            client_name = maintenance_plan.project.client_name or ''
-
-        if not project_name:
-            from app.models.project_info import ProjectInfo
-            project = self.db.query(ProjectInfo).filter(
-                ProjectInfo.project_id == maintenance_plan.project_id
-            ).first()
-            if project:
-                project_name = project.project_name or maintenance_plan.project_id
-                client_name = project.client_name or ''
-            else:
-                project_name = maintenance_plan.project_id
-                logger.warning(f"未找到项目信息，使用project_id作为project_name: {maintenance_plan.project_id}")
-
-        if existing_plan:
-            existing_plan.plan_name = maintenance_plan.plan_name
-            existing_plan.plan_type = maintenance_plan.plan_type
-            existing_plan.project_id = maintenance_plan.project_id
-            existing_plan.project_name = project_name or existing_plan.project_name
-            existing_plan.plan_start_date = maintenance_plan.plan_start_date
-            existing_plan.plan_end_date = maintenance_plan.plan_end_date
-            existing_plan.maintenance_personnel = maintenance_plan.maintenance_personnel
-            existing_plan.status = maintenance_plan.status
-            existing_plan.filled_count = maintenance_plan.filled_count or 0
-            existing_plan.total_count = maintenance_plan.total_count or 5
-            existing_plan.remarks = maintenance_plan.remarks
-
-            result = self.work_plan_repo.update(existing_plan)
-            logger.info(f"同步更新WorkPlan (from MaintenancePlan): plan_id={plan_id}")
-            return result
-        else:
-            new_plan = WorkPlan(
-                plan_id=plan_id,
-                plan_name=maintenance_plan.plan_name,
-                plan_type=maintenance_plan.plan_type,
-                project_id=maintenance_plan.project_id,
-                project_name=project_name or '',
-                plan_start_date=maintenance_plan.plan_start_date,
-                plan_end_date=maintenance_plan.plan_end_date,
-                client_name=client_name,
-                maintenance_personnel=maintenance_plan.maintenance_personnel,
-                status=maintenance_plan.status,
-                filled_count=maintenance_plan.filled_count or 0,
-                total_count=maintenance_plan.total_count or 5,
-                remarks=maintenance_plan.remarks
-            )
-
-            result = self.work_plan_repo.create(new_plan)
-            logger.info(f"同步创建WorkPlan (from MaintenancePlan): plan_id={plan_id}")
-            return result
-
     def sync_work_plan_to_maintenance_plan(self, work_plan: WorkPlan, is_delete: bool = False, user_id: int = None) -> MaintenancePlan | None:
         """
         将WorkPlan数据同步到MaintenancePlan表
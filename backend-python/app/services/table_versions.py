@@ -0,0 +1,125 @@
+"""
+表变更计数
+工单、库存和参考数据等列表接口以表的变更计数作为 ETag 校验值，所有进程读到的计数一致
+
+- 记录：监听 Session 的 after_flush 和批量 INSERT/UPDATE/DELETE，标记本事务修改过的计数表
+- 计数：事务提交后用独立的短事务把对应表的计数加一。计数总在数据提交之后变化，
+  读到新计数的请求一定能读到新数据；长事务无论何时开始，提交后计数都会变化
+- 不经过 ORM 的修改(手工 SQL、其他程序)不会计数，需要时调用 bump() 补记
+"""
+import logging
+from collections.abc import Iterable
+
+from sqlalchemy import event, func, select
+from sqlalchemy.orm import Session
+
+from app.models.dictionary import Dictionary
+from app.models.inspection_item import InspectionItem
+from app.models.operation_type import OperationType
+from app.models.periodic_inspection import PeriodicInspection
+from app.models.personnel import Personnel
+from app.models.project_info import ProjectInfo
+from app.models.repair_tools import RepairToolsStock
+from app.models.spare_parts_stock import SparePartsStock
+from app.models.spot_work import SpotWork
+from app.models.table_change_counter import TableChangeCounter
+from app.models.temporary_repair import TemporaryRepair
+from app.utils.db_upsert import dialect_insert
+
+logger = logging.getLogger(__name__)
+
+# 以变更计数作为校验值的表
+COUNTED_MODELS = (
+    PeriodicInspection, TemporaryRepair, SpotWork, SparePartsStock, RepairToolsStock,
+    Dictionary, OperationType, Personnel, ProjectInfo, InspectionItem,
+)
+
+COUNTED_TABLES = {model: model.__tablename__ for model in COUNTED_MODELS}
+
+_SESSION_KEY = 'table_versions_dirty'
+
+
+def bump(bind, table_names: Iterable[str]) -> None:
+    """
+    表的变更计数加一，不存在的计数行按 1 插入，不提交事务
+
+    Args:
+        bind: Session 或 Connection
+        table_names: 表名
+    """
+    rows = [{'table_name': name, 'version': 1} for name in sorted(set(table_names))]
+    if not rows:
+        return
+    table = TableChangeCounter.__table__
+    stmt = dialect_insert(bind, table)
+    bind.execute(
+        stmt.on_conflict_do_update(
+            index_elements=['table_name'],
+            set_={'version': table.c.version + 1, 'updated_at': func.now()},
+        ),
+        rows,
+    )
+
+
+def table_versions(bind, *models) -> tuple[int, ...]:
+    """
+    一条 SELECT 取回各表的变更计数
+
+    Args:
+        bind: Session 或 Connection
+        models: COUNTED_MODELS 中的模型类
+
+    Returns:
+        按 models 顺序的变更计数，从未变更的表为 0
+    """
+    names = [COUNTED_TABLES[model] for model in models]
+    table = TableChangeCounter.__table__
+    versions = dict(bind.execute(
+        select(table.c.table_name, table.c.version).where(table.c.table_name.in_(names))
+    ).all())
+    return tuple(versions.get(name, 0) for name in names)
+
+
+def _mark_dirty(session: Session, table_names: set[str]) -> None:
+    session.info.setdefault(_SESSION_KEY, set()).update(table_names)
+
+
+@event.listens_for(Session, 'after_flush')
+def _mark_tables_after_flush(session: Session, flush_context) -> None:
+    """flush 中有计数表的变更时标记会话"""
+    table_names = {
+        COUNTED_TABLES[type(obj)]
+        for obj in session.new | session.dirty | session.deleted
+        if type(obj) in COUNTED_TABLES
+    }
+    if table_names:
+        _mark_dirty(session, table_names)
+
+
+@event.listens_for(Session, 'do_orm_execute')
+def _mark_tables_on_bulk(orm_execute_state) -> None:
+    """批量 INSERT/UPDATE/DELETE 计数表时标记会话"""
+    if not (orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete):
+        return
+    mapper = orm_execute_state.bind_mapper
+    if mapper is not None and mapper.class_ in COUNTED_TABLES:
+        _mark_dirty(orm_execute_state.session, {COUNTED_TABLES[mapper.class_]})
+
+
+@event.listens_for(Session, 'after_commit')
+def _bump_after_commit(session: Session) -> None:
+    """数据提交后在独立的短事务中计数，不延长业务事务持有的锁"""
+    table_names = session.info.pop(_SESSION_KEY, None)
+    if not table_names:
+        return
+    try:
+        with session.get_bind().engine.begin() as connection:
+            bump(connection, table_names)
+    except Exception as e:
+        logger.error(f"表变更计数失败 {sorted(table_names)}: {str(e)}")
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_tables_flag(session: Session) -> None:
+    """回滚后丢弃标记"""
+    session.info.pop(_SESSION_KEY, None)
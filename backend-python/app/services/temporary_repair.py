@@ -13,7 +13,6 @@ from app.models.temporary_repair import TemporaryRepair
 from app.repositories.personnel import PersonnelRepository
 from app.repositories.temporary_repair import TemporaryRepairRepository
 from app.schemas.temporary_repair import TemporaryRepairCreate, TemporaryRepairUpdate
-from app.services.sync_service import PLAN_TYPE_REPAIR, SyncService
 from app.utils.date_utils import parse_datetime
 from app.utils.dictionary_helper import get_default_temporary_repair_status
 from app.utils.work_order_id_generator import generate_repair_id
@@ -30,7 +29,6 @@ class TemporaryRepairService:
     def __init__(self, db: Session):
         self.repository = TemporaryRepairRepository(db)
         self.personnel_repository = PersonnelRepository(db)
-        self.sync_service = SyncService(db)
         self._db = db
 
     def _parse_date(self, date_value: str | datetime | None) -> datetime | None:
@@ -97,7 +95,8 @@ class TemporaryRepairService:
         project_name: str | None = None,
         repair_id: str | None = None,
         status: str | None = None,
-        maintenance_personnel: str | None = None
+        maintenance_personnel: str | None = None,
+        projection: str | None = None
     ) -> tuple[list[TemporaryRepair], int]:
         """
         分页获取临时维修列表
@@ -109,12 +108,13 @@ class TemporaryRepairService:
             repair_id: 维修单编号
             status: 状态
             maintenance_personnel: 运维人员
+            projection: 列投影名称，None 表示加载完整实体
 
         Returns:
             (维修单列表, 总数)
         """
         return self.repository.find_all(
-            page, size, project_name, repair_id, status, maintenance_personnel
+            page, size, project_name, repair_id, status, maintenance_personnel, projection=projection
         )
 
     def get_by_id(self, id: int) -> TemporaryRepair:
@@ -202,7 +202,6 @@ class TemporaryRepairService:
         )
 
         result = self.repository.create(repair)
-        self.sync_service.sync_order_to_work_plan(PLAN_TYPE_REPAIR, result)
 
         if operator_name and result.id:
             self._create_operation_log(
@@ -268,7 +267,6 @@ class TemporaryRepairService:
         existing_repair.execution_date = self._parse_date(dto.execution_date)
 
         result = self.repository.update(existing_repair)
-        self.sync_service.sync_order_to_work_plan(PLAN_TYPE_REPAIR, result)
 
         if operator_name and result.id:
             self._create_operation_log(
@@ -352,7 +350,6 @@ class TemporaryRepairService:
             existing_repair.execution_date = self._parse_date(dto.execution_date)
 
         result = self.repository.update(existing_repair)
-        self.sync_service.sync_order_to_work_plan(PLAN_TYPE_REPAIR, result)
         self._db.commit()
         return result
 
@@ -369,7 +366,6 @@ class TemporaryRepairService:
             NotFoundException: 维修单不存在
         """
         repair = self.get_by_id(id)
-        self.sync_service.sync_order_to_work_plan(PLAN_TYPE_REPAIR, repair, is_delete=True, user_id=user_id)
 
         if operator_name and repair.id:
             self._create_operation_log(
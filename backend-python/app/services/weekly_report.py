@@ -13,6 +13,7 @@ from app.models.weekly_report import WeeklyReport
 from app.repositories.weekly_report import WeeklyReportRepository
 from app.schemas.weekly_report import WeeklyReportCreate, WeeklyReportUpdate
 from app.utils.date_utils import parse_datetime
+from app.utils.work_order_id_generator import WEEKLY_REPORT_ID_PATTERN, generate_weekly_report_id
 
 logger = logging.getLogger(__name__)
 
@@ -31,15 +32,9 @@ class WeeklyReportService:
         """解析日期"""
         return parse_datetime(date_value)
 
-    def _generate_report_id(self, project_id: str) -> str:
-        """生成周报编号"""
-        today = datetime.now().strftime("%Y%m%d")
-        base_id = f"ZB-{project_id}-{today}"
-        count = self._db.query(WeeklyReport).filter(
-            WeeklyReport.report_id.like(f"{base_id}%")
-        ).count()
-        sequence = str(count + 1).zfill(2)
-        return f"{base_id}-{sequence}"
+    def _generate_report_id(self, report_date: datetime | None) -> str:
+        """生成周报编号，按填报日期分配序号"""
+        return generate_weekly_report_id(self._db, report_date.date() if report_date else None)
 
     def get_all(
         self,
@@ -115,7 +110,11 @@ class WeeklyReportService:
         Returns:
             创建的周报对象
         """
-        report_id = dto.report_id or self._generate_report_id(dto.project_id or "")
+        report_date = self._parse_date(dto.report_date)
+        report_id = dto.report_id
+        if not report_id or WEEKLY_REPORT_ID_PATTERN.match(report_id):
+            # 页面预览的编号只作展示，保存时统一由计数器分配
+            report_id = self._generate_report_id(report_date)
 
         images_json = json.dumps(dto.images, ensure_ascii=False) if dto.images else None
 
@@ -125,7 +124,7 @@ class WeeklyReportService:
             project_name=dto.project_name,
             week_start_date=self._parse_date(dto.week_start_date),
             week_end_date=self._parse_date(dto.week_end_date),
-            report_date=self._parse_date(dto.report_date),
+            report_date=report_date,
             work_summary=dto.work_summary,
             work_content=dto.work_content,
             next_week_plan=dto.next_week_plan,
@@ -0,0 +1,44 @@
+"""
+工单图片外置存储
+签字和现场照片不再以 base64 保存在工单行中，写入时自动转存到 blob 存储，
+列中只保存 /uploads/blobs/... 引用
+
+转换挂在模型属性的 set 事件上，任何 Service 或接口给这些字段赋值都会自动转存；
+存量数据由迁移 externalize_work_order_blobs 批量转换，迁移内保存了迁移时的转换逻辑
+"""
+from sqlalchemy import event
+
+from app.models.periodic_inspection import PeriodicInspection
+from app.models.spot_work import SpotWork
+from app.models.temporary_repair import TemporaryRepair
+from app.utils import blob_store
+
+SIGNATURE_COLUMNS = (
+    PeriodicInspection.signature,
+    TemporaryRepair.signature,
+    TemporaryRepair.customer_signature,
+    SpotWork.signature,
+)
+
+PHOTO_LIST_COLUMNS = (
+    TemporaryRepair.photos,
+    SpotWork.photos,
+)
+
+
+def _externalize_on_set(target, value, oldvalue, initiator):
+    """签字赋值时转存"""
+    return blob_store.externalize(value)
+
+
+def _externalize_list_on_set(target, value, oldvalue, initiator):
+    """照片 JSON 数组赋值时逐项转存"""
+    return blob_store.externalize_json_list(value)
+
+
+for _attribute in SIGNATURE_COLUMNS:
+    event.listen(_attribute, 'set', _externalize_on_set, retval=True)
+
+for _attribute in PHOTO_LIST_COLUMNS:
+    event.listen(_attribute, 'set', _externalize_list_on_set, retval=True)
+
@@ -0,0 +1,336 @@
+"""
+工单日汇总服务
+维护 work_order_daily_rollup 表，供 /statistics/* 接口读取
+
+增量维护：监听 Session 的 after_flush 事件，三种工单的新增、修改、软删除和删除
+在同一事务中转换为汇总行的增量 UPSERT，任何 Service 写工单都会自动保持汇总一致
+全量重建：rebuild() 从三张工单表重新聚合，用于修复批量 UPDATE 等绕过 ORM 造成的偏差
+批量改名/删除：move_personnel()、remove() 在批量 UPDATE/DELETE 之前移动或扣除对应工单的汇总
+"""
+import logging
+from collections import defaultdict
+from datetime import date, datetime
+
+from sqlalchemy import and_, case, delete, event, func, inspect, literal, select
+from sqlalchemy.orm import Session
+
+from app.models.periodic_inspection import PeriodicInspection
+from app.models.spot_work import SpotWork
+from app.models.temporary_repair import TemporaryRepair
+from app.models.work_order_daily_rollup import WorkOrderDailyRollup
+from app.utils.db_upsert import dialect_insert
+
+logger = logging.getLogger(__name__)
+
+ORDER_TYPE_INSPECTION = 'inspection'
+ORDER_TYPE_REPAIR = 'repair'
+ORDER_TYPE_SPOTWORK = 'spotwork'
+
+ROLLUP_SOURCES = {
+    PeriodicInspection: ORDER_TYPE_INSPECTION,
+    TemporaryRepair: ORDER_TYPE_REPAIR,
+    SpotWork: ORDER_TYPE_SPOTWORK,
+}
+
+TRACKED_FIELDS = (
+    'plan_start_date',
+    'plan_end_date',
+    'project_id',
+    'maintenance_personnel',
+    'status',
+    'actual_completion_date',
+    'is_deleted',
+)
+
+
+def _to_date(value) -> date | None:
+    """datetime 转 date"""
+    if isinstance(value, datetime):
+        return value.date()
+    return value
+
+
+def _contribution(order_type: str, values: dict) -> tuple[tuple, tuple[int, int, int]] | None:
+    """
+    计算一张工单对汇总表的贡献
+
+    Args:
+        order_type: 工单类型
+        values: TRACKED_FIELDS 对应的字段值
+
+    Returns:
+        (汇总键, (order_count, completed_count, on_time_count))，不计入汇总时返回 None
+    """
+    if values['is_deleted']:
+        return None
+    stat_date = _to_date(values['plan_start_date'])
+    if not stat_date:
+        return None
+
+    actual_completion = _to_date(values['actual_completion_date'])
+    plan_end = _to_date(values['plan_end_date'])
+    completed = 1 if actual_completion else 0
+    on_time = 1 if actual_completion and plan_end and actual_completion <= plan_end else 0
+
+    key = (
+        stat_date,
+        values['project_id'] or '',
+        values['maintenance_personnel'] or '',
+        order_type,
+        values['status'] or '',
+    )
+    return key, (1, completed, on_time)
+
+
+def _current_values(obj) -> dict:
+    """工单当前字段值"""
+    return {field: getattr(obj, field) for field in TRACKED_FIELDS}
+
+
+def _committed_values(obj) -> dict:
+    """工单本次 flush 之前的字段值"""
+    state = inspect(obj)
+    values = {}
+    for field in TRACKED_FIELDS:
+        history = state.attrs[field].load_history()
+        if history.deleted:
+            values[field] = history.deleted[0]
+        elif history.unchanged:
+            values[field] = history.unchanged[0]
+        else:
+            values[field] = getattr(obj, field)
+    return values
+
+
+def _has_tracked_changes(obj) -> bool:
+    """本次 flush 是否修改了影响汇总的字段"""
+    state = inspect(obj)
+    return any(state.attrs[field].history.has_changes() for field in TRACKED_FIELDS)
+
+
+def _apply_deltas(connection, deltas: dict) -> None:
+    """
+    将增量写入汇总表
+
+    Args:
+        connection: 当前事务连接
+        deltas: {汇总键: [order_count, completed_count, on_time_count]}
+    """
+    table = WorkOrderDailyRollup.__table__
+    rows = []
+    emptied = []
+    for key, (order_delta, completed_delta, on_time_delta) in deltas.items():
+        if not (order_delta or completed_delta or on_time_delta):
+            continue
+        stat_date, project_id, personnel, order_type, status = key
+        rows.append({
+            'stat_date': stat_date,
+            'project_id': project_id,
+            'maintenance_personnel': personnel,
+            'order_type': order_type,
+            'status': status,
+            'order_count': order_delta,
+            'completed_count': completed_delta,
+            'on_time_count': on_time_delta,
+        })
+        if order_delta < 0:
+            emptied.append(key)
+    if not rows:
+        return
+
+    # 同一语句批量执行，批量导入等大量变更时只编译一次
+    stmt = dialect_insert(connection, table)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=['stat_date', 'project_id', 'maintenance_personnel', 'order_type', 'status'],
+        set_={
+            'order_count': table.c.order_count + stmt.excluded.order_count,
+            'completed_count': table.c.completed_count + stmt.excluded.completed_count,
+            'on_time_count': table.c.on_time_count + stmt.excluded.on_time_count,
+            'updated_at': func.now(),
+        },
+    )
+    connection.execute(stmt, rows)
+
+    for stat_date, project_id, personnel, order_type, status in emptied:
+        connection.execute(delete(table).where(and_(
+            table.c.stat_date == stat_date,
+            table.c.project_id == project_id,
+            table.c.maintenance_personnel == personnel,
+            table.c.order_type == order_type,
+            table.c.status == status,
+            table.c.order_count <= 0,
+        )))
+
+
+def collect_rollup_deltas(session: Session) -> dict:
+    """
+    收集本次 flush 中工单变更对汇总表的增量
+
+    Args:
+        session: 正在 flush 的会话
+
+    Returns:
+        {汇总键: [order_count, completed_count, on_time_count]}
+    """
+    deltas = defaultdict(lambda: [0, 0, 0])
+
+    def add(contribution, sign: int):
+        if contribution is None:
+            return
+        key, measures = contribution
+        for index, value in enumerate(measures):
+            deltas[key][index] += sign * value
+
+    for obj in session.new:
+        order_type = ROLLUP_SOURCES.get(type(obj))
+        if order_type:
+            add(_contribution(order_type, _current_values(obj)), 1)
+
+    for obj in session.dirty:
+        order_type = ROLLUP_SOURCES.get(type(obj))
+        if order_type and _has_tracked_changes(obj):
+            add(_contribution(order_type, _committed_values(obj)), -1)
+            add(_contribution(order_type, _current_values(obj)), 1)
+
+    for obj in session.deleted:
+        order_type = ROLLUP_SOURCES.get(type(obj))
+        if order_type:
+            add(_contribution(order_type, _committed_values(obj)), -1)
+
+    return deltas
+
+
+@event.listens_for(Session, 'after_flush')
+def _maintain_rollup_after_flush(session: Session, flush_context) -> None:
+    """flush 后在同一事务中更新汇总表"""
+    deltas = collect_rollup_deltas(session)
+    if deltas:
+        _apply_deltas(session.connection(), deltas)
+
+
+class WorkOrderRollupService:
+    """
+    工单日汇总服务
+    提供汇总表的全量重建，以及批量改名、删除时的汇总调整
+    """
+
+    def __init__(self, db: Session):
+        self._db = db
+
+    def _aggregate_select(self, model, order_type: str):
+        """单张工单表按汇总键聚合"""
+        actual_date = func.date(model.actual_completion_date)
+        return select(
+            func.date(model.plan_start_date).label('stat_date'),
+            func.coalesce(model.project_id, '').label('project_id'),
+            func.coalesce(model.maintenance_personnel, '').label('maintenance_personnel'),
+            literal(order_type).label('order_type'),
+            func.coalesce(model.status, '').label('status'),
+            func.count().label('order_count'),
+            func.count(model.actual_completion_date).label('completed_count'),
+            func.coalesce(func.sum(case(
+                (and_(
+                    model.actual_completion_date.isnot(None),
+                    actual_date <= func.date(model.plan_end_date),
+                ), 1),
+                else_=0,
+            )), 0).label('on_time_count'),
+        ).where(
+            model.is_deleted == False,
+            model.plan_start_date.isnot(None),
+        ).group_by(
+            func.date(model.plan_start_date),
+            func.coalesce(model.project_id, ''),
+            func.coalesce(model.maintenance_personnel, ''),
+            func.coalesce(model.status, ''),
+        )
+
+    def _shift(self, model, criteria: tuple, new_personnel: str | None) -> None:
+        """
+        从汇总表扣除满足条件的工单，new_personnel 不为 None 时再以新运维人员计入
+
+        Args:
+            model: 工单模型
+            criteria: 工单过滤条件
+            new_personnel: 新运维人员，None 表示只扣除
+        """
+        order_type = ROLLUP_SOURCES[model]
+        rows = self._db.execute(self._aggregate_select(model, order_type).where(*criteria)).all()
+
+        deltas = defaultdict(lambda: [0, 0, 0])
+        for row in rows:
+            stat_date = row.stat_date
+            if isinstance(stat_date, str):
+                stat_date = date.fromisoformat(stat_date)
+            measures = (row.order_count, row.completed_count, row.on_time_count)
+            targets = [(row.maintenance_personnel, -1)]
+            if new_personnel is not None:
+                targets.append((new_personnel, 1))
+            for personnel, sign in targets:
+                key = (stat_date, row.project_id, personnel, order_type, row.status)
+                for index, value in enumerate(measures):
+                    deltas[key][index] += sign * value
+        if deltas:
+            _apply_deltas(self._db.connection(), deltas)
+
+    def move_personnel(self, model, old_name: str, new_name: str, min_id: int, max_id: int, *criteria) -> None:
+        """
+        将一段工单对汇总表的贡献从原运维人员移到新运维人员
+
+        需要在同一事务中、批量 UPDATE 工单之前调用
+
+        Args:
+            model: 工单模型
+            old_name: 原运维人员
+            new_name: 新运维人员
+            min_id: 工单 ID 下界（含）
+            max_id: 工单 ID 上界（含）
+            criteria: 其他过滤条件
+        """
+        self._shift(
+            model,
+            (model.maintenance_personnel == old_name, model.id.between(min_id, max_id), *criteria),
+            new_name,
+        )
+
+    def remove(self, model, min_id: int, max_id: int, *criteria) -> None:
+        """
+        从汇总表扣除一段工单
+
+        需要在同一事务中、批量 DELETE 工单之前调用
+
+        Args:
+            model: 工单模型
+            min_id: 工单 ID 下界（含）
+            max_id: 工单 ID 上界（含）
+            criteria: 其他过滤条件
+        """
+        self._shift(model, (model.id.between(min_id, max_id), *criteria), None)
+
+    def rebuild(self) -> int:
+        """
+        从三张工单表全量重建汇总表
+
+        Returns:
+            重建后的汇总行数
+        """
+        table = WorkOrderDailyRollup.__table__
+        columns = [
+            'stat_date', 'project_id', 'maintenance_personnel', 'order_type', 'status',
+            'order_count', 'completed_count', 'on_time_count',
+        ]
+        try:
+            self._db.execute(delete(table))
+            for model, order_type in ROLLUP_SOURCES.items():
+                self._db.execute(
+                    table.insert().from_select(columns, self._aggregate_select(model, order_type))
+                )
+            self._db.commit()
+        except Exception as e:
+            self._db.rollback()
+            logger.error(f"重建工单日汇总表失败: {str(e)}")
+            raise
+
+        row_count = self._db.query(func.count()).select_from(table).scalar() or 0
+        logger.info(f"工单日汇总表重建完成，共 {row_count} 行")
+        return row_count
@@ -0,0 +1,607 @@
+"""
+工作计划同步发件箱
+三种工单和维保计划镜像到 work_plan 表，不再在请求中同步双写
+
+- 记录：监听 Session 的 after_flush 事件，来源单据的新增、修改、软删除和删除
+  在同一事务中写入 work_plan_outbox，请求只多一条批量 INSERT
+- 应用：后台线程按批领取发件箱记录，同一单据的多次变更合并为一次，
+  按来源表当前状态批量 UPSERT 工作计划，来源已删除的工作计划批量软删除
+- 对账：reconcile() 全量比较来源表与工作计划，修复批量 UPDATE 等绕过 ORM 造成的偏差
+
+工作计划反向同步到工单和维保计划(WorkPlanService)仍在请求内完成
+"""
+import logging
+import threading
+from collections import defaultdict
+from collections.abc import Iterable
+from datetime import datetime
+
+from sqlalchemy import (
+    and_,
+    bindparam,
+    delete,
+    event,
+    exists,
+    func,
+    insert,
+    inspect,
+    literal,
+    select,
+    update,
+)
+from sqlalchemy.orm import Session
+
+from app.config import get_settings
+from app.database import SessionLocal
+from app.models.maintenance_plan import MaintenancePlan
+from app.models.periodic_inspection import PeriodicInspection
+from app.models.project_info import ProjectInfo
+from app.models.spot_work import SpotWork
+from app.models.temporary_repair import TemporaryRepair
+from app.models.work_plan import WorkPlan
+from app.models.work_plan_outbox import WorkPlanOutbox
+from app.services.sync_service import PLAN_TYPE_INSPECTION, PLAN_TYPE_REPAIR, PLAN_TYPE_SPOTWORK
+from app.utils.db_upsert import dialect_insert
+
+logger = logging.getLogger(__name__)
+
+SOURCE_INSPECTION = 'inspection'
+SOURCE_REPAIR = 'repair'
+SOURCE_SPOTWORK = 'spotwork'
+SOURCE_MAINTENANCE_PLAN = 'maintenance_plan'
+
+# 来源类型: (模型, 编号字段)
+SOURCE_MODELS = {
+    SOURCE_MAINTENANCE_PLAN: (MaintenancePlan, 'plan_id'),
+    SOURCE_INSPECTION: (PeriodicInspection, 'inspection_id'),
+    SOURCE_REPAIR: (TemporaryRepair, 'repair_id'),
+    SOURCE_SPOTWORK: (SpotWork, 'work_id'),
+}
+
+OUTBOX_SOURCES = {model: (source_type, key_field) for source_type, (model, key_field) in SOURCE_MODELS.items()}
+
+ORDER_PLAN_TYPES = {
+    SOURCE_INSPECTION: PLAN_TYPE_INSPECTION,
+    SOURCE_REPAIR: PLAN_TYPE_REPAIR,
+    SOURCE_SPOTWORK: PLAN_TYPE_SPOTWORK,
+}
+
+ORDER_FIELDS = (
+    'project_id',
+    'project_name',
+    'plan_start_date',
+    'plan_end_date',
+    'client_name',
+    'maintenance_personnel',
+    'status',
+    'filled_count',
+    'total_count',
+    'remarks',
+)
+
+# 工作计划中由来源单据决定的字段
+WORK_PLAN_FIELDS = ('plan_type',) + ORDER_FIELDS
+MAINTENANCE_PLAN_WORK_PLAN_FIELDS = ('plan_name',) + WORK_PLAN_FIELDS
+
+# 变更后需要重新同步的来源字段
+TRACKED_FIELDS = {
+    model: tuple(
+        field for field in (key_field, 'plan_id', 'plan_name', 'plan_type', 'is_deleted') + ORDER_FIELDS
+        if hasattr(model, field)
+    )
+    for model, (_, key_field) in OUTBOX_SOURCES.items()
+}
+
+# advisory lock 键，保证同一时刻只有一个进程应用发件箱，同一单据的变更按提交顺序生效
+OUTBOX_LOCK_KEY = 0x57504F42
+
+_SESSION_FLAG = 'work_plan_outbox_written'
+
+_UNCHANGED = object()
+
+
+def _committed_key(obj, key_field: str):
+    """单据本次 flush 之前的编号"""
+    history = inspect(obj).attrs[key_field].load_history()
+    if history.deleted:
+        return history.deleted[0]
+    return getattr(obj, key_field)
+
+
+def collect_outbox_events(session: Session) -> set[tuple[str, str]]:
+    """
+    收集本次 flush 中需要同步到工作计划的来源单据
+
+    单据编号被修改时同时记录旧编号，使旧编号对应的工作计划被软删除
+
+    Args:
+        session: 正在 flush 的会话
+
+    Returns:
+        {(来源类型, 单据编号)}
+    """
+    events = set()
+    for obj in session.new:
+        source = OUTBOX_SOURCES.get(type(obj))
+        if source:
+            events.add((source[0], getattr(obj, source[1])))
+
+    for obj in session.dirty:
+        source = OUTBOX_SOURCES.get(type(obj))
+        if not source:
+            continue
+        state = inspect(obj)
+        if any(state.attrs[field].history.has_changes() for field in TRACKED_FIELDS[type(obj)]):
+            events.add((source[0], getattr(obj, source[1])))
+            events.add((source[0], _committed_key(obj, source[1])))
+
+    for obj in session.deleted:
+        source = OUTBOX_SOURCES.get(type(obj))
+        if source:
+            events.add((source[0], _committed_key(obj, source[1])))
+
+    return {(source_type, key) for source_type, key in events if key}
+
+
+@event.listens_for(Session, 'after_flush')
+def _record_outbox_after_flush(session: Session, flush_context) -> None:
+    """flush 后在同一事务中写入发件箱"""
+    events = collect_outbox_events(session)
+    if events:
+        session.connection().execute(
+            insert(WorkPlanOutbox.__table__),
+            [{'source_type': source_type, 'source_key': key} for source_type, key in sorted(events)],
+        )
+        session.info[_SESSION_FLAG] = True
+
+
+def record_bulk_changes(session: Session, model, *criteria) -> None:
+    """
+    批量 UPDATE 绕过 ORM、不触发 after_flush 时，为命中的来源单据写入发件箱
+
+    在同一事务中、批量语句执行之前调用，criteria 与批量语句的条件一致
+
+    Args:
+        session: 数据库会话
+        model: 来源单据模型，不是工单或维保计划时忽略
+        criteria: 过滤条件
+    """
+    source = OUTBOX_SOURCES.get(model)
+    if source is None:
+        return
+    source_type, key_field = source
+    key_column = getattr(model, key_field)
+    result = session.execute(
+        insert(WorkPlanOutbox.__table__).from_select(
+            ['source_type', 'source_key'],
+            select(literal(source_type), key_column).where(*criteria, key_column.isnot(None)),
+        )
+    )
+    if result.rowcount:
+        session.info[_SESSION_FLAG] = True
+
+
+@event.listens_for(Session, 'after_commit')
+def _wake_outbox_applier(session: Session) -> None:
+    """提交后通知应用线程"""
+    if session.info.pop(_SESSION_FLAG, False):
+        work_plan_outbox_applier.wake()
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_outbox_flag(session: Session) -> None:
+    """回滚后丢弃标记"""
+    session.info.pop(_SESSION_FLAG, None)
+
+
+def _source_select(source_type: str):
+    """来源单据同步所需的列，维保计划附带项目名称和客户单位"""
+    model, key_field = SOURCE_MODELS[source_type]
+    columns = [
+        getattr(model, key_field).label('key'),
+        model.is_deleted,
+        model.deleted_at,
+        model.deleted_by,
+        *(getattr(model, field) for field in ORDER_FIELDS if hasattr(model, field)),
+    ]
+    if source_type == SOURCE_MAINTENANCE_PLAN:
+        return select(
+            *columns,
+            model.plan_name,
+            model.plan_type,
+            ProjectInfo.project_name.label('project_project_name'),
+            ProjectInfo.client_name.label('project_client_name'),
+        ).outerjoin(ProjectInfo, ProjectInfo.project_id == model.project_id)
+    if source_type == SOURCE_INSPECTION:
+        columns.append(model.plan_id)
+    return select(*columns)
+
+
+def _work_plan_values(source_type: str, row) -> dict | None:
+    """
+    来源单据对应的工作计划字段值
+
+    Returns:
+        字段值；来源单据已删除时返回 None；不镜像的单据返回 _UNCHANGED
+    """
+    if source_type == SOURCE_INSPECTION and row.plan_id:
+        # 由维保计划生成的巡检单以维保计划的工作计划为准
+        return _UNCHANGED
+    if row.is_deleted:
+        return None
+
+    values = {
+        'plan_id': row.key,
+        'project_id': row.project_id,
+        'project_name': row.project_name,
+        'plan_start_date': row.plan_start_date,
+        'plan_end_date': row.plan_end_date,
+        'maintenance_personnel': row.maintenance_personnel,
+        'status': row.status,
+        'filled_count': row._mapping.get('filled_count') or 0,
+        'total_count': row._mapping.get('total_count') or 5,
+        'remarks': row.remarks,
+    }
+    if source_type == SOURCE_MAINTENANCE_PLAN:
+        values['plan_name'] = row.plan_name
+        values['plan_type'] = row.plan_type
+        values['project_name'] = row.project_name or row.project_project_name or row.project_id
+        values['client_name'] = row.project_client_name or ''
+    else:
+        values['plan_type'] = ORDER_PLAN_TYPES[source_type]
+        values['client_name'] = row.client_name
+    return values
+
+
+class WorkPlanOutboxService:
+    """
+    工作计划同步服务
+    应用发件箱记录，以及全量对账修复
+    """
+
+    def __init__(self, db: Session):
+        self._db = db
+
+    def _load_sources(self, source_type: str, keys: Iterable[str]) -> dict:
+        """按编号批量读取来源单据"""
+        model, key_field = SOURCE_MODELS[source_type]
+        keys = list(keys)
+        rows = {}
+        for start in range(0, len(keys), 1000):
+            chunk = keys[start:start + 1000]
+            for row in self._db.execute(_source_select(source_type).where(getattr(model, key_field).in_(chunk))):
+                rows[row.key] = row
+        return rows
+
+    def _upsert(self, fields: tuple[str, ...], rows: list[dict]) -> None:
+        """批量插入或更新工作计划，已软删除的工作计划一并恢复"""
+        if not rows:
+            return
+        table = WorkPlan.__table__
+        stmt = dialect_insert(self._db, table)
+        set_ = {field: stmt.excluded[field] for field in fields}
+        set_.update(is_deleted=False, deleted_at=None, deleted_by=None, updated_at=func.now())
+        self._db.execute(
+            stmt.on_conflict_do_update(index_elements=['plan_id'], set_=set_),
+            [dict(row, is_deleted=False) for row in rows],
+        )
+
+    def _soft_delete(self, rows: list[dict]) -> None:
+        """批量软删除工作计划，rows 为 {'key', 'at', 'by'}"""
+        if not rows:
+            return
+        table = WorkPlan.__table__
+        self._db.execute(
+            update(table)
+            .where(table.c.plan_id == bindparam('key'), table.c.is_deleted.isnot(True))
+            .values(is_deleted=True, deleted_at=bindparam('at'), deleted_by=bindparam('by'), updated_at=func.now()),
+            rows,
+        )
+
+    def _write(self, changes: dict[str, tuple[dict, dict]]) -> tuple[int, int]:
+        """
+        按来源类型写入工作计划，维保计划先于工单写入
+
+        Args:
+            changes: {来源类型: ({编号: 工作计划字段值}, {编号: 软删除参数})}
+
+        Returns:
+            (写入数, 软删除数)
+        """
+        upserted = deleted = 0
+        for source_type in SOURCE_MODELS:
+            values, removals = changes.get(source_type, ({}, {}))
+            fields = MAINTENANCE_PLAN_WORK_PLAN_FIELDS if source_type == SOURCE_MAINTENANCE_PLAN else WORK_PLAN_FIELDS
+            self._upsert(fields, list(values.values()))
+            self._soft_delete(list(removals.values()))
+            upserted += len(values)
+            deleted += len(removals)
+        return upserted, deleted
+
+    def apply(self, keys: Iterable[tuple[str, str]]) -> dict:
+        """
+        按来源单据当前状态同步工作计划，不提交事务
+
+        Args:
+            keys: {(来源类型, 单据编号)}
+
+        Returns:
+            {'upserted': 写入数, 'deleted': 软删除数}
+        """
+        by_type = defaultdict(set)
+        for source_type, key in keys:
+            if source_type in SOURCE_MODELS:
+                by_type[source_type].add(key)
+
+        now = datetime.now()
+        changes = {}
+        for source_type, type_keys in by_type.items():
+            sources = self._load_sources(source_type, type_keys)
+            values, removals = {}, {}
+            for key in type_keys:
+                row = sources.get(key)
+                plan_values = _work_plan_values(source_type, row) if row is not None else None
+                if plan_values is _UNCHANGED:
+                    continue
+                if plan_values is None:
+                    removals[key] = {
+                        'key': key,
+                        'at': (row.deleted_at if row is not None else None) or now,
+                        'by': row.deleted_by if row is not None else None,
+                    }
+                else:
+                    values[key] = plan_values
+            changes[source_type] = (values, removals)
+
+        upserted, deleted = self._write(changes)
+        return {'upserted': upserted, 'deleted': deleted}
+
+    def _try_lock(self) -> bool:
+        """获取事务级 advisory lock，非 PostgreSQL 时不加锁"""
+        if self._db.get_bind().dialect.name != 'postgresql':
+            return True
+        return bool(self._db.execute(select(func.pg_try_advisory_xact_lock(OUTBOX_LOCK_KEY))).scalar())
+
+    def _apply_isolated(self, events: list) -> tuple[list[int], dict[tuple[str, str], str]]:
+        """
+        在 SAVEPOINT 中应用一批记录，整批失败时逐个单据重试，使单个违反约束的单据不影响其他单据
+
+        Returns:
+            (已应用的记录 ID, {(来源类型, 单据编号): 失败原因})
+        """
+        by_key = defaultdict(list)
+        for row in events:
+            by_key[(row.source_type, row.source_key)].append(row.id)
+        groups = [list(by_key)]
+        if len(by_key) > 1:
+            groups += [[key] for key in by_key]
+
+        applied, failed = [], {}
+        for keys in groups:
+            try:
+                with self._db.begin_nested():
+                    self.apply(keys)
+            except Exception as e:
+                if len(keys) == 1:
+                    failed[keys[0]] = str(e)
+                continue
+            applied.extend(row_id for key in keys for row_id in by_key[key])
+            if len(keys) > 1:
+                break
+        return applied, failed
+
+    def _record_failures(self, events: list, failed: dict[tuple[str, str], str], max_attempts: int) -> None:
+        """累加失败次数并记录原因，达到上限的记录标记为死信，不再领取"""
+        table = WorkPlanOutbox.__table__
+        now = datetime.now()
+        for row in events:
+            error = failed.get((row.source_type, row.source_key))
+            if error is None:
+                continue
+            dead = row.attempts + 1 >= max_attempts
+            self._db.execute(
+                update(table)
+                .where(table.c.id == row.id)
+                .values(attempts=row.attempts + 1, last_error=error[:2000], dead_at=now if dead else None)
+            )
+            if dead:
+                logger.error(f"工作计划同步失败 {max_attempts} 次，停止重试: {row.source_type} {row.source_key}: {error}")
+
+    def drain(self, batch_size: int | None = None) -> int:
+        """
+        领取一批发件箱记录，合并后同步到工作计划并删除记录，在一个事务内提交
+
+        每个单据在独立的 SAVEPOINT 中应用，失败的记录保留并累加失败次数，排到未失败过的记录之后；
+        失败次数达到 outbox_max_attempts 后标记为死信，由 reconcile() 修复
+
+        Args:
+            batch_size: 每批记录数，默认取配置
+
+        Returns:
+            成功同步的记录数，其他进程正在处理或没有可同步的记录时返回 0
+        """
+        settings = get_settings()
+        batch_size = batch_size or settings.outbox_batch_size
+        table = WorkPlanOutbox.__table__
+        try:
+            if not self._try_lock():
+                self._db.rollback()
+                return 0
+            events = self._db.execute(
+                select(table.c.id, table.c.source_type, table.c.source_key, table.c.attempts)
+                .where(table.c.dead_at.is_(None))
+                .order_by(table.c.attempts, table.c.id)
+                .limit(batch_size)
+            ).all()
+            if not events:
+                self._db.rollback()
+                return 0
+            applied, failed = self._apply_isolated(events)
+            if applied:
+                self._db.execute(delete(table).where(table.c.id.in_(applied)))
+            self._record_failures(events, failed, settings.outbox_max_attempts)
+            self._db.commit()
+        except Exception:
+            self._db.rollback()
+            raise
+        return len(applied)
+
+    def drain_all(self, batch_size: int | None = None) -> int:
+        """处理发件箱直到没有可同步的记录，返回成功同步的记录数；失败的记录留待下次轮询重试"""
+        total = 0
+        while True:
+            processed = self.drain(batch_size)
+            total += processed
+            if not processed:
+                return total
+
+    def _diff_source(self, source_type: str, now: datetime) -> tuple[dict, dict, set]:
+        """比较一种来源单据与工作计划，返回需要写入、需要软删除的工作计划和未删除的单据编号"""
+        model, key_field = SOURCE_MODELS[source_type]
+        fields = MAINTENANCE_PLAN_WORK_PLAN_FIELDS if source_type == SOURCE_MAINTENANCE_PLAN else WORK_PLAN_FIELDS
+        table = WorkPlan.__table__
+        key_column = getattr(model, key_field)
+        stmt = _source_select(source_type).add_columns(
+            table.c.id.label('work_plan_pk'),
+            table.c.is_deleted.label('work_plan_deleted'),
+            *(table.c[field].label(f'work_plan_{field}') for field in fields),
+        ).outerjoin(table, table.c.plan_id == key_column)
+
+        values, removals, live = {}, {}, set()
+        for row in self._db.execute(stmt.execution_options(yield_per=1000)):
+            plan_values = _work_plan_values(source_type, row)
+            if plan_values is _UNCHANGED:
+                continue
+            if plan_values is not None:
+                live.add(row.key)
+            if plan_values is None:
+                if row.work_plan_pk is not None and not row.work_plan_deleted:
+                    removals[row.key] = {'key': row.key, 'at': row.deleted_at or now, 'by': row.deleted_by}
+            elif (
+                row.work_plan_pk is None
+                or row.work_plan_deleted
+                or any(getattr(row, f'work_plan_{field}') != plan_values[field] for field in fields)
+            ):
+                values[row.key] = plan_values
+        return values, removals, live
+
+    def reconcile(self, fix: bool = True) -> dict:
+        """
+        全量比较来源表与工作计划并修复偏差
+
+        没有任何未删除来源单据的工作计划视为孤立记录，予以软删除
+
+        Args:
+            fix: 是否写入修复，False 时只统计
+
+        Returns:
+            {'upserted': 需写入数, 'deleted': 需软删除数, 'orphaned': 孤立工作计划数}
+        """
+        now = datetime.now()
+        changes = {}
+        live_keys = set()
+        for source_type in SOURCE_MODELS:
+            values, removals, live = self._diff_source(source_type, now)
+            changes[source_type] = (values, removals)
+            live_keys |= live
+        # 同一编号的维保计划和工单可能同时存在，以未删除的一方为准
+        for _, removals in changes.values():
+            for key in removals.keys() & live_keys:
+                del removals[key]
+
+        table = WorkPlan.__table__
+        removed_keys = set()
+        for _, removals in changes.values():
+            removed_keys.update(removals)
+        orphans = [
+            {'key': plan_id, 'at': now, 'by': None}
+            for plan_id in self._db.execute(
+                select(table.c.plan_id).where(
+                    table.c.is_deleted.isnot(True),
+                    *(
+                        ~exists().where(and_(
+                            getattr(model, key_field) == table.c.plan_id,
+                            model.is_deleted.isnot(True),
+                        ))
+                        for model, key_field in SOURCE_MODELS.values()
+                    ),
+                )
+            ).scalars()
+            if plan_id not in removed_keys
+        ]
+
+        upserted = sum(len(values) for values, _ in changes.values())
+        deleted = sum(len(removals) for _, removals in changes.values())
+        if fix:
+            try:
+                self._write(changes)
+                self._soft_delete(orphans)
+                self._db.commit()
+            except Exception:
+                self._db.rollback()
+                raise
+            logger.info(f"工作计划对账完成: 写入 {upserted} 条, 软删除 {deleted} 条, 孤立 {len(orphans)} 条")
+        return {'upserted': upserted, 'deleted': deleted, 'orphaned': len(orphans)}
+
+
+class WorkPlanOutboxApplier:
+    """
+    发件箱应用线程
+    提交后被唤醒，另按固定间隔轮询，处理其他进程写入或上次失败的记录
+    """
+
+    def __init__(self, session_factory, batch_size: int, poll_seconds: int):
+        """
+        Args:
+            session_factory: 数据库会话工厂
+            batch_size: 每批处理的记录数
+            poll_seconds: 轮询间隔
+        """
+        self._session_factory = session_factory
+        self.batch_size = batch_size
+        self.poll_seconds = poll_seconds
+        self._thread: threading.Thread | None = None
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+
+    def start(self) -> None:
+        """启动应用线程"""
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name='work-plan-outbox', daemon=True)
+        self._thread.start()
+
+    def shutdown(self) -> None:
+        """停止应用线程，未处理的记录由下次启动时处理"""
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def wake(self) -> None:
+        """通知应用线程有新记录"""
+        if self._thread is not None:
+            self._wake.set()
+
+    def _loop(self) -> None:
+        while not self._stop.is_set():
+            self._wake.clear()
+            try:
+                self.run_once()
+            except Exception as e:
+                logger.error(f"同步工作计划失败: {str(e)}")
+            self._wake.wait(self.poll_seconds)
+
+    def run_once(self) -> int:
+        """处理发件箱直到为空，返回处理的记录数"""
+        with self._session_factory() as db:
+            return WorkPlanOutboxService(db).drain_all(self.batch_size)
+
+
+_settings = get_settings()
+
+work_plan_outbox_applier = WorkPlanOutboxApplier(
+    SessionLocal, _settings.outbox_batch_size, _settings.outbox_poll_seconds
+)
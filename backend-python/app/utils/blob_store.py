@@ -0,0 +1,282 @@
+"""
+内容寻址文件存储
+文件按 SHA-256 存放在 uploads/blobs/<前两位>/<摘要><扩展名>，相同内容只存一份，
+数据库只保存 /uploads/blobs/... 形式的短引用，前端可直接作为图片地址使用
+"""
+import base64
+import binascii
+import hashlib
+import json
+import os
+import re
+import tempfile
+from pathlib import Path
+
+from app.utils.signed_url import UPLOADS_PREFIX, strip_upload_signature
+
+UPLOAD_DIR = Path(__file__).resolve().parent.parent / "uploads"
+BLOB_DIR = UPLOAD_DIR / "blobs"
+BLOB_URL_PREFIX = "/uploads/blobs/"
+
+MIME_EXTENSIONS = {
+    'image/png': '.png',
+    'image/jpeg': '.jpg',
+    'image/jpg': '.jpg',
+    'image/gif': '.gif',
+    'image/webp': '.webp',
+}
+
+DATA_URI_PATTERN = re.compile(r'^data:(?P<mime>[\w.+-]+/[\w.+-]+)?(?:;[\w.+-]+=[\w.+-]+)*;base64,', re.IGNORECASE)
+
+RAW_BASE64_MIN_LENGTH = 512
+
+# 每次读取的 base64 字符数，去掉空白后不足 4 的倍数的部分并入下一块解码
+BASE64_CHUNK_CHARS = 4 * 64 * 1024
+
+# MIME 等格式按行折叠的 base64 中的空白
+BASE64_WHITESPACE = str.maketrans('', '', ' \t\n\r\v\f')
+
+
+def sniff_extension(data: bytes) -> str | None:
+    """根据文件头识别图片扩展名"""
+    if data.startswith(b'\x89PNG\r\n\x1a\n'):
+        return '.png'
+    if data.startswith(b'\xff\xd8\xff'):
+        return '.jpg'
+    if data[:6] in (b'GIF87a', b'GIF89a'):
+        return '.gif'
+    if data[:4] == b'RIFF' and data[8:12] == b'WEBP':
+        return '.webp'
+    return None
+
+
+def blob_url(digest: str, extension: str) -> str:
+    """摘要对应的访问地址"""
+    return f"{BLOB_URL_PREFIX}{digest[:2]}/{digest}{extension}"
+
+
+def blob_path_from_url(url: str) -> Path | None:
+    """访问地址对应的本地文件，不是 blob 地址时返回 None"""
+    if not url or not url.startswith(BLOB_URL_PREFIX):
+        return None
+    relative = url[len(BLOB_URL_PREFIX):]
+    if '..' in relative or relative.startswith('/'):
+        return None
+    return BLOB_DIR / relative
+
+
+class BlobTooLargeError(ValueError):
+    """写入内容超过大小限制"""
+
+
+class BlobWriter:
+    """
+    分块写入 blob
+
+    内容边写入同目录临时文件边计算 SHA-256，commit() 时原子重命名到内容地址；
+    相同内容已存在时丢弃临时文件，并发写入同一内容也不会产生半个文件
+    """
+
+    def __init__(self, max_size: int | None = None):
+        """
+        Args:
+            max_size: 最大字节数，None 表示不限制
+        """
+        self.max_size = max_size
+        self.size = 0
+        self.head = b''
+        self._hash = hashlib.sha256()
+        BLOB_DIR.mkdir(parents=True, exist_ok=True)
+        fd, self._temp_path = tempfile.mkstemp(dir=BLOB_DIR, prefix='.tmp-')
+        self._file = os.fdopen(fd, 'wb')
+
+    def write(self, chunk: bytes) -> None:
+        """
+        写入一块内容
+
+        Raises:
+            BlobTooLargeError: 累计大小超过 max_size
+        """
+        self.size += len(chunk)
+        if self.max_size is not None and self.size > self.max_size:
+            raise BlobTooLargeError(f"文件大小超过 {self.max_size} 字节")
+        if len(self.head) < 16:
+            self.head += chunk[:16 - len(self.head)]
+        self._hash.update(chunk)
+        self._file.write(chunk)
+
+    def commit(self, extension: str) -> str:
+        """
+        完成写入并移动到内容地址
+
+        Args:
+            extension: 扩展名（含点）
+
+        Returns:
+            /uploads/blobs/... 访问地址
+        """
+        self._file.close()
+        digest = self._hash.hexdigest()
+        target = BLOB_DIR / digest[:2] / f"{digest}{extension}"
+        try:
+            if target.exists():
+                os.unlink(self._temp_path)
+            else:
+                target.parent.mkdir(parents=True, exist_ok=True)
+                os.replace(self._temp_path, target)
+        except BaseException:
+            self.abort()
+            raise
+        return blob_url(digest, extension)
+
+    def abort(self) -> None:
+        """放弃写入并删除临时文件"""
+        self._file.close()
+        if os.path.exists(self._temp_path):
+            os.unlink(self._temp_path)
+
+
+def resolve_upload_path(relative: str) -> Path | None:
+    """
+    uploads 目录下的相对路径对应的文件
+
+    Args:
+        relative: 相对 uploads 目录的路径
+
+    Returns:
+        文件路径，越出 uploads 目录或文件不存在时返回 None
+    """
+    root = UPLOAD_DIR.resolve()
+    path = (root / relative).resolve()
+    if not path.is_relative_to(root) or not path.is_file():
+        return None
+    return path
+
+
+def store_blob(data: bytes, extension: str) -> str:
+    """
+    保存文件内容，已存在相同内容时直接返回引用
+
+    Args:
+        data: 文件内容
+        extension: 扩展名（含点）
+
+    Returns:
+        /uploads/blobs/... 访问地址
+    """
+    digest = hashlib.sha256(data).hexdigest()
+    if (BLOB_DIR / digest[:2] / f"{digest}{extension}").exists():
+        return blob_url(digest, extension)
+    writer = BlobWriter()
+    try:
+        writer.write(data)
+    except BaseException:
+        writer.abort()
+        raise
+    return writer.commit(extension)
+
+
+def store_base64(payload: str, max_size: int | None = None, default_extension: str = '.png') -> str:
+    """
+    分块解码 base64 并保存，不在内存中生成完整的解码结果
+
+    允许按行折叠的 base64，空白字符被忽略，其他非 base64 字符视为无效数据
+
+    Args:
+        payload: data URI 或裸 base64
+        max_size: 解码后最大字节数
+        default_extension: 无法从文件头识别格式时使用的扩展名
+
+    Returns:
+        /uploads/blobs/... 访问地址
+
+    Raises:
+        ValueError: base64 数据无效
+        BlobTooLargeError: 超过大小限制
+    """
+    match = DATA_URI_PATTERN.match(payload)
+    start = match.end() if match else 0
+    writer = BlobWriter(max_size)
+    try:
+        remainder = ''
+        for offset in range(start, len(payload), BASE64_CHUNK_CHARS):
+            chunk = remainder + payload[offset:offset + BASE64_CHUNK_CHARS].translate(BASE64_WHITESPACE)
+            usable = len(chunk) - len(chunk) % 4
+            remainder = chunk[usable:]
+            writer.write(base64.b64decode(chunk[:usable], validate=True))
+        if remainder:
+            writer.write(base64.b64decode(remainder, validate=True))
+    except binascii.Error:
+        writer.abort()
+        raise ValueError("无效的base64数据") from None
+    except BaseException:
+        writer.abort()
+        raise
+    return writer.commit(sniff_extension(writer.head) or default_extension)
+
+
+def _decode_inline_image(value: str) -> tuple[bytes, str] | None:
+    """解析 data URI 或裸 base64 图片，返回 (内容, 扩展名)"""
+    match = DATA_URI_PATTERN.match(value)
+    if match:
+        payload = value[match.end():]
+    elif len(value) >= RAW_BASE64_MIN_LENGTH and not value.startswith(('/uploads/', 'http')):
+        payload = value
+    else:
+        return None
+
+    try:
+        data = base64.b64decode(payload.strip(), validate=not match)
+    except (binascii.Error, ValueError):
+        return None
+
+    extension = sniff_extension(data)
+    if extension is None and match and match.group('mime'):
+        extension = MIME_EXTENSIONS.get(match.group('mime').lower())
+    if extension is None:
+        return None
+    return data, extension
+
+
+def externalize(value: str | None) -> str | None:
+    """
+    将内联的 base64 图片转存为文件引用，/uploads 地址去掉签名参数，其他值原样返回
+
+    Args:
+        value: data URI、裸 base64、已有地址或空值
+
+    Returns:
+        文件引用或原值
+    """
+    if not value or not isinstance(value, str):
+        return value
+    if value.startswith(UPLOADS_PREFIX):
+        return strip_upload_signature(value)
+    decoded = _decode_inline_image(value)
+    if decoded is None:
+        return value
+    return store_blob(*decoded)
+
+
+def externalize_json_list(value: str | None) -> str | None:
+    """
+    JSON 数组形式的图片列表逐项转存
+
+    Args:
+        value: JSON 数组字符串
+
+    Returns:
+        转存后的 JSON 数组字符串，无法解析时原样返回
+    """
+    if not value or not isinstance(value, str):
+        return value
+    if 'base64' not in value and 'signature=' not in value and len(value) < RAW_BASE64_MIN_LENGTH:
+        return value
+    try:
+        items = json.loads(value)
+    except (TypeError, ValueError):
+        return value
+    if not isinstance(items, list):
+        return value
+    return json.dumps([externalize(item) for item in items], ensure_ascii=False)
+
@@ -0,0 +1,140 @@
+"""
+HTTP 条件请求工具
+列表和参考数据接口先计算廉价的校验值，生成弱 ETag；请求头 If-None-Match 命中时直接返回 304，
+不执行列表查询，也不做序列化
+
+- 校验值：工单、库存和参考数据都取表变更计数(见 table_versions)，一条 SELECT 取回，
+  计数在数据提交之后才变化，长事务提交后同样会更换校验值，多个 worker 的 ETag 一致；
+  参考数据读到新计数时先失效本进程的参考数据缓存，再返回新内容
+- ETag：请求路径、查询参数、用户范围和校验值的摘要，筛选条件不同或用户不同时 ETag 不同；
+  开启 upload_require_signature 时还包含文件签名时间窗，缓存的响应不会带着过期的签名地址
+- 缓存策略：按路由类别设置 Cache-Control / Vary，见 REFERENCE_POLICY、USER_SCOPED_POLICY
+"""
+import hashlib
+from collections.abc import Callable
+
+from fastapi import Request, Response, status
+from sqlalchemy.orm import Session
+
+from app.services.reference_cache import REFERENCE_NAMESPACES, reference_cache
+from app.services.table_versions import table_versions
+from app.utils.signed_url import upload_url_window
+
+
+class CachePolicy:
+    """
+    路由类别对应的缓存响应头
+    """
+
+    def __init__(self, cache_control: str, vary: str | None = None):
+        self.cache_control = cache_control
+        self.vary = vary
+
+    def headers(self, etag: str) -> dict[str, str]:
+        """生成响应头"""
+        headers = {"ETag": etag, "Cache-Control": self.cache_control}
+        if self.vary:
+            headers["Vary"] = self.vary
+        return headers
+
+
+# 字典、操作类型、巡检事项、库存等所有用户看到相同内容的接口，每次使用前向服务端确认
+REFERENCE_POLICY = CachePolicy("private, no-cache")
+
+# 工单、项目等按当前用户过滤的接口，浏览器缓存按登录凭证区分
+USER_SCOPED_POLICY = CachePolicy("private, no-cache", vary="Authorization")
+
+
+_NAMESPACE_MODELS = {namespace: model for model, namespace in REFERENCE_NAMESPACES.items()}
+
+
+def table_validator(db: Session, *models) -> tuple:
+    """
+    一条 SELECT 取回各表的变更计数
+
+    Args:
+        db: 数据库会话
+        models: table_versions.COUNTED_MODELS 中的模型类
+
+    Returns:
+        按 models 顺序的变更计数
+    """
+    return table_versions(db, *models)
+
+
+def reference_validator(db: Session, namespace: str) -> int:
+    """
+    参考数据命名空间的表变更计数，计数变化时先失效本进程的参考数据缓存
+
+    Args:
+        db: 数据库会话
+        namespace: 参考数据命名空间
+
+    Returns:
+        表变更计数
+    """
+    model = _NAMESPACE_MODELS[namespace]
+    (counter,) = table_versions(db, model)
+    reference_cache.sync_counter(namespace, counter)
+    return counter
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """按弱比较判断 If-None-Match 是否包含 etag"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == '*':
+        return True
+    opaque = etag.removeprefix('W/')
+    return any(tag.strip().removeprefix('W/') == opaque for tag in if_none_match.split(','))
+
+
+class ConditionalGet:
+    """
+    单次请求的条件判断，由 conditional_get 依赖注入
+    """
+
+    def __init__(self, request: Request, response: Response, policy: CachePolicy):
+        self._request = request
+        self._response = response
+        self.policy = policy
+
+    def etag(self, *parts) -> str:
+        """根据请求路径、查询参数、文件签名时间窗和 parts 生成弱 ETag"""
+        query = sorted(self._request.query_params.multi_items())
+        key = (self._request.url.path, query, upload_url_window(), parts)
+        digest = hashlib.sha256(repr(key).encode('utf-8')).hexdigest()
+        return f'W/"{digest[:32]}"'
+
+    def evaluate(self, *parts) -> Response | None:
+        """
+        计算 ETag 并写入响应头，客户端缓存仍有效时返回 304 响应
+
+        Args:
+            parts: 校验值和用户范围等影响响应内容的值
+
+        Returns:
+            304 响应，需要返回完整内容时为 None
+        """
+        etag = self.etag(*parts)
+        headers = self.policy.headers(etag)
+        if etag_matches(self._request.headers.get('if-none-match'), etag):
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+        self._response.headers.update(headers)
+        return None
+
+
+def conditional_get(policy: CachePolicy) -> Callable[[Request, Response], ConditionalGet]:
+    """
+    条件请求依赖
+
+    用法:
+        conditional: ConditionalGet = Depends(conditional_get(REFERENCE_POLICY))
+        not_modified = conditional.evaluate(reference_validator(db, 'dictionary'))
+        if not_modified is not None:
+            return not_modified
+    """
+    def dependency(request: Request, response: Response) -> ConditionalGet:
+        return ConditionalGet(request, response, policy)
+
+    return dependency
@@ -0,0 +1,35 @@
+"""
+数据库分段批量处理工具模块
+按主键顺序分段，批量 UPDATE/DELETE 每段单独提交，缩短单个事务持有行锁的时间
+"""
+from collections.abc import Iterator
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+
+def iter_id_ranges(db: Session, model, *criteria, chunk_size: int = 1000) -> Iterator[tuple[int, int, int]]:
+    """
+    按主键顺序分段遍历满足条件的记录
+
+    每次只查询下一段的主键，调用方在两次迭代之间可以更新、删除当前段并提交
+
+    Args:
+        db: 数据库会话
+        model: 模型类，主键为 id
+        criteria: 过滤条件
+        chunk_size: 每段记录数
+
+    Yields:
+        (段内最小 ID, 段内最大 ID, 段内记录数)
+    """
+    last_id = None
+    while True:
+        stmt = select(model.id).where(*criteria)
+        if last_id is not None:
+            stmt = stmt.where(model.id > last_id)
+        ids = db.execute(stmt.order_by(model.id).limit(chunk_size)).scalars().all()
+        if not ids:
+            return
+        last_id = ids[-1]
+        yield ids[0], ids[-1], len(ids)
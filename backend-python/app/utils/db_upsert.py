@@ -0,0 +1,25 @@
+"""
+数据库 UPSERT 工具模块
+根据当前连接方言返回支持 ON CONFLICT 的 insert 构造器
+"""
+from sqlalchemy.dialects import postgresql, sqlite
+
+
+def dialect_insert(bind, table):
+    """
+    获取支持 on_conflict_do_update / on_conflict_do_nothing 的 insert 语句
+
+    生产环境为 PostgreSQL，测试环境为 SQLite，两者的 ON CONFLICT 语法一致
+
+    Args:
+        bind: Session、Connection 或 Engine
+        table: 表对象或模型类
+
+    Returns:
+        方言对应的 Insert 对象
+    """
+    if hasattr(bind, 'get_bind'):
+        bind = bind.get_bind()
+    if bind.dialect.name == 'sqlite':
+        return sqlite.insert(table)
+    return postgresql.insert(table)
@@ -3,37 +3,30 @@ import logging
 from sqlalchemy.orm import Session
 
 from app.repositories.dictionary import DictionaryRepository
+from app.services.reference_cache import reference_cache
 
 logger = logging.getLogger(__name__)
 
 
 class DictionaryHelper:
-    """字典工具类，用于获取字典的默认值"""
-
-    _cache = {}
+    """字典工具类，用于获取字典的默认值，结果缓存在参考数据缓存的 dictionary 命名空间"""
 
     @classmethod
     def get_default_value(cls, db: Session, dict_type: str, dict_key: str) -> str:
         """获取字典的默认值"""
-        cache_key = f"{dict_type}:{dict_key}"
-
-        if cache_key in cls._cache:
-            return cls._cache[cache_key]
+        def load() -> str | None:
+            dictionary = DictionaryRepository(db).find_by_type_and_key(dict_type, dict_key)
+            return dictionary.dict_value if dictionary else None
 
         try:
-            repository = DictionaryRepository(db)
-            dictionary = repository.find_by_type_and_key(dict_type, dict_key)
-
-            if dictionary:
-                value = dictionary.dict_value
-                cls._cache[cache_key] = value
-                return value
-            else:
-                logger.warning(f"字典不存在: dict_type={dict_type}, dict_key={dict_key}")
-                return ""
+            value = reference_cache.get_or_load(db, 'dictionary', ('value', dict_type, dict_key), load)
         except Exception as e:
             logger.error(f"获取字典默认值失败: {str(e)}")
             return ""
+        if value is None:
+            logger.warning(f"字典不存在: dict_type={dict_type}, dict_key={dict_key}")
+            return ""
+        return value
 
 
 def get_default_temporary_repair_status(db: Session) -> str:
@@ -0,0 +1,143 @@
+"""
+上传文件签名地址
+/uploads/<路径>?expires=<过期时间戳>&signature=<HMAC-SHA256>，
+签名密钥由 SECRET_KEY 派生，过期或被篡改的地址校验失败；
+衍生图地址 <api_prefix>/images/<规格>/<路径> 沿用原图的签名参数；
+开启 upload_require_signature 后，接口返回的文件地址由 present_upload_url 统一加签名
+"""
+import hashlib
+import hmac
+import time
+from urllib.parse import quote, unquote, urlencode
+
+from app.config import get_settings
+
+UPLOADS_PREFIX = "/uploads/"
+
+
+def _signing_key() -> bytes:
+    return hashlib.sha256(f"uploads:{get_settings().secret_key}".encode()).digest()
+
+
+def _signature(path: str, expires: int) -> str:
+    return hmac.new(_signing_key(), f"{path}:{expires}".encode(), hashlib.sha256).hexdigest()
+
+
+def _signed_url(url: str, expires: int) -> str:
+    if not url.startswith(UPLOADS_PREFIX):
+        raise ValueError("只能签名 /uploads 下的文件")
+    path = unquote(url[len(UPLOADS_PREFIX):].split('?', 1)[0])
+    query = urlencode({'expires': expires, 'signature': _signature(path, expires)})
+    return f"{UPLOADS_PREFIX}{quote(path)}?{query}"
+
+
+def sign_upload_url(url: str, ttl_seconds: int, now: float | None = None) -> str:
+    """
+    为 /uploads 下的文件生成带过期时间的签名地址
+
+    Args:
+        url: /uploads/... 地址
+        ttl_seconds: 有效秒数
+        now: 当前时间戳
+
+    Returns:
+        签名地址
+
+    Raises:
+        ValueError: 不是 /uploads 下的地址
+    """
+    return _signed_url(url, int((now if now is not None else time.time()) + ttl_seconds))
+
+
+def sign_image_url(url: str, variant: str, ttl_seconds: int, now: float | None = None) -> str:
+    """
+    为 /uploads 下的图片生成衍生图的签名地址，签名与原图相同
+
+    Args:
+        url: /uploads/... 地址
+        variant: 图片规格
+        ttl_seconds: 有效秒数
+        now: 当前时间戳
+
+    Returns:
+        签名地址
+
+    Raises:
+        ValueError: 不是 /uploads 下的地址
+    """
+    signed = sign_upload_url(url, ttl_seconds, now)
+    return f"{get_settings().api_prefix}/images/{quote(variant)}/{signed[len(UPLOADS_PREFIX):]}"
+
+
+def verify_upload_signature(path: str, expires: int, signature: str, now: float | None = None) -> bool:
+    """
+    校验签名地址
+
+    Args:
+        path: 相对 uploads 目录的路径
+        expires: 过期时间戳
+        signature: 签名
+
+    Returns:
+        签名有效且未过期
+    """
+    if expires < (now if now is not None else time.time()):
+        return False
+    return hmac.compare_digest(_signature(path, expires), signature)
+
+
+def upload_url_window(now: float | None = None) -> int | None:
+    """
+    present_upload_url 当前使用的签名时间窗序号，未开启强制签名时为 None
+
+    同一时间窗内生成的签名地址相同，条件请求把它计入 ETag，缓存的响应不会带着过期的签名地址
+    """
+    settings = get_settings()
+    if not settings.upload_require_signature:
+        return None
+    return int(now if now is not None else time.time()) // settings.upload_url_ttl_seconds
+
+
+def present_upload_url(value, now: float | None = None):
+    """
+    返回给客户端的文件地址，upload_require_signature 开启时为 /uploads 下的地址加签名
+
+    数据库只保存不带签名的引用，序列化工单、巡检记录或上传结果时经此转换。
+    过期时间对齐到时间窗末尾再加一个有效期，同一时间窗内地址不变，浏览器可以复用缓存的图片
+
+    Args:
+        value: 文件地址或其他值
+        now: 当前时间戳
+
+    Returns:
+        签名地址或原值
+    """
+    settings = get_settings()
+    if (
+        not settings.upload_require_signature
+        or not isinstance(value, str)
+        or not value.startswith(UPLOADS_PREFIX)
+        or '?' in value
+    ):
+        return value
+    return _signed_url(value, (upload_url_window(now) + 2) * settings.upload_url_ttl_seconds)
+
+
+def present_upload_urls(values: list) -> list:
+    """逐项转换图片地址列表，见 present_upload_url"""
+    return [present_upload_url(value) for value in values]
+
+
+def strip_upload_signature(value):
+    """
+    去掉 /uploads 地址上的签名参数，客户端回传签名地址时只保存引用
+
+    Args:
+        value: 文件地址或其他值
+
+    Returns:
+        不带查询参数的地址或原值
+    """
+    if isinstance(value, str) and value.startswith(UPLOADS_PREFIX) and '?' in value:
+        return value.split('?', 1)[0]
+    return value
@@ -0,0 +1,33 @@
+"""
+跨方言 SQL 函数
+生产环境为 PostgreSQL，测试环境为 SQLite，在此统一两者语法差异
+"""
+from sqlalchemy import Integer
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.functions import FunctionElement
+
+
+class days_between(FunctionElement):
+    """
+    两个日期/时间之间相差的天数（按日期部分计算，忽略时间）
+
+    用法: days_between(end, start) 等价于 Python 的 (end.date() - start.date()).days
+    """
+    type = Integer()
+    inherit_cache = True
+    name = 'days_between'
+
+
+@compiles(days_between)
+def _compile_days_between(element, compiler, **kw):
+    end, start = list(element.clauses)
+    return f"(CAST({compiler.process(end, **kw)} AS DATE) - CAST({compiler.process(start, **kw)} AS DATE))"
+
+
+@compiles(days_between, 'sqlite')
+def _compile_days_between_sqlite(element, compiler, **kw):
+    end, start = list(element.clauses)
+    return (
+        f"CAST(julianday(date({compiler.process(end, **kw)})) - "
+        f"julianday(date({compiler.process(start, **kw)})) AS INTEGER)"
+    )
@@ -0,0 +1,160 @@
+"""
+表格文件读取工具
+读取 CSV 或 XLSX 的第一个工作表，首行为表头，返回按表头取值的行字典
+
+XLSX 只解析共享字符串和单元格值，不依赖第三方库；日期单元格返回 Excel 序列号字符串，由调用方按列转换
+"""
+import csv
+import io
+import re
+import zipfile
+from xml.etree import ElementTree
+
+XLSX_NS = {'m': 'http://schemas.openxmlformats.org/spreadsheetml/2006/main'}
+REL_NS = '{http://schemas.openxmlformats.org/officeDocument/2006/relationships}id'
+PACKAGE_REL_NS = {'r': 'http://schemas.openxmlformats.org/package/2006/relationships'}
+
+MAX_XLSX_PART_SIZE = 50 * 1024 * 1024
+
+# Excel 工作表的最大行数和列数，超出的行号或列号视为无效文件
+XLSX_MAX_ROWS = 1048576
+XLSX_MAX_COLUMNS = 16384
+
+CELL_REF_PATTERN = re.compile(r'^([A-Z]+)')
+
+
+def _column_index(ref: str) -> int:
+    """单元格引用的列序号，A 为 0"""
+    match = CELL_REF_PATTERN.match(ref)
+    if match is None:
+        raise ValueError("无效的 XLSX 文件")
+    index = 0
+    for letter in match.group(1):
+        index = index * 26 + ord(letter) - ord('A') + 1
+    if index > XLSX_MAX_COLUMNS:
+        raise ValueError("无效的 XLSX 文件")
+    return index - 1
+
+
+def _read_part(archive: zipfile.ZipFile, name: str) -> bytes | None:
+    """读取压缩包内的文件，不存在时返回 None"""
+    try:
+        info = archive.getinfo(name)
+    except KeyError:
+        return None
+    if info.file_size > MAX_XLSX_PART_SIZE:
+        raise ValueError("表格文件过大")
+    return archive.read(info)
+
+
+def _shared_string(shared_strings: list[str], raw: str) -> str:
+    """按序号取共享字符串，序号无效时视为无效文件"""
+    if not raw.isdigit() or int(raw) >= len(shared_strings):
+        raise ValueError("无效的 XLSX 文件")
+    return shared_strings[int(raw)]
+
+
+def _first_sheet_path(archive: zipfile.ZipFile) -> str:
+    """第一个工作表在压缩包内的路径"""
+    workbook = _read_part(archive, 'xl/workbook.xml')
+    rels = _read_part(archive, 'xl/_rels/workbook.xml.rels')
+    if workbook and rels:
+        sheet = ElementTree.fromstring(workbook).find('m:sheets/m:sheet', XLSX_NS)
+        if sheet is not None:
+            rel_id = sheet.get(REL_NS)
+            for rel in ElementTree.fromstring(rels).findall('r:Relationship', PACKAGE_REL_NS):
+                if rel.get('Id') == rel_id:
+                    target = rel.get('Target').lstrip('/')
+                    return target if target.startswith('xl/') else f"xl/{target}"
+    return 'xl/worksheets/sheet1.xml'
+
+
+def _read_xlsx(content: bytes) -> list[list[str]]:
+    """读取 XLSX 第一个工作表的单元格文本"""
+    try:
+        archive = zipfile.ZipFile(io.BytesIO(content))
+    except zipfile.BadZipFile:
+        raise ValueError("无效的 XLSX 文件") from None
+
+    with archive:
+        shared_strings = []
+        shared = _read_part(archive, 'xl/sharedStrings.xml')
+        if shared:
+            for item in ElementTree.fromstring(shared).findall('m:si', XLSX_NS):
+                shared_strings.append(''.join(text.text or '' for text in item.iter(f"{{{XLSX_NS['m']}}}t")))
+
+        sheet = _read_part(archive, _first_sheet_path(archive))
+        if sheet is None:
+            raise ValueError("XLSX 文件中没有工作表")
+
+        rows: list[list[str]] = []
+        for row in ElementTree.fromstring(sheet).iterfind('m:sheetData/m:row', XLSX_NS):
+            # Excel 不写出空行，按行号 r 补齐，保证数据行号与表格中一致
+            row_number = row.get('r')
+            if row_number:
+                if not row_number.isdigit() or int(row_number) > XLSX_MAX_ROWS:
+                    raise ValueError("无效的 XLSX 文件")
+                rows.extend([] for _ in range(int(row_number) - 1 - len(rows)))
+            values: list[str] = []
+            for position, cell in enumerate(row.findall('m:c', XLSX_NS)):
+                ref = cell.get('r')
+                index = _column_index(ref) if ref else position
+                cell_type = cell.get('t')
+                if cell_type == 'inlineStr':
+                    value = ''.join(text.text or '' for text in cell.iter(f"{{{XLSX_NS['m']}}}t"))
+                else:
+                    raw = cell.findtext('m:v', default='', namespaces=XLSX_NS)
+                    value = _shared_string(shared_strings, raw) if cell_type == 's' and raw else raw
+                values.extend([''] * (index + 1 - len(values)))
+                values[index] = value
+            rows.append(values)
+        return rows
+
+
+def _read_csv(content: bytes) -> list[list[str]]:
+    """读取 CSV，兼容 UTF-8（含 BOM）和 Excel 另存的 GB18030 编码"""
+    try:
+        text = content.decode('utf-8-sig')
+    except UnicodeDecodeError:
+        text = content.decode('gb18030', errors='replace')
+    return list(csv.reader(io.StringIO(text)))
+
+
+def _fit(values: list[str], width: int) -> list[str]:
+    """数据行按表头列数截断或补空，表头以外的单元格忽略"""
+    return values[:width] + [''] * (width - len(values))
+
+
+def read_table(filename: str, content: bytes) -> list[dict[str, str]]:
+    """
+    读取表格文件
+
+    Args:
+        filename: 文件名，按扩展名区分 CSV 和 XLSX
+        content: 文件内容
+
+    Returns:
+        数据行列表，每行为 {表头: 单元格文本}，空行保留为空字典以便调用方按行号报错
+
+    Raises:
+        ValueError: 文件格式不支持或内容无效
+    """
+    name = (filename or '').lower()
+    if name.endswith('.xlsx'):
+        rows = _read_xlsx(content)
+    elif name.endswith('.csv'):
+        rows = _read_csv(content)
+    else:
+        raise ValueError("仅支持 CSV 或 XLSX 文件")
+
+    if not rows:
+        return []
+    headers = [header.strip() for header in rows[0]]
+    return [
+        {
+            header: value
+            for header, value in zip(headers, _fit(values, len(headers)), strict=True)
+            if header and value.strip()
+        }
+        for values in rows[1:]
+    ]
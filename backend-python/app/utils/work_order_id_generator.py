@@ -1,45 +1,221 @@
 """
-工单编号生成工具 - 使用数据库序列保证唯一性
+单据编号生成工具 - 基于 serial_counter 计数器表分配序号
+
+每个 (前缀, 范围, 日期) 一行计数器，分配时执行
+INSERT ... ON CONFLICT DO UPDATE SET last_value = last_value + N RETURNING last_value，
+一次往返即可预留 N 个连续序号：
+
+- 并发安全：同一计数器行的并发分配由行锁串行化，不会重复
+- 不留空号：计数器在调用方事务内更新，事务回滚时预留的序号一并撤销
 """
 import logging
-from datetime import datetime
+import re
+from datetime import date
 
-from sqlalchemy import text
+from sqlalchemy import func, select
 from sqlalchemy.orm import Session
 
+from app.models.serial_counter import SerialCounter
+from app.utils.db_upsert import dialect_insert
+
 logger = logging.getLogger(__name__)
 
+WEEKLY_REPORT_PREFIX = "ZB"
+MAINTENANCE_LOG_COUNTER_PREFIX = "LOG-"
+
+WEEKLY_REPORT_ID_PATTERN = re.compile(r'^ZB-\d{8}-\d+$')
+
+
+def _counter_upsert(db: Session):
+    """计数器累加语句，参数为 prefix/scope/day/last_value(本次预留数量)"""
+    table = SerialCounter.__table__
+    stmt = dialect_insert(db, table)
+    return stmt.on_conflict_do_update(
+        index_elements=['prefix', 'scope', 'day'],
+        set_={
+            'last_value': table.c.last_value + stmt.excluded.last_value,
+            'updated_at': func.now(),
+        },
+    )
+
 
-def generate_work_order_id(db: Session, prefix: str, project_id: str) -> str:
+def reserve_serials(
+    db: Session,
+    prefix: str,
+    scope: str = '',
+    day: date | None = None,
+    count: int = 1
+) -> range:
     """
-    生成唯一的工单编号
-    格式: 前缀-项目编号-年月日-序号
-    例如: XJ-PRJ001-20260222-0001
+    预留连续序号
+
+    Args:
+        db: 数据库会话，计数器在该会话的事务内更新
+        prefix: 编号前缀
+        scope: 编号范围，如项目编号
+        day: 编号日期，默认今天
+        count: 预留数量
+
+    Returns:
+        预留的序号区间
+
+    Raises:
+        ValueError: 预留数量小于 1
+    """
+    if count < 1:
+        raise ValueError("预留数量必须大于0")
 
-    使用数据库序列保证并发安全
-    序列应该在应用启动时创建
+    last_value = db.execute(
+        _counter_upsert(db).returning(SerialCounter.__table__.c.last_value),
+        {'prefix': prefix, 'scope': scope or '', 'day': day or date.today(), 'last_value': count},
+    ).scalar_one()
+    return range(last_value - count + 1, last_value + 1)
+
+
+def reserve_serial_ranges(db: Session, counts: dict[tuple[str, str, date], int]) -> dict[tuple[str, str, date], range]:
+    """
+    一次为多个计数器预留序号，批量创建跨项目、跨日期的单据时使用
+
+    Args:
+        db: 数据库会话
+        counts: {(前缀, 范围, 日期): 预留数量}
+
+    Returns:
+        {(前缀, 范围, 日期): 预留的序号区间}
+    """
+    if not counts:
+        return {}
+    if min(counts.values()) < 1:
+        raise ValueError("预留数量必须大于0")
+
+    table = SerialCounter.__table__
+    rows = db.execute(
+        _counter_upsert(db).returning(table.c.prefix, table.c.scope, table.c.day, table.c.last_value),
+        [
+            {'prefix': prefix, 'scope': scope or '', 'day': day, 'last_value': count}
+            for (prefix, scope, day), count in counts.items()
+        ],
+    ).all()
+    last_values = {(row.prefix, row.scope, row.day): row.last_value for row in rows}
+
+    ranges = {}
+    for (prefix, scope, day), count in counts.items():
+        last_value = last_values[(prefix, scope or '', day)]
+        ranges[(prefix, scope, day)] = range(last_value - count + 1, last_value + 1)
+    return ranges
+
+
+def peek_serial(db: Session, prefix: str, scope: str = '', day: date | None = None) -> int:
     """
-    today = datetime.now().strftime("%Y%m%d")
+    查询下一个序号，不预留，仅用于页面预览
 
-    seq = db.execute(text("SELECT nextval('work_order_seq')")).scalar()
+    Args:
+        db: 数据库会话
+        prefix: 编号前缀
+        scope: 编号范围
+        day: 编号日期，默认今天
 
-    sequence = str(seq).zfill(4)
-    work_id = f"{prefix}-{project_id}-{today}-{sequence}"
+    Returns:
+        下一个序号
+    """
+    last_value = db.execute(
+        select(SerialCounter.last_value).where(
+            SerialCounter.prefix == prefix,
+            SerialCounter.scope == (scope or ''),
+            SerialCounter.day == (day or date.today()),
+        )
+    ).scalar()
+    return (last_value or 0) + 1
 
+
+def format_work_order_id(prefix: str, project_id: str, day: date, seq: int) -> str:
+    """
+    工单编号格式: 前缀-项目编号-年月日-序号
+    例如: XJ-PRJ001-20260222-0001
+    """
+    return f"{prefix}-{project_id}-{day.strftime('%Y%m%d')}-{seq:04d}"
+
+
+def generate_work_order_ids(
+    db: Session,
+    prefix: str,
+    project_id: str,
+    count: int,
+    day: date | None = None
+) -> list[str]:
+    """批量生成同一项目同一天的工单编号，一次往返预留 count 个序号"""
+    day = day or date.today()
+    return [
+        format_work_order_id(prefix, project_id, day, seq)
+        for seq in reserve_serials(db, prefix, project_id, day, count)
+    ]
+
+
+def generate_work_order_id(db: Session, prefix: str, project_id: str, day: date | None = None) -> str:
+    """
+    生成唯一的工单编号
+    格式: 前缀-项目编号-年月日-序号
+    例如: XJ-PRJ001-20260222-0001
+
+    序号按前缀、项目和日期分别从 1 开始连续递增
+    """
+    work_id = generate_work_order_ids(db, prefix, project_id, 1, day)[0]
     logger.debug(f"生成工单编号: {work_id}")
     return work_id
 
 
-def generate_inspection_id(db: Session, project_id: str) -> str:
+def generate_inspection_id(db: Session, project_id: str, day: date | None = None) -> str:
     """生成定期巡检单编号"""
-    return generate_work_order_id(db, "XJ", project_id)
+    return generate_work_order_id(db, "XJ", project_id, day)
 
 
-def generate_repair_id(db: Session, project_id: str) -> str:
+def generate_repair_id(db: Session, project_id: str, day: date | None = None) -> str:
     """生成临时维修单编号"""
-    return generate_work_order_id(db, "WX", project_id)
+    return generate_work_order_id(db, "WX", project_id, day)
 
 
-def generate_spot_work_id(db: Session, project_id: str) -> str:
+def generate_spot_work_id(db: Session, project_id: str, day: date | None = None) -> str:
     """生成零星用工单编号"""
-    return generate_work_order_id(db, "YG", project_id)
+    return generate_work_order_id(db, "YG", project_id, day)
+
+
+def generate_weekly_report_id(db: Session, day: date | None = None) -> str:
+    """
+    生成周报编号
+    格式: ZB-年月日-序号
+    示例: ZB-20260220-01
+    """
+    day = day or date.today()
+    seq = reserve_serials(db, WEEKLY_REPORT_PREFIX, '', day)[0]
+    return f"{WEEKLY_REPORT_PREFIX}-{day.strftime('%Y%m%d')}-{seq:02d}"
+
+
+def preview_weekly_report_id(db: Session, day: date | None = None) -> str:
+    """预览下一个周报编号，不预留，实际编号在保存时分配"""
+    day = day or date.today()
+    seq = peek_serial(db, WEEKLY_REPORT_PREFIX, '', day)
+    return f"{WEEKLY_REPORT_PREFIX}-{day.strftime('%Y%m%d')}-{seq:02d}"
+
+
+def generate_maintenance_log_id(db: Session, prefix: str, project_id: str, day: date | None = None) -> str:
+    """
+    生成维修日志编号
+    格式: 前缀-项目编号-年月日-序号
+    示例: WX-TQ2023423-20251123-01
+
+    日志与临时维修单共用 WX 前缀，计数器单独计数
+    """
+    day = day or date.today()
+    seq = reserve_serials(db, f"{MAINTENANCE_LOG_COUNTER_PREFIX}{prefix}", project_id, day)[0]
+    return f"{prefix}-{project_id}-{day.strftime('%Y%m%d')}-{seq:02d}"
+
+
+def generate_inbound_no(db: Session, prefix: str, day: date | None = None) -> str:
+    """
+    生成入库单号
+    格式: 前缀年月日序号
+    示例: IN202602200001
+    """
+    day = day or date.today()
+    seq = reserve_serials(db, prefix, '', day)[0]
+    return f"{prefix}{day.strftime('%Y%m%d')}{seq:04d}"
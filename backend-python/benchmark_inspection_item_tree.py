@@ -0,0 +1,91 @@
+"""
+巡检事项树基准
+对比逐节点扫描全表建树、一次遍历索引建树和读取缓存快照的耗时
+
+用法: python benchmark_inspection_item_tree.py [--systems 100] [--checks 30]
+"""
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.database import Base
+from app.models.inspection_item import InspectionItem
+from app.repositories.inspection_item import InspectionItemRepository
+from app.services.inspection_item import InspectionItemService
+
+
+def _scan_tree(items: list[InspectionItem], parent_id: int | None = None) -> list[dict]:
+    """原实现：每个节点扫描一遍全部事项"""
+    tree = []
+    for item in items:
+        if item.parent_id == parent_id:
+            node = item.to_dict()
+            node['children'] = _scan_tree(items, item.id)
+            tree.append(node)
+    return tree
+
+
+def _seed(session, systems: int, checks: int) -> int:
+    """生成 项目类型 → 系统类型 → 检查项 三层目录"""
+    rows = []
+    next_id = 1
+    for project in range(5):
+        project_id = next_id
+        next_id += 1
+        rows.append(InspectionItem(id=project_id, item_code=f'P{project}', item_name='项目类型', item_type='项目类型', level=1))
+        for _ in range(systems // 5):
+            system_id = next_id
+            next_id += 1
+            rows.append(InspectionItem(
+                id=system_id, item_code=f'S{system_id}', item_name='系统类型', item_type='系统类型',
+                level=2, parent_id=project_id,
+            ))
+            for check in range(checks):
+                rows.append(InspectionItem(
+                    id=next_id, item_code=f'C{next_id}', item_name='检查项', item_type='检查项',
+                    level=3, parent_id=system_id, sort_order=check,
+                ))
+                next_id += 1
+    session.add_all(rows)
+    session.commit()
+    return len(rows)
+
+
+def _timed(label: str, func, repeat: int = 5) -> None:
+    started = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    print(f"{label}: {(time.perf_counter() - started) / repeat * 1000:.1f} ms")
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description="巡检事项树基准")
+    parser.add_argument("--systems", type=int, default=100)
+    parser.add_argument("--checks", type=int, default=30)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        engine = create_engine(f"sqlite:///{Path(directory) / 'tree.db'}")
+        Base.metadata.create_all(engine)
+        session = sessionmaker(bind=engine)()
+        print(f"巡检事项 {_seed(session, args.systems, args.checks)} 条")
+
+        repository = InspectionItemRepository(session)
+        service = InspectionItemService(session)
+        _timed("逐节点扫描建树", lambda: _scan_tree(repository.get_all()), repeat=1)
+        _timed("索引建树", repository.get_tree)
+        service.get_tree_json()
+        _timed("读取缓存快照", service.get_tree_json, repeat=100)
+        session.close()
+
+
+if __name__ == "__main__":
+    main()
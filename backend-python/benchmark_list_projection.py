@@ -0,0 +1,117 @@
+"""
+列表投影基准
+对比列表查询加载完整实体与 summary 投影的耗时和峰值内存
+
+用法: python benchmark_list_projection.py [--rows 1000] [--text-size 8000] [--rounds 5]
+"""
+import argparse
+import json
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.database import Base
+from app.models.maintenance_plan import MaintenancePlan
+from app.models.periodic_inspection import PeriodicInspection
+from app.models.project_info import ProjectInfo
+from app.models.spot_work import SpotWork
+from app.models.temporary_repair import TemporaryRepair
+from app.repositories.maintenance_plan import MaintenancePlanRepository
+from app.repositories.periodic_inspection import PeriodicInspectionRepository
+from app.repositories.spot_work import SpotWorkRepository
+from app.repositories.temporary_repair import TemporaryRepairRepository
+
+
+def _seed(session, rows: int, text_size: int):
+    """生成工单数据，大字段按 text_size 填充；SQLite 的 BigInteger 主键不自增，显式指定 id"""
+    text = 'x' * text_size
+    photos = json.dumps([f"/uploads/blobs/ab/{index:064d}.jpg" for index in range(6)])
+    start = datetime(2024, 1, 1)
+    session.add(ProjectInfo(
+        id=1, project_id='P001', project_name='基准项目', completion_date=start,
+        maintenance_end_date=start + timedelta(days=365), maintenance_period='每月',
+        client_name='客户单位', address='地址', project_manager='张三',
+    ))
+    for index in range(rows):
+        common = {
+            'id': index + 1,
+            'project_id': 'P001',
+            'project_name': '基准项目',
+            'plan_start_date': start + timedelta(days=index % 365),
+            'plan_end_date': start + timedelta(days=index % 365 + 7),
+            'maintenance_personnel': '张三',
+            'status': '执行中',
+            'remarks': '备注',
+        }
+        session.add(PeriodicInspection(inspection_id=f'XJ-{index:05d}', execution_result=text, **common))
+        session.add(TemporaryRepair(
+            repair_id=f'WX-{index:05d}', fault_description=text, solution=text, photos=photos, **common
+        ))
+        session.add(SpotWork(work_id=f'YG-{index:05d}', work_content=text, photos=photos, **common))
+        session.add(MaintenancePlan(
+            plan_id=f'JH-{index:05d}', plan_name='基准计划', plan_type='定期维保', equipment_id='E001',
+            equipment_name='设备', maintenance_content=text, maintenance_requirements=text,
+            inspection_items=text, plan_status='已发布', **common,
+        ))
+    session.commit()
+
+
+def _measure(session_factory, repository_class, rows: int, projection: str | None, rounds: int):
+    """返回 (单次耗时毫秒, 峰值内存 MB, 响应字节数)"""
+    elapsed = []
+    peak = 0
+    payload = 0
+    for _ in range(rounds):
+        session = session_factory()
+        tracemalloc.start()
+        started = time.perf_counter()
+        items, _ = repository_class(session).find_all(page=0, size=rows, projection=projection)
+        payload = len(json.dumps([item.to_dict() for item in items], ensure_ascii=False).encode())
+        elapsed.append((time.perf_counter() - started) * 1000)
+        peak = max(peak, tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+        session.close()
+    return min(elapsed), peak / 1024 / 1024, payload
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description="列表投影基准")
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--text-size", type=int, default=8000, help="每个大字段的字符数")
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        engine = create_engine(f"sqlite:///{Path(directory) / 'bench.db'}")
+        Base.metadata.create_all(engine)
+        session_factory = sessionmaker(bind=engine)
+        with session_factory() as session:
+            _seed(session, args.rows, args.text_size)
+
+        print(f"每种工单 {args.rows} 行，大字段 {args.text_size} 字符，取 {args.rounds} 轮最优耗时")
+        for repository_class in (
+            PeriodicInspectionRepository,
+            TemporaryRepairRepository,
+            SpotWorkRepository,
+            MaintenancePlanRepository,
+        ):
+            for projection in (None, 'summary'):
+                cost, peak, payload = _measure(session_factory, repository_class, args.rows, projection, args.rounds)
+                print(
+                    f"{repository_class.__name__:<32} {projection or 'full':<8} "
+                    f"{cost:8.1f} ms  峰值 {peak:7.1f} MB  响应 {payload / 1024:8.1f} KB"
+                )
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+维保计划导入基准
+对比逐条调用 MaintenancePlanService.create 与 bulk_import 创建计划、巡检工单、工作计划和操作日志的耗时
+
+用法: python benchmark_plan_import.py [--plans 1000] [--projects 20]
+"""
+import argparse
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from sqlalchemy import BigInteger, create_engine
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import sessionmaker
+
+from app.database import Base
+from app.models.project_info import ProjectInfo
+from app.schemas.maintenance_plan import MaintenancePlanCreate
+from app.services.maintenance_plan import MaintenancePlanService
+
+
+@compiles(BigInteger, "sqlite")
+def _compile_big_integer_sqlite(type_, compiler, **kw):
+    """SQLite 只有 INTEGER PRIMARY KEY 自增"""
+    return "INTEGER"
+
+
+def _rows(plans: int, projects: int) -> list[dict]:
+    """生成一年的维保计划数据"""
+    start = datetime(2026, 1, 1)
+    return [
+        {
+            'plan_id': f'JH-{index:05d}',
+            'plan_name': '年度维保计划',
+            'project_id': f'P{index % projects:03d}',
+            'plan_type': '定期维保',
+            'equipment_id': 'EQ001',
+            'equipment_name': '默认设备',
+            'plan_start_date': (start + timedelta(days=index % 365)).isoformat(),
+            'plan_end_date': (start + timedelta(days=index % 365 + 7)).isoformat(),
+            'maintenance_personnel': '张三',
+            'maintenance_content': '常规维保',
+            'plan_status': '执行中',
+            'status': '未开始',
+        }
+        for index in range(plans)
+    ]
+
+
+def _session(directory: str, name: str, projects: int):
+    """新建数据库并写入项目"""
+    engine = create_engine(f"sqlite:///{Path(directory) / name}")
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    start = datetime(2026, 1, 1)
+    session.add_all([
+        ProjectInfo(
+            project_id=f'P{index:03d}', project_name=f'项目{index}', completion_date=start,
+            maintenance_end_date=start + timedelta(days=365), maintenance_period='每月',
+            client_name=f'客户{index}', address='地址', project_manager='张三',
+        )
+        for index in range(projects)
+    ])
+    session.commit()
+    return session
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description="维保计划导入基准")
+    parser.add_argument("--plans", type=int, default=1000)
+    parser.add_argument("--projects", type=int, default=20)
+    args = parser.parse_args()
+
+    rows = _rows(args.plans, args.projects)
+    print(f"维保计划 {args.plans} 条，项目 {args.projects} 个")
+    with tempfile.TemporaryDirectory() as directory:
+        session = _session(directory, 'single.db', args.projects)
+        service = MaintenancePlanService(session)
+        started = time.perf_counter()
+        for row in rows:
+            service.create(MaintenancePlanCreate.model_validate(row), 1, '管理员')
+        print(f"逐条创建: {time.perf_counter() - started:.2f} s")
+        session.close()
+
+        session = _session(directory, 'bulk.db', args.projects)
+        started = time.perf_counter()
+        result = MaintenancePlanService(session).bulk_import(rows, 1, '管理员')
+        print(f"批量导入: {time.perf_counter() - started:.2f} s，错误 {len(result['errors'])} 行")
+        session.close()
+
+
+if __name__ == "__main__":
+    main()
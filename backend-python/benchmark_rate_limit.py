@@ -0,0 +1,93 @@
+"""
+限流算法微基准
+对比原时间戳列表实现与滑动窗口计数实现的单次请求耗时
+
+用法: python benchmark_rate_limit.py [--clients 50] [--requests 2000] [--threads 4]
+"""
+import argparse
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from app.middleware.rate_limit import (
+    HOUR_WINDOW,
+    MINUTE_WINDOW,
+    MemoryRateLimitBackend,
+    SQLiteRateLimitBackend,
+)
+
+REQUESTS_PER_MINUTE = 10 ** 9
+REQUESTS_PER_HOUR = 10 ** 9
+LIMITS = ((MINUTE_WINDOW, REQUESTS_PER_MINUTE), (HOUR_WINDOW, REQUESTS_PER_HOUR))
+
+
+class LegacyListLimiter:
+    """原 RateLimitMiddleware 的计数逻辑：每个客户端保存请求时间戳列表，全局一把锁"""
+
+    def __init__(self):
+        self.request_counts = defaultdict(lambda: {"minute": [], "hour": []})
+        self._lock = threading.Lock()
+
+    def hit(self, client_id: str, now: float, limits) -> int | None:
+        with self._lock:
+            counts = self.request_counts[client_id]
+            counts["minute"] = [t for t in counts["minute"] if t > now - 60]
+            counts["hour"] = [t for t in counts["hour"] if t > now - 3600]
+            if len(counts["minute"]) >= REQUESTS_PER_MINUTE:
+                return 0
+            if len(counts["hour"]) >= REQUESTS_PER_HOUR:
+                return 1
+            counts["minute"].append(now)
+            counts["hour"].append(now)
+            return None
+
+
+def _run(limiter, clients: int, requests: int, threads: int) -> float:
+    """每个客户端在一小时内均匀发出 requests 次请求，返回单次请求平均耗时（微秒）"""
+    step = HOUR_WINDOW / requests
+    client_ids = [f"10.0.{index // 256}.{index % 256}" for index in range(clients)]
+    per_thread = [client_ids[index::threads] for index in range(threads)]
+
+    def worker(ids):
+        for request_index in range(requests):
+            now = 1_700_000_000.0 + request_index * step
+            for client_id in ids:
+                limiter.hit(client_id, now, LIMITS)
+
+    workers = [threading.Thread(target=worker, args=(ids,)) for ids in per_thread]
+    started = time.perf_counter()
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    return elapsed / (clients * requests) * 1_000_000
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description="限流算法微基准")
+    parser.add_argument("--clients", type=int, default=50)
+    parser.add_argument("--requests", type=int, default=2000, help="每个客户端每小时请求数")
+    parser.add_argument("--threads", type=int, default=4)
+    args = parser.parse_args()
+
+    print(f"客户端 {args.clients} 个，每客户端每小时 {args.requests} 次请求，线程 {args.threads} 个")
+    with tempfile.TemporaryDirectory() as directory:
+        limiters = [
+            ("原时间戳列表", LegacyListLimiter()),
+            ("滑动窗口计数（内存分片）", MemoryRateLimitBackend()),
+            ("滑动窗口计数（SQLite 共享）", SQLiteRateLimitBackend(str(Path(directory) / "rate.db"))),
+        ]
+        for title, limiter in limiters:
+            cost = _run(limiter, args.clients, args.requests, args.threads)
+            print(f"{title}: {cost:.2f} µs/请求")
+
+
+if __name__ == "__main__":
+    main()
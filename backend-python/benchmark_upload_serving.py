@@ -0,0 +1,78 @@
+"""
+上传文件下发压测脚本
+对同一个 /uploads 文件分别请求应用直出地址和经 nginx X-Accel-Redirect 下发的地址，
+输出吞吐量和延迟分位数，用于确认 accel 模式下大文件不再占用 Python worker
+
+用法: python benchmark_upload_serving.py --path /uploads/blobs/ab/xxx.jpg \
+          --direct-url http://127.0.0.1:8000 --accel-url http://127.0.0.1
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+import httpx
+
+
+async def _download_loop(client: httpx.AsyncClient, path: str, deadline: float, latencies: list, sizes: list):
+    """持续下载文件并记录耗时和字节数"""
+    while time.perf_counter() < deadline:
+        started = time.perf_counter()
+        response = await client.get(path)
+        response.raise_for_status()
+        latencies.append((time.perf_counter() - started) * 1000)
+        sizes.append(len(response.content))
+
+
+def _percentile(values: list, percent: float) -> float:
+    """计算分位数"""
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(len(ordered) * percent / 100))
+    return ordered[index]
+
+
+async def _measure(base_url: str, path: str, concurrency: int, seconds: float) -> tuple[list, list]:
+    """并发下载一段时间，返回 (延迟列表, 字节数列表)"""
+    latencies = []
+    sizes = []
+    limits = httpx.Limits(max_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, timeout=60, limits=limits) as client:
+        deadline = time.perf_counter() + seconds
+        await asyncio.gather(*[
+            _download_loop(client, path, deadline, latencies, sizes)
+            for _ in range(concurrency)
+        ])
+    return latencies, sizes
+
+
+def _report(title: str, latencies: list, sizes: list, seconds: float):
+    """输出吞吐量和延迟统计"""
+    if not latencies:
+        print(f"{title}: 无数据")
+        return
+    print(
+        f"{title}: 请求数={len(latencies)} "
+        f"吞吐={len(latencies) / seconds:.1f}req/s "
+        f"带宽={sum(sizes) / seconds / 1024 / 1024:.1f}MB/s "
+        f"p50={statistics.median(latencies):.1f}ms "
+        f"p99={_percentile(latencies, 99):.1f}ms"
+    )
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description="上传文件下发压测")
+    parser.add_argument("--path", required=True, help="/uploads/... 文件地址，可带签名参数")
+    parser.add_argument("--direct-url", default="http://127.0.0.1:8000", help="UPLOAD_SERVE_MODE=direct 的后端地址")
+    parser.add_argument("--accel-url", default="http://127.0.0.1", help="nginx 地址，后端为 UPLOAD_SERVE_MODE=accel")
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--seconds", type=float, default=10)
+    args = parser.parse_args()
+
+    for title, base_url in (("应用直出", args.direct_url), ("nginx X-Accel-Redirect", args.accel_url)):
+        latencies, sizes = asyncio.run(_measure(base_url, args.path, args.concurrency, args.seconds))
+        _report(title, latencies, sizes, args.seconds)
+
+
+if __name__ == "__main__":
+    main()
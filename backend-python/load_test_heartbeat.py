@@ -0,0 +1,93 @@
+"""
+心跳接口压测脚本
+在慢统计查询执行期间并发请求心跳接口，输出心跳延迟分位数，
+用于确认 async 路由不会被同一 worker 上的慢查询阻塞
+
+用法: python load_test_heartbeat.py --base-url http://127.0.0.1:8000 --token <JWT>
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from datetime import datetime
+
+import httpx
+
+
+async def _heartbeat_loop(client: httpx.AsyncClient, headers: dict, stop: asyncio.Event, latencies: list):
+    """持续请求心跳接口并记录耗时"""
+    while not stop.is_set():
+        started = time.perf_counter()
+        await client.post("/api/v1/online/heartbeat", json={"device_type": "h5"}, headers=headers)
+        latencies.append((time.perf_counter() - started) * 1000)
+
+
+async def _slow_queries(client: httpx.AsyncClient, headers: dict, rounds: int):
+    """重复请求统计明细接口作为慢查询负载"""
+    for _ in range(rounds):
+        await client.get(
+            "/api/v1/statistics/detail",
+            params={"year": datetime.now().year, "data_type": "overdue", "page_size": 1000},
+            headers=headers,
+            timeout=120,
+        )
+
+
+def _percentile(values: list, percent: float) -> float:
+    """计算分位数"""
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(len(ordered) * percent / 100))
+    return ordered[index]
+
+
+def _report(title: str, latencies: list):
+    """输出延迟统计"""
+    if not latencies:
+        print(f"{title}: 无数据")
+        return
+    print(
+        f"{title}: 请求数={len(latencies)} "
+        f"p50={statistics.median(latencies):.1f}ms "
+        f"p99={_percentile(latencies, 99):.1f}ms "
+        f"max={max(latencies):.1f}ms"
+    )
+
+
+async def _measure(base_url: str, token: str, concurrency: int, seconds: float, slow_rounds: int) -> list:
+    """测量一轮心跳延迟，slow_rounds 为0时不施加慢查询负载"""
+    headers = {"Authorization": f"Bearer {token}"}
+    latencies = []
+    stop = asyncio.Event()
+    async with httpx.AsyncClient(base_url=base_url, timeout=30) as client:
+        workers = [
+            asyncio.create_task(_heartbeat_loop(client, headers, stop, latencies))
+            for _ in range(concurrency)
+        ]
+        if slow_rounds:
+            await _slow_queries(client, headers, slow_rounds)
+        else:
+            await asyncio.sleep(seconds)
+        stop.set()
+        await asyncio.gather(*workers)
+    return latencies
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description="心跳接口压测")
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--token", required=True)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--slow-rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    baseline = asyncio.run(_measure(args.base_url, args.token, args.concurrency, args.seconds, 0))
+    _report("空闲时心跳", baseline)
+
+    loaded = asyncio.run(_measure(args.base_url, args.token, args.concurrency, args.seconds, args.slow_rounds))
+    _report("慢查询期间心跳", loaded)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,38 @@
+"""
+工单日汇总表重建脚本
+从三种工单表全量重建 work_order_daily_rollup，修复统计偏差
+
+用法: python rebuild_rollup.py
+"""
+import sys
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from app.database import Base, SessionLocal, engine
+from app.services.work_order_rollup import WorkOrderRollupService
+
+
+def main():
+    """主函数"""
+    print("=" * 50)
+    print("工单日汇总表重建工具")
+    print(f"时间: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    print("=" * 50)
+
+    Base.metadata.create_all(bind=engine, checkfirst=True)
+
+    session = SessionLocal()
+    try:
+        row_count = WorkOrderRollupService(session).rebuild()
+        print(f"✅ 重建完成，共 {row_count} 行")
+    except Exception as e:
+        print(f"❌ 重建失败: {str(e)}")
+        sys.exit(1)
+    finally:
+        session.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""
+工作计划对账脚本
+比较三种工单表、维保计划表与 work_plan，修复缺失、过期和孤立的工作计划；
+运行前先处理发件箱中尚未应用的记录
+
+用法: python reconcile_work_plan.py [--dry-run]
+"""
+import argparse
+import sys
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from app.database import Base, SessionLocal, engine
+from app.services.work_plan_outbox import WorkPlanOutboxService
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description="工作计划对账")
+    parser.add_argument("--dry-run", action="store_true", help="只统计偏差，不写入")
+    args = parser.parse_args()
+
+    print("=" * 50)
+    print("工作计划对账工具")
+    print(f"时间: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    print("=" * 50)
+
+    Base.metadata.create_all(bind=engine, checkfirst=True)
+
+    session = SessionLocal()
+    try:
+        service = WorkPlanOutboxService(session)
+        if not args.dry_run:
+            print(f"处理发件箱记录 {service.drain_all()} 条")
+        result = service.reconcile(fix=not args.dry_run)
+        action = "发现" if args.dry_run else "修复"
+        print(
+            f"✅ 对账完成，{action}需写入 {result['upserted']} 条，"
+            f"需软删除 {result['deleted']} 条，孤立 {result['orphaned']} 条"
+        )
+    except Exception as e:
+        print(f"❌ 对账失败: {str(e)}")
+        sys.exit(1)
+    finally:
+        session.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -5,11 +5,19 @@ import pytest
 import os
 from typing import Generator
 from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
+from sqlalchemy import BigInteger, create_engine
+from sqlalchemy.ext.compiler import compiles
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.pool import StaticPool
 
 from app.database import Base, get_db
+from app.services.reference_cache import reference_cache
+
+
+@compiles(BigInteger, "sqlite")
+def _compile_big_integer_sqlite(type_, compiler, **kw):
+    """SQLite 只有 INTEGER PRIMARY KEY 自增，测试库中 BigInteger 按 INTEGER 建表"""
+    return "INTEGER"
 
 
 SQLALCHEMY_DATABASE_URL = "sqlite:///:memory:"
@@ -121,8 +129,9 @@ def setup_test_env():
 @pytest.fixture(scope="function")
 def db_session() -> Generator:
     """
-    创建数据库会话
+    创建数据库会话，每个测试使用新建的库，参考数据缓存一并清空
     """
+    reference_cache.clear()
     Base.metadata.create_all(bind=engine)
     session = TestingSessionLocal()
     try:
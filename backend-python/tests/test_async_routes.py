@@ -0,0 +1,120 @@
+"""
+测试使用异步数据库会话的路由
+"""
+from collections.abc import Generator
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.database import Base, get_async_database_url, get_async_db
+from app.dependencies import UserInfo, get_current_user_info, get_material_manager_user
+from app.models.repair_tools import RepairToolsStock
+
+
+@pytest.fixture(scope="function")
+def async_client(tmp_path) -> Generator:
+    """
+    使用 aiosqlite 文件数据库的测试客户端，同步会话用于准备和校验数据
+    """
+    from app.api.v1 import repair_tools
+
+    database_url = f"sqlite:///{tmp_path / 'async.db'}"
+    sync_engine = create_engine(database_url)
+    Base.metadata.create_all(bind=sync_engine)
+    async_engine = create_async_engine(get_async_database_url(database_url))
+    AsyncTestingSessionLocal = async_sessionmaker(
+        bind=async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False
+    )
+
+    async def override_get_async_db():
+        async with AsyncTestingSessionLocal() as db:
+            yield db
+
+    user = UserInfo(id=7, name='材料员甲', role='材料员', token='token')
+    test_app = FastAPI()
+    test_app.include_router(repair_tools.router, prefix="/api/v1")
+    test_app.dependency_overrides[get_async_db] = override_get_async_db
+    test_app.dependency_overrides[get_current_user_info] = lambda: user
+    test_app.dependency_overrides[get_material_manager_user] = lambda: user
+
+    with TestClient(test_app) as client:
+        client.sync_session = sessionmaker(bind=sync_engine)
+        yield client
+
+    sync_engine.dispose()
+
+
+class TestAsyncDatabase:
+    """
+    异步数据库路由测试类
+    """
+
+    def test_async_database_url(self):
+        """
+        测试同步URL转换为异步驱动URL
+        """
+        assert get_async_database_url('postgresql://u:p@h:5432/db') == 'postgresql+asyncpg://u:p@h:5432/db'
+        assert get_async_database_url('postgresql+psycopg2://u:p@h/db') == 'postgresql+asyncpg://u:p@h/db'
+        assert get_async_database_url('sqlite:///./test.db') == 'sqlite+aiosqlite:///./test.db'
+        with pytest.raises(ValueError):
+            get_async_database_url('mysql://u:p@h/db')
+
+    def test_repair_tools_stock_flow(self, async_client):
+        """
+        测试入库、补库、搜索、领用、归还流程
+        """
+        created = async_client.post("/api/v1/repair-tools/stock", json={
+            "tool_name": "万用表", "specification": "FLUKE-17B", "stock": 2,
+        }).json()['data']
+        stock_id = created['id']
+
+        restocked = async_client.post(
+            f"/api/v1/repair-tools/stock/{stock_id}/restock", json={"quantity": 3}
+        ).json()['data']
+        assert restocked['stock'] == 5
+
+        found = async_client.get("/api/v1/repair-tools/tools/search", params={"keyword": "万用"}).json()['data']
+        assert found['total'] == 1
+
+        issue = async_client.post("/api/v1/repair-tools/issue", json={
+            "tool_id": str(stock_id), "quantity": 4, "user_name": "材料员甲",
+        }).json()['data']
+        assert issue['status'] == '待归还'
+
+        response = async_client.post("/api/v1/repair-tools/issue", json={
+            "tool_id": str(stock_id), "quantity": 2, "user_name": "张三",
+        })
+        assert response.status_code == 400
+
+        response = async_client.delete(f"/api/v1/repair-tools/stock/{stock_id}")
+        assert response.status_code == 400
+
+        returned = async_client.put(
+            f"/api/v1/repair-tools/issue/{issue['id']}/return", json={"return_quantity": 4}
+        ).json()['data']
+        assert returned['status'] == '已归还'
+
+        issues = async_client.get("/api/v1/repair-tools/issue").json()['data']
+        assert issues['total'] == 1
+
+        with async_client.sync_session() as db:
+            assert db.get(RepairToolsStock, stock_id).stock == 5
+
+    def test_repair_tools_stock_conditional_get(self, async_client):
+        """
+        测试库存列表未变化时返回304，新增入库后返回新内容
+        """
+        async_client.post("/api/v1/repair-tools/stock", json={"tool_name": "万用表", "stock": 2})
+        response = async_client.get("/api/v1/repair-tools/stock")
+        etag = response.headers['etag']
+
+        assert async_client.get("/api/v1/repair-tools/stock", headers={"If-None-Match": etag}).status_code == 304
+
+        async_client.post("/api/v1/repair-tools/stock", json={"tool_name": "电烙铁", "stock": 1})
+        response = async_client.get("/api/v1/repair-tools/stock", headers={"If-None-Match": etag})
+        assert response.status_code == 200
+        assert response.json()['data']['total'] == 2
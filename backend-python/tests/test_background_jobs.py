@@ -0,0 +1,192 @@
+"""
+测试后台任务和项目级联任务
+"""
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.exceptions import ValidationException
+from app.models.background_job import BackgroundJob
+from app.models.periodic_inspection import PeriodicInspection
+from app.models.project_info import ProjectInfo
+from app.models.spare_parts_usage import SparePartsUsage
+from app.models.work_order_daily_rollup import WorkOrderDailyRollup
+from app.services import background_jobs
+from app.services import project_info as project_info_service
+from app.services.background_jobs import BackgroundJobService, JobRunner, register_job
+from app.services.project_info import JOB_PROJECT_SYNC_NAMES, ProjectInfoService
+from app.services.work_order_rollup import WorkOrderRollupService
+from tests.conftest import TestingSessionLocal
+
+
+@pytest.fixture
+def runner(db_session):
+    """在当前线程同步执行任务的执行器"""
+    return JobRunner(TestingSessionLocal, 1, 1)
+
+
+@pytest.fixture
+def project(db_session, monkeypatch):
+    """创建项目及其关联的巡检工单和备件领用，分段大小设为 2"""
+    monkeypatch.setattr(project_info_service.settings, 'job_chunk_size', 2)
+    start = datetime(2026, 5, 10, 9, 0, 0)
+    project = ProjectInfo(
+        id=1, project_id='P001', project_name='项目一', completion_date=start,
+        maintenance_end_date=start + timedelta(days=365), maintenance_period='每月',
+        client_name='客户一', address='地址', project_manager='张三',
+    )
+    db_session.add(project)
+    db_session.add_all([
+        PeriodicInspection(
+            id=index, inspection_id=f'XJ-{index:04d}', project_id='P001', project_name='项目一',
+            client_name='客户一', plan_start_date=start, plan_end_date=start + timedelta(days=2),
+            maintenance_personnel='张三', status='执行中',
+        )
+        for index in range(1, 6)
+    ])
+    db_session.add(SparePartsUsage(
+        id=1, product_name='滤芯', quantity=1, user_name='张三', issue_time=start,
+        project_id='P001', project_name='项目一',
+    ))
+    db_session.commit()
+    return project
+
+
+def _job(job_id: int) -> BackgroundJob:
+    """用新会话读取任务最新状态"""
+    with TestingSessionLocal() as db:
+        job = db.get(BackgroundJob, job_id)
+        db.expunge(job)
+        return job
+
+
+class TestBackgroundJobs:
+    """
+    后台任务测试类
+    """
+
+    def test_cascade_delete_runs_as_job(self, db_session, project, runner):
+        """
+        测试级联删除提交为任务，分段删除关联数据并扣除日汇总
+        """
+        with pytest.raises(ValidationException):
+            ProjectInfoService(db_session).delete(1)
+
+        result = ProjectInfoService(db_session).delete(1, cascade=True, operator_name='管理员')
+        job_id = result['job']['id']
+        assert result['job']['status'] == 'pending'
+        assert db_session.get(ProjectInfo, 1) is not None
+
+        assert runner.run(job_id) is True
+
+        job = _job(job_id)
+        assert job.status == 'succeeded'
+        assert job.progress == 100
+        assert job.to_dict()['result']['deleted_related'] == {
+            'periodic_inspection': 5,
+            'spare_parts_usage': 1,
+        }
+        db_session.expire_all()
+        assert db_session.get(ProjectInfo, 1) is None
+        assert db_session.query(PeriodicInspection).count() == 0
+        assert db_session.query(WorkOrderDailyRollup).filter(WorkOrderDailyRollup.order_count > 0).count() == 0
+
+    def test_sync_names_job(self, db_session, project, runner):
+        """
+        测试名称同步任务按项目当前名称更新关联表
+        """
+        project.project_name = '项目一（二期）'
+        db_session.commit()
+
+        job = BackgroundJobService(db_session).enqueue(JOB_PROJECT_SYNC_NAMES, {'project_id': 'P001'}, target='P001')
+        duplicate = BackgroundJobService(db_session).enqueue(JOB_PROJECT_SYNC_NAMES, {'project_id': 'P001'}, target='P001')
+        assert duplicate.id == job.id
+
+        runner.run(job.id)
+
+        assert _job(job.id).to_dict()['result']['periodic_inspection.project_name'] == 5
+        db_session.expire_all()
+        assert {row.project_name for row in db_session.query(PeriodicInspection)} == {'项目一（二期）'}
+        assert db_session.get(SparePartsUsage, 1).project_name == '项目一（二期）'
+
+    def test_cancel_pending_and_running(self, db_session, runner, monkeypatch):
+        """
+        测试取消未开始的任务和执行中的任务
+        """
+        monkeypatch.setattr(background_jobs, 'JOB_HANDLERS', {})
+
+        @register_job('test_cancel')
+        def _handler(context):
+            with TestingSessionLocal() as other:
+                BackgroundJobService(other).cancel(context.job_id)
+            context.progress(1, 2)
+            return {'finished': True}
+
+        service = BackgroundJobService(db_session)
+        pending = service.enqueue('test_cancel')
+        service.cancel(pending.id)
+        assert runner.run(pending.id) is False
+        assert _job(pending.id).status == 'cancelled'
+
+        running = service.enqueue('test_cancel')
+        runner.run(running.id)
+        assert _job(running.id).status == 'cancelled'
+
+        with pytest.raises(ValidationException):
+            service.cancel(running.id)
+
+    def test_failed_job_records_error(self, db_session, runner, monkeypatch):
+        """
+        测试处理函数抛出异常时任务标记为失败
+        """
+        monkeypatch.setattr(background_jobs, 'JOB_HANDLERS', {})
+
+        @register_job('test_fail')
+        def _handler(context):
+            raise RuntimeError('boom')
+
+        job = BackgroundJobService(db_session).enqueue('test_fail')
+        runner.run(job.id)
+
+        job = _job(job.id)
+        assert job.status == 'failed'
+        assert job.error == 'boom'
+
+    def test_recover_requeues_interrupted_jobs(self, db_session, runner, monkeypatch):
+        """
+        测试只把心跳超时的 running 任务放回队列，其他 worker 正在执行的任务不受影响
+        """
+        monkeypatch.setattr(background_jobs, 'JOB_HANDLERS', {'test_noop': lambda context: None})
+        service = BackgroundJobService(db_session)
+        live, stale = service.enqueue('test_noop', target='live'), service.enqueue('test_noop', target='stale')
+        now = datetime.now()
+        live.status = stale.status = 'running'
+        live.started_at = stale.started_at = now - timedelta(hours=1)
+        live.heartbeat_at = now - timedelta(seconds=background_jobs.JOB_HEARTBEAT_SECONDS)
+        stale.heartbeat_at = now - timedelta(seconds=background_jobs.JOB_STALE_SECONDS + 1)
+        db_session.commit()
+
+        assert runner.recover() == 1
+        assert _job(live.id).status == 'running'
+        assert _job(stale.id).status == 'pending'
+        assert runner.run(stale.id) is True
+        assert _job(stale.id).status == 'succeeded'
+
+    def test_rollup_matches_rebuild_after_cascade(self, db_session, project, runner):
+        """
+        测试级联删除后日汇总与全量重建一致
+        """
+        result = ProjectInfoService(db_session).delete(1, cascade=True)
+        runner.run(result['job']['id'])
+
+        db_session.expire_all()
+        incremental = {
+            (row.stat_date, row.project_id, row.maintenance_personnel, row.order_type, row.status): row.order_count
+            for row in db_session.query(WorkOrderDailyRollup) if row.order_count
+        }
+        WorkOrderRollupService(db_session).rebuild()
+        rebuilt = {
+            (row.stat_date, row.project_id, row.maintenance_personnel, row.order_type, row.status): row.order_count
+            for row in db_session.query(WorkOrderDailyRollup) if row.order_count
+        }
+        assert incremental == rebuilt
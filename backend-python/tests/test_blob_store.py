@@ -0,0 +1,170 @@
+"""
+测试签字、照片外置存储
+"""
+import base64
+import importlib.util
+import json
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+from alembic.migration import MigrationContext
+from alembic.operations import Operations
+
+from app.models.spot_work import SpotWork
+from app.models.temporary_repair import TemporaryRepair
+from app.utils import blob_store
+
+PNG_BYTES = b'\x89PNG\r\n\x1a\n' + b'\x00' * 64
+JPEG_BYTES = b'\xff\xd8\xff\xe0' + b'\x01' * 64
+PNG_DATA_URI = 'data:image/png;base64,' + base64.b64encode(PNG_BYTES).decode('ascii')
+JPEG_DATA_URI = 'data:image/jpeg;base64,' + base64.b64encode(JPEG_BYTES).decode('ascii')
+
+
+@pytest.fixture(autouse=True)
+def blob_dir(tmp_path, monkeypatch):
+    """blob 存储写入临时目录"""
+    monkeypatch.setattr(blob_store, 'BLOB_DIR', tmp_path / 'blobs')
+    return tmp_path / 'blobs'
+
+
+class TestBlobStore:
+    """
+    blob 存储测试类
+    """
+
+    def test_store_is_content_addressed(self, blob_dir):
+        """相同内容只存一份，地址由内容决定"""
+        first = blob_store.externalize(PNG_DATA_URI)
+        second = blob_store.externalize(PNG_DATA_URI)
+
+        assert first == second
+        assert first.startswith(blob_store.BLOB_URL_PREFIX) and first.endswith('.png')
+        assert blob_store.blob_path_from_url(first).read_bytes() == PNG_BYTES
+        assert len(list(blob_dir.rglob('*.png'))) == 1
+
+    def test_store_base64_accepts_line_wrapped_payload(self, monkeypatch):
+        """按行折叠的 base64 与单行结果相同，跨块的空白也被忽略"""
+        encoded = base64.b64encode(PNG_BYTES).decode('ascii')
+        wrapped = 'data:image/png;base64,' + '\r\n'.join(encoded[index:index + 19] for index in range(0, len(encoded), 19))
+        monkeypatch.setattr(blob_store, 'BASE64_CHUNK_CHARS', 10)
+
+        url = blob_store.store_base64(wrapped)
+
+        assert url == blob_store.store_base64(encoded)
+        assert blob_store.blob_path_from_url(url).read_bytes() == PNG_BYTES
+        with pytest.raises(ValueError):
+            blob_store.store_base64(encoded[:-4] + '*' + encoded[-3:])
+
+    def test_externalize_leaves_other_values(self):
+        """已有地址、普通文本和非图片内容原样返回"""
+        for value in (None, '', '/uploads/2024/01/01/a.png', 'https://example.com/a.png', 'data:text/plain;base64,aGk='):
+            assert blob_store.externalize(value) == value
+
+    def test_raw_base64_is_detected_by_header(self):
+        """不带 data: 前缀的 base64 图片按文件头识别"""
+        raw = base64.b64encode(JPEG_BYTES * 10).decode('ascii')
+        url = blob_store.externalize(raw)
+        assert url.endswith('.jpg')
+        assert blob_store.blob_path_from_url(url).read_bytes() == JPEG_BYTES * 10
+
+    def test_json_list_externalizes_each_item(self):
+        """照片数组逐项转存，已有地址原样保留"""
+        photos = json.dumps([PNG_DATA_URI, '/uploads/2024/01/01/a.jpg'])
+        stored = blob_store.externalize_json_list(photos)
+        items = json.loads(stored)
+
+        assert items[0].startswith(blob_store.BLOB_URL_PREFIX)
+        assert items[1] == '/uploads/2024/01/01/a.jpg'
+        assert blob_store.blob_path_from_url(items[0]).read_bytes() == PNG_BYTES
+
+    def test_blob_path_rejects_traversal(self):
+        """拒绝越出 blob 目录的地址"""
+        assert blob_store.blob_path_from_url('/uploads/blobs/../../etc/passwd') is None
+        assert blob_store.blob_path_from_url('/uploads/other.png') is None
+
+
+class TestWorkOrderBlobColumns:
+    """
+    工单图片列转存测试类
+    """
+
+    def test_orm_assignment_stores_reference(self, db_session):
+        """给签字和照片字段赋值时自动转存"""
+        repair = TemporaryRepair(
+            repair_id='WX-0001',
+            project_id='P001',
+            project_name='测试项目',
+            plan_start_date=datetime(2024, 1, 1),
+            plan_end_date=datetime(2024, 1, 2),
+            signature=PNG_DATA_URI,
+            customer_signature=JPEG_DATA_URI,
+            photos=json.dumps([PNG_DATA_URI, JPEG_DATA_URI]),
+        )
+        db_session.add(repair)
+        db_session.commit()
+        db_session.refresh(repair)
+
+        assert repair.signature.startswith(blob_store.BLOB_URL_PREFIX)
+        assert repair.customer_signature.endswith('.jpg')
+        assert json.loads(repair.photos) == [repair.signature, repair.customer_signature]
+        assert len(repair.signature) < 100
+
+
+def _load_migration(name: str):
+    """按文件加载 alembic 迁移模块"""
+    path = Path(__file__).resolve().parents[1] / 'alembic' / 'versions' / f'{name}.py'
+    spec = importlib.util.spec_from_file_location(f'migration_{name}', path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+class TestExternalizeMigration:
+    """
+    迁移 externalize_work_order_blobs 测试类
+    """
+
+    def test_upgrade_externalizes_and_downgrade_restores(self, db_session, blob_dir, monkeypatch):
+        """升级分批转存存量图片，引用与 blob 存储一致；重复执行不再修改，降级还原为 data URI"""
+        migration = _load_migration('externalize_work_order_blobs')
+        monkeypatch.setattr(migration, 'BLOB_DIR', blob_dir)
+        monkeypatch.setattr(migration, 'BATCH_SIZE', 2)
+        raw_jpeg = base64.b64encode(JPEG_BYTES * 10).decode('ascii')
+        photos = json.dumps([JPEG_DATA_URI, raw_jpeg, '/uploads/2024/01/01/a.jpg'])
+        table = SpotWork.__table__
+        db_session.execute(table.insert(), [
+            {
+                'id': index,
+                'work_id': f'YG-{index:04d}',
+                'project_id': 'P001',
+                'project_name': '测试项目',
+                'plan_start_date': datetime(2024, 1, 1),
+                'plan_end_date': datetime(2024, 1, 2),
+                'signature': PNG_DATA_URI if index % 2 else None,
+                'photos': photos,
+            }
+            for index in range(1, 6)
+        ])
+        connection = db_session.connection()
+
+        def run(step):
+            with Operations.context(MigrationContext.configure(connection)):
+                step()
+            return connection.execute(table.select().order_by(table.c.id)).all()
+
+        rows = run(migration.upgrade)
+        assert [row.signature is None for row in rows] == [False, True, False, True, False]
+        assert blob_store.blob_path_from_url(rows[0].signature).read_bytes() == PNG_BYTES
+        stored = json.loads(rows[0].photos)
+        assert [blob_store.blob_path_from_url(url).read_bytes() for url in stored[:2]] == [JPEG_BYTES, JPEG_BYTES * 10]
+        assert stored[2] == '/uploads/2024/01/01/a.jpg'
+        assert all(row.photos == rows[0].photos for row in rows)
+
+        assert run(migration.upgrade) == rows
+
+        rows = run(migration.downgrade)
+        assert rows[0].signature == PNG_DATA_URI
+        assert json.loads(rows[0].photos) == [
+            JPEG_DATA_URI, 'data:image/jpeg;base64,' + raw_jpeg, '/uploads/2024/01/01/a.jpg'
+        ]
@@ -0,0 +1,156 @@
+"""
+测试 HTTP 条件请求
+"""
+from collections.abc import Generator
+
+import pytest
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+from sqlalchemy import event, update
+
+from app.database import get_db
+from app.dependencies import UserInfo, get_current_user_info
+from app.models.dictionary import Dictionary
+from app.models.temporary_repair import TemporaryRepair
+from app.services.table_versions import bump
+from app.utils.conditional_get import etag_matches
+from tests.test_statistics import _seed_work_orders
+
+
+@pytest.fixture
+def http_client(db_session) -> Generator:
+    """挂载字典和工单路由的测试客户端，请求头 X-Test-User 切换当前用户"""
+    from app.api.v1 import dictionary, work_order
+
+    users = {
+        'admin': UserInfo(id=1, name='管理员', role='管理员', token='token'),
+        'staff': UserInfo(id=2, name='张三', role='运维人员', token='token'),
+    }
+
+    def current_user(request: Request) -> UserInfo:
+        return users[request.headers.get('X-Test-User', 'admin')]
+
+    test_app = FastAPI()
+    test_app.include_router(dictionary.router, prefix="/api/v1")
+    test_app.include_router(work_order.router, prefix="/api/v1")
+    test_app.dependency_overrides[get_db] = lambda: db_session
+    test_app.dependency_overrides[get_current_user_info] = current_user
+    with TestClient(test_app) as client:
+        yield client
+
+
+class _StatementCounter:
+    """统计执行的 SQL 语句数"""
+
+    def __init__(self, bind):
+        self.count = 0
+        self._bind = bind
+
+    def __enter__(self):
+        event.listen(self._bind, 'before_cursor_execute', self._count)
+        return self
+
+    def __exit__(self, *exc):
+        event.remove(self._bind, 'before_cursor_execute', self._count)
+
+    def _count(self, *args):
+        self.count += 1
+
+
+class TestConditionalGet:
+    """
+    HTTP条件请求测试类
+    """
+
+    def test_etag_matches(self):
+        """
+        测试If-None-Match与ETag的匹配规则
+        """
+        assert etag_matches('W/"abc"', 'W/"abc"')
+        assert etag_matches('"abc"', 'W/"abc"')
+        assert etag_matches('"x", W/"abc"', 'W/"abc"')
+        assert etag_matches('*', 'W/"abc"')
+        assert not etag_matches(None, 'W/"abc"')
+        assert not etag_matches('"abcd"', 'W/"abc"')
+
+    def test_reference_list_not_modified_without_queries(self, db_session, http_client):
+        """
+        测试参考数据未变化时只查询表变更计数，直接返回304
+        """
+        db_session.add(Dictionary(dict_type='status', dict_key='a', dict_value='执行中', dict_label='执行中'))
+        db_session.commit()
+
+        response = http_client.get("/api/v1/dictionary/type/status")
+        assert response.status_code == 200
+        assert response.headers['cache-control'] == 'private, no-cache'
+        etag = response.headers['etag']
+
+        with _StatementCounter(db_session.get_bind()) as statements:
+            response = http_client.get("/api/v1/dictionary/type/status", headers={"If-None-Match": etag})
+        assert response.status_code == 304
+        assert response.headers['etag'] == etag
+        assert statements.count == 1
+
+        assert http_client.get("/api/v1/dictionary/type/other", headers={"If-None-Match": etag}).status_code == 200
+
+        db_session.add(Dictionary(dict_type='status', dict_key='b', dict_value='已完成', dict_label='已完成'))
+        db_session.commit()
+        response = http_client.get("/api/v1/dictionary/type/status", headers={"If-None-Match": etag})
+        assert response.status_code == 200
+        assert len(response.json()['data']) == 2
+
+    def test_reference_list_follows_commits_from_other_workers(self, db_session, http_client):
+        """
+        测试其他worker提交的参考数据变更：通知未送达时也按表变更计数返回新内容
+        """
+        db_session.add(Dictionary(dict_type='status', dict_key='a', dict_value='执行中', dict_label='执行中'))
+        db_session.commit()
+        response = http_client.get("/api/v1/dictionary/type/status")
+        etag = response.headers['etag']
+
+        # 模拟其他 worker：绕过本进程的会话修改数据并计数，本进程缓存未收到失效通知
+        with db_session.get_bind().begin() as connection:
+            connection.execute(update(Dictionary.__table__).values(dict_label='进行中'))
+            bump(connection, ['dictionary'])
+
+        response = http_client.get("/api/v1/dictionary/type/status", headers={"If-None-Match": etag})
+        assert response.status_code == 200
+        assert response.json()['data'][0]['dict_label'] == '进行中'
+        assert http_client.get(
+            "/api/v1/dictionary/type/status", headers={"If-None-Match": response.headers['etag']}
+        ).status_code == 304
+
+    def test_work_order_list_validator_is_user_scoped(self, db_session, http_client):
+        """
+        测试工单列表的校验值按用户区分
+        """
+        _seed_work_orders(db_session, count=5)
+        params = {"page": 0, "size": 10}
+
+        response = http_client.get("/api/v1/work-order", params=params)
+        assert response.status_code == 200
+        assert response.headers['vary'] == 'Authorization'
+        etag = response.headers['etag']
+
+        assert http_client.get("/api/v1/work-order", params=params, headers={"If-None-Match": etag}).status_code == 304
+        response = http_client.get(
+            "/api/v1/work-order", params=params, headers={"If-None-Match": etag, "X-Test-User": "staff"}
+        )
+        assert response.status_code == 200
+        assert response.headers['etag'] != etag
+
+        repair = db_session.query(TemporaryRepair).first()
+        repair.remarks = '已联系客户'
+        db_session.commit()
+        response = http_client.get("/api/v1/work-order", params=params, headers={"If-None-Match": etag})
+        assert response.status_code == 200
+        etag = response.headers['etag']
+
+        # 绕过 flush 的批量更新同样更换校验值
+        db_session.execute(update(TemporaryRepair).values(remarks='批量备注'))
+        db_session.commit()
+        response = http_client.get("/api/v1/work-order", params=params, headers={"If-None-Match": etag})
+        assert response.status_code == 200
+        assert http_client.get(
+            "/api/v1/work-order", params=params, headers={"If-None-Match": response.headers['etag']}
+        ).status_code == 304
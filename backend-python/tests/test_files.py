@@ -0,0 +1,181 @@
+"""
+测试上传文件访问与签名地址
+"""
+from datetime import datetime
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api.v1 import files, temporary_repair, upload
+from app.database import get_db
+from app.dependencies import UserInfo, get_current_user_info, get_current_user_required
+from app.models.project_info import ProjectInfo
+from app.models.temporary_repair import TemporaryRepair
+from app.utils import blob_store
+from app.utils.signed_url import (
+    present_upload_url,
+    sign_upload_url,
+    strip_upload_signature,
+    upload_url_window,
+    verify_upload_signature,
+)
+
+
+@pytest.fixture
+def upload_dir(tmp_path, monkeypatch):
+    """uploads 目录指向临时目录，放入一个 blob 文件"""
+    root = tmp_path / 'uploads'
+    (root / 'blobs' / 'ab').mkdir(parents=True)
+    (root / 'blobs' / 'ab' / 'photo.png').write_bytes(b'\x89PNG\r\n\x1a\n' + b'0' * 64)
+    (tmp_path / 'secret.txt').write_text('secret')
+    monkeypatch.setattr(blob_store, 'UPLOAD_DIR', root)
+    return root
+
+
+@pytest.fixture
+def files_client(upload_dir):
+    """只挂载文件访问路由的测试客户端"""
+    app = FastAPI()
+    app.include_router(files.uploads_router)
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+@pytest.fixture
+def client_app(db_session, upload_dir, monkeypatch):
+    """挂载上传、临时维修和文件访问路由的测试客户端，登录用户为运维人员张三"""
+    monkeypatch.setattr(blob_store, 'BLOB_DIR', upload_dir / 'blobs')
+    db_session.add(ProjectInfo(
+        id=1, project_id='P001', project_name='项目1', completion_date=datetime(2026, 1, 1),
+        maintenance_end_date=datetime(2027, 1, 1), maintenance_period='每月',
+        client_name='客户1', address='地址', project_manager='张三',
+    ))
+    db_session.add(TemporaryRepair(
+        id=1, repair_id='WX-1', project_id='P001', project_name='项目1',
+        plan_start_date=datetime(2026, 3, 1), plan_end_date=datetime(2026, 3, 2),
+        maintenance_personnel='张三', status='执行中',
+    ))
+    db_session.commit()
+
+    user = UserInfo(id=2, name='张三', role='运维人员', token='token')
+    app = FastAPI()
+    app.include_router(upload.router)
+    app.include_router(temporary_repair.router)
+    app.include_router(files.uploads_router)
+    app.dependency_overrides[get_db] = lambda: db_session
+    app.dependency_overrides[get_current_user_info] = lambda: user
+    app.dependency_overrides[get_current_user_required] = lambda: user
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+class TestSignedUrl:
+    """
+    签名地址测试类
+    """
+
+    def test_sign_and_verify(self):
+        """签名地址在有效期内校验通过"""
+        url = sign_upload_url('/uploads/blobs/ab/photo.png', 60, now=1000)
+        path, query = url.split('?')
+        params = dict(item.split('=') for item in query.split('&'))
+
+        assert path == '/uploads/blobs/ab/photo.png'
+        assert params['expires'] == '1060'
+        assert verify_upload_signature('blobs/ab/photo.png', 1060, params['signature'], now=1030)
+
+    def test_expired_or_tampered(self):
+        """过期、改路径、改过期时间都校验失败"""
+        url = sign_upload_url('/uploads/blobs/ab/photo.png', 60, now=1000)
+        signature = url.rsplit('signature=', 1)[1]
+
+        assert not verify_upload_signature('blobs/ab/photo.png', 1060, signature, now=1061)
+        assert not verify_upload_signature('blobs/ab/other.png', 1060, signature, now=1030)
+        assert not verify_upload_signature('blobs/ab/photo.png', 9999, signature, now=1030)
+
+    def test_present_upload_url(self, monkeypatch):
+        """开启强制签名后返回地址在同一时间窗内不变，未开启时原样返回"""
+        url = '/uploads/blobs/ab/photo.png'
+        assert present_upload_url(url) == url
+        assert upload_url_window() is None
+
+        monkeypatch.setattr(files.settings, 'upload_require_signature', True)
+        monkeypatch.setattr(files.settings, 'upload_url_ttl_seconds', 60)
+        signed = present_upload_url(url, now=1000)
+        assert signed == present_upload_url(url, now=1019) != present_upload_url(url, now=1020)
+        assert (upload_url_window(1019), upload_url_window(1020)) == (16, 17)
+        assert verify_upload_signature('blobs/ab/photo.png', 1080, signed.rsplit('signature=', 1)[1], now=1079)
+        assert present_upload_url(None) is None
+        assert strip_upload_signature(signed) == url
+
+    def test_rejects_non_upload_url(self):
+        """只能签名 /uploads 下的地址"""
+        with pytest.raises(ValueError):
+            sign_upload_url('/api/v1/personnel', 60)
+
+
+class TestServeUpload:
+    """
+    上传文件访问测试类
+    """
+
+    def test_direct_mode_returns_file(self, files_client):
+        """direct 模式由应用返回文件"""
+        response = files_client.get('/uploads/blobs/ab/photo.png')
+
+        assert response.status_code == 200
+        assert response.content.startswith(b'\x89PNG')
+        assert 'immutable' in response.headers['cache-control']
+
+    def test_accel_mode_returns_redirect_header(self, files_client, monkeypatch):
+        """accel 模式只返回 X-Accel-Redirect，不读取文件内容"""
+        monkeypatch.setattr(files.settings, 'upload_serve_mode', 'accel')
+
+        response = files_client.get('/uploads/blobs/ab/photo.png')
+
+        assert response.status_code == 200
+        assert response.headers['x-accel-redirect'] == '/protected-uploads/blobs/ab/photo.png'
+        assert response.content == b''
+
+    def test_signed_url(self, files_client):
+        """有效签名可以访问，篡改后返回 403"""
+        url = sign_upload_url('/uploads/blobs/ab/photo.png', 60)
+
+        assert files_client.get(url).status_code == 200
+        assert files_client.get(url[:-1] + ('0' if url[-1] != '0' else '1')).status_code == 403
+        assert files_client.get('/uploads/blobs/ab/photo.png?expires=1&signature=abc').status_code == 403
+
+    def test_require_signature(self, files_client, monkeypatch):
+        """开启强制签名后，不带签名的地址返回 403"""
+        monkeypatch.setattr(files.settings, 'upload_require_signature', True)
+
+        assert files_client.get('/uploads/blobs/ab/photo.png').status_code == 403
+        assert files_client.get(sign_upload_url('/uploads/blobs/ab/photo.png', 60)).status_code == 200
+
+    def test_path_outside_uploads(self, files_client):
+        """越出 uploads 目录的路径返回 404"""
+        assert files_client.get('/uploads/..%2Fsecret.txt').status_code == 404
+        assert files_client.get('/uploads/blobs/ab/missing.png').status_code == 404
+
+    def test_require_signature_through_work_order(self, client_app, db_session, monkeypatch):
+        """开启强制签名后，上传、保存到工单再读取工单得到的图片地址都可以访问，数据库只保存引用"""
+        monkeypatch.setattr(files.settings, 'upload_require_signature', True)
+        png = b'\x89PNG\r\n\x1a\n' + b'1' * 64
+
+        uploaded = client_app.post('/upload', files={'file': ('photo.png', png, 'image/png')}).json()['data']['url']
+        assert '?' in uploaded
+        assert client_app.get(uploaded).content == png
+        assert client_app.get(uploaded.split('?')[0]).status_code == 403
+
+        response = client_app.patch('/temporary-repair/1', json={'photos': [uploaded], 'signature': uploaded})
+        assert response.status_code == 200
+        repair = db_session.get(TemporaryRepair, 1)
+        db_session.refresh(repair)
+        reference = uploaded.split('?')[0]
+        assert (repair.photos, repair.signature) == (f'["{reference}"]', reference)
+
+        data = client_app.get('/temporary-repair/1').json()['data']
+        for url in (*data['photos'], data['signature']):
+            assert url.startswith(f'{reference}?')
+            assert client_app.get(url).content == png
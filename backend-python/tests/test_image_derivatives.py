@@ -0,0 +1,115 @@
+"""
+测试图片衍生图缓存
+"""
+import io
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from PIL import Image
+
+from app.api.v1 import files, images
+from app.services.image_derivatives import DerivativeCache
+from app.utils import blob_store
+from app.utils.signed_url import sign_image_url
+
+
+@pytest.fixture
+def upload_dir(tmp_path, monkeypatch):
+    """uploads 目录指向临时目录，放入两张测试图片"""
+    root = tmp_path / 'uploads'
+    (root / 'blobs' / 'ab').mkdir(parents=True)
+    Image.new('RGB', (1600, 1200), (200, 30, 30)).save(root / 'blobs' / 'ab' / 'photo.png')
+    Image.new('RGB', (800, 1600), (30, 200, 30)).save(root / 'legacy.jpg')
+    monkeypatch.setattr(blob_store, 'UPLOAD_DIR', root)
+    return root
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    """单进程的衍生图缓存"""
+    derivative_cache = DerivativeCache(str(tmp_path / 'cache'), 10 * 1024 * 1024, 1)
+    monkeypatch.setattr(images, 'derivative_cache', derivative_cache)
+    yield derivative_cache
+    derivative_cache.shutdown()
+
+
+@pytest.fixture
+def image_client(upload_dir, cache):
+    """只挂载衍生图路由的测试客户端"""
+    app = FastAPI()
+    app.include_router(images.router)
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+class TestImageDerivatives:
+    """
+    衍生图测试类
+    """
+
+    def test_thumbnail_is_resized_webp(self, image_client):
+        """返回缩放后的 WebP，内容寻址文件长期缓存"""
+        response = image_client.get('/images/thumb/blobs/ab/photo.png')
+
+        assert response.status_code == 200
+        assert response.headers['content-type'] == 'image/webp'
+        assert 'immutable' in response.headers['cache-control']
+        with Image.open(io.BytesIO(response.content)) as image:
+            assert image.format == 'WEBP'
+            assert image.size == (240, 180)
+
+    def test_etag_revalidation(self, image_client):
+        """ETag 匹配时返回 304"""
+        first = image_client.get('/images/small/legacy.jpg')
+        etag = first.headers['etag']
+        assert 'immutable' not in first.headers['cache-control']
+
+        second = image_client.get('/images/small/legacy.jpg', headers={'If-None-Match': etag})
+        assert second.status_code == 304
+        assert second.headers['etag'] == etag
+
+    def test_signed_url(self, image_client):
+        """衍生图地址沿用原图签名，签名地址只允许私有缓存，篡改后返回 403"""
+        url = sign_image_url('/uploads/blobs/ab/photo.png', 'thumb', 60).removeprefix('/api/v1')
+
+        response = image_client.get(url)
+        assert response.status_code == 200
+        assert response.headers['cache-control'].startswith('private, max-age=')
+        assert image_client.get(url.replace('/blobs/ab/photo.png', '/legacy.jpg')).status_code == 403
+        assert image_client.get('/images/thumb/legacy.jpg?expires=1&signature=abc').status_code == 403
+
+    def test_require_signature(self, image_client, monkeypatch):
+        """开启强制签名后，不带签名的衍生图地址返回 403"""
+        monkeypatch.setattr(files.settings, 'upload_require_signature', True)
+
+        assert image_client.get('/images/thumb/blobs/ab/photo.png').status_code == 403
+        url = sign_image_url('/uploads/blobs/ab/photo.png', 'thumb', 60).removeprefix('/api/v1')
+        assert image_client.get(url).status_code == 200
+
+    def test_not_found(self, image_client):
+        """未知规格、越出 uploads 目录和不存在的文件返回 404"""
+        assert image_client.get('/images/huge/legacy.jpg').status_code == 404
+        assert image_client.get('/images/thumb/../secret.png').status_code == 404
+        assert image_client.get('/images/thumb/missing.png').status_code == 404
+
+    def test_lru_eviction(self, image_client, cache):
+        """超过总大小上限时淘汰最久未访问的衍生图"""
+        image_client.get('/images/medium/blobs/ab/photo.png')
+        image_client.get('/images/medium/legacy.jpg')
+        assert len(list(cache.cache_dir.glob('*/*.webp'))) == 2
+
+        cache.max_bytes = 1
+        image_client.get('/images/thumb/legacy.jpg')
+
+        remaining = list(cache.cache_dir.glob('*/*.webp'))
+        assert len(remaining) == 1
+        assert cache.total_bytes() == remaining[0].stat().st_size
+
+    def test_load_restores_entries(self, image_client, cache, tmp_path):
+        """重启后从缓存目录恢复"""
+        image_client.get('/images/thumb/legacy.jpg')
+        restored = DerivativeCache(str(cache.cache_dir), 10 * 1024 * 1024, 1)
+        restored.load()
+
+        assert restored.total_bytes() == cache.total_bytes() > 0
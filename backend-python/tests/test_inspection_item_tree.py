@@ -0,0 +1,140 @@
+"""
+测试巡检事项树构建与快照缓存
+"""
+from collections.abc import Generator
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.database import get_db
+from app.dependencies import UserInfo, get_manager_user
+from app.models.inspection_item import InspectionItem
+from app.schemas.common import ApiResponse
+from app.schemas.inspection_item import InspectionItemCreate, InspectionItemUpdate
+from app.services.inspection_item import InspectionItemService
+from app.services.inspection_item_tree import inspection_item_tree_cache
+
+
+@pytest.fixture
+def items(db_session):
+    """两个项目类型，第一个下面两个系统，每个系统两个检查项"""
+    rows = [
+        InspectionItem(id=1, item_code='A', item_name='消防', item_type='项目类型', level=1, sort_order=1),
+        InspectionItem(id=2, item_code='B', item_name='安防', item_type='项目类型', level=1, sort_order=2),
+        InspectionItem(id=3, item_code='A1', item_name='喷淋', item_type='系统类型', level=2, parent_id=1, sort_order=2),
+        InspectionItem(id=4, item_code='A2', item_name='报警', item_type='系统类型', level=2, parent_id=1, sort_order=1),
+    ]
+    for parent_id in (3, 4):
+        rows += [
+            InspectionItem(
+                id=parent_id * 10 + index, item_code=f'C{parent_id}{index}', item_name='检查项',
+                item_type='检查项', level=3, parent_id=parent_id, sort_order=index,
+            )
+            for index in range(2)
+        ]
+    db_session.add_all(rows)
+    db_session.commit()
+
+
+def _shape(tree: list[dict]) -> list:
+    return [(node['id'], _shape(node['children'])) for node in tree]
+
+
+def _child_id(db_session, item_code: str) -> int:
+    return db_session.query(InspectionItem.id).filter(InspectionItem.item_code == item_code).scalar()
+
+
+@pytest.fixture
+def tree_client(db_session, items) -> Generator:
+    """只挂载巡检事项路由的测试客户端"""
+    from app.api.v1 import inspection_item
+
+    test_app = FastAPI()
+    test_app.include_router(inspection_item.router, prefix="/api/v1")
+    test_app.dependency_overrides[get_db] = lambda: db_session
+    test_app.dependency_overrides[get_manager_user] = lambda: UserInfo(id=1, name='管理员', role='管理员', token='token')
+    with TestClient(test_app) as client:
+        yield client
+
+
+class TestInspectionItemTree:
+    """
+    巡检事项树测试类
+    """
+
+    def test_tree_order_and_subtree_depth(self, db_session, items):
+        """
+        测试树的节点顺序和子树深度
+        """
+        service = InspectionItemService(db_session)
+
+        assert _shape(service.get_tree()) == [
+            (1, [(4, [(40, []), (41, [])]), (3, [(30, []), (31, [])])]),
+            (2, []),
+        ]
+        assert _shape(service.get_tree(depth=1)) == [(1, []), (2, [])]
+        assert _shape(service.get_tree(root=1, depth=2)) == [(1, [(4, []), (3, [])])]
+        assert _shape(service.get_tree(root=3)) == [(3, [(30, []), (31, [])])]
+        assert service.get_tree(root=999) == []
+        assert service.get_tree() == service.repository.get_tree()
+
+    def test_snapshot_reused_until_items_change(self, db_session, items):
+        """
+        测试巡检事项变更前复用树快照
+        """
+        service = InspectionItemService(db_session)
+        snapshot = inspection_item_tree_cache.load(db_session)
+        assert inspection_item_tree_cache.load(db_session) is snapshot
+        etag = service.get_tree_json()[1]
+
+        service.create_item(InspectionItemCreate(item_code='B1', item_name='门禁', item_type='系统类型', level=2, parent_id=2))
+        assert inspection_item_tree_cache.get() is None
+        assert _shape(service.get_tree(root=2)) == [(2, [(_child_id(db_session, 'B1'), [])])]
+        assert service.get_tree_json()[1] != etag
+
+        inspection_item_tree_cache.load(db_session)
+        service.update_item(3, InspectionItemUpdate(sort_order=0))
+        assert inspection_item_tree_cache.get() is None
+        assert _shape(service.get_tree(root=1, depth=2)) == [(1, [(3, []), (4, [])])]
+
+        service.delete_item(1)
+        assert [node['id'] for node in service.get_tree()] == [2]
+
+    def test_uncommitted_changes_are_not_cached(self, db_session, items):
+        """
+        测试未提交的修改不写入缓存
+        """
+        db_session.get(InspectionItem, 2).item_name = '安防（草稿）'
+        db_session.flush()
+        assert InspectionItemService(db_session).get_tree(root=2)[0]['item_name'] == '安防（草稿）'
+        assert inspection_item_tree_cache.get() is None
+
+        db_session.rollback()
+        assert InspectionItemService(db_session).get_tree(root=2)[0]['item_name'] == '安防'
+        assert inspection_item_tree_cache.get() is not None
+
+    def test_tree_endpoint_etag(self, tree_client):
+        """
+        测试树接口的ETag条件请求
+        """
+        response = tree_client.get("/api/v1/inspection-item/tree", params={"root": 1, "depth": 2})
+        assert response.status_code == 200
+        body = response.json()
+        assert body == ApiResponse(code=200, message="获取成功", data=body['data']).model_dump()
+        assert _shape(body['data']) == [(1, [(4, []), (3, [])])]
+        etag = response.headers['etag']
+
+        response = tree_client.get(
+            "/api/v1/inspection-item/tree", params={"root": 1, "depth": 2}, headers={"If-None-Match": etag}
+        )
+        assert response.status_code == 304
+
+        tree_client.put("/api/v1/inspection-item/4", json={"item_name": "火灾报警"})
+        response = tree_client.get(
+            "/api/v1/inspection-item/tree", params={"root": 1, "depth": 2}, headers={"If-None-Match": etag}
+        )
+        assert response.status_code == 200
+        assert response.json()['data'][0]['children'][0]['item_name'] == '火灾报警'
+
+        assert tree_client.get("/api/v1/inspection-item/tree", params={"root": 999}).status_code == 404
@@ -0,0 +1,189 @@
+"""
+测试定期巡检进度表
+"""
+import json
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.models.inspection_progress import InspectionProgress
+from app.models.maintenance_plan import MaintenancePlan
+from app.models.periodic_inspection import PeriodicInspection
+from app.models.periodic_inspection_record import PeriodicInspectionRecord
+from app.models.project_info import ProjectInfo
+from app.repositories.periodic_inspection_record import PeriodicInspectionRecordRepository
+from app.services.inspection_progress import InspectionProgressService, parse_inspection_items
+from app.services.periodic_inspection import PeriodicInspectionService
+
+START = datetime(2026, 3, 1)
+
+
+@pytest.fixture
+def project(db_session):
+    """创建项目"""
+    db_session.add(ProjectInfo(
+        id=1, project_id='P001', project_name='项目1', completion_date=START,
+        maintenance_end_date=START + timedelta(days=365), maintenance_period='每月',
+        client_name='客户1', address='地址', project_manager='张三',
+    ))
+    db_session.commit()
+
+
+def _items(*contents: str) -> str:
+    return json.dumps([{'inspection_item': '消防', 'inspection_content': content} for content in contents], ensure_ascii=False)
+
+
+def _plan(plan_id: str, items: str, start: datetime = START, days: int = 30) -> MaintenancePlan:
+    return MaintenancePlan(
+        plan_id=plan_id, plan_name='月度维保', project_id='P001', plan_type='定期维保',
+        equipment_id='EQ001', equipment_name='默认设备', plan_start_date=start,
+        plan_end_date=start + timedelta(days=days), maintenance_content='常规维保', plan_status='执行中',
+        inspection_items=items,
+    )
+
+
+def _inspection(inspection_id: str, plan_id: str | None = None, start: datetime = START) -> PeriodicInspection:
+    return PeriodicInspection(
+        inspection_id=inspection_id, plan_id=plan_id, project_id='P001', project_name='项目1',
+        plan_start_date=start, plan_end_date=start + timedelta(days=2),
+    )
+
+
+def _record(inspection_id: str, item_id: str, content: str, inspected: bool) -> PeriodicInspectionRecord:
+    return PeriodicInspectionRecord(
+        inspection_id=inspection_id, item_id=item_id, item_name=item_id, inspection_content=content, inspected=inspected,
+    )
+
+
+def _progress(db_session, inspection_id: str) -> tuple[int, int]:
+    row = db_session.get(InspectionProgress, inspection_id, populate_existing=True)
+    return (row.total_count, row.filled_count) if row else None
+
+
+class TestInspectionProgress:
+    """
+    巡检进度计数测试类
+    """
+
+    def test_plan_stores_parsed_inspection_items(self, db_session, project):
+        """
+        测试维保计划保存解析后的巡查内容
+        """
+        plan = _plan('MP-1', _items('灭火器', '烟感', '灭火器'))
+        assert (plan.inspection_item_count, json.loads(plan.inspection_contents)) == (3, ['灭火器', '烟感'])
+
+        plan.inspection_items = 'not json'
+        assert (plan.inspection_item_count, plan.inspection_contents) == (0, None)
+        assert parse_inspection_items('{"a": 1}') == (0, [])
+
+    def test_linked_inspection_progress_follows_records(self, db_session, project):
+        """
+        测试关联计划的巡检单进度随巡检记录变化
+        """
+        db_session.add(_plan('MP-1', _items('灭火器', '烟感', '喷淋')))
+        db_session.add(_inspection('XJ-1', 'MP-1'))
+        db_session.commit()
+        assert _progress(db_session, 'XJ-1') == (3, 0)
+
+        record = _record('XJ-1', 'I1', '灭火器', True)
+        db_session.add_all([record, _record('XJ-1', 'I2', '灭火器', False), _record('XJ-1', 'I3', '烟感', True)])
+        db_session.commit()
+        assert _progress(db_session, 'XJ-1') == (3, 2)
+
+        record.inspected = False
+        db_session.commit()
+        assert _progress(db_session, 'XJ-1') == (3, 1)
+
+        PeriodicInspectionRecordRepository(db_session).delete_by_inspection_id('XJ-1')
+        assert _progress(db_session, 'XJ-1') == (3, 0)
+
+    def test_unlinked_inspection_counts_overlapping_plan_contents(self, db_session, project):
+        """
+        测试未关联计划的巡检单按重叠计划的巡查内容计数
+        """
+        plan = _plan('MP-1', _items('灭火器', '烟感'))
+        db_session.add_all([
+            plan,
+            _plan('MP-2', _items('烟感', '喷淋'), start=START + timedelta(days=1), days=5),
+            _plan('MP-3', _items('电梯'), start=START + timedelta(days=60)),
+            _inspection('XJ-1'),
+        ])
+        db_session.commit()
+        assert _progress(db_session, 'XJ-1') == (3, 0)
+
+        plan.inspection_items = _items('灭火器', '烟感', '配电柜')
+        db_session.commit()
+        assert _progress(db_session, 'XJ-1') == (4, 0)
+
+        inspection = db_session.query(PeriodicInspection).filter_by(inspection_id='XJ-1').one()
+        inspection.plan_start_date = START + timedelta(days=60)
+        inspection.plan_end_date = START + timedelta(days=61)
+        db_session.commit()
+        assert _progress(db_session, 'XJ-1') == (1, 0)
+
+        db_session.delete(inspection)
+        db_session.commit()
+        assert _progress(db_session, 'XJ-1') is None
+
+    def test_plan_change_skips_inspections_linked_to_other_plans(self, db_session, project, monkeypatch):
+        """
+        测试计划变更只重算关联该计划和同项目未关联计划的巡检单，不重算关联其他计划的巡检单
+        """
+        from app.services import inspection_progress
+
+        plan = _plan('MP-1', _items('灭火器'))
+        db_session.add_all([
+            plan,
+            _plan('MP-2', _items('烟感', '喷淋')),
+            _inspection('XJ-1', 'MP-1'),
+            _inspection('XJ-2', 'MP-2'),
+            _inspection('XJ-3'),
+            _inspection('XJ-4', 'MP-DELETED'),
+        ])
+        db_session.commit()
+
+        refreshed = []
+        refresh_progress = inspection_progress.refresh_progress
+
+        def recording_refresh(bind, inspection_ids):
+            refreshed.extend(inspection_ids)
+            return refresh_progress(bind, inspection_ids)
+
+        monkeypatch.setattr(inspection_progress, 'refresh_progress', recording_refresh)
+        plan.inspection_items = _items('灭火器', '配电柜')
+        db_session.commit()
+
+        assert sorted(refreshed) == ['XJ-1', 'XJ-3', 'XJ-4']
+        assert [_progress(db_session, inspection_id) for inspection_id in ('XJ-1', 'XJ-2', 'XJ-3', 'XJ-4')] == [
+            (2, 0), (2, 0), (4, 0), (4, 0),
+        ]
+
+    def test_list_counts_read_progress_table(self, db_session, project):
+        """
+        测试巡检单列表从进度表读取计数
+        """
+        db_session.add_all([_plan('MP-1', _items('灭火器', '烟感')), _inspection('XJ-1', 'MP-1'), _inspection('XJ-2', 'MP-1')])
+        db_session.add(_record('XJ-1', 'I1', '灭火器', True))
+        db_session.commit()
+        db_session.query(InspectionProgress).filter_by(inspection_id='XJ-2').delete()
+        db_session.commit()
+
+        inspections = db_session.query(PeriodicInspection).order_by(PeriodicInspection.inspection_id).all()
+        assert PeriodicInspectionService(db_session).get_inspection_counts_batch(inspections) == {
+            'XJ-1': {'total_count': 2, 'filled_count': 1},
+            'XJ-2': {'total_count': 2, 'filled_count': 0},
+        }
+
+    def test_rebuild(self, db_session, project):
+        """
+        测试重建全部巡检进度
+        """
+        db_session.add_all([_plan('MP-1', _items('灭火器', '烟感')), _inspection('XJ-1', 'MP-1'), _inspection('XJ-2')])
+        db_session.commit()
+        db_session.query(InspectionProgress).delete()
+        db_session.query(MaintenancePlan).update({'inspection_item_count': 0, 'inspection_contents': None})
+        db_session.commit()
+
+        assert InspectionProgressService(db_session).rebuild() == 2
+        assert _progress(db_session, 'XJ-1') == (2, 0)
+        assert _progress(db_session, 'XJ-2') == (2, 0)
@@ -0,0 +1,112 @@
+"""
+测试巡检记录批量保存
+"""
+import json
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.models.inspection_progress import InspectionProgress
+from app.models.maintenance_plan import MaintenancePlan
+from app.models.periodic_inspection import PeriodicInspection
+from app.models.periodic_inspection_record import PeriodicInspectionRecord
+from app.models.project_info import ProjectInfo
+from app.schemas.periodic_inspection_record import BatchRecordSave
+from app.services.periodic_inspection_record import PeriodicInspectionRecordService
+
+START = datetime(2026, 3, 1)
+
+
+@pytest.fixture
+def inspection(db_session):
+    """创建项目、含三个巡查内容的维保计划和巡检单"""
+    db_session.add(ProjectInfo(
+        id=1, project_id='P001', project_name='项目1', completion_date=START,
+        maintenance_end_date=START + timedelta(days=365), maintenance_period='每月',
+        client_name='客户1', address='地址', project_manager='张三',
+    ))
+    db_session.add(MaintenancePlan(
+        plan_id='JH-1', plan_name='月度维保', project_id='P001', plan_type='定期维保',
+        equipment_id='EQ001', equipment_name='默认设备', plan_start_date=START,
+        plan_end_date=START + timedelta(days=30), maintenance_content='常规维保', plan_status='执行中',
+        inspection_items=json.dumps(
+            [{'inspection_item': '消防', 'inspection_content': content} for content in ('A', 'B', 'C')],
+            ensure_ascii=False,
+        ),
+    ))
+    db_session.add(PeriodicInspection(
+        inspection_id='XJ-1', project_id='P001', project_name='项目1',
+        plan_start_date=START, plan_end_date=START + timedelta(days=2),
+    ))
+    db_session.commit()
+    return 'XJ-1'
+
+
+def _save(db_session, inspection_id: str, *records: dict) -> list[PeriodicInspectionRecord]:
+    return PeriodicInspectionRecordService(db_session).batch_save(
+        BatchRecordSave.model_validate({
+            'inspection_id': inspection_id,
+            'records': [{'inspection_id': inspection_id, **record} for record in records],
+        })
+    )
+
+
+def _progress(db_session, inspection_id: str) -> tuple[int, int]:
+    row = db_session.get(InspectionProgress, inspection_id, populate_existing=True)
+    return row.total_count, row.filled_count
+
+
+class TestInspectionRecordBatch:
+    """
+    巡检记录批量保存测试类
+    """
+
+    def test_batch_save_inserts_and_returns_rows_in_order(self, db_session, inspection):
+        """
+        测试批量保存插入记录并按提交顺序返回
+        """
+        saved = _save(
+            db_session, inspection,
+            {'item_id': 'i2', 'inspection_content': 'B', 'inspected': True, 'photos': ['/a.jpg']},
+            {'item_id': 'i1', 'inspection_content': 'A'},
+        )
+
+        assert [record.item_id for record in saved] == ['i2', 'i1']
+        assert all(record.id for record in saved)
+        assert saved[0].to_dict()['photos'] == ['/a.jpg']
+        assert saved[1].photos == '[]'
+        assert _progress(db_session, inspection) == (3, 1)
+
+    def test_batch_save_updates_existing_rows_and_keeps_unset_fields(self, db_session, inspection):
+        """
+        测试批量保存更新已有记录且保留未提交的字段
+        """
+        first = _save(
+            db_session, inspection,
+            {'item_id': 'i1', 'item_name': '灭火器', 'inspection_content': 'A', 'inspection_result': '正常'},
+        )
+        second = _save(
+            db_session, inspection,
+            {'item_id': 'i1', 'inspected': True},
+            {'item_id': 'i3', 'inspection_content': 'C', 'inspected': True},
+        )
+
+        assert second[0].id == first[0].id
+        assert (second[0].item_name, second[0].inspection_content, second[0].inspection_result) == ('灭火器', 'A', '正常')
+        assert second[0].inspected is True
+        assert db_session.query(PeriodicInspectionRecord).count() == 2
+        assert _progress(db_session, inspection) == (3, 2)
+
+    def test_batch_save_keeps_last_duplicate_item(self, db_session, inspection):
+        """
+        测试同一检查项重复提交时保留最后一条
+        """
+        saved = _save(
+            db_session, inspection,
+            {'item_id': 'i1', 'inspection_content': 'A', 'inspected': True},
+            {'item_id': 'i2', 'inspection_content': 'B'},
+            {'item_id': 'i1', 'inspection_content': 'A', 'inspected': False},
+        )
+
+        assert [(record.item_id, record.inspected) for record in saved] == [('i1', False), ('i2', False)]
+        assert _progress(db_session, inspection) == (3, 0)
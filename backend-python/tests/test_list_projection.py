@@ -0,0 +1,97 @@
+"""
+测试列表接口的列投影
+"""
+from datetime import datetime
+
+import pytest
+from sqlalchemy.exc import InvalidRequestError
+
+from app.models.maintenance_plan import MaintenancePlan
+from app.models.periodic_inspection import PeriodicInspection
+from app.models.project_info import ProjectInfo
+from app.models.spot_work import SpotWork
+from app.models.temporary_repair import TemporaryRepair
+from app.repositories.maintenance_plan import MaintenancePlanRepository
+from app.repositories.periodic_inspection import PeriodicInspectionRepository
+from app.repositories.spot_work import SpotWorkRepository
+from app.repositories.temporary_repair import TemporaryRepairRepository
+
+LARGE_TEXT = '问题描述' * 2000
+
+
+def _seed(db_session):
+    """每种工单各一条，大文本字段填满"""
+    common = {
+        'project_id': 'P001',
+        'project_name': '测试项目',
+        'plan_start_date': datetime(2024, 1, 1),
+        'plan_end_date': datetime(2024, 1, 31),
+        'maintenance_personnel': '张三',
+        'status': '执行中',
+        'remarks': '备注',
+    }
+    db_session.add(ProjectInfo(
+        project_id='P001', project_name='测试项目', completion_date=datetime(2024, 1, 1),
+        maintenance_end_date=datetime(2025, 1, 1), maintenance_period='每月', client_name='客户单位',
+        address='地址', project_manager='张三',
+    ))
+    db_session.add(PeriodicInspection(inspection_id='XJ-0001', execution_result=LARGE_TEXT, **common))
+    db_session.add(TemporaryRepair(repair_id='WX-0001', fault_description=LARGE_TEXT, solution=LARGE_TEXT, **common))
+    db_session.add(SpotWork(work_id='YG-0001', work_content=LARGE_TEXT, photos='[]', **common))
+    db_session.add(MaintenancePlan(
+        plan_id='JH-0001', plan_name='测试计划', plan_type='定期维保', equipment_id='E001',
+        equipment_name='设备', maintenance_content=LARGE_TEXT, inspection_items=LARGE_TEXT,
+        plan_status='已发布', **common,
+    ))
+    db_session.commit()
+    db_session.expunge_all()
+
+
+REPOSITORIES = [
+    (PeriodicInspectionRepository, ('execution_result', 'signature')),
+    (TemporaryRepairRepository, ('fault_description', 'solution', 'photos', 'signature', 'customer_signature')),
+    (SpotWorkRepository, ('work_content', 'photos', 'signature')),
+    (MaintenancePlanRepository, ('maintenance_content', 'maintenance_requirements', 'maintenance_standard', 'remarks', 'inspection_items')),
+]
+
+
+class TestListProjection:
+    """
+    列投影测试类
+    """
+
+    @pytest.mark.parametrize("repository_class, deferred", REPOSITORIES)
+    def test_summary_skips_large_columns(self, db_session, repository_class, deferred):
+        """summary 投影不加载大字段，to_dict 不输出这些字段"""
+        _seed(db_session)
+        items, total = repository_class(db_session).find_all(projection='summary')
+
+        assert total == 1
+        data = items[0].to_dict()
+        for name in deferred:
+            assert name not in data
+        assert data['project_name'] == '测试项目'
+        assert data['client_name'] == '客户单位'
+
+    @pytest.mark.parametrize("repository_class, deferred", REPOSITORIES)
+    def test_full_entity_by_default(self, db_session, repository_class, deferred):
+        """不传投影时仍返回完整字段"""
+        _seed(db_session)
+        items, _ = repository_class(db_session).find_all()
+
+        data = items[0].to_dict()
+        for name in deferred:
+            assert name in data
+
+    def test_deferred_column_access_raises(self, db_session):
+        """投影外的列访问时直接报错，不会逐行补查"""
+        _seed(db_session)
+        items, _ = PeriodicInspectionRepository(db_session).find_all(projection='summary')
+
+        with pytest.raises(InvalidRequestError):
+            _ = items[0].execution_result
+
+    def test_unknown_projection(self, db_session):
+        """未定义的投影名称"""
+        with pytest.raises(ValueError):
+            PeriodicInspectionRepository(db_session).find_all(projection='missing')
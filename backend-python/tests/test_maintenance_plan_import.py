@@ -0,0 +1,257 @@
+"""
+测试维保计划批量导入
+"""
+import io
+import zipfile
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.exceptions import ValidationException
+from app.models.maintenance_plan import MaintenancePlan
+from app.models.periodic_inspection import PeriodicInspection
+from app.models.project_info import ProjectInfo
+from app.models.work_order_daily_rollup import WorkOrderDailyRollup
+from app.models.work_order_operation_log import WorkOrderOperationLog
+from app.models.work_plan import WorkPlan
+from app.schemas.maintenance_plan import MaintenancePlanCreate
+from app.services.maintenance_plan import MaintenancePlanService
+from app.services.work_plan_outbox import WorkPlanOutboxService
+from app.utils.table_import import read_table
+
+
+@pytest.fixture
+def projects(db_session):
+    """创建两个项目"""
+    start = datetime(2026, 1, 1)
+    for index in (1, 2):
+        db_session.add(ProjectInfo(
+            id=index, project_id=f'P00{index}', project_name=f'项目{index}', completion_date=start,
+            maintenance_end_date=start + timedelta(days=365), maintenance_period='每月',
+            client_name=f'客户{index}', address='地址', project_manager='张三',
+        ))
+    db_session.commit()
+
+
+def _row(plan_id: str, project_id: str = 'P001', start: str = '2026-03-01', **overrides) -> dict:
+    row = {
+        'plan_id': plan_id,
+        'plan_name': '月度维保',
+        'project_id': project_id,
+        'plan_type': '定期维保',
+        'equipment_id': 'EQ001',
+        'equipment_name': '默认设备',
+        'plan_start_date': start,
+        'plan_end_date': '2026-03-31',
+        'maintenance_personnel': '张三',
+        'maintenance_content': '常规维保',
+        'plan_status': '执行中',
+        'status': '未开始',
+    }
+    row.update(overrides)
+    return row
+
+
+def _xlsx(rows: list[list | None]) -> bytes:
+    """生成只含一个工作表的最小 XLSX，字符串放在共享字符串表，数字原样写入，None 行按 Excel 的方式省略"""
+    shared: list[str] = []
+    sheet_rows = []
+    for row_index, values in enumerate(rows, start=1):
+        if values is None:
+            continue
+        cells = []
+        for column_index, value in enumerate(values):
+            ref = f"{chr(ord('A') + column_index)}{row_index}"
+            if isinstance(value, str):
+                shared.append(value)
+                cells.append(f'<c r="{ref}" t="s"><v>{len(shared) - 1}</v></c>')
+            else:
+                cells.append(f'<c r="{ref}"><v>{value}</v></c>')
+        sheet_rows.append(f'<row r="{row_index}">{"".join(cells)}</row>')
+
+    ns = 'xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"'
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w') as archive:
+        archive.writestr('xl/workbook.xml', (
+            f'<workbook {ns} xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+            '<sheets><sheet name="计划" sheetId="1" r:id="rId1"/></sheets></workbook>'
+        ))
+        archive.writestr('xl/_rels/workbook.xml.rels', (
+            '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+            '<Relationship Id="rId1" Target="worksheets/data.xml" '
+            'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet"/>'
+            '</Relationships>'
+        ))
+        archive.writestr('xl/sharedStrings.xml', f'<sst {ns}>' + ''.join(
+            f'<si><t>{value}</t></si>' for value in shared
+        ) + '</sst>')
+        archive.writestr('xl/worksheets/data.xml', f'<worksheet {ns}><sheetData>{"".join(sheet_rows)}</sheetData></worksheet>')
+    return buffer.getvalue()
+
+
+def _patch_sheet(content: bytes, old: str, new: str) -> bytes:
+    """替换 XLSX 工作表中的文本，用于构造无效文件"""
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(io.BytesIO(content)) as source, zipfile.ZipFile(buffer, 'w') as archive:
+        for name in source.namelist():
+            data = source.read(name)
+            if name == 'xl/worksheets/data.xml':
+                data = data.decode().replace(old, new).encode()
+            archive.writestr(name, data)
+    return buffer.getvalue()
+
+
+class TestMaintenancePlanImport:
+    """
+    维保计划批量导入测试类
+    """
+
+    def test_bulk_import_creates_plans_work_orders_and_work_plans(self, db_session, projects):
+        """
+        测试批量导入创建维保计划、工单和工作计划
+        """
+        rows = [_row(f'MP-{index:03d}', 'P001' if index % 2 else 'P002') for index in range(1, 21)]
+
+        result = MaintenancePlanService(db_session).bulk_import(rows, 1, '管理员')
+
+        assert result == {'created': 20, 'restored': 0, 'work_orders': 20, 'errors': []}
+        WorkPlanOutboxService(db_session).drain_all()
+        assert db_session.query(MaintenancePlan).count() == 20
+        assert db_session.query(WorkPlan).count() == 20
+        assert db_session.query(WorkOrderOperationLog).count() == 20
+
+        inspections = db_session.query(PeriodicInspection).order_by(PeriodicInspection.inspection_id).all()
+        assert [order.inspection_id for order in inspections[:2]] == [
+            'XJ-P001-20260301-0001', 'XJ-P001-20260301-0002'
+        ]
+        assert {order.client_name for order in inspections} == {'客户1', '客户2'}
+        assert db_session.query(WorkPlan).filter_by(plan_id='MP-002').one().project_name == '项目2'
+
+        rollup = db_session.query(WorkOrderDailyRollup).filter_by(order_type='inspection').all()
+        assert sum(row.order_count for row in rollup) == 20
+
+    def test_bulk_import_reports_row_errors_and_writes_nothing(self, db_session, projects):
+        """
+        测试存在错误行时逐行报告且不写入任何数据
+        """
+        db_session.add(MaintenancePlan(**MaintenancePlanService(db_session)._plan_values(
+            MaintenancePlanCreate.model_validate(_row('MP-EXISTING')), '项目1'
+        )))
+        db_session.commit()
+
+        rows = [
+            _row('MP-001'),
+            _row('MP-002', project_id='P404'),
+            _row('MP-001'),
+            _row('MP-EXISTING'),
+            _row('MP-003', plan_end_date='2026-02-01'),
+            {key: value for key, value in _row('MP-004').items() if key != 'equipment_name'},
+            {},
+        ]
+        result = MaintenancePlanService(db_session).bulk_import(rows, first_row=2)
+
+        assert result['created'] == 0
+        assert [(error['row'], error['plan_id']) for error in result['errors']] == [
+            (3, 'MP-002'), (4, 'MP-001'), (5, 'MP-EXISTING'), (6, 'MP-003'), (7, 'MP-004'),
+        ]
+        assert '设备名称' in result['errors'][-1]['message']
+        assert db_session.query(MaintenancePlan).count() == 1
+        assert db_session.query(PeriodicInspection).count() == 0
+
+    def test_bulk_import_restores_soft_deleted_plan(self, db_session, projects):
+        """
+        测试导入已软删除的计划编号时恢复该计划
+        """
+        service = MaintenancePlanService(db_session)
+        service.bulk_import([_row('MP-001')])
+        WorkPlanOutboxService(db_session).drain_all()
+        plan = db_session.query(MaintenancePlan).filter_by(plan_id='MP-001').one()
+        plan.is_deleted = True
+        db_session.query(WorkPlan).filter_by(plan_id='MP-001').one().is_deleted = True
+        db_session.commit()
+
+        result = service.bulk_import([_row('MP-001', plan_name='年度维保')])
+        WorkPlanOutboxService(db_session).drain_all()
+
+        assert (result['created'], result['restored']) == (0, 1)
+        db_session.refresh(plan)
+        assert (plan.is_deleted, plan.plan_name) == (False, '年度维保')
+        work_plan = db_session.query(WorkPlan).filter_by(plan_id='MP-001').one()
+        assert (work_plan.is_deleted, work_plan.plan_name) == (False, '年度维保')
+
+    def test_bulk_import_rejects_empty_input(self, db_session):
+        """
+        测试拒绝空的导入数据
+        """
+        with pytest.raises(ValidationException):
+            MaintenancePlanService(db_session).bulk_import([{}])
+
+    def test_read_csv_with_chinese_headers(self, db_session, projects):
+        """
+        测试读取中文表头的CSV文件
+        """
+        content = (
+            "计划编号,计划名称,关联项目编号,工单类型,设备编号,设备名称,计划开始日期,计划结束日期,维保内容,计划状态,执行状态\n"
+            "MP-001,月度维保,P001,定期维保,EQ001,默认设备,2026-03-01,2026-03-31,常规维保,执行中,未开始\n"
+        ).encode('gb18030')
+
+        rows = read_table('plans.csv', content)
+        result = MaintenancePlanService(db_session).bulk_import(rows, first_row=2)
+
+        assert result['created'] == 1
+        assert db_session.query(MaintenancePlan).one().plan_start_date == datetime(2026, 3, 1)
+
+    def test_read_xlsx_with_excel_date_serials(self, db_session, projects):
+        """
+        测试读取以Excel日期序列号表示日期的XLSX文件
+        """
+        headers = list(_row('MP-001').keys())
+        values = list(_row('MP-001', start=46082, plan_end_date=46112).values())
+        rows = read_table('plans.xlsx', _xlsx([headers, values]))
+
+        result = MaintenancePlanService(db_session).bulk_import(rows, first_row=2)
+
+        assert result['created'] == 1
+        plan = db_session.query(MaintenancePlan).one()
+        assert (plan.plan_start_date, plan.plan_end_date) == (datetime(2026, 3, 1), datetime(2026, 3, 31))
+
+    def test_read_xlsx_keeps_row_numbers_across_blank_rows(self, db_session, projects):
+        """
+        测试XLSX中省略的空行不影响错误提示的行号
+        """
+        headers = list(_row('MP-001').keys())
+        rows = read_table('plans.xlsx', _xlsx([
+            headers,
+            list(_row('MP-001').values()),
+            None,
+            None,
+            list(_row('MP-002', plan_end_date='2026-02-01').values()),
+        ]))
+
+        assert rows[1:3] == [{}, {}]
+        result = MaintenancePlanService(db_session).bulk_import(rows, first_row=2)
+
+        assert [error['row'] for error in result['errors']] == [5]
+
+    def test_read_table_rejects_other_formats(self):
+        """
+        测试拒绝CSV和XLSX以外的文件格式
+        """
+        with pytest.raises(ValueError):
+            read_table('plans.xls', b'')
+        with pytest.raises(ValueError):
+            read_table('plans.xlsx', b'not a zip')
+
+    def test_read_xlsx_rejects_invalid_indexes(self):
+        """
+        测试超出范围的行号、列号和共享字符串序号按无效文件报错
+        """
+        content = _xlsx([['计划编号'], ['MP-001']])
+        for old, new in (
+            ('<row r="2">', '<row r="2000000000">'),
+            ('r="A2"', 'r="ZZZZ2"'),
+            ('<v>1</v>', '<v>99</v>'),
+            ('<v>1</v>', '<v>-1</v>'),
+        ):
+            with pytest.raises(ValueError, match='无效的 XLSX 文件'):
+                read_table('plans.xlsx', _patch_sheet(content, old, new))
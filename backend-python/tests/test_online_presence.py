@@ -0,0 +1,192 @@
+"""
+测试在线用户心跳聚合
+"""
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy.dialects import postgresql
+
+from app.database import get_db
+from app.dependencies import UserInfo, get_current_user_info
+from app.models.online_user import OnlineUser
+from app.services.online_presence import (
+    HeartbeatAggregator,
+    OnlinePresence,
+    build_values_update,
+    count_today_logins,
+)
+
+
+@pytest.fixture(scope="function")
+def aggregator() -> HeartbeatAggregator:
+    return HeartbeatAggregator()
+
+
+@pytest.fixture(scope="function")
+def online_client(db_session, aggregator, monkeypatch):
+    """
+    在线用户路由测试客户端，使用独立的聚合器
+    """
+    from app.api.v1 import online_user
+
+    monkeypatch.setattr(online_user, 'heartbeat_aggregator', aggregator)
+    user = UserInfo(id=7, name='张三', role='运维人员', token='token')
+    test_app = FastAPI()
+    test_app.include_router(online_user.router, prefix="/api/v1")
+    test_app.dependency_overrides[get_db] = lambda: db_session
+    test_app.dependency_overrides[get_current_user_info] = lambda: user
+    with TestClient(test_app) as client:
+        yield client
+
+
+class TestHeartbeatAggregator:
+    """
+    心跳聚合测试类
+    """
+
+    def test_heartbeat_served_from_memory_and_flushed(self, online_client, aggregator, db_session):
+        """
+        测试心跳只写内存，统计读内存，定时写入后数据库只有一条在线记录
+        """
+        for device_type in ('h5', 'pc'):
+            response = online_client.post("/api/v1/online/heartbeat", json={"device_type": device_type})
+            assert response.json()['code'] == 200
+
+        assert db_session.query(OnlineUser).count() == 0
+        assert online_client.get("/api/v1/online/count").json()['data'] == {'count': 1}
+        statistics = online_client.get("/api/v1/online/statistics").json()['data']
+        assert statistics == {'total_online': 1, 'h5_count': 0, 'pc_count': 1, 'today_logins': 1}
+
+        assert aggregator.flush(db_session) == 1
+        online_client.post("/api/v1/online/heartbeat", json={"device_type": "h5"})
+        assert aggregator.flush(db_session) == 1
+        assert aggregator.flush(db_session) == 0
+
+        rows = db_session.query(OnlineUser).all()
+        assert len(rows) == 1
+        assert rows[0].device_type == 'h5'
+        users = online_client.get("/api/v1/online/users").json()['data']
+        assert [(user['id'], user['user_id']) for user in users] == [(rows[0].id, 7)]
+        assert online_client.get("/api/v1/online/statistics").json()['data']['today_logins'] == 1
+
+    def test_logout_discards_pending_heartbeat(self, online_client, aggregator, db_session):
+        """
+        测试登录写库并同步内存，登出后未写入的心跳不会重新上线
+        """
+        online_client.post("/api/v1/online/login", json={"user_id": 7, "user_name": "张三", "device_type": "pc"})
+        assert aggregator.count() == 1
+
+        aggregator.record_heartbeat(7, '张三', '10.0.0.1', 'h5')
+        online_client.post("/api/v1/online/logout", json={"user_id": 7})
+        assert aggregator.count() == 0
+
+        aggregator.flush(db_session)
+        assert db_session.query(OnlineUser).filter(OnlineUser.is_active == True).count() == 0
+        assert aggregator.count() == 0
+
+    def test_flush_skips_session_logged_out_after_heartbeat(self, aggregator, db_session):
+        """
+        测试心跳取出后在其他 worker 登出的会话，写入时不会重新上线
+        """
+        now = datetime.utcnow()
+        db_session.add(OnlineUser(
+            user_id=7, user_name='张三', login_time=now - timedelta(minutes=5),
+            last_activity=now - timedelta(minutes=1), device_type='h5', is_active=True,
+        ))
+        db_session.commit()
+        aggregator.record_heartbeat(7, '张三', '10.0.0.1', 'h5', now=now)
+        aggregator.record_heartbeat(8, '李四', '10.0.0.2', 'pc', now=now)
+
+        online_user = db_session.query(OnlineUser).filter(OnlineUser.user_id == 7).one()
+        online_user.is_active = False
+        online_user.last_activity = now + timedelta(seconds=1)
+        db_session.commit()
+
+        assert aggregator.flush(db_session) == 2
+        active = {row.user_id for row in db_session.query(OnlineUser).filter(OnlineUser.is_active == True)}
+        assert active == {8}
+        assert {user['user_id'] for user in aggregator.users()} == {8}
+
+        aggregator.record_heartbeat(7, '张三', '10.0.0.1', 'h5', now=now + timedelta(seconds=5))
+        aggregator.flush(db_session)
+        assert db_session.query(OnlineUser).filter(OnlineUser.is_active == True).count() == 2
+
+    def test_reload_merges_other_workers(self, aggregator, db_session):
+        """
+        测试写入后重新加载其他 worker 的在线记录，保留尚未写入的心跳
+        """
+        now = datetime.utcnow()
+        db_session.add(OnlineUser(
+            user_id=8, user_name='李四', login_time=now - timedelta(minutes=5),
+            last_activity=now, device_type='h5', is_active=True,
+        ))
+        db_session.commit()
+        aggregator.load(db_session)
+        assert aggregator.count() == 1
+
+        aggregator.record_heartbeat(9, '王五', '10.0.0.2', 'pc')
+        db_session.add(OnlineUser(
+            user_id=10, user_name='赵六', login_time=now, last_activity=now, device_type='pc', is_active=True,
+        ))
+        db_session.commit()
+        aggregator._reload(db_session)
+
+        assert {user['user_id'] for user in aggregator.users()} == {8, 9, 10}
+        assert aggregator.statistics()['today_logins'] == 3
+
+    def test_postgresql_values_update(self):
+        """
+        测试 PostgreSQL 使用 UPDATE ... FROM (VALUES ...)
+        """
+        now = datetime.utcnow()
+        statement = build_values_update([
+            OnlinePresence(user_id=1, user_name='张三', login_time=now, last_activity=now),
+            OnlinePresence(user_id=2, user_name='李四', login_time=now, last_activity=now),
+        ])
+        sql = str(statement.compile(dialect=postgresql.dialect()))
+        assert 'FROM (VALUES' in sql
+        assert sql.count('UPDATE') == 1
+
+    def test_sweep_deactivates_idle_sessions(self, aggregator, db_session):
+        """
+        测试清理超时会话，刚有心跳但尚未写入的用户不会被清理
+        """
+        now = datetime.utcnow()
+        for user_id, idle_minutes, device_type in [(1, 5, 'h5'), (2, 45, 'pc'), (3, 90, 'h5')]:
+            db_session.add(OnlineUser(
+                user_id=user_id, user_name=f'用户{user_id}', login_time=now - timedelta(hours=2),
+                last_activity=now - timedelta(minutes=idle_minutes), device_type=device_type, is_active=True,
+            ))
+        db_session.commit()
+        aggregator.load(db_session)
+        aggregator.record_heartbeat(3, '用户3', '10.0.0.3', 'h5')
+
+        assert aggregator.sweep(db_session, timeout_minutes=30) == 1
+
+        active = {row.user_id for row in db_session.query(OnlineUser).filter(OnlineUser.is_active == True)}
+        assert active == {1, 3}
+        assert {user['user_id'] for user in aggregator.users()} == {1, 3}
+
+    def test_statistics_after_load(self, aggregator, db_session):
+        """
+        测试加载后内存统计与数据库一致，今日登录数包括已离线的记录
+        """
+        now = datetime.utcnow()
+        db_session.add_all([
+            OnlineUser(user_id=1, user_name='甲', login_time=now, last_activity=now, device_type='h5', is_active=True),
+            OnlineUser(user_id=2, user_name='乙', login_time=now, last_activity=now, device_type='pc', is_active=True),
+            OnlineUser(user_id=3, user_name='丙', login_time=now, last_activity=now, device_type='h5', is_active=False),
+            OnlineUser(
+                user_id=4, user_name='丁', login_time=now - timedelta(days=2),
+                last_activity=now, device_type='h5', is_active=True,
+            ),
+        ])
+        db_session.commit()
+        aggregator.load(db_session)
+
+        today_start = now.replace(hour=0, minute=0, second=0, microsecond=0)
+        expected = {'total_online': 3, 'h5_count': 2, 'pc_count': 1, 'today_logins': 3}
+        assert count_today_logins(db_session, today_start) == 3
+        assert aggregator.statistics() == expected
@@ -0,0 +1,107 @@
+"""
+测试人员改名的关联表同步
+"""
+from datetime import datetime, timedelta
+
+from app.models.periodic_inspection import PeriodicInspection
+from app.models.personnel import Personnel
+from app.models.spare_parts_usage import SparePartsUsage
+from app.models.temporary_repair import TemporaryRepair
+from app.models.weekly_report import WeeklyReport
+from app.models.work_order_daily_rollup import WorkOrderDailyRollup
+from app.models.work_order_operation_log import WorkOrderOperationLog
+from app.schemas.personnel import PersonnelUpdate
+from app.services import personnel as personnel_service
+from app.services.personnel import PersonnelService
+from app.services.work_order_rollup import WorkOrderRollupService
+
+
+def _rollup_snapshot(db_session) -> dict:
+    """汇总表内容快照，忽略数量为0的行"""
+    return {
+        (row.stat_date, row.project_id, row.maintenance_personnel, row.order_type, row.status):
+            (row.order_count, row.completed_count, row.on_time_count)
+        for row in db_session.query(WorkOrderDailyRollup).all()
+        if row.order_count
+    }
+
+
+def _create_records(db_session):
+    """创建人员及其名下的工单、领用和操作记录"""
+    start = datetime(2026, 5, 10, 9, 0, 0)
+    db_session.add(Personnel(id=1, name='张三', gender='男', role='运维人员'))
+    db_session.add_all([
+        PeriodicInspection(
+            id=index, inspection_id=f'XJ-{index:04d}', project_id='P001', project_name='项目一',
+            plan_start_date=start, plan_end_date=start + timedelta(days=2),
+            maintenance_personnel='张三', status='执行中' if index % 2 else '已完成',
+            actual_completion_date=None if index % 2 else start + timedelta(days=1),
+        )
+        for index in range(1, 6)
+    ])
+    db_session.add_all([
+        TemporaryRepair(
+            id=1, repair_id='WX-0001', project_id='P001', project_name='项目一',
+            plan_start_date=start, plan_end_date=start + timedelta(days=1),
+            maintenance_personnel='王五', status='执行中',
+        ),
+        TemporaryRepair(
+            id=2, repair_id='WX-0002', project_id='P001', project_name='项目一',
+            plan_start_date=start, plan_end_date=start + timedelta(days=1),
+            maintenance_personnel='张三', status='执行中',
+        ),
+        SparePartsUsage(
+            id=1, product_name='滤芯', quantity=1, user_name='张三', issue_time=start,
+        ),
+        WorkOrderOperationLog(
+            id=1, work_order_type='periodic_inspection', work_order_id=1,
+            work_order_no='XJ-0001', operator_name='张三', operation_type='create',
+        ),
+        WeeklyReport(id=1, report_id='ZB-0001', report_date=start, created_by='张三', approved_by='李四'),
+        WeeklyReport(id=2, report_id='ZB-0002', report_date=start, created_by='李四', approved_by='张三'),
+        WeeklyReport(id=3, report_id='ZB-0003', report_date=start, created_by='张三', approved_by='张三'),
+    ])
+    db_session.commit()
+
+
+class TestPersonnelRename:
+    """
+    人员改名同步测试类
+    """
+
+    def test_rename_updates_all_tables_in_chunks(self, db_session, monkeypatch):
+        """
+        测试分段批量更新所有关联表并返回各表更新条数
+        """
+        monkeypatch.setattr(personnel_service, 'RENAME_CHUNK_SIZE', 2)
+        _create_records(db_session)
+
+        counts = PersonnelService(db_session)._sync_personnel_name_to_all_tables('张三', '张三丰')
+
+        assert counts['periodic_inspection.maintenance_personnel'] == 5
+        assert counts['temporary_repair.maintenance_personnel'] == 1
+        assert counts['spare_parts_usage.user_name'] == 1
+        assert counts['work_order_operation_log.operator_name'] == 1
+        assert counts['maintenance_plan.maintenance_personnel'] == 0
+        assert counts['weekly_report.created_by'] == 2
+        assert counts['weekly_report.approved_by'] == 2
+        assert db_session.query(PeriodicInspection).filter_by(maintenance_personnel='张三').count() == 0
+        assert db_session.query(TemporaryRepair).filter_by(maintenance_personnel='王五').count() == 1
+        assert db_session.get(SparePartsUsage, 1).user_name == '张三丰'
+        assert db_session.get(WorkOrderOperationLog, 1).operator_name == '张三丰'
+
+    def test_rename_keeps_rollup_consistent(self, db_session):
+        """
+        测试批量改名后日汇总与全量重建一致
+        """
+        _create_records(db_session)
+
+        PersonnelService(db_session).update(1, PersonnelUpdate(
+            name='张三丰', gender='男', role='运维人员'
+        ))
+        incremental = _rollup_snapshot(db_session)
+
+        WorkOrderRollupService(db_session).rebuild()
+
+        assert incremental == _rollup_snapshot(db_session)
+        assert all(key[2] != '张三' for key in incremental)
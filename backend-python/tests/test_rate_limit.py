@@ -0,0 +1,134 @@
+"""
+测试请求限流
+"""
+import threading
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.middleware.rate_limit import (
+    HOUR_WINDOW,
+    MINUTE_WINDOW,
+    MemoryRateLimitBackend,
+    RateLimitMiddleware,
+    SQLiteRateLimitBackend,
+    create_rate_limit_backend,
+    sliding_window_estimate,
+)
+
+LIMITS = ((MINUTE_WINDOW, 5), (HOUR_WINDOW, 8))
+
+
+def _hits(backend, client_id: str, now: float, count: int) -> list:
+    return [backend.hit(client_id, now, LIMITS) for _ in range(count)]
+
+
+class TestRateLimit:
+    """
+    限流测试类
+    """
+
+    def test_sliding_window_estimate(self):
+        """
+        测试窗口滚动和上一窗口按剩余占比计入
+        """
+        assert sliding_window_estimate(60, 10, 4, 2, 630.0) == (10, 4, 2, 2 * 0.5 + 4)
+        assert sliding_window_estimate(60, 10, 4, 2, 675.0) == (11, 0, 4, 4 * 0.75)
+        assert sliding_window_estimate(60, 10, 4, 2, 900.0) == (15, 0, 0, 0)
+
+    @pytest.mark.parametrize("backend_factory", [
+        lambda tmp_path: MemoryRateLimitBackend(shard_count=4),
+        lambda tmp_path: SQLiteRateLimitBackend(str(tmp_path / 'rate.db')),
+    ])
+    def test_minute_and_hour_limits(self, tmp_path, backend_factory):
+        """
+        测试分钟、小时限额，超限请求不计数，客户端之间互不影响
+        """
+        backend = backend_factory(tmp_path)
+        start = 7200.0
+
+        assert _hits(backend, 'a', start, 6) == [None] * 5 + [0]
+        assert backend.hit('b', start, LIMITS) is None
+
+        assert _hits(backend, 'a', start + 120, 4) == [None, None, None, 1]
+        assert backend.hit('a', start + 2 * HOUR_WINDOW, LIMITS) is None
+
+    def test_sqlite_backend_shared_between_workers(self, tmp_path):
+        """
+        测试两个 worker 共享同一 SQLite 文件时限额合并计算
+        """
+        path = str(tmp_path / 'rate.db')
+        worker_a = SQLiteRateLimitBackend(path)
+        worker_b = SQLiteRateLimitBackend(path)
+
+        assert _hits(worker_a, 'client', 7200.0, 3) == [None] * 3
+        assert _hits(worker_b, 'client', 7201.0, 3) == [None, None, 0]
+
+    def test_memory_backend_cleans_idle_clients(self):
+        """
+        测试长时间不活跃的客户端被清理
+        """
+        backend = MemoryRateLimitBackend(shard_count=1, idle_seconds=600, cleanup_interval=60)
+        for index in range(100):
+            backend.hit(f'client-{index}', 1000.0, LIMITS)
+        assert backend.client_count() == 100
+
+        backend.hit('client-new', 2000.0, LIMITS)
+        assert backend.client_count() == 1
+
+    def test_middleware_returns_429(self):
+        """
+        测试中间件超限返回429，健康检查不限流
+        """
+        test_app = FastAPI()
+        test_app.add_middleware(RateLimitMiddleware, requests_per_minute=2, requests_per_hour=100)
+
+        @test_app.get("/ping")
+        def ping():
+            return {"ok": True}
+
+        @test_app.get("/health")
+        def health():
+            return {"status": "healthy"}
+
+        with TestClient(test_app) as client:
+            assert [client.get("/ping").status_code for _ in range(3)] == [200, 200, 429]
+            assert client.get("/ping").json()['message'] == "请求过于频繁，请稍后再试"
+            assert client.get("/health").status_code == 200
+
+    def test_blocking_backend_runs_in_threadpool(self, tmp_path):
+        """
+        测试 SQLite 存储在线程池中调用，不阻塞事件循环所在线程
+        """
+        backend = SQLiteRateLimitBackend(str(tmp_path / 'rate_limit.db'))
+        hit_threads = []
+        hit = backend.hit
+
+        def record_thread(*args):
+            hit_threads.append(threading.get_ident())
+            return hit(*args)
+
+        backend.hit = record_thread
+        test_app = FastAPI()
+        test_app.add_middleware(RateLimitMiddleware, requests_per_minute=1, requests_per_hour=100, backend=backend)
+
+        @test_app.get("/ping")
+        async def ping():
+            return {"thread": threading.get_ident()}
+
+        with TestClient(test_app) as client:
+            loop_thread = client.get("/ping").json()['thread']
+            assert client.get("/ping").status_code == 429
+
+        assert len(hit_threads) == 2
+        assert loop_thread not in hit_threads
+
+    def test_create_backend(self, tmp_path):
+        """
+        测试按配置创建存储
+        """
+        assert isinstance(create_rate_limit_backend('memory'), MemoryRateLimitBackend)
+        assert isinstance(create_rate_limit_backend('sqlite', str(tmp_path / 'r.db')), SQLiteRateLimitBackend)
+        with pytest.raises(ValueError):
+            create_rate_limit_backend('redis')
@@ -0,0 +1,144 @@
+"""
+测试参考数据缓存
+"""
+import socket
+
+from app.models.dictionary import Dictionary
+from app.models.personnel import Personnel
+from app.services.dictionary import DictionaryService
+from app.services.personnel import PersonnelService
+from app.services.reference_cache import (
+    REFERENCE_CACHE_INVALIDATIONS,
+    REFERENCE_CACHE_REQUESTS,
+    ReferenceCacheListener,
+    reference_cache,
+)
+from app.utils.dictionary_helper import get_default_spot_work_status
+
+
+def _requests(namespace: str, result: str) -> float:
+    return REFERENCE_CACHE_REQUESTS.labels(namespace=namespace, result=result)._value.get()
+
+
+def _dictionary(db_session, value: str) -> Dictionary:
+    item = Dictionary(dict_type='spot_work_status', dict_key='not_started', dict_value=value, dict_label=value)
+    db_session.add(item)
+    db_session.commit()
+    return item
+
+
+class _FakeNotify:
+    def __init__(self, payload: str):
+        self.payload = payload
+
+
+class _FakeConnection:
+    """可被 select 的假 DBAPI 连接，poll 时投递预置的通知"""
+
+    def __init__(self, listener: ReferenceCacheListener, payloads: list[str]):
+        self._listener = listener
+        self._payloads = payloads
+        self._reader, self._writer = socket.socketpair()
+        self._writer.send(b'x')
+        self.notifies: list[_FakeNotify] = []
+        self.executed: list[str] = []
+
+    def fileno(self) -> int:
+        return self._reader.fileno()
+
+    def cursor(self):
+        return self
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, sql: str) -> None:
+        self.executed.append(sql)
+
+    def poll(self) -> None:
+        self.notifies.extend(_FakeNotify(payload) for payload in self._payloads)
+        self._listener._stop.set()
+
+    def close(self) -> None:
+        self._reader.close()
+        self._writer.close()
+
+
+class TestReferenceCache:
+    """
+    参考数据缓存测试类
+    """
+
+    def test_dictionary_default_refreshes_after_update(self, db_session):
+        """
+        测试字典默认值在更新后刷新
+        """
+        assert get_default_spot_work_status(db_session) == '执行中'
+        item = _dictionary(db_session, '未开始')
+
+        hits, misses = _requests('dictionary', 'hit'), _requests('dictionary', 'miss')
+        assert get_default_spot_work_status(db_session) == '未开始'
+        assert get_default_spot_work_status(db_session) == '未开始'
+        assert (_requests('dictionary', 'hit'), _requests('dictionary', 'miss')) == (hits + 1, misses + 1)
+
+        DictionaryService(db_session).update(item.id, {'dict_value': '待处理'})
+        assert get_default_spot_work_status(db_session) == '待处理'
+        assert [row['dict_value'] for row in DictionaryService(db_session).get_dicts_by_type('spot_work_status')] == ['待处理']
+
+    def test_uncommitted_changes_bypass_cache(self, db_session):
+        """
+        测试存在未提交修改时绕过缓存
+        """
+        db_session.add(Personnel(name='张三', gender='男'))
+        db_session.commit()
+        service = PersonnelService(db_session)
+        assert service.get_all_names() == ['张三']
+
+        db_session.add(Personnel(name='李四', gender='男'))
+        db_session.flush()
+        assert sorted(service.get_all_names()) == ['张三', '李四']
+
+        db_session.rollback()
+        assert service.get_all_names() == ['张三']
+
+    def test_bulk_update_invalidates(self, db_session):
+        """
+        测试批量更新使缓存失效
+        """
+        db_session.add(Personnel(name='张三', gender='男'))
+        db_session.commit()
+        service = PersonnelService(db_session)
+        assert service.get_all_names() == ['张三']
+
+        db_session.query(Personnel).update({Personnel.name: '张三丰'})
+        db_session.commit()
+        assert service.get_all_names() == ['张三丰']
+
+    def test_listener_invalidates_on_notification(self, db_session, monkeypatch):
+        """
+        测试收到数据库通知后使缓存失效
+        """
+        db_session.add(Personnel(name='张三', gender='男'))
+        db_session.commit()
+        service = PersonnelService(db_session)
+        service.get_all_names()
+
+        listener = ReferenceCacheListener(reference_cache, db_session.get_bind())
+        connection = _FakeConnection(listener, ['personnel'])
+        monkeypatch.setattr(listener, '_connect', lambda: connection)
+        # 模拟其他 worker 修改人员后发出的通知
+        db_session.execute(Personnel.__table__.update().values(name='王五'))
+        db_session.commit()
+        assert service.get_all_names() == ['张三']
+
+        remote = REFERENCE_CACHE_INVALIDATIONS.labels(namespace='personnel', source='remote')
+        before = remote._value.get()
+        listener._listen()
+
+        assert connection.executed == ['LISTEN reference_cache']
+        # 建立监听后清空一次，收到通知后再失效一次
+        assert remote._value.get() == before + 2
+        assert service.get_all_names() == ['王五']
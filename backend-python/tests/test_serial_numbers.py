@@ -0,0 +1,178 @@
+"""
+测试单据编号分配
+"""
+import random
+import threading
+from datetime import date, datetime
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from app.models.maintenance_plan import MaintenancePlan
+from app.models.periodic_inspection import PeriodicInspection
+from app.models.serial_counter import SerialCounter
+from app.models.weekly_report import WeeklyReport
+from app.schemas.weekly_report import WeeklyReportCreate
+from app.services.maintenance_plan import MaintenancePlanService
+from app.services.weekly_report import WeeklyReportService
+from app.utils.work_order_id_generator import (
+    generate_inbound_no,
+    generate_inspection_id,
+    generate_maintenance_log_id,
+    generate_repair_id,
+    generate_work_order_ids,
+    peek_serial,
+    preview_weekly_report_id,
+    reserve_serial_ranges,
+    reserve_serials,
+)
+
+DAY = date(2026, 2, 20)
+
+
+class TestSerialNumbers:
+    """
+    单据编号分配测试类
+    """
+
+    def test_work_order_ids_are_sequential_per_prefix_project_and_day(self, db_session):
+        """
+        测试工单号按前缀、项目和日期分别连续编号
+        """
+        assert generate_inspection_id(db_session, 'P001', DAY) == 'XJ-P001-20260220-0001'
+        assert generate_inspection_id(db_session, 'P001', DAY) == 'XJ-P001-20260220-0002'
+        assert generate_inspection_id(db_session, 'P002', DAY) == 'XJ-P002-20260220-0001'
+        assert generate_repair_id(db_session, 'P001', DAY) == 'WX-P001-20260220-0001'
+        assert generate_inspection_id(db_session, 'P001', date(2026, 2, 21)) == 'XJ-P001-20260221-0001'
+
+    def test_reserve_many_in_one_call(self, db_session):
+        """
+        测试一次调用预留多个编号
+        """
+        assert generate_work_order_ids(db_session, 'YG', 'P001', 3, DAY) == [
+            'YG-P001-20260220-0001',
+            'YG-P001-20260220-0002',
+            'YG-P001-20260220-0003',
+        ]
+        assert reserve_serials(db_session, 'YG', 'P001', DAY, 2) == range(4, 6)
+        assert peek_serial(db_session, 'YG', 'P001', DAY) == 6
+
+    def test_reserve_ranges_for_many_counters_in_one_statement(self, db_session):
+        """
+        测试一条语句为多个计数器预留编号区间
+        """
+        reserve_serials(db_session, 'XJ', 'P001', DAY, 2)
+
+        ranges = reserve_serial_ranges(db_session, {
+            ('XJ', 'P001', DAY): 3,
+            ('XJ', 'P002', DAY): 1,
+            ('XJ', 'P001', date(2026, 2, 21)): 2,
+        })
+
+        assert ranges == {
+            ('XJ', 'P001', DAY): range(3, 6),
+            ('XJ', 'P002', DAY): range(1, 2),
+            ('XJ', 'P001', date(2026, 2, 21)): range(1, 3),
+        }
+
+    def test_rollback_releases_reserved_numbers(self, db_session):
+        """
+        测试回滚后释放已预留的编号
+        """
+        reserve_serials(db_session, 'XJ', 'P001', DAY, 2)
+        db_session.commit()
+
+        reserve_serials(db_session, 'XJ', 'P001', DAY, 5)
+        db_session.rollback()
+
+        assert reserve_serials(db_session, 'XJ', 'P001', DAY) == range(3, 4)
+
+    def test_other_document_numbers(self, db_session):
+        """
+        测试维修记录等其他单据编号
+        """
+        assert generate_maintenance_log_id(db_session, 'WX', 'P001', DAY) == 'WX-P001-20260220-01'
+        assert generate_repair_id(db_session, 'P001', DAY) == 'WX-P001-20260220-0001'
+        assert generate_maintenance_log_id(db_session, 'WX', 'P001', DAY) == 'WX-P001-20260220-02'
+        assert generate_inbound_no(db_session, 'IN', DAY) == 'IN202602200001'
+        assert generate_inbound_no(db_session, 'RT', DAY) == 'RT202602200001'
+
+    def test_weekly_report_replaces_previewed_id_on_save(self, db_session):
+        """
+        测试保存周报时以实际分配的编号替换预览编号
+        """
+        assert preview_weekly_report_id(db_session, DAY) == 'ZB-20260220-01'
+
+        service = WeeklyReportService(db_session)
+        first = service.create(WeeklyReportCreate(report_id='ZB-20260220-01', report_date='2026-02-20'))
+        second = service.create(WeeklyReportCreate(report_id='ZB-20260220-01', report_date='2026-02-20'))
+        custom = service.create(WeeklyReportCreate(report_id='CUSTOM-1', report_date='2026-02-20'))
+
+        assert (first.report_id, second.report_id, custom.report_id) == (
+            'ZB-20260220-01', 'ZB-20260220-02', 'CUSTOM-1'
+        )
+        assert preview_weekly_report_id(db_session, DAY) == 'ZB-20260220-03'
+        assert db_session.query(WeeklyReport).count() == 3
+
+    def test_plan_work_orders_numbered_by_plan_start_date(self, db_session):
+        """
+        测试维保计划生成的工单按计划开始日期编号
+        """
+        service = MaintenancePlanService(db_session)
+        for index in range(2):
+            plan = MaintenancePlan(
+                plan_id=f'PLAN-{index}', project_id='P001', project_name='项目一',
+                plan_start_date=datetime(2026, 3, 1), plan_end_date=datetime(2026, 3, 31),
+            )
+            service._create_work_order_for_plan(plan)
+
+        assert sorted(order.inspection_id for order in db_session.query(PeriodicInspection).all()) == [
+            'XJ-P001-20260301-0001',
+            'XJ-P001-20260301-0002',
+        ]
+
+    def test_concurrent_reservations_have_no_duplicates_or_gaps(self, tmp_path):
+        """
+        测试并发预留编号不重复也不跳号
+        """
+        engine = create_engine(f"sqlite:///{tmp_path / 'serial.db'}", connect_args={'timeout': 30})
+
+        @event.listens_for(engine, "connect")
+        def _disable_pysqlite_transaction(dbapi_connection, connection_record):
+            dbapi_connection.isolation_level = None
+
+        @event.listens_for(engine, "begin")
+        def _begin_immediate(connection):
+            connection.exec_driver_sql("BEGIN IMMEDIATE")
+
+        SerialCounter.__table__.create(engine)
+        session_factory = sessionmaker(bind=engine)
+        committed: list[int] = []
+        errors: list[BaseException] = []
+        lock = threading.Lock()
+
+        def worker(seed: int):
+            rng = random.Random(seed)
+            try:
+                for _ in range(40):
+                    with session_factory() as session:
+                        numbers = reserve_serials(session, 'XJ', 'P001', DAY, rng.randint(1, 3))
+                        if rng.random() < 0.2:
+                            session.rollback()
+                            continue
+                        session.commit()
+                    with lock:
+                        committed.extend(numbers)
+            except BaseException as exc:
+                errors.append(exc)
+
+        threads = [threading.Thread(target=worker, args=(seed,)) for seed in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        engine.dispose()
+
+        assert not errors
+        assert len(committed) == len(set(committed))
+        assert sorted(committed) == list(range(1, len(committed) + 1))
@@ -0,0 +1,261 @@
+"""
+测试统计接口
+"""
+import random
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.config import OverdueAlertConfig
+from app.dependencies import UserInfo
+from app.models.periodic_inspection import PeriodicInspection
+from app.models.spot_work import SpotWork
+from app.models.temporary_repair import TemporaryRepair
+
+STATUSES = ['执行中', '待确认', '已退回', '已完成', '已取消']
+PERSONNEL = ['张三', '李四', None]
+
+
+def _seed_work_orders(db_session, count: int = 60):
+    """按固定随机种子生成三种工单，日期分布在今天前后两年内"""
+    rng = random.Random(20240115)
+    now = datetime.now().replace(microsecond=0)
+    models = [
+        (PeriodicInspection, 'inspection_id', 'XJ'),
+        (TemporaryRepair, 'repair_id', 'WX'),
+        (SpotWork, 'work_id', 'YG'),
+    ]
+    for model, number_field, prefix in models:
+        for i in range(1, count + 1):
+            plan_start = now + timedelta(days=rng.randint(-500, 400), hours=rng.randint(0, 23))
+            plan_end = plan_start + timedelta(days=rng.randint(0, 30))
+            status = rng.choice(STATUSES)
+            actual_completion = None
+            if status == '已完成' or rng.random() < 0.1:
+                actual_completion = plan_start + timedelta(days=rng.randint(0, 40))
+            db_session.add(model(**{
+                'id': i,
+                number_field: f'{prefix}-{i:04d}',
+                'project_id': f'P{rng.randint(1, 5):03d}',
+                'project_name': '测试项目',
+                'plan_start_date': plan_start,
+                'plan_end_date': plan_end,
+                'maintenance_personnel': rng.choice(PERSONNEL),
+                'status': status,
+                'actual_completion_date': actual_completion,
+                'is_deleted': rng.random() < 0.1,
+            }))
+
+    today = datetime.combine(now.date(), datetime.min.time())
+    boundaries = [
+        today - timedelta(seconds=1),
+        today,
+        today + timedelta(days=7, hours=23, minutes=59),
+        today + timedelta(days=8),
+    ]
+    for offset, plan_start in enumerate(boundaries, start=count + 1):
+        db_session.add(PeriodicInspection(
+            id=offset,
+            inspection_id=f'XJ-{offset:04d}',
+            project_id='P001',
+            project_name='测试项目',
+            plan_start_date=plan_start,
+            plan_end_date=plan_start,
+            maintenance_personnel='张三',
+            status='执行中',
+            is_deleted=False,
+        ))
+    db_session.commit()
+
+
+def _legacy_overview(db_session, year: int, user_name: str | None, is_manager: bool) -> dict:
+    """原逐行遍历实现，作为聚合查询结果的对照"""
+    today = datetime.now().date()
+    year_start = datetime(year, 1, 1).date()
+    year_end = datetime(year, 12, 31).date()
+    valid_statuses = OverdueAlertConfig.VALID_STATUSES
+    completed_statuses = OverdueAlertConfig.COMPLETED_STATUSES
+    counts = {'nearDueCount': 0, 'overdueCount': 0, 'yearCompletedCount': 0}
+    type_keys = {
+        PeriodicInspection: 'regularInspectionCount',
+        TemporaryRepair: 'temporaryRepairCount',
+        SpotWork: 'spotWorkCount',
+    }
+
+    for model, type_key in type_keys.items():
+        counts[type_key] = 0
+        query = db_session.query(model).filter(model.is_deleted == False)
+        if not is_manager and user_name:
+            query = query.filter(model.maintenance_personnel == user_name)
+        for item in query.all():
+            plan_start = item.plan_start_date.date()
+            plan_end = item.plan_end_date.date()
+            actual_completion = item.actual_completion_date.date() if item.actual_completion_date else None
+            if year_start <= plan_start <= year_end and item.status in valid_statuses:
+                counts[type_key] += 1
+            if item.status in valid_statuses and 0 <= (plan_start - today).days <= 7:
+                counts['nearDueCount'] += 1
+            check_date = today if year == today.year else year_end
+            if plan_end < check_date and item.status in valid_statuses:
+                counts['overdueCount'] += 1
+            if item.status in completed_statuses and actual_completion:
+                if year_start <= actual_completion <= year_end:
+                    counts['yearCompletedCount'] += 1
+
+    counts['totalWorkOrders'] = sum(counts[key] for key in type_keys.values())
+    counts['year'] = year
+    return counts
+
+
+class TestStatisticsOverview:
+    """
+    统计概览测试类
+    """
+
+    @pytest.mark.parametrize("year_offset", [-1, 0, 1])
+    @pytest.mark.parametrize("role,name", [("管理员", "管理员"), ("运维人员", "张三")])
+    def test_overview_matches_legacy(self, db_session, year_offset, role, name):
+        """
+        测试聚合查询与原逐行统计结果一致
+        """
+        from app.api.v1.statistics import get_statistics_overview
+
+        _seed_work_orders(db_session)
+        year = datetime.now().year + year_offset
+        user_info = UserInfo(name=name, role=role)
+
+        response = get_statistics_overview(year=year, db=db_session, user_info=user_info)
+
+        assert response.data == _legacy_overview(db_session, year, name, user_info.is_manager)
+
+    def test_overview_empty(self, db_session):
+        """
+        测试无工单时各项统计为0
+        """
+        from app.api.v1.statistics import get_statistics_overview
+
+        response = get_statistics_overview(
+            year=datetime.now().year, db=db_session, user_info=UserInfo(name="管理员", role="管理员")
+        )
+
+        assert response.data['totalWorkOrders'] == 0
+        assert response.data['nearDueCount'] == 0
+        assert response.data['overdueCount'] == 0
+        assert response.data['yearCompletedCount'] == 0
+
+
+def _legacy_detail_keys(db_session, year: int, data_type: str, **params) -> list[tuple[str, int]]:
+    """原逐行过滤实现的判定条件，返回 (工单类型, ID) 列表"""
+    today = datetime.now().date()
+    year_start = datetime(year, 1, 1).date()
+    year_end = datetime(year, 12, 31).date()
+    valid_statuses = OverdueAlertConfig.VALID_STATUSES
+    completed_statuses = OverdueAlertConfig.COMPLETED_STATUSES
+    order_type = params.get('order_type')
+    type_names = {
+        PeriodicInspection: ('定期巡检单', 'inspection', 'regularInspection'),
+        TemporaryRepair: ('临时维修单', 'repair', 'temporaryRepair'),
+        SpotWork: ('零星用工单', 'spotwork', 'spotWork'),
+    }
+
+    def matches(item, type_code: str, type_data: str) -> bool:
+        plan_start = item.plan_start_date.date()
+        plan_end = item.plan_end_date.date()
+        actual = item.actual_completion_date.date() if item.actual_completion_date else None
+        in_year = year_start <= plan_start <= year_end
+        if data_type == 'nearDue':
+            return year == today.year and item.status in valid_statuses and 0 <= (plan_start - today).days <= 7
+        if data_type == 'overdue':
+            check_date = today if year == today.year else year_end
+            return plan_end < check_date and item.status in valid_statuses
+        if data_type == 'yearCompleted':
+            return item.status in completed_statuses and bool(actual) and year_start <= actual <= year_end
+        if data_type in ('regularInspection', 'temporaryRepair', 'spotWork'):
+            return data_type == type_data and in_year and item.status in valid_statuses
+        if data_type in ('onTime', 'delayed'):
+            if not (item.status in completed_statuses and actual and in_year):
+                return False
+            return actual <= plan_end if data_type == 'onTime' else actual > plan_end
+        if data_type == 'employee':
+            if order_type and order_type != type_code:
+                return False
+            matched = in_year and item.maintenance_personnel == params['employee_name']
+            return matched and (not order_type or item.status in completed_statuses)
+        return False
+
+    keys = []
+    for model, (type_name, type_code, type_data) in type_names.items():
+        for item in db_session.query(model).filter(model.is_deleted == False).order_by(model.id):
+            if matches(item, type_code, type_data):
+                keys.append((type_name, item.id))
+    return keys
+
+
+class TestStatisticsDetail:
+    """
+    统计明细测试类
+    """
+
+    @pytest.mark.parametrize("data_type,params", [
+        ('nearDue', {}),
+        ('overdue', {}),
+        ('yearCompleted', {}),
+        ('regularInspection', {}),
+        ('temporaryRepair', {}),
+        ('spotWork', {}),
+        ('onTime', {}),
+        ('delayed', {}),
+        ('employee', {'employee_name': '张三'}),
+        ('employee', {'employee_name': '张三', 'order_type': 'repair'}),
+    ])
+    @pytest.mark.parametrize("year_offset", [-1, 0])
+    def test_detail_matches_legacy(self, db_session, data_type, params, year_offset):
+        """
+        测试SQL谓词与原逐行过滤结果一致
+        """
+        from app.api.v1.statistics import get_statistics_detail
+
+        _seed_work_orders(db_session)
+        year = datetime.now().year + year_offset
+
+        response = get_statistics_detail(
+            year=year, data_type=data_type,
+            employee_name=params.get('employee_name'), project_name=None,
+            order_type=params.get('order_type'), page=1, page_size=1000,
+            db=db_session, user_info=UserInfo(name='管理员', role='管理员'),
+        )
+
+        expected = _legacy_detail_keys(db_session, year, data_type, **params)
+        assert response.data['total'] == len(expected)
+        assert [(row['orderType'], row['id']) for row in response.data['data']] == expected
+
+    def test_detail_project_and_paging(self, db_session):
+        """
+        测试项目明细通过名称匹配并在数据库中分页
+        """
+        from app.api.v1.statistics import get_statistics_detail
+        from app.models.project_info import ProjectInfo
+
+        _seed_work_orders(db_session)
+        db_session.add(ProjectInfo(
+            id=1, project_id='P001', project_name='一号项目',
+            completion_date=datetime(2024, 1, 1), maintenance_end_date=datetime(2030, 12, 31),
+            maintenance_period='每月', client_name='客户', address='地址', project_manager='张三',
+        ))
+        db_session.commit()
+        year = datetime.now().year
+
+        def fetch(page: int, page_size: int):
+            return get_statistics_detail(
+                year=year, data_type='project', employee_name=None, project_name='一号项目',
+                order_type=None, page=page, page_size=page_size,
+                db=db_session, user_info=UserInfo(name='管理员', role='管理员'),
+            ).data
+
+        full = fetch(1, 1000)
+        assert full['total'] > 3
+        assert all(row['projectName'] == '一号项目' for row in full['data'])
+
+        second_page = fetch(2, 3)
+        assert second_page['total'] == full['total']
+        assert second_page['data'] == full['data'][3:6]
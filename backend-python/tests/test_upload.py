@@ -0,0 +1,86 @@
+"""
+测试图片上传
+"""
+import base64
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api.v1 import upload
+from app.utils import blob_store
+
+PNG_BYTES = b'\x89PNG\r\n\x1a\n' + bytes(range(256)) * 4
+
+
+@pytest.fixture
+def blob_dir(tmp_path, monkeypatch):
+    """blob 存储写入临时目录"""
+    monkeypatch.setattr(blob_store, 'BLOB_DIR', tmp_path / 'blobs')
+    return tmp_path / 'blobs'
+
+
+@pytest.fixture
+def upload_client(blob_dir):
+    """只挂载上传路由的测试客户端"""
+    app = FastAPI()
+    app.include_router(upload.router)
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+def _stored_files(blob_dir):
+    return [path for path in blob_dir.rglob('*') if path.is_file()]
+
+
+class TestUpload:
+    """
+    图片上传测试类
+    """
+
+    def test_duplicate_upload_stored_once(self, upload_client, blob_dir, monkeypatch):
+        """相同内容分块写入后只保存一份"""
+        monkeypatch.setattr(upload, 'UPLOAD_CHUNK_SIZE', 100)
+        urls = []
+        for name in ('a.png', 'b.jpg'):
+            response = upload_client.post('/upload', files={'file': (name, PNG_BYTES, 'image/png')})
+            assert response.status_code == 200
+            urls.append(response.json()['data']['url'])
+
+        assert urls[0] == urls[1]
+        assert urls[0].startswith('/uploads/blobs/') and urls[0].endswith('.png')
+        files = _stored_files(blob_dir)
+        assert len(files) == 1
+        assert files[0].read_bytes() == PNG_BYTES
+
+    def test_oversized_upload_rejected(self, upload_client, blob_dir, monkeypatch):
+        """超过大小限制时拒绝并删除临时文件"""
+        monkeypatch.setattr(upload, 'MAX_UPLOAD_SIZE', 512)
+        monkeypatch.setattr(upload, 'UPLOAD_CHUNK_SIZE', 100)
+        response = upload_client.post('/upload', files={'file': ('a.png', PNG_BYTES, 'image/png')})
+
+        assert response.status_code == 400
+        assert _stored_files(blob_dir) == []
+
+    def test_non_image_rejected(self, upload_client):
+        """只接受图片类型"""
+        response = upload_client.post('/upload', files={'file': ('a.txt', b'hello', 'text/plain')})
+        assert response.status_code == 400
+
+    def test_base64_upload_matches_file_upload(self, upload_client, blob_dir):
+        """base64 上传与文件上传得到同一地址"""
+        data_uri = 'data:image/png;base64,' + base64.b64encode(PNG_BYTES).decode('ascii')
+        from_base64 = upload_client.post('/upload/base64', json={'data': data_uri}).json()['data']['url']
+        from_file = upload_client.post(
+            '/upload', files={'file': ('a.png', PNG_BYTES, 'image/png')}
+        ).json()['data']['url']
+
+        assert from_base64 == from_file
+        assert len(_stored_files(blob_dir)) == 1
+
+    def test_invalid_base64_rejected(self, upload_client, blob_dir):
+        """无效 base64 返回 400 且不留下临时文件"""
+        response = upload_client.post('/upload/base64', json={'data': 'data:image/png;base64,@@@@'})
+
+        assert response.status_code == 400
+        assert _stored_files(blob_dir) == []
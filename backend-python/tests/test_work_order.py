@@ -0,0 +1,111 @@
+"""
+测试统一工单列表
+"""
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.models.periodic_inspection import PeriodicInspection
+from app.models.spot_work import SpotWork
+from app.models.temporary_repair import TemporaryRepair
+from app.repositories.work_order import WorkOrderRepository, decode_cursor, encode_cursor
+
+
+def _seed(db_session):
+    """三种工单各10条，创建时间交错并包含相同时间戳"""
+    base = datetime(2026, 1, 1, 8, 0, 0)
+    models = [
+        (PeriodicInspection, 'inspection_id', 'XJ'),
+        (TemporaryRepair, 'repair_id', 'WX'),
+        (SpotWork, 'work_id', 'YG'),
+    ]
+    for offset, (model, number_field, prefix) in enumerate(models):
+        for i in range(1, 11):
+            db_session.add(model(**{
+                'id': i,
+                number_field: f'{prefix}-{i:04d}',
+                'project_id': 'P001',
+                'project_name': '地铁项目' if i % 2 else '园区项目',
+                'plan_start_date': base,
+                'plan_end_date': base + timedelta(days=3),
+                'maintenance_personnel': '张三' if i % 3 else '李四',
+                'status': '执行中',
+                'created_at': base + timedelta(hours=i * 3 + offset) if i != 5 else base,
+                'updated_at': base,
+            }))
+    db_session.commit()
+
+
+class TestWorkOrderRepository:
+    """
+    统一工单Repository测试类
+    """
+
+    def test_offset_pages_are_sorted_and_complete(self, db_session):
+        """
+        测试OFFSET分页按创建时间倒序且覆盖全部工单
+        """
+        _seed(db_session)
+        repository = WorkOrderRepository(db_session)
+
+        seen = []
+        for page in range(4):
+            rows, total, _ = repository.find_page(page=page, size=8)
+            assert total == 30
+            seen.extend(rows)
+
+        assert len(seen) == 30
+        assert len({(row['order_type_code'], row['id']) for row in seen}) == 30
+        created = [row['created_at'] for row in seen]
+        assert created == sorted(created, reverse=True)
+
+    def test_cursor_pages_match_offset_pages(self, db_session):
+        """
+        测试键集分页与OFFSET分页结果一致
+        """
+        _seed(db_session)
+        repository = WorkOrderRepository(db_session)
+
+        offset_rows = []
+        for page in range(3):
+            rows, _, _ = repository.find_page(page=page, size=10)
+            offset_rows.extend(rows)
+
+        cursor_rows = []
+        cursor = None
+        while True:
+            rows, _, cursor = repository.find_page(size=10, cursor=cursor, with_total=False)
+            cursor_rows.extend(rows)
+            if not cursor:
+                break
+
+        assert [(r['order_type_code'], r['id']) for r in cursor_rows] == \
+            [(r['order_type_code'], r['id']) for r in offset_rows]
+
+    def test_filters(self, db_session):
+        """
+        测试类型、模糊搜索和人员过滤
+        """
+        _seed(db_session)
+        repository = WorkOrderRepository(db_session)
+
+        rows, total, _ = repository.find_page(size=100, order_type='repair')
+        assert total == 10
+        assert {row['order_type_code'] for row in rows} == {'repair'}
+
+        rows, total, _ = repository.find_page(size=100, project_name='园区', order_id='xj')
+        assert total == 5
+        assert all(row['order_id'].startswith('XJ') for row in rows)
+
+        _, total, _ = repository.find_page(size=100, user_name='李四')
+        assert total == 9
+
+    def test_cursor_round_trip(self):
+        """
+        测试游标编解码
+        """
+        created_at = datetime(2026, 3, 1, 12, 30, 15)
+        assert decode_cursor(encode_cursor(created_at, 2, 42)) == (created_at, 2, 42)
+
+        with pytest.raises(ValueError):
+            decode_cursor('not-a-cursor')
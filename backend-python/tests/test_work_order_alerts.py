@@ -0,0 +1,187 @@
+"""
+测试超期、临期工单提醒
+"""
+from datetime import date, datetime, timedelta
+
+import pytest
+
+from app.config import OverdueAlertConfig
+from app.models.periodic_inspection import PeriodicInspection
+from app.models.spot_work import SpotWork
+from app.models.temporary_repair import TemporaryRepair
+from app.services.alert_counter import (
+    ALERT_COUNT_CACHE_REQUESTS,
+    AlertCounterService,
+    alert_count_cache,
+)
+from app.services.expiring_soon import ExpiringSoonService
+from app.services.overdue_alert import OverdueAlertService
+from tests.test_statistics import _seed_work_orders
+
+ALERT_TYPES = {
+    PeriodicInspection: ('定期巡检', 'inspection_id'),
+    TemporaryRepair: ('临时维修', 'repair_id'),
+    SpotWork: ('零星用工', 'work_id'),
+}
+
+
+def _legacy_items(db_session, overdue: bool, **filters) -> list[dict]:
+    """原逐行计算实现，作为数据库分页结果的对照（不含排序）"""
+    today = date.today()
+    today_dt = datetime.combine(today, datetime.min.time())
+    items = []
+    for model, (type_name, number_field) in ALERT_TYPES.items():
+        if filters.get('work_order_type') not in (None, type_name):
+            continue
+        for row in db_session.query(model).filter(model.is_deleted == False).all():
+            if row.status not in OverdueAlertConfig.VALID_STATUSES:
+                continue
+            if filters.get('maintenance_personnel') and row.maintenance_personnel != filters['maintenance_personnel']:
+                continue
+            if overdue:
+                if not row.plan_end_date < today_dt:
+                    continue
+                days = (today - row.plan_end_date.date()).days
+            else:
+                if not today_dt <= row.plan_start_date <= today_dt + timedelta(days=7):
+                    continue
+                days = (row.plan_start_date.date() - today).days
+            items.append({'workOrderNo': getattr(row, number_field), 'workOrderType': type_name, 'days': days})
+    return items
+
+
+class TestWorkOrderAlerts:
+    """
+    超期、临期工单提醒测试类
+    """
+
+    @pytest.mark.parametrize("filters", [
+        {},
+        {'work_order_type': '临时维修'},
+        {'maintenance_personnel': '张三'},
+    ])
+    def test_overdue_matches_legacy(self, db_session, filters):
+        """
+        测试超期工单与原逐行实现一致，且按超期天数倒序分页
+        """
+        _seed_work_orders(db_session)
+        service = OverdueAlertService(db_session)
+
+        expected = _legacy_items(db_session, overdue=True, **filters)
+        items, total = service.get_overdue_items(size=1000, **filters)
+
+        assert total == len(expected)
+        assert sorted((i['workOrderType'], i['workOrderNo'], i['overdueDays']) for i in items) == \
+            sorted((e['workOrderType'], e['workOrderNo'], e['days']) for e in expected)
+        days = [item['overdueDays'] for item in items]
+        assert days == sorted(days, reverse=True)
+
+        page_items, page_total = service.get_overdue_items(page=1, size=7, **filters)
+        assert page_total == total
+        assert page_items == items[7:14]
+
+    @pytest.mark.parametrize("filters", [
+        {},
+        {'work_order_type': '定期巡检'},
+    ])
+    def test_expiring_matches_legacy(self, db_session, filters):
+        """
+        测试临期工单与原逐行实现一致，且按剩余天数正序排列
+        """
+        _seed_work_orders(db_session)
+        service = ExpiringSoonService(db_session)
+
+        expected = _legacy_items(db_session, overdue=False, **filters)
+        items, total = service.get_expiring_items(size=1000, **filters)
+
+        assert total == len(expected)
+        assert sorted((i['workOrderType'], i['workOrderNo'], i['daysRemaining']) for i in items) == \
+            sorted((e['workOrderType'], e['workOrderNo'], e['days']) for e in expected)
+        days = [item['daysRemaining'] for item in items]
+        assert days == sorted(days)
+        assert service.get_expiring_count() == total
+
+    def test_page_beyond_end_keeps_total(self, db_session):
+        """
+        测试超出末页时仍返回总数
+        """
+        _seed_work_orders(db_session)
+        service = OverdueAlertService(db_session)
+
+        _, total = service.get_overdue_items(size=1000)
+        items, page_total = service.get_overdue_items(page=100, size=10)
+
+        assert items == []
+        assert page_total == total
+
+
+class TestAlertCounter:
+    """
+    提醒数量缓存测试类
+    """
+
+    def setup_method(self):
+        alert_count_cache.clear()
+
+    def _cache_requests(self, result: str) -> float:
+        return ALERT_COUNT_CACHE_REQUESTS.labels(result=result)._value.get()
+
+    def test_counts_match_lists(self, db_session):
+        """
+        测试数量与列表总数一致，按用户区分缓存
+        """
+        _seed_work_orders(db_session)
+        counter = AlertCounterService(db_session)
+
+        counts = counter.get_counts('管理员', True)
+        assert counts['overdue'] == OverdueAlertService(db_session).get_overdue_count()
+        assert counts['expiring'] == ExpiringSoonService(db_session).get_expiring_count()
+
+        own = counter.get_counts('张三', False)
+        assert own['overdue'] == OverdueAlertService(db_session).get_overdue_count(maintenance_personnel='张三')
+        assert own['overdue'] < counts['overdue']
+
+    def test_cache_hit_and_invalidation(self, db_session):
+        """
+        测试缓存命中，工单状态变更提交后失效，无关字段变更不失效
+        """
+        _seed_work_orders(db_session)
+        counter = AlertCounterService(db_session)
+        hits, misses = self._cache_requests('hit'), self._cache_requests('miss')
+
+        before = counter.get_counts('管理员', True)
+        assert counter.get_counts('管理员', True) == before
+        assert self._cache_requests('miss') == misses + 1
+        assert self._cache_requests('hit') == hits + 1
+
+        item = db_session.query(PeriodicInspection).filter(
+            PeriodicInspection.plan_end_date < datetime.combine(date.today(), datetime.min.time()),
+            PeriodicInspection.status.in_(OverdueAlertConfig.VALID_STATUSES),
+            PeriodicInspection.is_deleted == False,
+        ).first()
+        item.remarks = '备注'
+        db_session.commit()
+        assert counter.get_counts('管理员', True) == before
+        assert self._cache_requests('miss') == misses + 1
+
+        item.status = '已完成'
+        db_session.flush()
+        assert counter.get_counts('管理员', True) == before
+
+        db_session.commit()
+        after = counter.get_counts('管理员', True)
+        assert after['overdue'] == before['overdue'] - 1
+        assert self._cache_requests('miss') == misses + 2
+
+    def test_bulk_update_invalidates(self, db_session):
+        """
+        测试批量UPDATE工单后缓存失效
+        """
+        _seed_work_orders(db_session)
+        counter = AlertCounterService(db_session)
+        counter.get_counts('管理员', True)
+
+        db_session.query(TemporaryRepair).update({TemporaryRepair.status: '已取消'})
+        db_session.commit()
+
+        assert alert_count_cache.get((None, True, date.today())) is None
@@ -0,0 +1,156 @@
+"""
+测试工单日汇总表
+"""
+from datetime import datetime, timedelta
+
+from app.dependencies import UserInfo
+from app.models.periodic_inspection import PeriodicInspection
+from app.models.project_info import ProjectInfo
+from app.models.spot_work import SpotWork
+from app.models.temporary_repair import TemporaryRepair
+from app.models.work_order_daily_rollup import WorkOrderDailyRollup
+from app.schemas.project_info import ProjectInfoUpdate
+from app.services.project_info import ProjectInfoService
+from app.services.work_order_rollup import WorkOrderRollupService
+
+
+def _rollup_snapshot(db_session) -> dict:
+    """汇总表内容快照，忽略数量为0的行"""
+    return {
+        (row.stat_date, row.project_id, row.maintenance_personnel, row.order_type, row.status):
+            (row.order_count, row.completed_count, row.on_time_count)
+        for row in db_session.query(WorkOrderDailyRollup).all()
+        if row.order_count
+    }
+
+
+def _create_orders(db_session):
+    """创建三种工单"""
+    start = datetime(2026, 5, 10, 9, 0, 0)
+    db_session.add_all([
+        PeriodicInspection(
+            id=1, inspection_id='XJ-0001', project_id='P001', project_name='项目一',
+            plan_start_date=start, plan_end_date=start + timedelta(days=2),
+            maintenance_personnel='张三', status='执行中',
+        ),
+        PeriodicInspection(
+            id=2, inspection_id='XJ-0002', project_id='P001', project_name='项目一',
+            plan_start_date=start, plan_end_date=start + timedelta(days=2),
+            maintenance_personnel='张三', status='执行中',
+        ),
+        TemporaryRepair(
+            id=1, repair_id='WX-0001', project_id='P002', project_name='项目二',
+            plan_start_date=start, plan_end_date=start + timedelta(days=1),
+            maintenance_personnel='李四', status='已完成',
+            actual_completion_date=start + timedelta(days=3),
+        ),
+        SpotWork(
+            id=1, work_id='YG-0001', project_id='P002', project_name='项目二',
+            plan_start_date=start + timedelta(days=40), plan_end_date=start + timedelta(days=41),
+            maintenance_personnel=None, status='待确认',
+        ),
+    ])
+    db_session.commit()
+
+
+class TestWorkOrderRollup:
+    """
+    工单日汇总测试类
+    """
+
+    def test_incremental_matches_rebuild(self, db_session):
+        """
+        测试增量维护结果与全量重建一致
+        """
+        _create_orders(db_session)
+
+        inspection = db_session.get(PeriodicInspection, 1)
+        inspection.status = '已完成'
+        inspection.actual_completion_date = datetime(2026, 5, 11, 18, 0, 0)
+        db_session.commit()
+
+        repair = db_session.get(TemporaryRepair, 1)
+        repair.maintenance_personnel = '王五'
+        repair.plan_start_date = datetime(2027, 1, 3, 9, 0, 0)
+        db_session.commit()
+
+        db_session.get(PeriodicInspection, 2).soft_delete(user_id=1)
+        db_session.delete(db_session.get(SpotWork, 1))
+        db_session.commit()
+
+        incremental = _rollup_snapshot(db_session)
+        WorkOrderRollupService(db_session).rebuild()
+
+        assert incremental == _rollup_snapshot(db_session)
+        assert sum(counts[0] for counts in incremental.values()) == 2
+
+    def test_rollback_discards_deltas(self, db_session):
+        """
+        测试事务回滚时汇总增量一并回滚
+        """
+        _create_orders(db_session)
+        before = _rollup_snapshot(db_session)
+
+        inspection = db_session.get(PeriodicInspection, 1)
+        inspection.maintenance_personnel = '赵六'
+        db_session.flush()
+        db_session.rollback()
+
+        assert _rollup_snapshot(db_session) == before
+
+    def test_project_manager_change_moves_rollup(self, db_session):
+        """
+        测试更换项目运维人员批量更新工单后日汇总与全量重建一致
+        """
+        _create_orders(db_session)
+        start = datetime(2026, 5, 10, 9, 0, 0)
+        db_session.add(ProjectInfo(
+            id=1, project_id='P001', project_name='项目一', completion_date=start,
+            maintenance_end_date=start + timedelta(days=365), maintenance_period='每月',
+            client_name='客户一', address='地址', project_manager='张三',
+        ))
+        db_session.add(PeriodicInspection(
+            id=3, inspection_id='XJ-0003', project_id='P002', project_name='项目二',
+            plan_start_date=start, plan_end_date=start + timedelta(days=2),
+            maintenance_personnel='张三', status='执行中',
+        ))
+        db_session.commit()
+
+        ProjectInfoService(db_session).update(1, ProjectInfoUpdate(
+            project_id='P001', project_name='项目一', completion_date=start,
+            maintenance_end_date=start + timedelta(days=365), maintenance_period='每月',
+            client_name='客户一', address='地址', project_manager='王五',
+        ))
+
+        assert db_session.get(PeriodicInspection, 3).maintenance_personnel == '张三'
+        incremental = _rollup_snapshot(db_session)
+        assert incremental[(start.date(), 'P001', '王五', 'inspection', '执行中')] == (2, 0, 0)
+        assert incremental[(start.date(), 'P002', '张三', 'inspection', '执行中')] == (1, 0, 0)
+        WorkOrderRollupService(db_session).rebuild()
+        assert incremental == _rollup_snapshot(db_session)
+
+    def test_statistics_read_rollup(self, db_session):
+        """
+        测试统计接口读取汇总表
+        """
+        from app.api.v1.statistics import get_completion_rate, get_employee_stats, get_repair_stats
+
+        _create_orders(db_session)
+        db_session.get(PeriodicInspection, 1).status = '已完成'
+        db_session.get(PeriodicInspection, 1).actual_completion_date = datetime(2026, 5, 11)
+        db_session.commit()
+        admin = UserInfo(name='管理员', role='管理员')
+
+        rate = get_completion_rate(year=2026, db=db_session, user_info=admin).data
+        assert rate['totalCount'] == 2
+        assert rate['onTimeCount'] == 1
+        assert rate['delayedCount'] == 1
+
+        employees = get_employee_stats(year=2026, db=db_session, user_info=admin).data
+        assert employees['employees'] == [{'name': '张三', 'count': 2}, {'name': '李四', 'count': 1}]
+
+        own = get_employee_stats(year=2026, db=db_session, user_info=UserInfo(name='李四', role='运维人员')).data
+        assert own['employees'] == [{'name': '李四', 'count': 1}]
+
+        repairs = get_repair_stats(year=2026, db=db_session, user_info=admin).data
+        assert repairs['employees'] == [{'name': '李四', 'count': 1}]
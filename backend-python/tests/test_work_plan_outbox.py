@@ -0,0 +1,267 @@
+"""
+测试工作计划同步发件箱
+"""
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import delete, update
+from sqlalchemy.orm import sessionmaker
+
+from app.models.maintenance_plan import MaintenancePlan
+from app.models.periodic_inspection import PeriodicInspection
+from app.models.project_info import ProjectInfo
+from app.models.temporary_repair import TemporaryRepair
+from app.models.work_plan import WorkPlan
+from app.models.work_plan_outbox import WorkPlanOutbox
+from app.services.work_plan_outbox import WorkPlanOutboxApplier, WorkPlanOutboxService
+
+START = datetime(2026, 3, 1)
+
+
+@pytest.fixture
+def project(db_session):
+    """创建项目"""
+    db_session.add(ProjectInfo(
+        id=1, project_id='P001', project_name='项目1', completion_date=START,
+        maintenance_end_date=START + timedelta(days=365), maintenance_period='每月',
+        client_name='客户1', address='地址', project_manager='张三',
+    ))
+    db_session.commit()
+
+
+def _repair(repair_id: str, **overrides) -> TemporaryRepair:
+    values = {
+        'repair_id': repair_id,
+        'project_id': 'P001',
+        'project_name': '项目1',
+        'plan_start_date': START,
+        'plan_end_date': START + timedelta(days=1),
+        'client_name': '客户1',
+        'maintenance_personnel': '张三',
+        'status': '执行中',
+    }
+    values.update(overrides)
+    return TemporaryRepair(**values)
+
+
+def _outbox_count(db_session) -> int:
+    return db_session.query(WorkPlanOutbox).count()
+
+
+def _work_plan(db_session, plan_id: str) -> WorkPlan:
+    return db_session.query(WorkPlan).filter_by(plan_id=plan_id).populate_existing().one()
+
+
+class TestWorkPlanOutbox:
+    """
+    工作计划发件箱测试类
+    """
+
+    def test_changes_are_recorded_in_the_same_transaction(self, db_session, project):
+        """
+        测试工单变更与发件箱记录在同一事务中写入
+        """
+        db_session.add(_repair('WX-1'))
+        db_session.flush()
+        assert _outbox_count(db_session) == 1
+        db_session.rollback()
+        assert _outbox_count(db_session) == 0
+
+        db_session.add(_repair('WX-1'))
+        db_session.commit()
+
+        assert _outbox_count(db_session) == 1
+        assert db_session.query(WorkPlan).count() == 0
+
+    def test_drain_coalesces_repeated_updates(self, db_session, project):
+        """
+        测试同一工单的多次更新合并为一次同步
+        """
+        repair = _repair('WX-1')
+        db_session.add(repair)
+        db_session.commit()
+        for status in ('进行中', '待确认', '已完成'):
+            repair.status = status
+            db_session.commit()
+        repair.fault_description = '不影响工作计划'
+        db_session.commit()
+        assert _outbox_count(db_session) == 4
+
+        assert WorkPlanOutboxService(db_session).drain() == 4
+
+        work_plan = _work_plan(db_session, 'WX-1')
+        assert (work_plan.plan_type, work_plan.status, work_plan.client_name) == ('临时维修', '已完成', '客户1')
+        assert (work_plan.filled_count, work_plan.total_count) == (0, 5)
+        assert _outbox_count(db_session) == 0
+
+    def test_drain_processes_in_batches(self, db_session, project):
+        """
+        测试发件箱按批次处理
+        """
+        db_session.add_all([_repair(f'WX-{index}') for index in range(5)])
+        db_session.commit()
+
+        service = WorkPlanOutboxService(db_session)
+        assert service.drain(batch_size=2) == 2
+        assert db_session.query(WorkPlan).count() == 2
+        assert service.drain_all(batch_size=2) == 3
+        assert db_session.query(WorkPlan).count() == 5
+
+    def test_soft_delete_restore_and_renumber(self, db_session, project):
+        """
+        测试软删除、恢复和修改编号后的同步
+        """
+        repair = _repair('WX-1')
+        db_session.add(repair)
+        db_session.commit()
+        service = WorkPlanOutboxService(db_session)
+        service.drain_all()
+
+        repair.soft_delete(7)
+        db_session.commit()
+        service.drain_all()
+        work_plan = _work_plan(db_session, 'WX-1')
+        assert (work_plan.is_deleted, work_plan.deleted_by) == (True, 7)
+
+        repair.restore()
+        repair.repair_id = 'WX-2'
+        db_session.commit()
+        service.drain_all()
+        assert _work_plan(db_session, 'WX-1').is_deleted is True
+        assert _work_plan(db_session, 'WX-2').is_deleted is False
+
+        db_session.delete(repair)
+        db_session.commit()
+        service.drain_all()
+        assert _work_plan(db_session, 'WX-2').is_deleted is True
+
+    def test_maintenance_plan_is_mirrored_but_its_inspections_are_not(self, db_session, project):
+        """
+        测试同步维保计划但不同步其生成的巡检单
+        """
+        db_session.add(MaintenancePlan(
+            plan_id='MP-1', plan_name='月度维保', project_id='P001', plan_type='定期维保',
+            equipment_id='EQ001', equipment_name='默认设备', plan_start_date=START,
+            plan_end_date=START + timedelta(days=30), maintenance_content='常规维保', plan_status='执行中',
+        ))
+        db_session.add(PeriodicInspection(
+            inspection_id='XJ-1', plan_id='MP-1', project_id='P001', project_name='项目1',
+            plan_start_date=START, plan_end_date=START + timedelta(days=30),
+        ))
+        db_session.commit()
+
+        WorkPlanOutboxService(db_session).drain_all()
+
+        work_plan = db_session.query(WorkPlan).one()
+        assert (work_plan.plan_id, work_plan.plan_name, work_plan.plan_type) == ('MP-1', '月度维保', '定期维保')
+        assert (work_plan.project_name, work_plan.client_name) == ('项目1', '客户1')
+
+    def test_reconcile_repairs_drift(self, db_session, project):
+        """
+        测试对账修复工作计划与工单的偏差
+        """
+        db_session.add_all([_repair('WX-1'), _repair('WX-2'), _repair('WX-3')])
+        db_session.commit()
+        service = WorkPlanOutboxService(db_session)
+        service.drain_all()
+
+        # 绕过 ORM 的批量修改不会写入发件箱
+        db_session.execute(delete(WorkPlan).where(WorkPlan.plan_id == 'WX-1'))
+        db_session.execute(update(WorkPlan).where(WorkPlan.plan_id == 'WX-2').values(status='已完成'))
+        db_session.execute(update(TemporaryRepair).where(TemporaryRepair.repair_id == 'WX-3').values(is_deleted=True))
+        db_session.add(WorkPlan(
+            plan_id='ORPHAN', plan_type='临时维修', project_id='P001', project_name='项目1',
+            plan_start_date=START, plan_end_date=START, status='执行中',
+        ))
+        db_session.commit()
+
+        assert service.reconcile(fix=False) == {'upserted': 2, 'deleted': 1, 'orphaned': 1}
+        assert service.reconcile() == {'upserted': 2, 'deleted': 1, 'orphaned': 1}
+
+        assert _work_plan(db_session, 'WX-1').is_deleted is False
+        assert _work_plan(db_session, 'WX-2').status == '执行中'
+        assert _work_plan(db_session, 'WX-3').is_deleted is True
+        assert _work_plan(db_session, 'ORPHAN').is_deleted is True
+        assert service.reconcile(fix=False) == {'upserted': 0, 'deleted': 0, 'orphaned': 0}
+
+    def test_failing_key_is_retried_then_dead_lettered(self, db_session, project, monkeypatch):
+        """
+        测试违反工作计划约束的单据不阻塞其他单据，失败次数达到上限后不再重试
+        """
+        from app.config import get_settings
+        from app.services import work_plan_outbox
+
+        work_plan_values = work_plan_outbox._work_plan_values
+
+        def broken_values(source_type, row):
+            values = work_plan_values(source_type, row)
+            if row.key == 'WX-2':
+                values['project_name'] = None
+            return values
+
+        monkeypatch.setattr(work_plan_outbox, '_work_plan_values', broken_values)
+        monkeypatch.setattr(get_settings(), 'outbox_max_attempts', 2)
+        db_session.add_all([_repair('WX-1'), _repair('WX-2'), _repair('WX-3')])
+        db_session.commit()
+        service = WorkPlanOutboxService(db_session)
+
+        assert service.drain() == 2
+        assert {plan.plan_id for plan in db_session.query(WorkPlan)} == {'WX-1', 'WX-3'}
+        failed = db_session.query(WorkPlanOutbox).populate_existing().one()
+        assert (failed.source_key, failed.attempts, failed.dead_at) == ('WX-2', 1, None)
+        assert failed.last_error
+
+        # 新记录排在失败过的记录之前
+        db_session.add(_repair('WX-4'))
+        db_session.commit()
+        assert service.drain(batch_size=1) == 1
+        assert service.drain() == 0
+        failed = db_session.query(WorkPlanOutbox).populate_existing().one()
+        assert failed.attempts == 2
+        assert failed.dead_at is not None
+        assert service.drain() == 0
+
+        monkeypatch.setattr(work_plan_outbox, '_work_plan_values', work_plan_values)
+        assert service.reconcile()['upserted'] == 1
+        assert _work_plan(db_session, 'WX-2').project_name == '项目1'
+
+    def test_project_manager_change_is_mirrored(self, db_session, project):
+        """
+        测试更换项目运维人员的批量更新写入发件箱并同步到工作计划
+        """
+        from app.schemas.project_info import ProjectInfoUpdate
+        from app.services.project_info import ProjectInfoService
+
+        db_session.add(_repair('WX-1'))
+        db_session.add(MaintenancePlan(
+            plan_id='MP-1', plan_name='月度维保', project_id='P001', plan_type='定期维保',
+            equipment_id='EQ001', equipment_name='默认设备', plan_start_date=START,
+            plan_end_date=START + timedelta(days=30), maintenance_content='常规维保', plan_status='执行中',
+            maintenance_personnel='张三',
+        ))
+        db_session.commit()
+        service = WorkPlanOutboxService(db_session)
+        service.drain_all()
+
+        ProjectInfoService(db_session).update(1, ProjectInfoUpdate(
+            project_id='P001', project_name='项目1', completion_date=START,
+            maintenance_end_date=START + timedelta(days=365), maintenance_period='每月',
+            client_name='客户1', address='地址', project_manager='王五',
+        ))
+        assert _outbox_count(db_session) == 2
+
+        service.drain_all()
+        assert _work_plan(db_session, 'WX-1').maintenance_personnel == '王五'
+        assert _work_plan(db_session, 'MP-1').maintenance_personnel == '王五'
+        assert service.reconcile(fix=False) == {'upserted': 0, 'deleted': 0, 'orphaned': 0}
+
+    def test_applier_thread_drains_with_its_own_session(self, db_session, project):
+        """
+        测试后台线程使用独立会话处理发件箱
+        """
+        db_session.add(_repair('WX-1'))
+        db_session.commit()
+
+        applier = WorkPlanOutboxApplier(sessionmaker(bind=db_session.get_bind()), batch_size=100, poll_seconds=1)
+        assert applier.run_once() == 1
+        assert _work_plan(db_session, 'WX-1').status == '执行中'
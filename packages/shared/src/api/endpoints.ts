@@ -85,6 +85,8 @@ export const API_ENDPOINTS = {
     ALL: '/maintenance-plan/all/list',
     BY_PLAN_ID: (planId: string) => `/maintenance-plan/plan-id/${planId}`,
     GENERATE_WORK_ORDERS: (id: number) => `/maintenance-plan/${id}/generate-work-orders`,
+    BATCH: '/maintenance-plan/batch',
+    IMPORT: '/maintenance-plan/import',
   },
 
   WORK_PLAN: {
@@ -201,6 +203,11 @@ export const API_ENDPOINTS = {
     UPDATE: '/user-dashboard-config',
   },
 
+  JOBS: {
+    DETAIL: (id: number) => `/jobs/${id}`,
+    CANCEL: (id: number) => `/jobs/${id}/cancel`,
+  },
+
   OPERATION_TYPE: {
     LIST: '/operation-type',
     DETAIL: (id: number) => `/operation-type/${id}`,
@@ -106,4 +106,6 @@ export interface PeriodicInspectionQueryParams {
   client_name?: string
   inspection_id?: string
   status?: string
+  /** summary：只返回列表展示字段，不含大文本、签字和照片 */
+  view?: 'summary'
 }
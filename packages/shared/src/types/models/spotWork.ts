@@ -111,6 +111,8 @@ export interface SpotWorkQueryParams {
   project_name?: string
   work_id?: string
   status?: string
+  /** summary：只返回列表展示字段，不含大文本、签字和照片 */
+  view?: 'summary'
 }
 
 /**
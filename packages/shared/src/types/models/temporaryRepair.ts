@@ -91,4 +91,6 @@ export interface TemporaryRepairQueryParams {
   client_name?: string
   repair_id?: string
   status?: string
+  /** summary：只返回列表展示字段，不含大文本、签字和照片 */
+  view?: 'summary'
 }
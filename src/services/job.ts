@@ -0,0 +1,65 @@
+/**
+ * 后台任务服务
+ * 提供后台任务的进度查询、取消和等待完成
+ */
+import request from '../api/request'
+import { API_ENDPOINTS } from '../api/endpoints'
+import type { ApiResponse } from '@sstcp/shared'
+
+export type BackgroundJobStatus = 'pending' | 'running' | 'succeeded' | 'failed' | 'cancelled'
+
+export interface BackgroundJob {
+  id: number
+  job_type: string
+  target: string | null
+  status: BackgroundJobStatus
+  progress: number
+  message: string | null
+  result: Record<string, any> | null
+  error: string | null
+  cancel_requested: boolean
+  created_by: string | null
+  created_at: string | null
+  started_at: string | null
+  finished_at: string | null
+}
+
+const FINISHED_STATUSES: BackgroundJobStatus[] = ['succeeded', 'failed', 'cancelled']
+
+export const jobService = {
+  /**
+   * 获取任务状态
+   */
+  async get(id: number): Promise<ApiResponse<BackgroundJob>> {
+    return await request.get(API_ENDPOINTS.JOBS.DETAIL(id))
+  },
+
+  /**
+   * 取消任务
+   */
+  async cancel(id: number): Promise<ApiResponse<BackgroundJob>> {
+    return await request.post(API_ENDPOINTS.JOBS.CANCEL(id))
+  },
+
+  /**
+   * 轮询任务直到结束
+   * @param id 任务ID
+   * @param onProgress 每次轮询后的回调
+   * @param intervalMs 轮询间隔
+   */
+  async waitFor(
+    id: number,
+    onProgress?: (job: BackgroundJob) => void,
+    intervalMs: number = 1000
+  ): Promise<BackgroundJob> {
+    for (;;) {
+      const response = await jobService.get(id)
+      const job = response.data
+      onProgress?.(job)
+      if (FINISHED_STATUSES.includes(job.status)) {
+        return job
+      }
+      await new Promise(resolve => setTimeout(resolve, intervalMs))
+    }
+  },
+}
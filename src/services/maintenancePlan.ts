@@ -106,6 +106,19 @@ export interface MaintenancePlanUpdate {
   inspection_items?: string
 }
 
+export interface MaintenancePlanImportError {
+  row: number
+  plan_id?: string
+  message: string
+}
+
+export interface MaintenancePlanImportResult {
+  created: number
+  restored: number
+  work_orders: number
+  errors: MaintenancePlanImportError[]
+}
+
 export interface ApiResponse<T = unknown> {
   code: number
   message: string
@@ -160,6 +173,27 @@ export const maintenancePlanService = {
     return await request.post(API_ENDPOINTS.MAINTENANCE_PLAN.LIST, data)
   },
 
+  /**
+   * 批量创建维保计划
+   * 任一条校验失败时整批不创建，返回 code 400 及行错误
+   */
+  async batchCreate(
+    plans: MaintenancePlanCreate[]
+  ): Promise<ApiResponse<MaintenancePlanImportResult>> {
+    return await request.post(API_ENDPOINTS.MAINTENANCE_PLAN.BATCH, { plans })
+  },
+
+  /**
+   * 从 CSV 或 XLSX 文件导入维保计划
+   */
+  async importFile(file: File): Promise<ApiResponse<MaintenancePlanImportResult>> {
+    const formData = new FormData()
+    formData.append('file', file)
+    return await request.post(API_ENDPOINTS.MAINTENANCE_PLAN.IMPORT, formData, {
+      headers: { 'Content-Type': 'multipart/form-data' },
+    })
+  },
+
   /**
    * 更新维保计划
    */
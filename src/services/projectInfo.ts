@@ -5,6 +5,7 @@
 import request from '../api/request'
 import { API_ENDPOINTS } from '../api/endpoints'
 import type { ApiResponse, PaginatedData } from '@sstcp/shared'
+import type { BackgroundJob } from './job'
 
 export interface ProjectInfo {
   id: number
@@ -90,8 +91,9 @@ export const projectInfoService = {
 
   /**
    * 删除项目
+   * 存在关联数据且级联删除时返回后台任务
    */
-  async delete(id: number, cascade: boolean = false): Promise<ApiResponse<null>> {
+  async delete(id: number, cascade: boolean = false): Promise<ApiResponse<BackgroundJob | null>> {
     return await request.delete(API_ENDPOINTS.PROJECT_INFO.DETAIL(id), { params: { cascade } })
   },
 